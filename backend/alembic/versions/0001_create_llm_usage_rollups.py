@@ -0,0 +1,48 @@
+"""Create llm_usage_rollups for per-minute LLM usage aggregates
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'llm_usage_rollups',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('agent_type', sa.String(length=50), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('error_type', sa.String(length=100), nullable=True),
+        sa.Column('request_count', sa.Integer(), nullable=True),
+        sa.Column('error_count', sa.Integer(), nullable=True),
+        sa.Column('cache_hits', sa.Integer(), nullable=True),
+        sa.Column('tokens_used', sa.Integer(), nullable=True),
+        sa.Column('input_tokens', sa.Integer(), nullable=True),
+        sa.Column('output_tokens', sa.Integer(), nullable=True),
+        sa.Column('retry_count', sa.Integer(), nullable=True),
+        sa.Column('total_cost', sa.Float(), nullable=True),
+        sa.Column('total_response_time_ms', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_llm_usage_rollups_bucket', 'llm_usage_rollups', ['bucket'])
+    op.create_index('ix_llm_usage_rollups_project_id', 'llm_usage_rollups', ['project_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_usage_rollups_project_id', table_name='llm_usage_rollups')
+    op.drop_index('ix_llm_usage_rollups_bucket', table_name='llm_usage_rollups')
+    op.drop_table('llm_usage_rollups')
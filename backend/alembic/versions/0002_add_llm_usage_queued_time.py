@@ -0,0 +1,24 @@
+"""Add total_queued_time_ms to llm_usage_rollups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('llm_usage_rollups', sa.Column('total_queued_time_ms', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('llm_usage_rollups', 'total_queued_time_ms')
@@ -0,0 +1,28 @@
+"""Add execution_key and checkpoint to tasks
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('execution_key', sa.String(length=32), nullable=True))
+    op.add_column('tasks', sa.Column('checkpoint', sa.JSON(), nullable=True))
+    op.create_index('ix_tasks_execution_key', 'tasks', ['execution_key'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_execution_key', table_name='tasks')
+    op.drop_column('tasks', 'checkpoint')
+    op.drop_column('tasks', 'execution_key')
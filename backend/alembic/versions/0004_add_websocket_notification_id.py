@@ -0,0 +1,50 @@
+"""Add notification_id and a pending-delivery index to websocket_notifications
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('websocket_notifications', sa.Column('notification_id', sa.String(length=200), nullable=True))
+
+    # Earlier rows kept the ID in event_data, when at all, and not always uniquely;
+    # rows without a unique one fall back to their primary key
+    op.execute("""
+        UPDATE websocket_notifications
+        SET notification_id = event_data->>'notification_id'
+        WHERE event_data->>'notification_id' IN (
+            SELECT event_data->>'notification_id'
+            FROM websocket_notifications
+            WHERE event_data->>'notification_id' IS NOT NULL
+            GROUP BY event_data->>'notification_id'
+            HAVING COUNT(*) = 1
+        )
+    """)
+    op.execute("""
+        UPDATE websocket_notifications
+        SET notification_id = CAST(id AS VARCHAR)
+        WHERE notification_id IS NULL
+    """)
+
+    op.create_index('ix_websocket_notifications_notification_id', 'websocket_notifications',
+                    ['notification_id'], unique=True)
+    op.create_index('ix_websocket_notifications_pending', 'websocket_notifications',
+                    ['project_id', 'delivered', 'expired', 'priority', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_websocket_notifications_pending', table_name='websocket_notifications')
+    op.drop_index('ix_websocket_notifications_notification_id', table_name='websocket_notifications')
+    op.drop_column('websocket_notifications', 'notification_id')
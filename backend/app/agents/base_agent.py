@@ -5,6 +5,7 @@ from typing import Dict, Any, List, Optional
 from uuid import UUID
 import structlog
 from autogen_agentchat.agents import AssistantAgent
+from autogen_core import CancellationToken
 
 from app.models.task import Task
 from app.models.context import ContextArtifact
@@ -13,6 +14,12 @@ from app.models.agent import AgentType
 from app.services.llm_validation import LLMResponseValidator
 from app.services.llm_retry import LLMRetryHandler, RetryConfig
 from app.services.llm_monitoring import LLMUsageTracker
+from app.services.llm_response_cache import llm_response_cache, prompt_fingerprint
+from app.services.llm_streaming import ResponseStreamBatcher
+from app.services.llm_dispatch import dispatch_agent_call
+from app.services.context_compactor import context_compactor
+from app.services.llm_scheduler import RequestPriority, request_priority
+from app.services.model_client_pool import model_client_pool
 from app.services.hitl_safety_service import HITLSafetyService, ApprovalTimeoutError
 from app.database.models import ResponseApprovalDB
 from app.services.response_safety_analyzer import ResponseSafetyAnalyzer
@@ -62,6 +69,12 @@ class BaseAgent(ABC):
 
         # AutoGen agent instance (initialized by subclasses)
         self.autogen_agent: Optional[AssistantAgent] = None
+        
+        # Separate agents for hedged and failover calls, keyed by (model, role)
+        self._alternate_agents: Dict[tuple, AssistantAgent] = {}
+        
+        # Model client pool generation the agents were built against
+        self._client_generation: Optional[int] = None
 
         logger.info("Base agent initialized",
                    agent_type=agent_type.value,
@@ -109,27 +122,46 @@ class BaseAgent(ABC):
         
         This method should be called by subclasses after they define their system message.
         """
-        from autogen_ext.models.openai import OpenAIChatCompletionClient
-        import os
+        self._client_generation = model_client_pool.generation()
+        self.autogen_agent = self._build_assistant(self.llm_config.get("model", "gpt-4o-mini"))
         
-        # Create model client
-        api_key = os.getenv("OPENAI_API_KEY", "demo-key")
-        model_client = OpenAIChatCompletionClient(
-            model=self.llm_config.get("model", "gpt-4o-mini"),
-            api_key=api_key,
-            temperature=self.llm_config.get("temperature", 0.7)
-        )
+        logger.info("AutoGen agent initialized", 
+                   agent_name=f"{self.agent_type.value}_agent")
+    
+    def _build_assistant(self, model: str) -> AssistantAgent:
+        """Create an AutoGen AssistantAgent for this agent type on the given model."""
+        model_client = model_client_pool.get(model, self.llm_config.get("temperature", 0.7))
         
-        # Create AutoGen agent
-        self.autogen_agent = AssistantAgent(
+        return AssistantAgent(
             name=f"{self.agent_type.value}_agent",
             model_client=model_client,
             system_message=self._create_system_message(),
-            description=f"Agent specialized in {self.agent_type.value} tasks"
+            description=f"Agent specialized in {self.agent_type.value} tasks",
+            model_client_stream=settings.llm_streaming_enabled
         )
+    
+    def _alternate_agent(self, model: str, role: str) -> AssistantAgent:
+        """Agent used for hedged or failover calls, so they never share the primary's conversation state."""
+        agent = self._alternate_agents.get((model, role))
+        if agent is None:
+            agent = self._alternate_agents[(model, role)] = self._build_assistant(model)
+        return agent
+    
+    async def reset_conversation(self) -> None:
+        """Clear AutoGen conversation state so a reused agent starts its next task fresh.
         
-        logger.info("AutoGen agent initialized", 
-                   agent_name=f"{self.agent_type.value}_agent")
+        Agents built on model clients the pool has since discarded are rebuilt instead.
+        """
+        if self.autogen_agent is None:
+            return
+        
+        if self._client_generation != model_client_pool.generation():
+            self._alternate_agents.clear()
+            self._initialize_autogen_agent()
+            return
+        
+        for agent in [self.autogen_agent, *self._alternate_agents.values()]:
+            await agent.on_reset(CancellationToken())
     
     async def _execute_with_reliability(self, message: str, task: Task) -> str:
         """Execute LLM conversation with comprehensive reliability features.
@@ -162,16 +194,51 @@ class BaseAgent(ABC):
         }
         
         try:
+            # Replay an identical deterministic prompt from the response cache
+            model = self.llm_config.get("model", "gpt-4o-mini")
+            temperature = self.llm_config.get("temperature", 0.7)
+            cache_key = None
+            if llm_response_cache.is_cacheable(temperature):
+                cache_key = prompt_fingerprint(
+                    model, temperature,
+                    [("system", self._create_system_message()), ("user", message)],
+                    agent_type=self.agent_type.value
+                )
+                cached_response = llm_response_cache.get(cache_key)
+                if cached_response is not None:
+                    await self._track_cached_request(task, (time.time() - start_time) * 1000)
+                    logger.info("Agent response served from cache", **context)
+                    return cached_response
+            
             # Create message for the agent
             user_message = UserMessage(content=message, source="user")
             
-            # Define LLM call with retry wrapper
-            async def llm_call():
-                return await self.autogen_agent.on_messages([user_message], cancellation_token=None)
+            # Forward completion chunks to WebSocket clients while the call runs
+            stream_batcher = None
+            if settings.llm_streaming_enabled:
+                stream_batcher = ResponseStreamBatcher(
+                    project_id=task.project_id,
+                    task_id=task.task_id,
+                    agent_type=self.agent_type.value
+                )
+            
+            # Each attempt waits for a scheduler slot within the provider's rate limits
+            prompt_tokens = self.usage_tracker.estimate_tokens(message, is_input=True, model=model)
             
             # Execute with retry logic
             logger.info("Starting LLM conversation with reliability features", **context)
-            retry_result = await self.retry_handler.execute_with_retry(llm_call, context=context)
+            retry_result = await dispatch_agent_call(
+                self.retry_handler,
+                self.autogen_agent,
+                self._alternate_agent,
+                [user_message],
+                model,
+                prompt_tokens=prompt_tokens,
+                project_id=task.project_id,
+                context=context,
+                stream_batcher=stream_batcher
+            )
+            queued_time_ms = retry_result.queued_time_ms
             
             response_time = (time.time() - start_time) * 1000
             
@@ -183,7 +250,10 @@ class BaseAgent(ABC):
                            final_error=str(retry_result.final_error),
                            **context)
                 
-                await self._track_failed_request(task, message, response_time, retry_result)
+                await self._track_failed_request(task, message, response_time, retry_result,
+                                                 queued_time_ms=queued_time_ms)
+                if stream_batcher:
+                    await stream_batcher.finish(validated=False)
                 return self._generate_fallback_response()
             
             # Extract response content
@@ -215,6 +285,10 @@ class BaseAgent(ABC):
                            validation_passed=True,
                            response_length=len(final_response),
                            **context)
+                
+                # A failover model's answer is not cached under the requested model's key
+                if cache_key and retry_result.model == model:
+                    llm_response_cache.set(cache_key, final_response)
             else:
                 # Handle validation failure
                 logger.warning("Agent response failed validation", 
@@ -229,8 +303,12 @@ class BaseAgent(ABC):
                            recovered_response_length=len(final_response),
                            **context)
             
+            if stream_batcher:
+                await stream_batcher.finish(validated=validation_result.is_valid, final_text=final_response)
+            
             # Track successful request
-            await self._track_successful_request(task, message, final_response, response_time, retry_result)
+            await self._track_successful_request(task, message, final_response, response_time, retry_result,
+                                                 queued_time_ms=queued_time_ms)
             
             logger.info("Agent conversation completed successfully",
                        response_time_ms=response_time,
@@ -276,17 +354,18 @@ class BaseAgent(ABC):
         }}"""
     
     async def _track_successful_request(self, task: Task, message: str, response: str, 
-                                      response_time: float, retry_result):
+                                      response_time: float, retry_result, queued_time_ms: float = 0.0):
         """Track successful LLM request with comprehensive metrics."""
         
-        # Estimate token usage
-        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True)
-        output_tokens = self.usage_tracker.estimate_tokens(response, is_input=False)
+        # Estimate token usage for the model that answered (the failover model, if used)
+        model = retry_result.model or self.llm_config.get("model", "gpt-4o-mini")
+        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True, model=model)
+        output_tokens = self.usage_tracker.estimate_tokens(response, is_input=False, model=model)
         total_tokens = input_tokens + output_tokens
         
         # Calculate cost
         cost = await self.usage_tracker.calculate_costs(
-            input_tokens, output_tokens, provider="openai", model=self.llm_config.get("model", "gpt-4o-mini")
+            input_tokens, output_tokens, provider="openai", model=model
         )
         
         # Track the request
@@ -299,16 +378,37 @@ class BaseAgent(ABC):
             project_id=task.project_id,
             task_id=task.task_id,
             provider="openai",
-            model=self.llm_config.get("model", "gpt-4o-mini"),
+            model=model,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
-            retry_count=retry_result.total_attempts - 1
+            retry_count=retry_result.total_attempts - 1,
+            queued_time_ms=queued_time_ms
         )
     
-    async def _track_failed_request(self, task: Task, message: str, response_time: float, retry_result):
+    async def _track_cached_request(self, task: Task, response_time: float):
+        """Track a request served from the response cache as zero-cost."""
+        
+        await self.usage_tracker.track_request(
+            agent_type=self.agent_type.value,
+            tokens_used=0,
+            response_time=response_time,
+            cost=0.0,
+            success=True,
+            project_id=task.project_id,
+            task_id=task.task_id,
+            provider="openai",
+            model=self.llm_config.get("model", "gpt-4o-mini"),
+            input_tokens=0,
+            output_tokens=0,
+            cache_hit=True
+        )
+    
+    async def _track_failed_request(self, task: Task, message: str, response_time: float, retry_result,
+                                    queued_time_ms: float = 0.0):
         """Track failed LLM request for monitoring and analysis."""
         
-        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True)
+        model = retry_result.model or self.llm_config.get("model", "gpt-4o-mini")
+        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True, model=model)
         error_type = type(retry_result.final_error).__name__ if retry_result.final_error else "unknown"
         
         await self.usage_tracker.track_request(
@@ -320,11 +420,21 @@ class BaseAgent(ABC):
             project_id=task.project_id,
             task_id=task.task_id,
             provider="openai",
-            model=self.llm_config.get("model", "gpt-4o-mini"),
+            model=model,
             input_tokens=input_tokens,
             output_tokens=0,
             error_type=error_type,
-            retry_count=retry_result.total_attempts - 1
+            retry_count=retry_result.total_attempts - 1,
+            queued_time_ms=queued_time_ms
+        )
+    
+    def _estimate_task_tokens(self, task: Task, context: List[ContextArtifact]) -> int:
+        """Estimate prompt tokens for a task from its instructions and context artifacts."""
+        texts = [self._create_system_message(), task.instructions]
+        texts.extend(str(artifact.content) for artifact in context)
+        
+        return self.usage_tracker.estimate_tokens_batch(
+            texts, model=self.llm_config.get("model", "gpt-4o-mini")
         )
     
     def prepare_context_message(self, context_artifacts: List[ContextArtifact], 
@@ -338,6 +448,13 @@ class BaseAgent(ABC):
         Returns:
             Formatted context message string
         """
+        if settings.context_compaction_enabled:
+            return context_compactor.build_message(
+                context_artifacts, handoff,
+                agent_type=self.agent_type.value,
+                model=self.llm_config.get("model", "gpt-4o-mini")
+            )
+        
         context_parts = [
             f"Task: {handoff.instructions}",
             f"Phase: {handoff.phase}",
@@ -395,15 +512,16 @@ class BaseAgent(ABC):
                 raise AgentExecutionDenied("Human rejected agent execution")
 
             # Step 2: Check budget limits
-            estimated_tokens = getattr(task, 'estimated_tokens', 100)
+            estimated_tokens = getattr(task, 'estimated_tokens', None) or self._estimate_task_tokens(task, context)
             budget_check = await self.hitl_service.check_budget_limits(
                 task.project_id, self.agent_type.value, estimated_tokens
             )
             if not budget_check.approved:
                 raise BudgetLimitExceeded(f"Budget limit exceeded: {budget_check.reason}")
 
-            # Step 3: Execute task with monitoring
-            result = await self._execute_with_hitl_monitoring(task, context)
+            # Step 3: Execute task with monitoring; a human is waiting on these LLM calls
+            with request_priority(RequestPriority.HITL_BLOCKING):
+                result = await self._execute_with_hitl_monitoring(task, context)
 
             # Step 4: Request approval for response
             response_approval = await self._request_response_approval(task, result)
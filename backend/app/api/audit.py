@@ -3,19 +3,19 @@
 from typing import List
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.connection import get_session
-from app.services.audit_service import AuditService
+from app.database.connection import get_async_session
+from app.services.audit_service import AsyncAuditService
 from app.models.event_log import EventLogResponse, EventLogFilter, EventType, EventSource
 
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
 
-async def get_audit_service(db: Session = Depends(get_session)) -> AuditService:
+async def get_audit_service(db: AsyncSession = Depends(get_async_session)) -> AsyncAuditService:
     """Dependency to get audit service instance."""
-    return AuditService(db)
+    return AsyncAuditService(db)
 
 
 @router.get("/events", response_model=List[EventLogResponse])
@@ -27,7 +27,7 @@ async def get_audit_events(
     event_source: EventSource = Query(None, description="Filter by event source"),
     limit: int = Query(100, le=1000, description="Maximum number of events to return"),
     offset: int = Query(0, ge=0, description="Number of events to skip"),
-    audit_service: AuditService = Depends(get_audit_service)
+    audit_service: AsyncAuditService = Depends(get_audit_service)
 ) -> List[EventLogResponse]:
     """Retrieve filtered audit events.
     
@@ -58,7 +58,7 @@ async def get_audit_events(
 @router.get("/events/{event_id}", response_model=EventLogResponse)
 async def get_audit_event(
     event_id: UUID,
-    audit_service: AuditService = Depends(get_audit_service)
+    audit_service: AsyncAuditService = Depends(get_audit_service)
 ) -> EventLogResponse:
     """Retrieve a specific audit event by ID."""
     try:
@@ -88,7 +88,7 @@ async def get_project_audit_events(
     event_source: EventSource = Query(None, description="Filter by event source"),
     limit: int = Query(100, le=1000, description="Maximum number of events to return"),
     offset: int = Query(0, ge=0, description="Number of events to skip"),
-    audit_service: AuditService = Depends(get_audit_service)
+    audit_service: AsyncAuditService = Depends(get_audit_service)
 ) -> List[EventLogResponse]:
     """Retrieve audit events for a specific project.
     
@@ -119,7 +119,7 @@ async def get_task_audit_events(
     event_type: EventType = Query(None, description="Filter by event type"),
     limit: int = Query(50, le=1000, description="Maximum number of events to return"),
     offset: int = Query(0, ge=0, description="Number of events to skip"),
-    audit_service: AuditService = Depends(get_audit_service)
+    audit_service: AsyncAuditService = Depends(get_audit_service)
 ) -> List[EventLogResponse]:
     """Retrieve audit events for a specific task.
     
@@ -2,10 +2,11 @@
 
 from typing import Generator
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database.connection import get_session
-from app.services.context_store import ContextStoreService
+from app.database.connection import get_async_session, get_session
+from app.services.context_store import AsyncContextStoreService, ContextStoreService
 from app.services.orchestrator import OrchestratorService
 from app.services.agent_service import AgentService
 
@@ -15,6 +16,13 @@ def get_context_store_service(db: Session = Depends(get_session)) -> ContextStor
     return ContextStoreService(db)
 
 
+def get_async_context_store_service(
+    db: AsyncSession = Depends(get_async_session)
+) -> AsyncContextStoreService:
+    """Get AsyncContextStoreService instance."""
+    return AsyncContextStoreService(db)
+
+
 def get_orchestrator_service(db: Session = Depends(get_session)) -> OrchestratorService:
     """Get OrchestratorService instance."""
     return OrchestratorService(db)
@@ -8,8 +8,9 @@ from sqlalchemy import text
 import redis
 import structlog
 
-from app.database.connection import get_session
+from app.database.connection import get_session, get_pool_status
 from app.config import settings
+from app.tasks.routing import autoscaling_hints, queue_depths
 
 router = APIRouter(prefix="/health", tags=["health"])
 logger = structlog.get_logger(__name__)
@@ -133,7 +134,8 @@ async def detailed_health_check(db: Session = Depends(get_session)):
         db.execute(text("SELECT 1"))
         health_status["components"]["database"] = {
             "status": "healthy",
-            "message": "Database connection successful"
+            "message": "Database connection successful",
+            "pool": get_pool_status()
         }
     except Exception as e:
         health_status["components"]["database"] = {
@@ -191,6 +193,26 @@ async def detailed_health_check(db: Session = Depends(get_session)):
     return {"detail": health_status}
 
 
+@router.get("/queues", status_code=status.HTTP_200_OK)
+async def queue_status():
+    """Agent task queue depths with worker autoscaling hints."""
+    
+    try:
+        redis_celery = redis.from_url(settings.redis_celery_url)
+        depths = queue_depths(redis_celery)
+    except Exception as e:
+        logger.error("Queue depth check failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "status": "unavailable",
+                "message": f"Celery broker not reachable: {str(e)}"
+            }
+        )
+    
+    return autoscaling_hints(depths)
+
+
 @router.get("/ready", status_code=status.HTTP_200_OK)
 async def readiness_check(db: Session = Depends(get_session)):
     """Readiness check for Kubernetes/container orchestration."""
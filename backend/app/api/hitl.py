@@ -5,11 +5,13 @@ from uuid import UUID
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.hitl import HitlAction, HitlStatus, HitlHistoryEntry
 from app.api.dependencies import get_orchestrator_service
-from app.database.connection import get_session
+from app.database.connection import get_async_session, get_session
 from app.services.orchestrator import OrchestratorService
 from app.database.models import HitlRequestDB
 from app.websocket.events import WebSocketEvent, EventType
@@ -209,7 +211,7 @@ async def respond_to_hitl_request(
     
     # 6. Resume workflow if needed
     if workflow_resumed:
-        await orchestrator.resume_workflow_after_hitl(hitl_request.project_id, hitl_request.task_id)
+        await orchestrator.resume_workflow_after_hitl(hitl_request.id, request.action.value)
     
     logger.info("HITL response processed", 
                 request_id=request_id, 
@@ -225,6 +227,57 @@ async def respond_to_hitl_request(
     )
 
 
+@router.get("/pending", response_model=List[HitlRequestResponse])
+async def get_pending_hitl_requests(
+    project_id: Optional[UUID] = None,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Get pending, unexpired HITL requests with optional project filtering."""
+
+    query = select(HitlRequestDB).where(
+        HitlRequestDB.status == HitlStatus.PENDING,
+        or_(
+            HitlRequestDB.expires_at.is_(None),
+            HitlRequestDB.expires_at > datetime.now(timezone.utc)
+        )
+    )
+
+    if project_id:
+        query = query.where(HitlRequestDB.project_id == project_id)
+
+    try:
+        result = await db.execute(query.order_by(HitlRequestDB.created_at.desc()).limit(limit))
+        pending_requests = result.scalars().all()
+
+    except Exception as e:
+        logger.error("Failed to get pending HITL requests", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get pending requests: {str(e)}"
+        )
+
+    return [
+        HitlRequestResponse(
+            request_id=req.id,
+            project_id=req.project_id,
+            task_id=req.task_id,
+            question=req.question,
+            options=req.options or [],
+            status=req.status,
+            user_response=req.user_response,
+            response_comment=req.response_comment,
+            amended_content=req.amended_content,
+            history=req.history or [],
+            created_at=req.created_at.isoformat(),
+            updated_at=req.updated_at.isoformat(),
+            expires_at=req.expires_at.isoformat() if req.expires_at else None,
+            responded_at=req.responded_at.isoformat() if req.responded_at else None
+        )
+        for req in pending_requests
+    ]
+
+
 @router.get("/{request_id}", response_model=HitlRequestResponse)
 async def get_hitl_request(
     request_id: UUID,
@@ -577,48 +630,3 @@ async def cleanup_expired_hitl_requests(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Cleanup failed: {str(e)}"
         )
-
-
-@router.get("/pending", response_model=List[HitlRequestResponse])
-async def get_pending_hitl_requests(
-    project_id: Optional[UUID] = None,
-    limit: int = 50,
-    db: Session = Depends(get_session)
-):
-    """Get pending HITL requests with optional project filtering."""
-    from app.services.hitl_service import HitlService
-
-    hitl_service = HitlService(db)
-
-    try:
-        pending_requests = await hitl_service.get_pending_hitl_requests(
-            project_id=project_id,
-            limit=limit
-        )
-
-        return [
-            HitlRequestResponse(
-                request_id=req.request_id,
-                project_id=req.project_id,
-                task_id=req.task_id,
-                question=req.question,
-                options=req.options,
-                status=req.status.value,
-                user_response=req.user_response,
-                response_comment=req.response_comment,
-                amended_content=req.amended_content,
-                history=[entry.model_dump() for entry in req.history],
-                created_at=req.created_at.isoformat(),
-                updated_at=req.updated_at.isoformat(),
-                expires_at=req.expires_at.isoformat() if req.expires_at else None,
-                responded_at=req.responded_at.isoformat() if req.responded_at else None
-            )
-            for req in pending_requests
-        ]
-
-    except Exception as e:
-        logger.error("Failed to get pending HITL requests", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get pending requests: {str(e)}"
-        )
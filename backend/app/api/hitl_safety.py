@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.database.connection import get_session
+from app.services.approval_notifier import approval_notifier
 from app.services.hitl_safety_service import HITLSafetyService
 from app.database.models import HitlAgentApprovalDB, AgentBudgetControlDB, EmergencyStopDB
 from app.websocket.events import WebSocketEvent, EventType
@@ -182,6 +183,9 @@ async def approve_agent_execution(
         approval_record.responded_at = datetime.utcnow()
         db.commit()
 
+        # Wake the agent waiting on this approval
+        await approval_notifier.notify_decision(approval_id)
+
         # Broadcast approval decision
         event = WebSocketEvent(
             event_type=EventType.HITL_RESPONSE,
@@ -3,13 +3,16 @@
 from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_orchestrator_service
 from app.services.orchestrator import OrchestratorService
 from app.services.project_completion_service import project_completion_service
-from app.database.connection import get_session
+from app.database.connection import get_async_session, get_session
+from app.database.models import TaskDB
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -33,6 +36,8 @@ class TaskCreateRequest(BaseModel):
     agent_type: str
     instructions: str
     context_ids: List[UUID] = []
+    priority: int = Field(default=1, ge=1, le=9, description="Task priority (1=highest)")
+    interactive: bool = Field(default=False, description="A user is waiting on the result")
 
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
@@ -58,23 +63,31 @@ async def create_project(
 @router.get("/{project_id}/status")
 async def get_project_status(
     project_id: UUID,
-    orchestrator: OrchestratorService = Depends(get_orchestrator_service)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get project status and tasks."""
     
-    tasks = orchestrator.get_project_tasks(project_id)
+    result = await db.execute(
+        select(
+            TaskDB.id,
+            TaskDB.agent_type,
+            TaskDB.status,
+            TaskDB.created_at,
+            TaskDB.updated_at
+        ).where(TaskDB.project_id == project_id)
+    )
     
     return {
         "project_id": project_id,
         "tasks": [
             {
-                "task_id": task.task_id,
+                "task_id": task.id,
                 "agent_type": task.agent_type,
                 "status": task.status,
                 "created_at": task.created_at,
                 "updated_at": task.updated_at
             }
-            for task in tasks
+            for task in result.all()
         ]
     }
 
@@ -95,7 +108,7 @@ async def create_task(
     )
     
     # Submit task to queue
-    celery_task_id = orchestrator.submit_task(task)
+    celery_task_id = orchestrator.submit_task(task, priority=request.priority, interactive=request.interactive)
     
     return {
         "task_id": task.task_id,
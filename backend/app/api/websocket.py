@@ -13,11 +13,14 @@ logger = structlog.get_logger(__name__)
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
-    project_id: Optional[str] = Query(None, description="Project ID to subscribe to")
+    project_id: Optional[str] = Query(None, description="Project ID to subscribe to"),
+    encoding: str = Query("json", description="Frame encoding: json (text frames) or msgpack (binary frames)"),
+    deltas: bool = Query(False, description="Receive JSON patches for repeated agent and workflow events"),
+    last_seq: Optional[int] = Query(None, description="Last project event sequence number received, to resume after it")
 ):
     """WebSocket endpoint for real-time communication."""
     
-    await websocket_manager.connect(websocket, project_id)
+    await websocket_manager.connect(websocket, project_id, encoding=encoding, deltas=deltas, last_seq=last_seq)
     
     try:
         while True:
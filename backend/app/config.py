@@ -17,11 +17,24 @@ class Settings(BaseSettings):
     # Database Configuration
     database_url: str = Field(env="DATABASE_URL")
     database_test_url: Optional[str] = Field(default=None, env="DATABASE_TEST_URL")
+    database_pool_size: int = Field(default=10, env="DATABASE_POOL_SIZE")
+    database_max_overflow: int = Field(default=20, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout: int = Field(default=30, env="DATABASE_POOL_TIMEOUT")
+    database_pool_recycle: int = Field(default=1800, env="DATABASE_POOL_RECYCLE")
+    database_pool_pre_ping: bool = Field(default=True, env="DATABASE_POOL_PRE_PING")
+    database_statement_timeout_ms: int = Field(default=30000, env="DATABASE_STATEMENT_TIMEOUT_MS")
     
     # Redis Configuration
     redis_url: str = Field(env="REDIS_URL")
     redis_celery_url: str = Field(env="REDIS_CELERY_URL")
     
+    # Celery Worker Configuration (agent tasks share one event loop per worker process)
+    celery_worker_pool: str = Field(default="threads", env="CELERY_WORKER_POOL")  # threads or prefork
+    celery_worker_concurrency: int = Field(default=8, env="CELERY_WORKER_CONCURRENCY")
+    celery_async_runner_enabled: bool = Field(default=True, env="CELERY_ASYNC_RUNNER_ENABLED")
+    celery_normal_priority_max: int = Field(default=3, env="CELERY_NORMAL_PRIORITY_MAX")  # lower priority goes to bulk queues
+    celery_autoscale_target_depth: int = Field(default=4, env="CELERY_AUTOSCALE_TARGET_DEPTH")
+    
     # API Configuration
     api_v1_prefix: str = Field(default="/api/v1", env="API_V1_PREFIX")
     cors_origins: List[str] = Field(
@@ -29,9 +42,32 @@ class Settings(BaseSettings):
         env="CORS_ORIGINS"
     )
     
+    # Artifact Cache Configuration (read-through cache for context artifacts)
+    artifact_cache_enabled: bool = Field(default=True, env="ARTIFACT_CACHE_ENABLED")
+    artifact_cache_max_entries: int = Field(default=1000, env="ARTIFACT_CACHE_MAX_ENTRIES")
+    artifact_cache_max_bytes: int = Field(default=64 * 1024 * 1024, env="ARTIFACT_CACHE_MAX_BYTES")
+    artifact_cache_ttl_seconds: int = Field(default=300, env="ARTIFACT_CACHE_TTL_SECONDS")
+    artifact_cache_redis_enabled: bool = Field(default=True, env="ARTIFACT_CACHE_REDIS_ENABLED")
+    
     # WebSocket Configuration
     ws_heartbeat_interval: int = Field(default=30, env="WS_HEARTBEAT_INTERVAL")
     ws_max_connections: int = Field(default=100, env="WS_MAX_CONNECTIONS")
+    ws_send_queue_size: int = Field(default=256, env="WS_SEND_QUEUE_SIZE")
+    ws_slow_consumer_policy: str = Field(default="coalesce", env="WS_SLOW_CONSUMER_POLICY")  # drop_oldest, coalesce or disconnect
+    ws_send_timeout_seconds: float = Field(default=10.0, env="WS_SEND_TIMEOUT_SECONDS")
+    ws_coalesce_window_ms: int = Field(default=50, env="WS_COALESCE_WINDOW_MS")  # 0 sends every status change
+    ws_entity_cache_size: int = Field(default=10000, env="WS_ENTITY_CACHE_SIZE")
+    ws_replay_buffer_size: int = Field(default=500, env="WS_REPLAY_BUFFER_SIZE")
+    ws_per_message_deflate: bool = Field(default=True, env="WS_PER_MESSAGE_DEFLATE")
+    ws_notification_flush_interval_ms: int = Field(default=200, env="WS_NOTIFICATION_FLUSH_INTERVAL_MS")
+    ws_notification_retention_hours: int = Field(default=72, env="WS_NOTIFICATION_RETENTION_HOURS")
+    ws_notification_compaction_interval_minutes: int = Field(default=60, env="WS_NOTIFICATION_COMPACTION_INTERVAL_MINUTES")
+
+    # Event Bus Configuration (Redis pub/sub fan-out from workers to WebSocket clients)
+    event_bus_enabled: bool = Field(default=True, env="EVENT_BUS_ENABLED")
+    event_bus_channel: str = Field(default="botarmy:websocket_events", env="EVENT_BUS_CHANNEL")
+    event_bus_batch_window_ms: int = Field(default=10, env="EVENT_BUS_BATCH_WINDOW_MS")
+    event_bus_max_batch_size: int = Field(default=100, env="EVENT_BUS_MAX_BATCH_SIZE")
     
     # LLM Configuration
     openai_api_key: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
@@ -44,6 +80,47 @@ class Settings(BaseSettings):
     llm_response_timeout: int = Field(default=30, env="LLM_RESPONSE_TIMEOUT")
     llm_max_response_size: int = Field(default=50000, env="LLM_MAX_RESPONSE_SIZE")
     llm_enable_usage_tracking: bool = Field(default=True, env="LLM_ENABLE_USAGE_TRACKING")
+    llm_circuit_failure_threshold: float = Field(default=0.5, env="LLM_CIRCUIT_FAILURE_THRESHOLD")
+    llm_circuit_min_calls: int = Field(default=5, env="LLM_CIRCUIT_MIN_CALLS")
+    llm_circuit_window_seconds: int = Field(default=60, env="LLM_CIRCUIT_WINDOW_SECONDS")
+    llm_circuit_open_seconds: int = Field(default=30, env="LLM_CIRCUIT_OPEN_SECONDS")
+    llm_hedging_enabled: bool = Field(default=False, env="LLM_HEDGING_ENABLED")
+    llm_hedge_min_delay_ms: int = Field(default=2000, env="LLM_HEDGE_MIN_DELAY_MS")
+    llm_failover_model: Optional[str] = Field(default=None, env="LLM_FAILOVER_MODEL")
+    llm_usage_ring_size: int = Field(default=10000, env="LLM_USAGE_RING_SIZE")
+    llm_usage_flush_interval_ms: int = Field(default=5000, env="LLM_USAGE_FLUSH_INTERVAL_MS")
+    llm_usage_persist_enabled: bool = Field(default=True, env="LLM_USAGE_PERSIST_ENABLED")
+    llm_tokenizer_use_tiktoken: bool = Field(default=True, env="LLM_TOKENIZER_USE_TIKTOKEN")
+    llm_token_count_cache_size: int = Field(default=4096, env="LLM_TOKEN_COUNT_CACHE_SIZE")
+
+    # LLM Request Scheduler Configuration (per-process admission control for provider calls)
+    llm_scheduler_enabled: bool = Field(default=True, env="LLM_SCHEDULER_ENABLED")
+    llm_scheduler_max_in_flight: int = Field(default=8, env="LLM_SCHEDULER_MAX_IN_FLIGHT")
+    llm_scheduler_requests_per_minute: int = Field(default=500, env="LLM_SCHEDULER_REQUESTS_PER_MINUTE")
+    llm_scheduler_tokens_per_minute: int = Field(default=200000, env="LLM_SCHEDULER_TOKENS_PER_MINUTE")
+
+    # Model Client Pool Configuration (per-process model clients with keep-alive HTTP connections)
+    model_client_pool_enabled: bool = Field(default=True, env="MODEL_CLIENT_POOL_ENABLED")
+    model_client_max_keepalive: int = Field(default=20, env="MODEL_CLIENT_MAX_KEEPALIVE")
+    model_client_keepalive_expiry: float = Field(default=30.0, env="MODEL_CLIENT_KEEPALIVE_EXPIRY")
+
+    # LLM Response Cache Configuration (opt-in replay of identical prompts)
+    llm_response_cache_enabled: bool = Field(default=False, env="LLM_RESPONSE_CACHE_ENABLED")
+    llm_response_cache_backend: str = Field(default="redis", env="LLM_RESPONSE_CACHE_BACKEND")  # redis or disk
+    llm_response_cache_ttl_seconds: int = Field(default=86400, env="LLM_RESPONSE_CACHE_TTL_SECONDS")
+    llm_response_cache_max_bytes: int = Field(default=256 * 1024 * 1024, env="LLM_RESPONSE_CACHE_MAX_BYTES")
+    llm_response_cache_force: bool = Field(default=False, env="LLM_RESPONSE_CACHE_FORCE")
+    llm_response_cache_dir: str = Field(default="/tmp/bmad_llm_cache", env="LLM_RESPONSE_CACHE_DIR")
+
+    # LLM Streaming Configuration (incremental agent output to WebSocket clients)
+    llm_streaming_enabled: bool = Field(default=False, env="LLM_STREAMING_ENABLED")
+    llm_stream_batch_interval_ms: int = Field(default=100, env="LLM_STREAM_BATCH_INTERVAL_MS")
+
+    # Context Compaction Configuration (token-budgeted context messages for agents)
+    context_compaction_enabled: bool = Field(default=True, env="CONTEXT_COMPACTION_ENABLED")
+    context_token_budget: int = Field(default=8000, env="CONTEXT_TOKEN_BUDGET")
+    context_max_section_tokens: int = Field(default=2000, env="CONTEXT_MAX_SECTION_TOKENS")
+    context_compaction_cache_size: int = Field(default=512, env="CONTEXT_COMPACTION_CACHE_SIZE")
 
     # HITL Safety Configuration
     hitl_enabled: bool = Field(default=True, env="HITL_ENABLED")
@@ -52,7 +129,19 @@ class Settings(BaseSettings):
     hitl_budget_session_limit: int = Field(default=2000, env="HITL_BUDGET_SESSION_LIMIT")
     hitl_emergency_stop_enabled: bool = Field(default=True, env="HITL_EMERGENCY_STOP_ENABLED")
     hitl_websocket_notifications: bool = Field(default=True, env="HITL_WEBSOCKET_NOTIFICATIONS")
-    
+    hitl_approval_channel: str = Field(default="botarmy:hitl_approvals", env="HITL_APPROVAL_CHANNEL")
+    hitl_approval_recheck_seconds: int = Field(default=60, env="HITL_APPROVAL_RECHECK_SECONDS")
+
+    # Workflow Execution Configuration
+    workflow_max_parallel_steps: int = Field(default=4, env="WORKFLOW_MAX_PARALLEL_STEPS")
+    workflow_state_flush_interval_ms: int = Field(default=500, env="WORKFLOW_STATE_FLUSH_INTERVAL_MS")
+
+    # Audit Trail Configuration (buffered audit events are inserted in batches)
+    audit_durability: str = Field(default="buffered", env="AUDIT_DURABILITY")  # buffered or strict
+    audit_flush_interval_ms: int = Field(default=250, env="AUDIT_FLUSH_INTERVAL_MS")
+    audit_flush_batch_size: int = Field(default=200, env="AUDIT_FLUSH_BATCH_SIZE")
+    audit_max_queue: int = Field(default=10000, env="AUDIT_MAX_QUEUE")
+
     # Security
     secret_key: str = Field(env="SECRET_KEY")
     algorithm: str = Field(default="HS256", env="ALGORITHM")
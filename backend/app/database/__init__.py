@@ -1,11 +1,21 @@
 """Database configuration and models."""
 
-from .connection import get_database_url, get_engine, get_session
+from .connection import (
+    get_async_engine,
+    get_async_session,
+    get_database_url,
+    get_engine,
+    get_pool_status,
+    get_session,
+)
 from .models import Base, TaskDB, AgentStatusDB, ContextArtifactDB, HitlRequestDB
 
 __all__ = [
+    "get_async_engine",
+    "get_async_session",
     "get_database_url",
     "get_engine", 
+    "get_pool_status",
     "get_session",
     "Base",
     "TaskDB",
@@ -1,24 +1,194 @@
 """Database connection and session management."""
 
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
 from app.config import settings
 
+
+class PoolMetrics:
+    """Thread-safe counters for connection pool checkouts and wait times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters."""
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connections_created = 0
+            self.checkout_timeouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.waits_recorded = 0
+
+    def record_wait(self, wait_seconds: float) -> None:
+        """Record the time spent waiting for a pooled connection."""
+        wait_ms = wait_seconds * 1000
+        with self._lock:
+            self.waits_recorded += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def record_timeout(self) -> None:
+        """Record a checkout that timed out waiting for a connection."""
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of the current counters."""
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connections_created": self.connections_created,
+                "checkout_timeouts": self.checkout_timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.waits_recorded, 3) if self.waits_recorded else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Instrumented pool for engines running on an asyncio driver."""
+
+
+# Async drivers used in place of the configured sync driver for each backend
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "psycopg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Translate a sync database URL into its asyncio driver equivalent.
+
+    URLs that already name an async driver (psycopg, asyncpg, aiosqlite) are
+    returned unchanged.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = url.get_driver_name()
+
+    if backend not in ASYNC_DRIVERS or driver in ("psycopg", "asyncpg", "aiosqlite"):
+        return database_url
+
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def _build_engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Build engine pool options for the configured backend.
+
+    SQLite keeps a single shared StaticPool connection; every other backend
+    gets a real QueuePool sized from settings. File-backed async SQLite opens
+    a connection per session instead, since each aiosqlite connection owns a
+    non-daemon thread that would otherwise outlive the event loop.
+    """
+    if database_url.startswith("sqlite"):
+        if is_async and ":memory:" not in database_url:
+            return {"poolclass": NullPool}
+        return {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+
+    connect_args: Dict[str, Any] = {}
+    if database_url.startswith("postgresql") and settings.database_statement_timeout_ms > 0:
+        if database_url.startswith("postgresql+asyncpg"):
+            connect_args["server_settings"] = {
+                "statement_timeout": str(settings.database_statement_timeout_ms)
+            }
+        else:
+            connect_args["options"] = f"-c statement_timeout={settings.database_statement_timeout_ms}"
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
 # Create database engine
 engine = create_engine(
     settings.database_url,
-    poolclass=StaticPool,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
     echo=settings.debug,
+    **_build_engine_options(settings.database_url),
 )
 
+
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.record_connect()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.record_checkout()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.record_checkin()
+
+
+def _instrument_engine(target) -> None:
+    """Attach pool metric listeners to a sync engine."""
+    event.listen(target, "connect", _on_connect)
+    event.listen(target, "checkout", _on_checkout)
+    event.listen(target, "checkin", _on_checkin)
+
+
+_instrument_engine(engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory, created on first use so that processes
+# that never touch the async path (Celery workers, scripts) skip the driver
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
 # Create base class for models
 Base = declarative_base()
 
@@ -33,6 +203,73 @@ def get_engine():
     return engine
 
 
+def get_async_engine() -> AsyncEngine:
+    """Get the async database engine, creating it on first use."""
+    global _async_engine
+
+    if _async_engine is None:
+        async_url = to_async_url(settings.database_url)
+        _async_engine = create_async_engine(
+            async_url,
+            echo=settings.debug,
+            **_build_engine_options(async_url, is_async=True),
+        )
+        _instrument_engine(_async_engine.sync_engine)
+
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Get the async session factory bound to the async engine."""
+    global _async_session_factory
+
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+    return _async_session_factory
+
+
+async def dispose_async_engine() -> None:
+    """Close all pooled async connections and drop the engine."""
+    global _async_engine, _async_session_factory
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Get connection pool configuration, occupancy and checkout metrics."""
+    pool = engine.pool
+    status: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        **pool_metrics.snapshot(),
+    }
+
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.database_max_overflow,
+        })
+
+    if _async_engine is not None:
+        async_pool = _async_engine.pool
+        status["async_pool_class"] = type(async_pool).__name__
+        if isinstance(async_pool, QueuePool):
+            status["async_checked_out"] = async_pool.checkedout()
+
+    return status
+
+
 def get_session() -> Generator:
     """Get a database session."""
     db = SessionLocal()
@@ -40,3 +277,9 @@ def get_session() -> Generator:
         yield db
     finally:
         db.close()
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get an async database session."""
+    async with get_async_session_factory()() as session:
+        yield session
@@ -11,7 +11,7 @@ from app.models.task import TaskStatus
 from app.models.agent import AgentType, AgentStatus
 from app.models.context import ArtifactType
 from app.models.hitl import HitlStatus
-from sqlalchemy import Numeric, Boolean
+from sqlalchemy import Numeric, Boolean, Float, Index
 
 
 def utcnow():
@@ -70,6 +70,10 @@ class TaskDB(Base):
     instructions = Column(Text, nullable=False)
     output = Column(JSON)
     error_message = Column(Text)
+    # Idempotency key of the submission being executed and its agent result,
+    # saved before post-processing so retries do not repeat the model call
+    execution_key = Column(String(32), index=True)
+    checkpoint = Column(JSON)
     created_at = Column(DateTime, default=utcnow)
     updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
     started_at = Column(DateTime)
@@ -279,8 +283,13 @@ class WebSocketNotificationDB(Base):
     """WebSocket notification database model for advanced event tracking."""
 
     __tablename__ = "websocket_notifications"
+    __table_args__ = (
+        # Pending notifications per project, in delivery order
+        Index("ix_websocket_notifications_pending", "project_id", "delivered", "expired", "priority", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    notification_id = Column(String(200), unique=True, index=True)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"))
     event_type = Column(String(100), nullable=False)
     priority = Column(String(20), default="NORMAL")  # 'LOW', 'NORMAL', 'HIGH', 'CRITICAL'
@@ -332,3 +341,28 @@ class WorkflowStateDB(Base):
 
 # Add workflow_states relationship to ProjectDB
 ProjectDB.workflow_states = relationship("WorkflowStateDB", back_populates="project")
+
+
+class LLMUsageRollupDB(Base):
+    """Per-minute aggregate of LLM requests by project, agent, model and error type."""
+
+    __tablename__ = "llm_usage_rollups"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    bucket = Column(DateTime, nullable=False, index=True)  # Start of the minute, UTC
+    project_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    agent_type = Column(String(50), nullable=False)
+    provider = Column(String(50), nullable=False)
+    model = Column(String(100), nullable=False)
+    error_type = Column(String(100), nullable=True)  # NULL for successful requests
+    request_count = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)
+    tokens_used = Column(Integer, default=0)
+    input_tokens = Column(Integer, default=0)
+    output_tokens = Column(Integer, default=0)
+    retry_count = Column(Integer, default=0)
+    total_cost = Column(Float, default=0.0)
+    total_response_time_ms = Column(Float, default=0.0)
+    total_queued_time_ms = Column(Float, default=0.0)  # Time spent waiting in the request scheduler
+    created_at = Column(DateTime, default=utcnow)
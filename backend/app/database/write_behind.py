@@ -0,0 +1,123 @@
+"""Timer-driven batching shared by the write-behind stores.
+
+The LLM usage store, the audit writer and the notification store all queue
+rows in memory and write them in batches on a timer, so callers never wait
+on a commit. This base class holds the part they share: scheduling a flush
+on the running event loop, running the write in a worker thread, keeping
+flush tasks alive until they finish, flushing synchronously outside an event
+loop, and handing a failed batch back to the store.
+
+Stores keep their pending rows in `_pending` (a list or dict) and implement
+`_write` and `_restore`, which decide how rows are written and what a failed
+flush puts back.
+"""
+
+import asyncio
+from typing import Any, Callable, Optional, Set
+from sqlalchemy.orm import Session
+
+from .connection import get_session
+
+
+class WriteBehindBuffer:
+    """Pending rows flushed on a timer, in a worker thread, on a dedicated session."""
+
+    def __init__(self, flush_interval: float, session_factory: Optional[Callable[[], Session]] = None):
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory or (lambda: next(get_session()))
+
+        self._pending: Any = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def flush(self) -> int:
+        """
+        Write pending rows and wait for background flushes already writing.
+
+        Returns:
+            Number of rows written by this call
+        """
+        written = await self._flush_pending()
+        in_flight = [task for task in self._flush_tasks if not task.done()]
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        return written
+
+    def flush_sync(self) -> int:
+        """Write pending rows from code that is not running an event loop."""
+        pending = self._take()
+        if not pending:
+            return 0
+
+        try:
+            return self._write(pending)
+        except Exception as e:
+            return self._restore(pending, e)
+
+    def clear(self) -> None:
+        """Drop pending rows."""
+        self._cancel_timer()
+        self._pending.clear()
+
+    def _write(self, pending: Any) -> int:
+        """Write a batch on its own session; runs in a worker thread. Returns rows written."""
+        raise NotImplementedError
+
+    def _restore(self, pending: Any, error: Exception) -> int:
+        """Put back what a failed write should retry. Returns rows it wrote before failing."""
+        raise NotImplementedError
+
+    def _take(self) -> Any:
+        self._cancel_timer()
+        pending, self._pending = self._pending, type(self._pending)()
+        return pending
+
+    async def _flush_pending(self) -> int:
+        pending = self._take()
+        if not pending:
+            return 0
+
+        try:
+            return await asyncio.to_thread(self._write, pending)
+        except Exception as e:
+            return self._restore(pending, e)
+
+    def _schedule_flush(self) -> None:
+        """Flush after the interval, unless a flush is already scheduled on this loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        # Timers from a finished event loop (e.g. a previous asyncio.run) never fire
+        if self._timer is not None and self._timer_loop is loop:
+            return
+
+        self._timer_loop = loop
+        self._timer = loop.call_later(self.flush_interval, self._flush_due)
+
+    def _flush_soon(self) -> None:
+        """Start a flush now, in the background when an event loop is running."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+        self._cancel_timer()
+        self._start_flush()
+
+    def _flush_due(self) -> None:
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self._flush_pending())
+        # Hold a reference until done so the flush is not garbage collected mid-write
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
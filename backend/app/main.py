@@ -7,7 +7,11 @@ import structlog
 
 from app.config import settings
 from app.api import projects, hitl, health, websocket, agents, artifacts, audit, workflows
-from app.database.connection import engine, Base
+from app.database.connection import engine, Base, dispose_async_engine
+from app.websocket.event_bus import event_bus_subscriber
+from app.websocket.notification_store import notification_store
+from app.services.audit_writer import audit_writer
+from app.services.llm_usage_store import llm_usage_store
 
 # Configure structured logging
 structlog.configure(
@@ -107,12 +111,27 @@ async def startup_event():
                 version=settings.app_version,
                 debug=settings.debug)
 
+    # Relay events published by Celery workers to connected WebSocket clients
+    if settings.event_bus_enabled:
+        await event_bus_subscriber.start()
+
+    # Expire and delete settled priority notifications periodically
+    notification_store.start_compaction()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event."""
     logger.info("BotArmy Backend shutting down")
 
+    if settings.event_bus_enabled:
+        await event_bus_subscriber.stop()
+
+    await notification_store.stop()
+    await audit_writer.flush()
+    await llm_usage_store.flush()
+    await dispose_async_engine()
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -140,5 +159,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        ws_per_message_deflate=settings.ws_per_message_deflate
     )
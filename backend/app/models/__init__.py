@@ -2,7 +2,7 @@
 
 from .task import Task, TaskStatus
 from .agent import AgentStatus, AgentType
-from .context import ContextArtifact, ArtifactType
+from .context import ContextArtifact, ContextArtifactSummary, ArtifactType
 from .hitl import HitlRequest, HitlStatus, HitlAction
 from .handoff import HandoffSchema
 from .workflow import (
@@ -29,6 +29,7 @@ __all__ = [
     "AgentStatus",
     "AgentType",
     "ContextArtifact",
+    "ContextArtifactSummary",
     "ArtifactType",
     "HitlRequest",
     "HitlStatus",
@@ -49,3 +49,23 @@ class ContextArtifact(BaseModel):
     @field_serializer('created_at', 'updated_at')  
     def serialize_datetime(self, value: datetime) -> str:
         return value.isoformat()
+
+
+class ContextArtifactSummary(BaseModel):
+    """Context artifact without its content, for listings and metadata reads."""
+    
+    context_id: UUID = Field(description="Unique context identifier")
+    project_id: UUID = Field(description="Project this artifact belongs to")
+    source_agent: AgentType = Field(description="Agent that created this artifact")
+    artifact_type: ArtifactType = Field(description="Type of artifact")
+    artifact_metadata: Optional[Dict[str, Any]] = Field(default=None, description="Additional metadata")
+    created_at: datetime = Field(description="Creation timestamp")
+    updated_at: datetime = Field(description="Last update timestamp")
+    
+    @field_serializer('context_id', 'project_id')
+    def serialize_uuid(self, value: UUID) -> str:
+        return str(value)
+    
+    @field_serializer('created_at', 'updated_at')  
+    def serialize_datetime(self, value: datetime) -> str:
+        return value.isoformat()
@@ -16,6 +16,9 @@ from app.services.agent_status_service import AgentStatusService
 
 logger = structlog.get_logger(__name__)
 
+# Number of recent project artifacts used when a task names no context
+PROJECT_CONTEXT_LIMIT = 10
+
 
 class AgentService:
     """Enhanced agent service with factory pattern integration and workflow management.
@@ -283,8 +286,9 @@ class AgentService:
         # Determine LLM configuration based on agent type and task
         llm_config = self._get_llm_config_for_agent(agent_type, task)
         
-        # Get or create agent instance
+        # Get or create agent instance; a warm instance keeps no conversation from its last task
         agent = self.agent_factory.create_agent(agent_type, llm_config)
+        await agent.reset_conversation()
         
         return agent
     
@@ -334,21 +338,22 @@ class AgentService:
         context_artifacts = []
         
         try:
-            # Get context from handoff if provided
+            # Load handoff and task context in one batched lookup
+            context_ids = []
             if handoff and handoff.context_ids:
-                handoff_artifacts = await self.context_store.get_artifacts_by_ids(handoff.context_ids)
-                context_artifacts.extend(handoff_artifacts)
-            
-            # Get additional context from task if specified
+                context_ids.extend(handoff.context_ids)
             if hasattr(task, 'context_ids') and task.context_ids:
-                task_artifacts = await self.context_store.get_artifacts_by_ids(task.context_ids)
-                context_artifacts.extend(task_artifacts)
+                context_ids.extend(task.context_ids)
+            
+            if context_ids:
+                context_artifacts = self.context_store.get_artifacts_by_ids(context_ids)
             
             # Get project-wide context if no specific context provided
             if not context_artifacts and task.project_id:
-                project_artifacts = await self.context_store.get_artifacts_by_project(task.project_id)
-                # Limit to most recent artifacts to avoid overwhelming context
-                context_artifacts = project_artifacts[-10:] if project_artifacts else []
+                # Only the most recent artifacts, to avoid overwhelming context
+                context_artifacts = self.context_store.get_recent_artifacts(
+                    task.project_id, limit=PROJECT_CONTEXT_LIMIT
+                )
             
             logger.debug("Retrieved task context",
                         task_id=task.task_id,
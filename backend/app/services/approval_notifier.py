@@ -0,0 +1,195 @@
+"""Wake-up notifications for agents waiting on HITL approval decisions.
+
+Agents block in HITLSafetyService.wait_for_approval until a human decides.
+Rather than polling the database, waiters register an asyncio.Event here and
+are woken when a decision or an emergency stop is announced. Announcements go
+through Redis pub/sub so that a decision recorded by the API process reaches
+agents running in Celery workers.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+from uuid import UUID
+import structlog
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Waiter key that is woken by every announcement
+EMERGENCY_STOP = "*"
+
+Waiter = Tuple[asyncio.AbstractEventLoop, asyncio.Event]
+
+
+class ApprovalSubscription:
+    """Handle for waiting on announcements about one approval request."""
+
+    def __init__(self, event: asyncio.Event):
+        self._event = event
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait for the next announcement or until the timeout elapses.
+
+        Returns:
+            True if woken by an announcement, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+
+class ApprovalNotifier:
+    """
+    Registry of approval waiters, fed by local calls and a Redis channel.
+
+    Each process keeps at most one Redis listener, started when the first
+    waiter registers and stopped once no waiters remain.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        channel: Optional[str] = None,
+        reconnect_delay: float = 1.0
+    ):
+        self.redis_url = redis_url or settings.redis_url
+        self.channel = channel or settings.hitl_approval_channel
+        self.reconnect_delay = reconnect_delay
+        self._waiters: Dict[str, Set[Waiter]] = {}
+        self._client: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def waiter_count(self) -> int:
+        """Number of waiters currently registered."""
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _get_client(self) -> redis.Redis:
+        """Get the Redis client, connecting lazily on first use."""
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url)
+        return self._client
+
+    @asynccontextmanager
+    async def subscribe(self, approval_id: UUID) -> AsyncIterator["ApprovalSubscription"]:
+        """
+        Register interest in an approval for the duration of the block.
+
+        Subscribe before checking the approval's current status so that a
+        decision made in between is not missed.
+        """
+        loop = asyncio.get_running_loop()
+        waiter: Waiter = (loop, asyncio.Event())
+        key = str(approval_id)
+
+        self._waiters.setdefault(key, set()).add(waiter)
+        self._ensure_listener(loop)
+        try:
+            yield ApprovalSubscription(waiter[1])
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[key]
+
+    async def notify_decision(self, approval_id: UUID) -> None:
+        """Announce that an approval request has been approved or rejected."""
+        await self._announce(str(approval_id))
+
+    async def notify_emergency_stop(self) -> None:
+        """Announce an emergency stop, waking every waiter."""
+        await self._announce(EMERGENCY_STOP)
+
+    async def _announce(self, key: str) -> None:
+        """Wake local waiters and publish the announcement to other processes."""
+        self._wake(key)
+        # The publish is a blocking round trip; keep it off the event loop
+        await asyncio.to_thread(self._publish, key)
+
+    def _publish(self, key: str) -> None:
+        """Publish an announcement on the channel, logging rather than raising on failure."""
+        try:
+            self._get_client().publish(self.channel, json.dumps({"key": key}))
+        except redis.RedisError as e:
+            logger.warning("Failed to publish approval notification",
+                          channel=self.channel,
+                          key=key,
+                          error=str(e))
+
+    def _wake(self, key: str) -> int:
+        """Set the events of all waiters matching the key."""
+        if key == EMERGENCY_STOP:
+            waiters = [w for group in self._waiters.values() for w in group]
+        else:
+            waiters = list(self._waiters.get(key, ()))
+
+        for loop, event in waiters:
+            if loop.is_closed():
+                continue
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if loop is running:
+                event.set()
+            else:
+                loop.call_soon_threadsafe(event.set)
+
+        return len(waiters)
+
+    def _ensure_listener(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the Redis listener on this loop unless one is already running."""
+        if self._listener is not None and not self._listener.done() \
+                and self._listener.get_loop() is loop:
+            return
+        self._listener = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Relay channel announcements to local waiters while any are registered."""
+        while self._waiters:
+            client = aioredis.from_url(self.redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+
+                while self._waiters:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        key = json.loads(message["data"])["key"]
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Discarding malformed approval notification")
+                        continue
+                    self._wake(key)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logger.warning("Approval notification listener failed",
+                              channel=self.channel,
+                              error=str(e))
+                await asyncio.sleep(self.reconnect_delay)
+
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+
+# Global approval notifier instance
+approval_notifier = ApprovalNotifier()
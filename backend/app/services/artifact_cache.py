@@ -0,0 +1,267 @@
+"""Read-through cache for context artifacts shared across agents.
+
+Within a workflow every downstream agent re-reads the same upstream artifacts
+(project brief, PRD, architecture). Artifacts are effectively immutable once
+written, so reads are served from a bounded in-process LRU tier backed by an
+optional Redis tier shared between the API process and Celery workers.
+
+Entries are keyed by artifact ID and carry the artifact's updated_at, so a
+caller that already knows the current updated_at (for example from a
+metadata-only listing) never receives a stale copy. ContextStoreService
+invalidates entries when an artifact is updated or deleted, but that only
+reaches this process's local tier and Redis; other processes' local tiers
+keep the old copy until it expires. ContextStoreService therefore always
+passes the current updated_at, read from the database, when serving reads.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import RLock
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from uuid import UUID
+import structlog
+import redis
+
+from app.config import settings
+from app.models.context import ContextArtifact
+
+logger = structlog.get_logger(__name__)
+
+
+class _Entry(NamedTuple):
+    artifact: ContextArtifact
+    size: int
+    expires_at: float
+
+
+class ArtifactCache:
+    """
+    Bounded, size-aware LRU cache of ContextArtifact models with a Redis tier.
+
+    The local tier is limited both by entry count and by the total size of the
+    cached artifacts' JSON encoding. Redis failures are logged and the Redis
+    tier is skipped for `redis_retry_delay` seconds before being tried again.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        redis_enabled: Optional[bool] = None,
+        key_prefix: str = "botarmy:artifact:",
+        redis_retry_delay: float = 30.0
+    ):
+        self.max_entries = max_entries if max_entries is not None else settings.artifact_cache_max_entries
+        self.max_bytes = max_bytes if max_bytes is not None else settings.artifact_cache_max_bytes
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.artifact_cache_ttl_seconds
+        self.redis_url = redis_url or settings.redis_url
+        self.redis_enabled = redis_enabled if redis_enabled is not None else settings.artifact_cache_redis_enabled
+        self.key_prefix = key_prefix
+        self.redis_retry_delay = redis_retry_delay
+
+        self._entries: "OrderedDict[UUID, _Entry]" = OrderedDict()
+        self._size = 0
+        self._lock = RLock()
+        self._client: Optional[redis.Redis] = None
+        self._redis_retry_at = 0.0
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Total encoded size of the artifacts in the local tier."""
+        return self._size
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+            }
+
+    def get(self, context_id: UUID, updated_at: Optional[datetime] = None) -> Optional[ContextArtifact]:
+        """
+        Get a cached artifact.
+
+        Args:
+            context_id: Artifact ID
+            updated_at: When given, only a copy with this updated_at is returned
+
+        Returns:
+            The cached artifact, or None on a miss
+        """
+        expected = {context_id: updated_at} if updated_at is not None else None
+        return self.get_many([context_id], expected).get(context_id)
+
+    def get_many(
+        self,
+        context_ids: Iterable[UUID],
+        updated_at: Optional[Dict[UUID, datetime]] = None
+    ) -> Dict[UUID, ContextArtifact]:
+        """
+        Get every cached artifact among the IDs, checking the local tier first.
+
+        Args:
+            context_ids: Artifact IDs to look up
+            updated_at: Optional expected updated_at per ID; mismatches are misses
+
+        Returns:
+            Cached artifacts by ID; IDs that missed are absent
+        """
+        found: Dict[UUID, ContextArtifact] = {}
+        remote: List[UUID] = []
+        now = time.monotonic()
+
+        with self._lock:
+            for context_id in context_ids:
+                entry = self._entries.get(context_id)
+                if entry is not None and entry.expires_at <= now:
+                    self._discard(context_id)
+                    entry = None
+                if entry is not None and _is_current(entry.artifact, updated_at, context_id):
+                    self._entries.move_to_end(context_id)
+                    found[context_id] = entry.artifact
+                    self.hits += 1
+                else:
+                    remote.append(context_id)
+
+        for context_id, artifact in self._redis_get_many(remote).items():
+            if _is_current(artifact, updated_at, context_id):
+                self._store(artifact, artifact.model_dump_json())
+                found[context_id] = artifact
+                with self._lock:
+                    self.redis_hits += 1
+
+        with self._lock:
+            self.misses += sum(1 for context_id in remote if context_id not in found)
+        return found
+
+    def put(self, artifact: ContextArtifact) -> None:
+        """Cache an artifact in both tiers."""
+        self.put_many([artifact])
+
+    def put_many(self, artifacts: Iterable[ContextArtifact]) -> None:
+        """Cache several artifacts, writing them to Redis in one pipeline."""
+        encoded = [(artifact, artifact.model_dump_json()) for artifact in artifacts]
+        for artifact, payload in encoded:
+            self._store(artifact, payload)
+        self._redis_set_many(encoded)
+
+    def invalidate(self, context_id: UUID) -> None:
+        """Drop an artifact from both tiers after it was updated or deleted."""
+        with self._lock:
+            self._discard(context_id)
+
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.delete(self._key(context_id))
+        except redis.RedisError as e:
+            self._redis_failed("invalidate", e)
+
+    def clear(self) -> None:
+        """Empty the local tier and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.redis_hits = self.misses = self.evictions = 0
+
+    def _store(self, artifact: ContextArtifact, payload: str) -> None:
+        """Insert into the local tier, evicting least recently used entries."""
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._discard(artifact.context_id)
+            self._entries[artifact.context_id] = _Entry(artifact, size, time.monotonic() + self.ttl_seconds)
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self.evictions += 1
+
+    def _discard(self, context_id: UUID) -> None:
+        entry = self._entries.pop(context_id, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def _key(self, context_id: UUID) -> str:
+        return f"{self.key_prefix}{context_id}"
+
+    def _redis(self) -> Optional[redis.Redis]:
+        """Get the Redis client, or None while the Redis tier is disabled or backing off."""
+        if not self.redis_enabled or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url)
+        return self._client
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        self._redis_retry_at = time.monotonic() + self.redis_retry_delay
+        logger.warning("Artifact cache Redis tier unavailable",
+                      operation=operation,
+                      retry_in_seconds=self.redis_retry_delay,
+                      error=str(error))
+
+    def _redis_get_many(self, context_ids: List[UUID]) -> Dict[UUID, ContextArtifact]:
+        client = self._redis() if context_ids else None
+        if client is None:
+            return {}
+
+        try:
+            payloads = client.mget([self._key(context_id) for context_id in context_ids])
+        except redis.RedisError as e:
+            self._redis_failed("get", e)
+            return {}
+
+        artifacts = {}
+        for context_id, payload in zip(context_ids, payloads):
+            if payload is None:
+                continue
+            try:
+                artifacts[context_id] = ContextArtifact.model_validate_json(payload)
+            except ValueError:
+                logger.warning("Discarding malformed cached artifact", artifact_id=context_id)
+        return artifacts
+
+    def _redis_set_many(self, encoded: List[tuple]) -> None:
+        client = self._redis() if encoded else None
+        if client is None:
+            return
+
+        try:
+            pipeline = client.pipeline(transaction=False)
+            for artifact, payload in encoded:
+                pipeline.set(self._key(artifact.context_id), payload, ex=self.ttl_seconds)
+            pipeline.execute()
+        except redis.RedisError as e:
+            self._redis_failed("put", e)
+
+
+def _is_current(
+    artifact: ContextArtifact,
+    updated_at: Optional[Dict[UUID, datetime]],
+    context_id: UUID
+) -> bool:
+    """Check a cached copy against the caller's expected updated_at, if any."""
+    if updated_at is None or updated_at.get(context_id) is None:
+        return True
+    return artifact.updated_at == updated_at[context_id]
+
+
+# Global artifact cache instance
+artifact_cache = ArtifactCache()
@@ -11,14 +11,20 @@ import tempfile
 import structlog
 from sqlalchemy.orm import Session
 
-from app.models.context import ArtifactType
-from app.database.models import ContextArtifactDB, ProjectDB
+from app.models.context import ArtifactType, ContextArtifact
+from app.database.models import ProjectDB
+from app.services.context_store import ContextStoreService
 from app.websocket.manager import websocket_manager
 from app.websocket.events import WebSocketEvent, EventType
 
 logger = structlog.get_logger(__name__)
 
 
+def _agent_name(artifact: ContextArtifact) -> str:
+    """Get the source agent name, whether stored as an AgentType or a string."""
+    return getattr(artifact.source_agent, "value", artifact.source_agent)
+
+
 class ProjectArtifact:
     """Represents a downloadable project artifact."""
     
@@ -52,10 +58,8 @@ class ArtifactService:
             if not project:
                 raise ValueError(f"Project {project_id} not found")
             
-            # Get all context artifacts for the project
-            context_artifacts = db.query(ContextArtifactDB).filter(
-                ContextArtifactDB.project_id == project_id
-            ).order_by(ContextArtifactDB.created_at).all()
+            # Get all context artifacts for the project, reusing cached content
+            context_artifacts = ContextStoreService(db).get_artifacts_by_project(project_id)
             
             artifacts = []
             
@@ -133,7 +137,7 @@ class ArtifactService:
                         exc_info=True)
             raise
     
-    def _generate_project_summary(self, project: ProjectDB, artifacts: List[ContextArtifactDB]) -> str:
+    def _generate_project_summary(self, project: ProjectDB, artifacts: List[ContextArtifact]) -> str:
         """Generate a project summary document."""
         
         summary = f"""# Project Summary: {project.name}
@@ -166,7 +170,7 @@ class ArtifactService:
         
         return summary
     
-    def _generate_filename(self, artifact: ContextArtifactDB, extension: str) -> str:
+    def _generate_filename(self, artifact: ContextArtifact, extension: str) -> str:
         """Generate a filename for an artifact."""
         
         # Try to extract filename from metadata
@@ -176,7 +180,7 @@ class ArtifactService:
             base_name = os.path.splitext(base_name)[0]
         else:
             # Generate filename based on artifact type and source
-            base_name = f"{artifact.source_agent}_{artifact.artifact_type.value}"
+            base_name = f"{_agent_name(artifact)}_{artifact.artifact_type.value}"
         
         # Sanitize filename
         base_name = "".join(c for c in base_name if c.isalnum() or c in "._-")
@@ -198,7 +202,7 @@ class ArtifactService:
         else:
             return str(content_data)
     
-    def _extract_requirements(self, artifacts: List[ContextArtifactDB]) -> List[str]:
+    def _extract_requirements(self, artifacts: List[ContextArtifact]) -> List[str]:
         """Extract Python requirements from artifacts."""
         
         requirements = set()
@@ -224,7 +228,7 @@ class ArtifactService:
         
         return sorted(list(requirements))
     
-    def _generate_readme(self, project: ProjectDB, artifacts: List[ContextArtifactDB]) -> str:
+    def _generate_readme(self, project: ProjectDB, artifacts: List[ContextArtifact]) -> str:
         """Generate a README.md file."""
         
         readme = f"""# {project.name}
@@ -249,7 +253,7 @@ This project was automatically generated by the BotArmy system. Below is an over
             readme += f"### {artifact_type.title()}\n\n"
             for artifact in group_artifacts:
                 filename = self._generate_filename(artifact, "py" if artifact_type == "code" else "md")
-                readme += f"- `{filename}` - Generated by {artifact.source_agent}\n"
+                readme += f"- `{filename}` - Generated by {_agent_name(artifact)}\n"
             readme += "\n"
         
         readme += f"""## Usage
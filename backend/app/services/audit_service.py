@@ -6,11 +6,13 @@ solely on event logging and audit trail management.
 
 import structlog
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
-from uuid import UUID
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, and_, desc, select
 
+from app.config import settings
 from app.database.models import EventLogDB
 from app.models.event_log import (
     EventLogCreate, 
@@ -19,6 +21,7 @@ from app.models.event_log import (
     EventType,
     EventSource
 )
+from app.services.audit_writer import AuditDurability, audit_writer, event_row
 
 
 logger = structlog.get_logger(__name__)
@@ -35,9 +38,16 @@ class AuditService:
     - Dependency Inversion: Depends on abstractions (AsyncSession)
     """
     
-    def __init__(self, db_session: Session):
-        """Initialize audit service with database session."""
+    def __init__(self, db_session: Session, durability: Optional[Union[AuditDurability, str]] = None):
+        """Initialize audit service with database session.
+        
+        Args:
+            db_session: Session for queries, and for writes in strict mode
+            durability: "buffered" queues events for batched inserts; "strict"
+                commits each event before returning. Defaults to AUDIT_DURABILITY.
+        """
         self.db_session = db_session
+        self.durability = AuditDurability(durability or settings.audit_durability)
     
     async def log_event(
         self,
@@ -63,34 +73,16 @@ class AuditService:
         Returns:
             EventLogResponse: The created event log entry
         """
-        try:
-            # Create event log entry
-            event_log_data = EventLogCreate(
-                project_id=project_id,
-                task_id=task_id,
-                hitl_request_id=hitl_request_id,
-                event_type=event_type,
-                event_source=event_source,
-                event_data=event_data,
-                metadata=metadata or {}
+        if self.durability == AuditDurability.BUFFERED:
+            return await self._log_buffered(
+                event_type, event_source, event_data,
+                project_id, task_id, hitl_request_id, metadata
             )
-            
-            # Add additional system metadata
-            enriched_metadata = {
-                **(metadata or {}),
-                "logged_at": datetime.now(timezone.utc).isoformat(),
-                "service_version": "1.0.0"
-            }
-            
-            # Create database record
-            db_event = EventLogDB(
-                project_id=event_log_data.project_id,
-                task_id=event_log_data.task_id,
-                hitl_request_id=event_log_data.hitl_request_id,
-                event_type=event_log_data.event_type.value,
-                event_source=event_log_data.event_source.value,
-                event_data=event_log_data.event_data,
-                event_metadata=enriched_metadata
+        
+        try:
+            db_event = self._build_event_record(
+                event_type, event_source, event_data,
+                project_id, task_id, hitl_request_id, metadata
             )
             
             self.db_session.add(db_event)
@@ -125,37 +117,9 @@ class AuditService:
             List[EventLogResponse]: Filtered event log entries
         """
         try:
-            # Build query with filters
-            query = select(EventLogDB)
-            conditions = []
-            
-            if filter_params.project_id:
-                conditions.append(EventLogDB.project_id == filter_params.project_id)
-            
-            if filter_params.task_id:
-                conditions.append(EventLogDB.task_id == filter_params.task_id)
-            
-            if filter_params.hitl_request_id:
-                conditions.append(EventLogDB.hitl_request_id == filter_params.hitl_request_id)
-            
-            if filter_params.event_type:
-                conditions.append(EventLogDB.event_type == filter_params.event_type.value)
-            
-            if filter_params.event_source:
-                conditions.append(EventLogDB.event_source == filter_params.event_source.value)
-            
-            if filter_params.start_date:
-                conditions.append(EventLogDB.created_at >= filter_params.start_date)
-            
-            if filter_params.end_date:
-                conditions.append(EventLogDB.created_at <= filter_params.end_date)
-            
-            if conditions:
-                query = query.where(and_(*conditions))
-            
-            # Apply ordering and pagination
-            query = query.order_by(desc(EventLogDB.created_at))
-            query = query.offset(filter_params.offset).limit(filter_params.limit)
+            # Include events this process has queued but not yet inserted
+            await audit_writer.flush()
+            query = self._build_events_query(filter_params)
             
             # Execute query
             result = self.db_session.execute(query)
@@ -181,6 +145,7 @@ class AuditService:
             EventLogResponse: Event log entry or None if not found
         """
         try:
+            await audit_writer.flush()
             query = select(EventLogDB).where(EventLogDB.id == event_id)
             result = self.db_session.execute(query)
             event = result.scalar_one_or_none()
@@ -257,6 +222,127 @@ class AuditService:
             metadata=metadata
         )
     
+    def _build_event_record(
+        self,
+        event_type: EventType,
+        event_source: EventSource,
+        event_data: Dict[str, Any],
+        project_id: Optional[UUID] = None,
+        task_id: Optional[UUID] = None,
+        hitl_request_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> EventLogDB:
+        """Validate event input and build the database record to insert.
+        
+        Returns:
+            EventLogDB: Unsaved event log record with system metadata added
+        """
+        # Create event log entry
+        event_log_data = EventLogCreate(
+            project_id=project_id,
+            task_id=task_id,
+            hitl_request_id=hitl_request_id,
+            event_type=event_type,
+            event_source=event_source,
+            event_data=event_data,
+            metadata=metadata or {}
+        )
+        
+        # Add additional system metadata
+        enriched_metadata = {
+            **(metadata or {}),
+            "logged_at": datetime.now(timezone.utc).isoformat(),
+            "service_version": "1.0.0"
+        }
+        
+        return EventLogDB(
+            project_id=event_log_data.project_id,
+            task_id=event_log_data.task_id,
+            hitl_request_id=event_log_data.hitl_request_id,
+            event_type=event_log_data.event_type.value,
+            event_source=event_log_data.event_source.value,
+            event_data=event_log_data.event_data,
+            event_metadata=enriched_metadata
+        )
+    
+    async def _log_buffered(
+        self,
+        event_type: EventType,
+        event_source: EventSource,
+        event_data: Dict[str, Any],
+        project_id: Optional[UUID] = None,
+        task_id: Optional[UUID] = None,
+        hitl_request_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> EventLogResponse:
+        """Queue an event for the next batched insert.
+        
+        Returns:
+            EventLogResponse: The event as it will be stored
+        """
+        try:
+            db_event = self._build_event_record(
+                event_type, event_source, event_data,
+                project_id, task_id, hitl_request_id, metadata
+            )
+            # Assigned here rather than by the database so the response is complete now
+            db_event.id = uuid4()
+            db_event.created_at = datetime.now(timezone.utc)
+            
+            await audit_writer.submit(event_row(db_event))
+            self._log_structured_event(db_event)
+            
+            return EventLogResponse.model_validate(db_event)
+            
+        except Exception as e:
+            logger.error(
+                "Failed to queue audit event",
+                event_type=event_type.value,
+                error=str(e),
+                project_id=str(project_id) if project_id else None
+            )
+            raise
+    
+    def _build_events_query(self, filter_params: EventLogFilter) -> Select:
+        """Build the filtered, ordered and paginated event query.
+        
+        Args:
+            filter_params: Filtering parameters
+            
+        Returns:
+            Select: Query selecting matching event log records
+        """
+        query = select(EventLogDB)
+        conditions = []
+        
+        if filter_params.project_id:
+            conditions.append(EventLogDB.project_id == filter_params.project_id)
+        
+        if filter_params.task_id:
+            conditions.append(EventLogDB.task_id == filter_params.task_id)
+        
+        if filter_params.hitl_request_id:
+            conditions.append(EventLogDB.hitl_request_id == filter_params.hitl_request_id)
+        
+        if filter_params.event_type:
+            conditions.append(EventLogDB.event_type == filter_params.event_type.value)
+        
+        if filter_params.event_source:
+            conditions.append(EventLogDB.event_source == filter_params.event_source.value)
+        
+        if filter_params.start_date:
+            conditions.append(EventLogDB.created_at >= filter_params.start_date)
+        
+        if filter_params.end_date:
+            conditions.append(EventLogDB.created_at <= filter_params.end_date)
+        
+        if conditions:
+            query = query.where(and_(*conditions))
+        
+        # Apply ordering and pagination
+        query = query.order_by(desc(EventLogDB.created_at))
+        return query.offset(filter_params.offset).limit(filter_params.limit)
+    
     def _log_structured_event(self, event: EventLogDB) -> None:
         """Log structured event for monitoring and alerting.
         
@@ -272,4 +358,116 @@ class AuditService:
             task_id=str(event.task_id) if event.task_id else None,
             hitl_request_id=str(event.hitl_request_id) if event.hitl_request_id else None,
             created_at=event.created_at.isoformat() if event.created_at else None
-        )
\ No newline at end of file
+        )
+
+
+class AsyncAuditService(AuditService):
+    """Audit service backed by an AsyncSession.
+    
+    Used on the FastAPI request path so audit queries do not block the
+    event loop while waiting on the database.
+    """
+    
+    def __init__(self, db_session: AsyncSession, durability: Optional[Union[AuditDurability, str]] = None):
+        """Initialize audit service with an async database session."""
+        super().__init__(db_session, durability)
+    
+    async def log_event(
+        self,
+        event_type: EventType,
+        event_source: EventSource,
+        event_data: Dict[str, Any],
+        project_id: Optional[UUID] = None,
+        task_id: Optional[UUID] = None,
+        hitl_request_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> EventLogResponse:
+        """Log a single event to the audit trail.
+        
+        Returns:
+            EventLogResponse: The created event log entry
+        """
+        if self.durability == AuditDurability.BUFFERED:
+            return await self._log_buffered(
+                event_type, event_source, event_data,
+                project_id, task_id, hitl_request_id, metadata
+            )
+        
+        try:
+            db_event = self._build_event_record(
+                event_type, event_source, event_data,
+                project_id, task_id, hitl_request_id, metadata
+            )
+            
+            self.db_session.add(db_event)
+            await self.db_session.commit()
+            await self.db_session.refresh(db_event)
+            
+            self._log_structured_event(db_event)
+            
+            return EventLogResponse.model_validate(db_event)
+            
+        except Exception as e:
+            await self.db_session.rollback()
+            logger.error(
+                "Failed to log audit event",
+                event_type=event_type.value,
+                error=str(e),
+                project_id=str(project_id) if project_id else None
+            )
+            raise
+    
+    async def get_events(
+        self,
+        filter_params: EventLogFilter
+    ) -> List[EventLogResponse]:
+        """Retrieve filtered event log entries.
+        
+        Args:
+            filter_params: Filtering parameters
+            
+        Returns:
+            List[EventLogResponse]: Filtered event log entries
+        """
+        try:
+            await audit_writer.flush()
+            result = await self.db_session.execute(self._build_events_query(filter_params))
+            events = result.scalars().all()
+            
+            return [EventLogResponse.model_validate(event) for event in events]
+            
+        except Exception as e:
+            logger.error(
+                "Failed to retrieve audit events",
+                filter_params=filter_params.model_dump(),
+                error=str(e)
+            )
+            raise
+    
+    async def get_event_by_id(self, event_id: UUID) -> Optional[EventLogResponse]:
+        """Retrieve a specific event log entry by ID.
+        
+        Args:
+            event_id: Event log entry ID
+            
+        Returns:
+            EventLogResponse: Event log entry or None if not found
+        """
+        try:
+            await audit_writer.flush()
+            result = await self.db_session.execute(
+                select(EventLogDB).where(EventLogDB.id == event_id)
+            )
+            event = result.scalar_one_or_none()
+            
+            if event:
+                return EventLogResponse.model_validate(event)
+            return None
+            
+        except Exception as e:
+            logger.error(
+                "Failed to retrieve audit event",
+                event_id=str(event_id),
+                error=str(e)
+            )
+            raise
@@ -0,0 +1,179 @@
+"""Write-behind sink for audit events.
+
+`AuditService.log_event` used to add, commit and refresh every event on the
+caller's session, putting a commit on the latency path of each HITL trigger
+and agent step that audits. In buffered mode the service builds the record
+(with its ID and timestamp assigned up front, so the response is complete),
+hands the row to this writer and returns. The writer inserts queued rows
+with one multi-row INSERT every `AUDIT_FLUSH_INTERVAL_MS` or once
+`AUDIT_FLUSH_BATCH_SIZE` rows are waiting, in a worker thread on its own
+session.
+
+The queue is bounded: when it is full, `submit` waits for a flush instead of
+growing or dropping events. Callers that need the event committed before
+they continue use strict durability (see `AuditDurability`).
+
+A batch the database rejects because of its contents (e.g. one event naming
+a deleted project) is split in halves until the offending rows are isolated;
+those are logged and dropped so they cannot hold back every later event.
+Other failures, such as a lost connection, requeue the rows not yet written.
+"""
+
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, DataError, IntegrityError, StatementError
+from sqlalchemy.orm import Session
+import structlog
+
+from app.config import settings
+from app.database.models import EventLogDB
+from app.database.write_behind import WriteBehindBuffer
+
+logger = structlog.get_logger(__name__)
+
+
+class AuditDurability(str, Enum):
+    """When `log_event` returns relative to the event being committed."""
+    # Returns once the event is queued; committed on the next flush
+    BUFFERED = "buffered"
+    # Returns after committing the event on the caller's session
+    STRICT = "strict"
+
+
+def event_row(record: EventLogDB) -> Dict[str, Any]:
+    """Column values of an unsaved event log record, for a Core insert."""
+    return {column.key: getattr(record, column.key) for column in EventLogDB.__table__.columns}
+
+
+def is_row_error(error: Exception) -> bool:
+    """Whether the database rejected the rows themselves, so retrying them cannot succeed."""
+    if isinstance(error, (IntegrityError, DataError)):
+        return True
+    # Statement errors not raised by the driver come from binding a row's values
+    return isinstance(error, StatementError) and not isinstance(error, DBAPIError)
+
+
+class AuditFlushError(Exception):
+    """A flush stopped on a retryable error; carries the rows not yet written."""
+
+    def __init__(self, rows: List[Dict[str, Any]], written: int, error: Exception):
+        super().__init__(str(error))
+        self.rows = rows
+        self.written = written
+        self.error = error
+
+
+class AuditWriter(WriteBehindBuffer):
+    """Bounded queue of audit rows flushed in batches."""
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        super().__init__(
+            flush_interval if flush_interval is not None else settings.audit_flush_interval_ms / 1000,
+            session_factory
+        )
+        self.batch_size = batch_size or settings.audit_flush_batch_size
+        self.max_queue = max_queue or settings.audit_max_queue
+
+        self._pending: List[Dict[str, Any]] = []
+        self.stats = {"queued": 0, "rows_written": 0, "flushes": 0, "flush_failures": 0,
+                      "dropped": 0, "rejected": 0, "backpressure_waits": 0}
+
+    async def submit(self, row: Dict[str, Any]) -> None:
+        """Queue an event row; waits for a flush only when the queue is full."""
+        if len(self._pending) >= self.max_queue:
+            self.stats["backpressure_waits"] += 1
+            await self.flush()
+
+        self._pending.append(row)
+        self.stats["queued"] += 1
+        if len(self._pending) >= self.batch_size:
+            self._flush_soon()
+        else:
+            self._schedule_flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "pending": len(self._pending)}
+
+    def _write(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert rows, splitting batches the database rejects to drop only the bad rows.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            AuditFlushError: A retryable error stopped the flush
+        """
+        batches: Deque[List[Dict[str, Any]]] = deque([rows])
+        written = 0
+        while batches:
+            batch = batches.popleft()
+            try:
+                self._insert(batch)
+            except Exception as e:
+                if not is_row_error(e):
+                    unwritten = [row for remaining in (batch, *batches) for row in remaining]
+                    raise AuditFlushError(unwritten, written, e) from e
+                if len(batch) > 1:
+                    middle = len(batch) // 2
+                    batches.extendleft([batch[middle:], batch[:middle]])
+                    continue
+                self._reject(batch[0], e)
+                continue
+            written += len(batch)
+
+        self.stats["flushes"] += 1
+        self.stats["rows_written"] += written
+        logger.debug("Audit events persisted", rows=written)
+        return written
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            # One INSERT with a VALUES row per event (insertmanyvalues)
+            db.execute(insert(EventLogDB), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _reject(self, row: Dict[str, Any], error: Exception) -> None:
+        """Drop a row the database will never accept."""
+        self.stats["rejected"] += 1
+        logger.error("Dropped audit event rejected by the database",
+                    event_id=str(row.get("id")),
+                    event_type=row.get("event_type"),
+                    project_id=str(row.get("project_id")),
+                    error=str(error))
+
+    def _restore(self, rows: List[Dict[str, Any]], error: Exception) -> int:
+        """Requeue the unwritten rows of a failed flush ahead of newer ones, within the queue bound."""
+        written = 0
+        if isinstance(error, AuditFlushError):
+            rows, written, error = error.rows, error.written, error.error
+        self.stats["flush_failures"] += 1
+        room = max(self.max_queue - len(self._pending), 0)
+        dropped = max(len(rows) - room, 0)
+        self._pending[:0] = rows[dropped:]
+        self.stats["dropped"] += dropped
+        logger.error("Failed to persist audit events",
+                    rows=len(rows),
+                    dropped=dropped,
+                    error=str(error))
+        if self._pending:
+            self._schedule_flush()
+        return written
+
+
+# Audit event sink shared by every AuditService in this process
+audit_writer = AuditWriter()
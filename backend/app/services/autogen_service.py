@@ -7,8 +7,8 @@ from uuid import UUID
 import structlog
 from autogen_agentchat.agents import AssistantAgent, UserProxyAgent
 from autogen_agentchat.base import Team, TaskRunner
+from autogen_core import CancellationToken
 from autogen_ext.models.openai import OpenAIChatCompletionClient
-import os
 
 from app.models.task import Task
 from app.models.handoff import HandoffSchema
@@ -18,18 +18,30 @@ from app.config import settings
 from app.services.llm_validation import LLMResponseValidator
 from app.services.llm_retry import LLMRetryHandler, RetryConfig
 from app.services.llm_monitoring import LLMUsageTracker
+from app.services.llm_response_cache import llm_response_cache, prompt_fingerprint
+from app.services.llm_streaming import ResponseStreamBatcher
+from app.services.llm_dispatch import dispatch_agent_call
+from app.services.context_compactor import context_compactor
+from app.services.model_client_pool import model_client_pool
 
 logger = structlog.get_logger(__name__)
 
+# Model for agents created without an explicit one
+DEFAULT_MODEL = "gpt-4o-mini"
+
 
 class AutoGenService:
     """Service for managing AutoGen agents and conversations."""
     
     def __init__(self):
         self.agents: Dict[str, AssistantAgent] = {}
+        self.agent_configs: Dict[str, Dict[str, Any]] = {}
         self.teams: Dict[str, Team] = {}
         self.task_runners: Dict[str, TaskRunner] = {}
         
+        # Separate agents for hedged and failover calls, keyed by (agent name, model, role)
+        self.alternate_agents: Dict[tuple, AssistantAgent] = {}
+        
         # Initialize LLM reliability components
         self.response_validator = LLMResponseValidator(
             max_response_size=settings.llm_max_response_size
@@ -53,15 +65,8 @@ class AutoGenService:
                    usage_tracking=settings.llm_enable_usage_tracking)
         
     def _create_model_client(self, model: str, temperature: float = 0.7) -> OpenAIChatCompletionClient:
-        """Create an OpenAI model client for agents."""
-        # Get API key from environment - in production, this should be properly configured
-        api_key = os.getenv("OPENAI_API_KEY", "demo-key")  # Default for demo purposes
-        
-        return OpenAIChatCompletionClient(
-            model=model,
-            api_key=api_key,
-            temperature=temperature
-        )
+        """Get the process-wide OpenAI model client for agents."""
+        return model_client_pool.get(model, temperature)
         
     def create_agent(self, agent_type: str, system_message: str, llm_config: dict) -> AssistantAgent:
         """Create an AutoGen agent based on agent type."""
@@ -70,7 +75,7 @@ class AutoGenService:
         
         # Configure LLM settings
         default_llm_config = {
-            "model": "gpt-4o-mini",  # Using a more available model
+            "model": DEFAULT_MODEL,  # Using a more available model
             "temperature": 0.7,
             "timeout": 30,
         }
@@ -148,10 +153,19 @@ class AutoGenService:
             name=agent_name,
             model_client=model_client,
             system_message=full_system_message,
-            description=f"Agent specialized in {agent_type} tasks"
+            description=f"Agent specialized in {agent_type} tasks",
+            model_client_stream=settings.llm_streaming_enabled
         )
         
         self.agents[agent_name] = agent
+        self.agent_configs[agent_name] = {
+            "model": default_llm_config["model"],
+            "temperature": default_llm_config["temperature"],
+            "system_message": full_system_message,
+            "instructions": system_message,
+            "client_generation": model_client_pool.generation()
+        }
+        self._drop_alternates(agent_name)
         logger.info("AutoGen agent created", agent_name=agent_name, agent_type=agent_type)
         
         return agent
@@ -163,19 +177,23 @@ class AutoGenService:
                    task_id=task.task_id, 
                    agent_type=task.agent_type)
         
-        # Create agent if it doesn't exist
+        # Reuse the warm agent when it was built for the same instructions on live clients
         agent_name = f"{task.agent_type}_agent"
-        if agent_name not in self.agents:
+        config = self.agent_configs.get(agent_name, {})
+        if (agent_name in self.agents
+                and config.get("instructions") == handoff.instructions
+                and config.get("client_generation") == model_client_pool.generation()):
+            agent = self.agents[agent_name]
+            await self.reset_agent(agent_name)
+        else:
             agent = self.create_agent(
                 task.agent_type,
                 handoff.instructions,
-                {"model": "gpt-4o-mini", "temperature": 0.7}
+                {"model": DEFAULT_MODEL, "temperature": 0.7}
             )
-        else:
-            agent = self.agents[agent_name]
         
         # Prepare context message from artifacts
-        context_message = self.prepare_context_message(context_artifacts, handoff)
+        context_message = self.prepare_context_message(context_artifacts, handoff, model=self._agent_model(agent))
         
         # Execute the conversation
         try:
@@ -206,9 +224,44 @@ class AutoGenService:
                 "context_used": [str(artifact.context_id) for artifact in context_artifacts]
             }
     
-    def prepare_context_message(self, context_artifacts: List[ContextArtifact], handoff: HandoffSchema) -> str:
+    def _alternate_agent(self, agent: AssistantAgent, model: str, role: str) -> AssistantAgent:
+        """Agent used for hedged or failover calls, so they never share the primary's conversation state."""
+        key = (agent.name, model, role)
+        alternate = self.alternate_agents.get(key)
+        if alternate is None:
+            config = self.agent_configs.get(agent.name, {})
+            alternate = self.alternate_agents[key] = AssistantAgent(
+                name=agent.name,
+                model_client=self._create_model_client(model, config.get("temperature", 0.7)),
+                system_message=config.get("system_message"),
+                description=agent.description,
+                model_client_stream=settings.llm_streaming_enabled
+            )
+        return alternate
+    
+    async def reset_agent(self, agent_name: str) -> None:
+        """Clear the conversation state of an agent and its alternates so a new task starts fresh."""
+        agents = [self.agents.get(agent_name)]
+        agents.extend(alternate for key, alternate in self.alternate_agents.items() if key[0] == agent_name)
+        for agent in agents:
+            if agent is not None:
+                await agent.on_reset(CancellationToken())
+    
+    def _drop_alternates(self, agent_name: str) -> None:
+        for key in [key for key in self.alternate_agents if key[0] == agent_name]:
+            del self.alternate_agents[key]
+    
+    def prepare_context_message(
+        self,
+        context_artifacts: List[ContextArtifact],
+        handoff: HandoffSchema,
+        model: str = DEFAULT_MODEL
+    ) -> str:
         """Prepare context message from artifacts for the agent."""
         
+        if settings.context_compaction_enabled:
+            return context_compactor.build_message(context_artifacts, handoff, model=model)
+        
         context_parts = [
             f"Task: {handoff.instructions}",
             f"Phase: {handoff.phase}",
@@ -239,23 +292,50 @@ class AutoGenService:
             "message_length": len(message)
         }
         
+        model = self._agent_model(agent)
+        
         try:
+            # Replay an identical deterministic prompt from the response cache
+            cache_key = self._response_cache_key(agent, message, task)
+            if cache_key:
+                cached_response = llm_response_cache.get(cache_key)
+                if cached_response is not None:
+                    await self._track_cached_request(task, (time.time() - start_time) * 1000, model)
+                    logger.info("LLM response served from cache", **context)
+                    return cached_response
+            
             # Import message types
             from autogen_core.models import UserMessage
             
             # Create message for the agent
             user_message = UserMessage(content=message, source="user")
             
-            # Define the LLM call with retry wrapper
-            async def llm_call():
-                return await agent.on_messages([user_message], cancellation_token=None)
+            # Forward completion chunks to WebSocket clients while the call runs
+            stream_batcher = None
+            if settings.llm_streaming_enabled:
+                stream_batcher = ResponseStreamBatcher(
+                    project_id=task.project_id,
+                    task_id=task.task_id,
+                    agent_type=task.agent_type
+                )
+            
+            # Each attempt waits for a scheduler slot within the provider's rate limits
+            prompt_tokens = self.usage_tracker.estimate_tokens(message, is_input=True, model=model)
             
             # Execute with retry logic
             logger.info("Starting LLM conversation with retry protection", **context)
-            retry_result = await self.retry_handler.execute_with_retry(
-                llm_call,
-                context=context
+            retry_result = await dispatch_agent_call(
+                self.retry_handler,
+                agent,
+                lambda alternate_model, role: self._alternate_agent(agent, alternate_model, role),
+                [user_message],
+                model,
+                prompt_tokens=prompt_tokens,
+                project_id=task.project_id,
+                context=context,
+                stream_batcher=stream_batcher
             )
+            queued_time_ms = retry_result.queued_time_ms
             
             response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
             
@@ -268,7 +348,11 @@ class AutoGenService:
                            **context)
                 
                 # Track failed request
-                await self._track_failed_request(task, message, response_time, retry_result)
+                await self._track_failed_request(task, message, response_time, retry_result,
+                                                 queued_time_ms=queued_time_ms)
+                
+                if stream_batcher:
+                    await stream_batcher.finish(validated=False)
                 
                 # Return fallback response
                 return self._generate_fallback_response(task.agent_type)
@@ -308,6 +392,10 @@ class AutoGenService:
                            validation_passed=True,
                            response_length=len(final_response),
                            **context)
+                
+                # A failover model's answer is not cached under the requested model's key
+                if cache_key and retry_result.model == model:
+                    llm_response_cache.set(cache_key, final_response)
             else:
                 # Handle validation failure
                 logger.warning("LLM response failed validation", 
@@ -323,9 +411,13 @@ class AutoGenService:
                            recovered_response_length=len(final_response),
                            **context)
             
+            if stream_batcher:
+                await stream_batcher.finish(validated=validation_result.is_valid, final_text=final_response)
+            
             # Track successful request
             await self._track_successful_request(
-                task, message, final_response, response_time, retry_result
+                task, message, final_response, response_time, retry_result,
+                queued_time_ms=queued_time_ms
             )
             
             logger.info("LLM conversation completed successfully",
@@ -360,6 +452,23 @@ class AutoGenService:
             # Return fallback response
             return self._generate_fallback_response(task.agent_type)
     
+    def _agent_model(self, agent: AssistantAgent) -> str:
+        """Model an agent was created with."""
+        return self.agent_configs.get(agent.name, {}).get("model", DEFAULT_MODEL)
+    
+    def _response_cache_key(self, agent: AssistantAgent, message: str, task: Task) -> Optional[str]:
+        """Get the response cache key for a call, or None if it should not be cached."""
+        
+        config = self.agent_configs.get(agent.name)
+        if not config or not llm_response_cache.is_cacheable(config["temperature"]):
+            return None
+        
+        return prompt_fingerprint(
+            config["model"], config["temperature"],
+            [("system", config["system_message"]), ("user", message)],
+            agent_type=str(task.agent_type)
+        )
+    
     def _generate_fallback_response(self, agent_type: str) -> str:
         """Generate a fallback response when agent conversation fails."""
         
@@ -408,6 +517,7 @@ class AutoGenService:
         
         if agent_name in self.agents:
             del self.agents[agent_name]
+            self._drop_alternates(agent_name)
             logger.info("Agent cleaned up", agent_name=agent_name)
     
     def get_agent_status(self, agent_name: str) -> Dict[str, Any]:
@@ -432,18 +542,20 @@ class AutoGenService:
         message: str,
         response: str,
         response_time: float,
-        retry_result
+        retry_result,
+        queued_time_ms: float = 0.0
     ):
         """Track successful LLM request with comprehensive metrics."""
         
-        # Estimate token usage
-        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True)
-        output_tokens = self.usage_tracker.estimate_tokens(response, is_input=False)
+        # Estimate token usage for the model that answered (the failover model, if used)
+        model = retry_result.model or DEFAULT_MODEL
+        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True, model=model)
+        output_tokens = self.usage_tracker.estimate_tokens(response, is_input=False, model=model)
         total_tokens = input_tokens + output_tokens
         
         # Calculate cost
         cost = await self.usage_tracker.calculate_costs(
-            input_tokens, output_tokens, provider="openai", model="gpt-4o-mini"
+            input_tokens, output_tokens, provider="openai", model=model
         )
         
         # Track the request
@@ -456,10 +568,11 @@ class AutoGenService:
             project_id=task.project_id,
             task_id=task.task_id,
             provider="openai",
-            model="gpt-4o-mini",
+            model=model,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
-            retry_count=retry_result.total_attempts - 1
+            retry_count=retry_result.total_attempts - 1,
+            queued_time_ms=queued_time_ms
         )
         
         # Log structured metrics for monitoring
@@ -473,21 +586,41 @@ class AutoGenService:
                    response_time_ms=response_time,
                    estimated_cost=cost,
                    provider="openai",
-                   model="gpt-4o-mini",
+                   model=model,
                    retry_attempts=retry_result.total_attempts - 1,
                    success=True)
     
+    async def _track_cached_request(self, task: Task, response_time: float, model: str = DEFAULT_MODEL):
+        """Track a request served from the response cache as zero-cost."""
+        
+        await self.usage_tracker.track_request(
+            agent_type=task.agent_type,
+            tokens_used=0,
+            response_time=response_time,
+            cost=0.0,
+            success=True,
+            project_id=task.project_id,
+            task_id=task.task_id,
+            provider="openai",
+            model=model,
+            input_tokens=0,
+            output_tokens=0,
+            cache_hit=True
+        )
+    
     async def _track_failed_request(
         self,
         task: Task,
         message: str,
         response_time: float,
-        retry_result
+        retry_result,
+        queued_time_ms: float = 0.0
     ):
         """Track failed LLM request for monitoring and analysis."""
         
         # Estimate input tokens (no output for failed requests)
-        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True)
+        model = retry_result.model or DEFAULT_MODEL
+        input_tokens = self.usage_tracker.estimate_tokens(message, is_input=True, model=model)
         
         # Determine error type
         error_type = "unknown"
@@ -504,11 +637,12 @@ class AutoGenService:
             project_id=task.project_id,
             task_id=task.task_id,
             provider="openai",
-            model="gpt-4o-mini",
+            model=model,
             input_tokens=input_tokens,
             output_tokens=0,
             error_type=error_type,
-            retry_count=retry_result.total_attempts - 1
+            retry_count=retry_result.total_attempts - 1,
+            queued_time_ms=queued_time_ms
         )
         
         # Log structured error metrics
@@ -523,7 +657,7 @@ class AutoGenService:
                     retry_attempts=retry_result.total_attempts - 1,
                     total_retry_time=retry_result.total_time,
                     provider="openai",
-                    model="gpt-4o-mini",
+                    model=model,
                     success=False)
     
     def get_usage_stats(self) -> Dict[str, Any]:
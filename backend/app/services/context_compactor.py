@@ -0,0 +1,266 @@
+"""Token-budgeted assembly of the context message sent to an agent.
+
+Downstream agents receive every upstream artifact, and later artifacts often
+repeat sections of earlier ones (the architecture restates the PRD's
+requirements, the test plan restates the architecture). Sending them verbatim
+makes tester and deployer prompts grow with the length of the workflow.
+
+Each artifact is split into its top-level sections. Sections are rendered,
+truncated to a per-section cap and token-counted once per artifact version
+(context ID and updated_at), then cached. Assembling a message deduplicates
+sections whose key and content already appeared in a newer artifact, ranks the rest
+by term overlap with the handoff instructions and expected outputs, and
+admits them in rank order until the receiving agent's token budget is spent.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+import structlog
+
+from app.config import settings
+from app.models.context import ContextArtifact
+from app.models.handoff import HandoffSchema
+from app.services.tokenizer import TokenCounter, token_counter
+
+logger = structlog.get_logger(__name__)
+
+# Context token budget per receiving agent; other agents use settings.context_token_budget
+AGENT_TOKEN_BUDGETS = {
+    "orchestrator": 6000,
+    "analyst": 6000,
+    "architect": 8000,
+    "coder": 12000,
+    "tester": 10000,
+    "deployer": 6000,
+}
+
+# Sections shorter than this are not worth truncating to fill a remaining budget
+MIN_PARTIAL_SECTION_TOKENS = 64
+
+TERMS = re.compile(r"[a-z][a-z0-9_]{2,}")
+STOPWORDS = frozenset({
+    "the", "and", "for", "with", "that", "this", "from", "into", "are", "was", "were",
+    "will", "should", "must", "can", "all", "any", "each", "its", "not", "but", "you",
+    "your", "our", "their", "has", "have", "use", "using", "based", "please", "per",
+})
+
+
+class Section(NamedTuple):
+    """A rendered, token-counted top-level section of an artifact."""
+    key: Optional[str]
+    text: str
+    tokens: int
+    digest: bytes
+    terms: FrozenSet[str]
+
+
+def _terms(text: str) -> FrozenSet[str]:
+    """Lower-cased content words of a text."""
+    return frozenset(term for term in TERMS.findall(text.lower()) if term not in STOPWORDS)
+
+
+def _label(value: Any) -> str:
+    """Plain value of an enum member, or the string itself."""
+    return str(getattr(value, "value", value))
+
+
+def _render(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class ContextCompactor:
+    """
+    Builds context messages within a per-agent token budget.
+
+    Rendered sections are cached per artifact version in a bounded LRU, so an
+    artifact shared by several downstream agents is rendered and tokenized once.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: Optional[int] = None,
+        max_section_tokens: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        counter: Optional[TokenCounter] = None
+    ):
+        self.budgets = dict(AGENT_TOKEN_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget if default_budget is not None else settings.context_token_budget
+        self.max_section_tokens = (max_section_tokens if max_section_tokens is not None
+                                   else settings.context_max_section_tokens)
+        self.max_entries = max_entries if max_entries is not None else settings.context_compaction_cache_size
+        self.counter = counter or token_counter
+
+        self._sections: "OrderedDict[Tuple[UUID, datetime, Optional[str]], List[Section]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def budget_for(self, agent_type: Optional[str]) -> int:
+        """Context token budget for a receiving agent."""
+        return self.budgets.get(_label(agent_type), self.default_budget)
+
+    def build_message(
+        self,
+        context_artifacts: Sequence[ContextArtifact],
+        handoff: HandoffSchema,
+        agent_type: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Build the context message for a handoff.
+
+        Args:
+            context_artifacts: Upstream artifacts, oldest first
+            handoff: Handoff with the instructions and expected outputs
+            agent_type: Receiving agent; defaults to the handoff's to_agent
+            model: Model whose tokenizer is used for counting
+
+        Returns:
+            Formatted context message string
+        """
+        header = [
+            f"Task: {handoff.instructions}",
+            f"Phase: {handoff.phase}",
+            f"Expected outputs: {', '.join(handoff.expected_outputs)}",
+            "",
+            "Context from previous agents:",
+        ]
+        budget = self.budget_for(agent_type or handoff.to_agent)
+        remaining = budget - self.counter.count_total(header, model)
+
+        artifacts = sorted(enumerate(context_artifacts), key=lambda item: (item[1].updated_at, item[0]))
+        headings = [
+            f"Artifact from {_label(artifact.source_agent)} ({_label(artifact.artifact_type)}):"
+            for artifact in context_artifacts
+        ]
+        heading_tokens = self.counter.count_many(headings, model)
+
+        # Newest artifacts first, so a repeated section is kept where it was last written
+        candidates: List[Tuple[int, int, Section]] = []
+        seen = set()
+        duplicates = 0
+        for index, artifact in reversed(artifacts):
+            for position, section in enumerate(self._artifact_sections(artifact, model)):
+                if section.digest in seen:
+                    duplicates += 1
+                    continue
+                seen.add(section.digest)
+                candidates.append((index, position, section))
+
+        query = _terms(" ".join([handoff.instructions, *handoff.expected_outputs]))
+        recency = {index: rank for rank, (index, _) in enumerate(artifacts)}
+        newest = max(len(artifacts) - 1, 1)
+
+        def score(candidate: Tuple[int, int, Section]) -> float:
+            index, _, section = candidate
+            overlap = len(section.terms & query) / len(query) if query else 0.0
+            key_match = 0.5 if section.key and _terms(section.key) & query else 0.0
+            return overlap + key_match + 0.1 * recency[index] / newest
+
+        admitted: Dict[int, List[Tuple[int, str]]] = {}
+        omitted = 0
+        for index, position, section in sorted(candidates, key=score, reverse=True):
+            cost = section.tokens + (0 if index in admitted else heading_tokens[index] + 1)
+            text = section.text
+            if cost > remaining:
+                available = remaining - (cost - section.tokens)
+                if available < MIN_PARTIAL_SECTION_TOKENS:
+                    omitted += 1
+                    continue
+                text = self._truncate(section.text, section.tokens, available)
+                cost = cost - section.tokens + self.counter.count(text, model)
+            remaining -= cost
+            admitted.setdefault(index, []).append((position, text))
+
+        parts = list(header)
+        for index, artifact in enumerate(context_artifacts):
+            if index not in admitted:
+                continue
+            parts.extend(["", headings[index]])
+            parts.extend(text for _, text in sorted(admitted[index]))
+
+        if omitted:
+            parts.extend(["", f"[{omitted} lower-relevance sections omitted to fit the context budget]"])
+
+        if omitted or duplicates:
+            logger.debug("Context compacted",
+                        agent_type=_label(agent_type or handoff.to_agent),
+                        budget=budget,
+                        artifacts=len(context_artifacts),
+                        duplicate_sections=duplicates,
+                        omitted_sections=omitted)
+
+        return "\n".join(parts)
+
+    def clear(self) -> None:
+        """Drop cached artifact sections."""
+        with self._lock:
+            self._sections.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache counters."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._sections)}
+
+    def _artifact_sections(self, artifact: ContextArtifact, model: Optional[str]) -> List[Section]:
+        """Rendered sections of an artifact version, from the cache when possible."""
+        key = (artifact.context_id, artifact.updated_at, model)
+        with self._lock:
+            sections = self._sections.get(key)
+            if sections is not None:
+                self._sections.move_to_end(key)
+                self.hits += 1
+                return sections
+            self.misses += 1
+
+        content = artifact.content
+        items = list(content.items()) if isinstance(content, dict) and content else [(None, content)]
+        texts = [_render(value) if name is None else f"{name}: {_render(value)}" for name, value in items]
+        counts = self.counter.count_many(texts, model)
+
+        sections = []
+        for (name, value), text, tokens in zip(items, texts, counts):
+            # The digest covers the section key, so short values that many sections share
+            # (e.g. "pending" or []) are only duplicates under the same heading
+            digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+            if tokens > self.max_section_tokens:
+                text = self._truncate(text, tokens, self.max_section_tokens)
+                tokens = self.counter.count(text, model)
+            sections.append(Section(
+                key=None if name is None else str(name),
+                text=text,
+                tokens=tokens,
+                digest=digest,
+                terms=_terms(text)
+            ))
+
+        with self._lock:
+            self._sections[key] = sections
+            while len(self._sections) > self.max_entries:
+                self._sections.popitem(last=False)
+        return sections
+
+    @staticmethod
+    def _truncate(text: str, tokens: int, limit: int) -> str:
+        """Keep the head and tail of a text, dropping the middle to fit a token limit."""
+        if tokens <= limit:
+            return text
+        marker = f"\n... [{tokens - limit} tokens omitted] ...\n"
+        keep = max(int(len(text) * limit / tokens) - len(marker), 0)
+        head = keep * 2 // 3
+        tail = keep - head
+        return text[:head] + marker + (text[-tail:] if tail else "")
+
+
+# Global context compactor instance
+context_compactor = ContextCompactor()
@@ -1,32 +1,157 @@
 """Context Store service for persistent memory management."""
 
-from typing import List, Optional, Dict, Any, Union
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable, Mapping, Sequence, Tuple, Union
 from uuid import UUID
+from pydantic import TypeAdapter
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import structlog
 
-from app.models.context import ContextArtifact, ArtifactType
+from app.config import settings
+from app.models.context import ContextArtifact, ContextArtifactSummary, ArtifactType
 from app.database.models import ContextArtifactDB
+from app.services.artifact_cache import ArtifactCache, artifact_cache
 
 logger = structlog.get_logger(__name__)
 
+# Keyset pagination cursor: (created_at, context_id) of the last artifact seen
+ArtifactCursor = Tuple[datetime, UUID]
+
+# Maximum number of IDs bound into a single IN clause
+ID_BATCH_SIZE = 500
+
+# Columns for metadata-only reads, labelled with the Pydantic field names
+_SUMMARY_COLUMNS = (
+    ContextArtifactDB.id.label("context_id"),
+    ContextArtifactDB.project_id,
+    ContextArtifactDB.source_agent,
+    ContextArtifactDB.artifact_type,
+    ContextArtifactDB.artifact_metadata,
+    ContextArtifactDB.created_at,
+    ContextArtifactDB.updated_at,
+)
+_ARTIFACT_COLUMNS = _SUMMARY_COLUMNS + (ContextArtifactDB.content,)
+
+# Built once and reused so each batch of rows is validated in a single call
+_artifact_list_adapter = TypeAdapter(List[ContextArtifact])
+_summary_list_adapter = TypeAdapter(List[ContextArtifactSummary])
+
+
+def to_artifacts(rows: Iterable[Any], include_content: bool = True) -> List[Any]:
+    """
+    Convert artifact rows into Pydantic models.
+
+    Accepts rows selected with the artifact columns, or ContextArtifactDB
+    instances, and returns ContextArtifact models (or ContextArtifactSummary
+    models when include_content is False).
+    """
+    mappings = [_row_mapping(row, include_content) for row in rows]
+    if include_content:
+        return _artifact_list_adapter.validate_python(mappings)
+    return _summary_list_adapter.validate_python(mappings)
+
+
+def _row_mapping(row: Any, include_content: bool) -> Mapping[str, Any]:
+    """Get a field mapping for a projected row or an ORM instance."""
+    if isinstance(row, ContextArtifactDB):
+        mapping = {
+            "context_id": row.id,
+            "project_id": row.project_id,
+            "source_agent": row.source_agent,
+            "artifact_type": row.artifact_type,
+            "artifact_metadata": row.artifact_metadata,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+        }
+        if include_content:
+            mapping["content"] = row.content
+        return mapping
+    return row._mapping
+
+
+def build_artifact_query(
+    project_id: UUID,
+    artifact_type: Optional[ArtifactType] = None,
+    include_content: bool = True,
+    limit: Optional[int] = None,
+    after: Optional[ArtifactCursor] = None,
+    newest_first: bool = False
+) -> Select:
+    """
+    Build a projected, keyset-paginated artifact query for a project.
+
+    Artifacts are ordered by (created_at, id). Passing the cursor of the last
+    artifact from the previous page as `after` continues from that point
+    without an OFFSET scan.
+    """
+    query = select(*(_ARTIFACT_COLUMNS if include_content else _SUMMARY_COLUMNS)).where(
+        ContextArtifactDB.project_id == project_id
+    )
+
+    if artifact_type:
+        query = query.where(ContextArtifactDB.artifact_type == artifact_type)
+
+    if after is not None:
+        created_at, context_id = after
+        if newest_first:
+            query = query.where(or_(
+                ContextArtifactDB.created_at < created_at,
+                and_(ContextArtifactDB.created_at == created_at, ContextArtifactDB.id < context_id)
+            ))
+        else:
+            query = query.where(or_(
+                ContextArtifactDB.created_at > created_at,
+                and_(ContextArtifactDB.created_at == created_at, ContextArtifactDB.id > context_id)
+            ))
+
+    if newest_first:
+        query = query.order_by(ContextArtifactDB.created_at.desc(), ContextArtifactDB.id.desc())
+    else:
+        query = query.order_by(ContextArtifactDB.created_at, ContextArtifactDB.id)
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return query
+
+
+def _as_uuid(context_id: Union[UUID, str]) -> UUID:
+    return UUID(context_id) if isinstance(context_id, str) else context_id
+
+
+def _id_batches(context_ids: Sequence[Union[UUID, str]]) -> List[List[UUID]]:
+    """Normalize IDs to UUIDs and split them into IN-clause sized batches."""
+    uuid_list = [_as_uuid(cid) for cid in context_ids]
+    return [uuid_list[i:i + ID_BATCH_SIZE] for i in range(0, len(uuid_list), ID_BATCH_SIZE)]
+
+
+def _default_cache() -> Optional[ArtifactCache]:
+    return artifact_cache if settings.artifact_cache_enabled else None
+
 
 class ContextStoreService:
     """Service for managing the Context Store pattern."""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: Session, cache: Optional[ArtifactCache] = None):
         self.db = db
-    
+        self.cache = cache if cache is not None else _default_cache()
+
     def create_artifact(
         self,
         project_id: UUID,
         source_agent: str,
         artifact_type: ArtifactType,
         content: Dict[str, Any],
-        artifact_metadata: Optional[Dict[str, Any]] = None
+        artifact_metadata: Optional[Dict[str, Any]] = None,
+        context_id: Optional[UUID] = None
     ) -> ContextArtifact:
-        """Create a new context artifact."""
-        
+        """Create a new context artifact.
+
+        Callers that may repeat the write pass a deterministic `context_id`.
+        """
+
         db_artifact = ContextArtifactDB(
             project_id=project_id,
             source_agent=source_agent,
@@ -34,122 +159,172 @@ class ContextStoreService:
             content=content,
             artifact_metadata=artifact_metadata
         )
-        
+        if context_id is not None:
+            db_artifact.id = context_id
+
         self.db.add(db_artifact)
         self.db.commit()
         self.db.refresh(db_artifact)
-        
-        # Convert to Pydantic model
-        artifact = ContextArtifact(
-            context_id=db_artifact.id,
-            project_id=db_artifact.project_id,
-            source_agent=db_artifact.source_agent,
-            artifact_type=db_artifact.artifact_type,
-            content=db_artifact.content,
-            artifact_metadata=db_artifact.artifact_metadata,
-            created_at=db_artifact.created_at,
-            updated_at=db_artifact.updated_at
-        )
-        
-        logger.info("Context artifact created", 
+
+        artifact = to_artifacts([db_artifact])[0]
+
+        # Downstream agents usually read a new artifact soon after it is written
+        if self.cache is not None:
+            self.cache.put(artifact)
+
+        logger.info("Context artifact created",
                    artifact_id=artifact.context_id,
                    artifact_type=artifact_type,
                    source_agent=source_agent)
-        
+
         return artifact
-    
+
     def get_artifact(self, context_id: UUID) -> Optional[ContextArtifact]:
         """Get a context artifact by ID."""
-        
-        db_artifact = self.db.query(ContextArtifactDB).filter(
-            ContextArtifactDB.id == context_id
-        ).first()
-        
-        if not db_artifact:
-            return None
-        
-        return ContextArtifact(
-            context_id=db_artifact.id,
-            project_id=db_artifact.project_id,
-            source_agent=db_artifact.source_agent,
-            artifact_type=db_artifact.artifact_type,
-            content=db_artifact.content,
-            artifact_metadata=db_artifact.artifact_metadata,
-            created_at=db_artifact.created_at,
-            updated_at=db_artifact.updated_at
-        )
-    
+
+        artifacts = self.get_artifacts_by_ids([context_id])
+        return artifacts[0] if artifacts else None
+
     def get_artifact_by_id(self, artifact_id: UUID) -> Optional[ContextArtifact]:
         """Get a context artifact by ID (alias for get_artifact)."""
         return self.get_artifact(artifact_id)
-    
+
     def get_artifacts_by_project(
-        self, 
+        self,
         project_id: UUID,
         artifact_type: Optional[ArtifactType] = None
     ) -> List[ContextArtifact]:
-        """Get all context artifacts for a project."""
-        
-        query = self.db.query(ContextArtifactDB).filter(
-            ContextArtifactDB.project_id == project_id
-        )
-        
-        if artifact_type:
-            query = query.filter(ContextArtifactDB.artifact_type == artifact_type)
-        
-        db_artifacts = query.all()
-        
-        artifacts = []
-        for db_artifact in db_artifacts:
-            artifact = ContextArtifact(
-                context_id=db_artifact.id,
-                project_id=db_artifact.project_id,
-                source_agent=db_artifact.source_agent,
-                artifact_type=db_artifact.artifact_type,
-                content=db_artifact.content,
-                artifact_metadata=db_artifact.artifact_metadata,
-                created_at=db_artifact.created_at,
-                updated_at=db_artifact.updated_at
-            )
-            artifacts.append(artifact)
-        
+        """Get all context artifacts for a project, oldest first."""
+
+        return self.list_artifacts(project_id, artifact_type=artifact_type)
+
+    def list_artifacts(
+        self,
+        project_id: UUID,
+        artifact_type: Optional[ArtifactType] = None,
+        include_content: bool = True,
+        limit: Optional[int] = None,
+        after: Optional[ArtifactCursor] = None,
+        newest_first: bool = False
+    ) -> List[Union[ContextArtifact, ContextArtifactSummary]]:
+        """
+        List a project's artifacts one keyset page at a time.
+
+        Args:
+            project_id: Project to list artifacts for
+            artifact_type: Optional artifact type filter
+            include_content: Load the JSON content; when False, returns
+                ContextArtifactSummary models without it
+            limit: Maximum number of artifacts to return
+            after: Cursor of the last artifact on the previous page
+            newest_first: Order by newest instead of oldest
+
+        Returns:
+            Artifacts on the requested page
+        """
+        if include_content and self.cache is not None:
+            return self._list_through_cache(project_id, artifact_type, limit, after, newest_first)
+
+        rows = self.db.execute(build_artifact_query(
+            project_id, artifact_type, include_content, limit, after, newest_first
+        )).all()
+
+        return to_artifacts(rows, include_content)
+
+    def _list_through_cache(
+        self,
+        project_id: UUID,
+        artifact_type: Optional[ArtifactType],
+        limit: Optional[int],
+        after: Optional[ArtifactCursor],
+        newest_first: bool
+    ) -> List[ContextArtifact]:
+        """
+        List a page by reading metadata only and taking content from the cache.
+
+        Cached copies are only used when their updated_at matches the row, so
+        content is loaded just for artifacts that are new or have changed.
+        """
+        summaries = self.db.execute(build_artifact_query(
+            project_id, artifact_type, False, limit, after, newest_first
+        )).all()
+        if not summaries:
+            return []
+
+        expected = {row.context_id: row.updated_at for row in summaries}
+        found = self.cache.get_many(expected.keys(), expected)
+
+        missing = [context_id for context_id in expected if context_id not in found]
+        if missing:
+            loaded = self._load_by_ids(missing)
+            self.cache.put_many(loaded)
+            found.update((artifact.context_id, artifact) for artifact in loaded)
+
+        return [found[row.context_id] for row in summaries if row.context_id in found]
+
+    def get_recent_artifacts(self, project_id: UUID, limit: int = 10) -> List[ContextArtifact]:
+        """Get a project's most recent artifacts, returned oldest first."""
+
+        artifacts = self.list_artifacts(project_id, limit=limit, newest_first=True)
+        artifacts.reverse()
         return artifacts
-    
-    def get_artifacts_by_ids(self, context_ids: List[Union[UUID, str]]) -> List[ContextArtifact]:
+
+    def get_artifacts_by_ids(
+        self,
+        context_ids: List[Union[UUID, str]],
+        include_content: bool = True
+    ) -> List[Union[ContextArtifact, ContextArtifactSummary]]:
         """Get multiple context artifacts by their IDs."""
-        
+
         # Handle empty or None input
         if not context_ids:
             return []
-        
-        # Convert string UUIDs to UUID objects
-        uuid_list = []
-        for context_id in context_ids:
-            if isinstance(context_id, str):
-                uuid_list.append(UUID(context_id))
-            else:
-                uuid_list.append(context_id)
-        
-        db_artifacts = self.db.query(ContextArtifactDB).filter(
-            ContextArtifactDB.id.in_(uuid_list)
-        ).all()
-        
-        artifacts = []
-        for db_artifact in db_artifacts:
-            artifact = ContextArtifact(
-                context_id=db_artifact.id,
-                project_id=db_artifact.project_id,
-                source_agent=db_artifact.source_agent,
-                artifact_type=db_artifact.artifact_type,
-                content=db_artifact.content,
-                artifact_metadata=db_artifact.artifact_metadata,
-                created_at=db_artifact.created_at,
-                updated_at=db_artifact.updated_at
-            )
-            artifacts.append(artifact)
-        
-        return artifacts
-    
+
+        if not include_content or self.cache is None:
+            return self._load_by_ids(context_ids, include_content)
+
+        # Cached copies are checked against the rows' updated_at: another
+        # process's update only invalidates its own local tier and Redis
+        expected = self._current_versions(context_ids)
+        uuid_list = [context_id for context_id in dict.fromkeys(_as_uuid(cid) for cid in context_ids)
+                     if context_id in expected]
+        found = self.cache.get_many(uuid_list, expected)
+
+        missing = [context_id for context_id in uuid_list if context_id not in found]
+        if missing:
+            loaded = self._load_by_ids(missing)
+            self.cache.put_many(loaded)
+            found.update((artifact.context_id, artifact) for artifact in loaded)
+
+        return [found[context_id] for context_id in uuid_list if context_id in found]
+
+    def _current_versions(self, context_ids: Sequence[Union[UUID, str]]) -> Dict[UUID, datetime]:
+        """Get the updated_at of each existing artifact without loading content."""
+
+        versions = {}
+        for batch in _id_batches(context_ids):
+            versions.update(self.db.execute(
+                select(ContextArtifactDB.id, ContextArtifactDB.updated_at)
+                .where(ContextArtifactDB.id.in_(batch))
+            ).tuples().all())
+        return versions
+
+    def _load_by_ids(
+        self,
+        context_ids: Sequence[Union[UUID, str]],
+        include_content: bool = True
+    ) -> List[Union[ContextArtifact, ContextArtifactSummary]]:
+        """Load artifacts by ID from the database in IN-clause sized batches."""
+
+        columns = _ARTIFACT_COLUMNS if include_content else _SUMMARY_COLUMNS
+        rows = []
+        for batch in _id_batches(context_ids):
+            rows.extend(self.db.execute(
+                select(*columns).where(ContextArtifactDB.id.in_(batch))
+            ).all())
+
+        return to_artifacts(rows, include_content)
+
     def update_artifact(
         self,
         context_id: UUID = None,
@@ -158,108 +333,218 @@ class ContextStoreService:
         artifact_metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[ContextArtifact]:
         """Update an existing context artifact."""
-        
+
         # Support both context_id and artifact_id parameter names
         target_id = context_id or artifact_id
         if target_id is None:
             raise ValueError("Either context_id or artifact_id must be provided")
-        
+
         db_artifact = self.db.query(ContextArtifactDB).filter(
             ContextArtifactDB.id == target_id
         ).first()
-        
+
         if not db_artifact:
             return None
-        
+
         if content is not None:
             db_artifact.content = content
-        
+
         if artifact_metadata is not None:
             db_artifact.artifact_metadata = artifact_metadata
-        
+
         self.db.commit()
         self.db.refresh(db_artifact)
-        
-        artifact = ContextArtifact(
-            context_id=db_artifact.id,
-            project_id=db_artifact.project_id,
-            source_agent=db_artifact.source_agent,
-            artifact_type=db_artifact.artifact_type,
-            content=db_artifact.content,
-            artifact_metadata=db_artifact.artifact_metadata,
-            created_at=db_artifact.created_at,
-            updated_at=db_artifact.updated_at
-        )
-        
+
+        if self.cache is not None:
+            self.cache.invalidate(db_artifact.id)
+
+        artifact = to_artifacts([db_artifact])[0]
+
         logger.info("Context artifact updated", artifact_id=target_id)
-        
+
         return artifact
-    
+
     def get_artifacts_by_project_and_type(self, project_id: UUID, artifact_type: str) -> List[ContextArtifact]:
         """Get context artifacts by project ID and artifact type."""
-        
-        db_artifacts = self.db.query(ContextArtifactDB).filter(
-            ContextArtifactDB.project_id == project_id,
-            ContextArtifactDB.artifact_type == artifact_type
-        ).all()
-        
-        artifacts = []
-        for db_artifact in db_artifacts:
-            artifact = ContextArtifact(
-                context_id=db_artifact.id,
-                project_id=db_artifact.project_id,
-                source_agent=db_artifact.source_agent,
-                artifact_type=db_artifact.artifact_type,
-                content=db_artifact.content,
-                artifact_metadata=db_artifact.artifact_metadata,
-                created_at=db_artifact.created_at,
-                updated_at=db_artifact.updated_at
-            )
-            artifacts.append(artifact)
-        
-        logger.info("Context artifacts retrieved by project and type", 
+
+        artifacts = self.list_artifacts(project_id, artifact_type=artifact_type)
+
+        logger.info("Context artifacts retrieved by project and type",
                    project_id=project_id, artifact_type=artifact_type, count=len(artifacts))
         return artifacts
-    
+
     def get_artifacts_by_project_and_agent(self, project_id: UUID, source_agent: str) -> List[ContextArtifact]:
         """Get context artifacts by project ID and source agent."""
-        
-        db_artifacts = self.db.query(ContextArtifactDB).filter(
-            ContextArtifactDB.project_id == project_id,
-            ContextArtifactDB.source_agent == source_agent
+
+        rows = self.db.execute(
+            build_artifact_query(project_id).where(ContextArtifactDB.source_agent == source_agent)
         ).all()
-        
-        artifacts = []
-        for db_artifact in db_artifacts:
-            artifact = ContextArtifact(
-                context_id=db_artifact.id,
-                project_id=db_artifact.project_id,
-                source_agent=db_artifact.source_agent,
-                artifact_type=db_artifact.artifact_type,
-                content=db_artifact.content,
-                artifact_metadata=db_artifact.artifact_metadata,
-                created_at=db_artifact.created_at,
-                updated_at=db_artifact.updated_at
-            )
-            artifacts.append(artifact)
-        
-        logger.info("Context artifacts retrieved by project and agent", 
+        artifacts = to_artifacts(rows)
+
+        logger.info("Context artifacts retrieved by project and agent",
                    project_id=project_id, source_agent=source_agent, count=len(artifacts))
         return artifacts
-    
+
     def delete_artifact(self, context_id: UUID) -> bool:
         """Delete a context artifact."""
-        
+
         db_artifact = self.db.query(ContextArtifactDB).filter(
             ContextArtifactDB.id == context_id
         ).first()
-        
+
         if not db_artifact:
             return False
-        
+
         self.db.delete(db_artifact)
         self.db.commit()
-        
+
+        if self.cache is not None:
+            self.cache.invalidate(db_artifact.id)
+
+        logger.info("Context artifact deleted", artifact_id=context_id)
+
+        return True
+
+
+class AsyncContextStoreService:
+    """Context Store service backed by an AsyncSession for the API request path."""
+
+    def __init__(self, db: AsyncSession, cache: Optional[ArtifactCache] = None):
+        self.db = db
+        self.cache = cache if cache is not None else _default_cache()
+
+    async def _get_row(self, context_id: UUID) -> Optional[ContextArtifactDB]:
+        result = await self.db.execute(
+            select(ContextArtifactDB).where(ContextArtifactDB.id == context_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def create_artifact(
+        self,
+        project_id: UUID,
+        source_agent: str,
+        artifact_type: ArtifactType,
+        content: Dict[str, Any],
+        artifact_metadata: Optional[Dict[str, Any]] = None
+    ) -> ContextArtifact:
+        """Create a new context artifact."""
+
+        db_artifact = ContextArtifactDB(
+            project_id=project_id,
+            source_agent=source_agent,
+            artifact_type=artifact_type,
+            content=content,
+            artifact_metadata=artifact_metadata
+        )
+
+        self.db.add(db_artifact)
+        await self.db.commit()
+        await self.db.refresh(db_artifact)
+
+        artifact = to_artifacts([db_artifact])[0]
+
+        logger.info("Context artifact created",
+                   artifact_id=artifact.context_id,
+                   artifact_type=artifact_type,
+                   source_agent=source_agent)
+
+        return artifact
+
+    async def get_artifact(self, context_id: UUID) -> Optional[ContextArtifact]:
+        """Get a context artifact by ID."""
+
+        result = await self.db.execute(
+            select(*_ARTIFACT_COLUMNS).where(ContextArtifactDB.id == context_id)
+        )
+        rows = result.all()
+        return to_artifacts(rows)[0] if rows else None
+
+    async def get_artifacts_by_project(
+        self,
+        project_id: UUID,
+        artifact_type: Optional[ArtifactType] = None
+    ) -> List[ContextArtifact]:
+        """Get all context artifacts for a project, oldest first."""
+
+        return await self.list_artifacts(project_id, artifact_type=artifact_type)
+
+    async def list_artifacts(
+        self,
+        project_id: UUID,
+        artifact_type: Optional[ArtifactType] = None,
+        include_content: bool = True,
+        limit: Optional[int] = None,
+        after: Optional[ArtifactCursor] = None,
+        newest_first: bool = False
+    ) -> List[Union[ContextArtifact, ContextArtifactSummary]]:
+        """List a project's artifacts one keyset page at a time."""
+
+        result = await self.db.execute(build_artifact_query(
+            project_id, artifact_type, include_content, limit, after, newest_first
+        ))
+        return to_artifacts(result.all(), include_content)
+
+    async def get_artifacts_by_ids(
+        self,
+        context_ids: List[Union[UUID, str]],
+        include_content: bool = True
+    ) -> List[Union[ContextArtifact, ContextArtifactSummary]]:
+        """Get multiple context artifacts by their IDs."""
+
+        if not context_ids:
+            return []
+
+        columns = _ARTIFACT_COLUMNS if include_content else _SUMMARY_COLUMNS
+        rows = []
+        for batch in _id_batches(context_ids):
+            result = await self.db.execute(select(*columns).where(ContextArtifactDB.id.in_(batch)))
+            rows.extend(result.all())
+
+        return to_artifacts(rows, include_content)
+
+    async def update_artifact(
+        self,
+        context_id: UUID,
+        content: Optional[Dict[str, Any]] = None,
+        artifact_metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[ContextArtifact]:
+        """Update an existing context artifact."""
+
+        db_artifact = await self._get_row(context_id)
+
+        if not db_artifact:
+            return None
+
+        if content is not None:
+            db_artifact.content = content
+
+        if artifact_metadata is not None:
+            db_artifact.artifact_metadata = artifact_metadata
+
+        await self.db.commit()
+        await self.db.refresh(db_artifact)
+
+        if self.cache is not None:
+            self.cache.invalidate(db_artifact.id)
+
+        logger.info("Context artifact updated", artifact_id=context_id)
+
+        return to_artifacts([db_artifact])[0]
+
+    async def delete_artifact(self, context_id: UUID) -> bool:
+        """Delete a context artifact."""
+
+        db_artifact = await self._get_row(context_id)
+
+        if not db_artifact:
+            return False
+
+        await self.db.delete(db_artifact)
+        await self.db.commit()
+
+        if self.cache is not None:
+            self.cache.invalidate(db_artifact.id)
+
         logger.info("Context artifact deleted", artifact_id=context_id)
-        
+
         return True
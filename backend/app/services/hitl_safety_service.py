@@ -4,7 +4,6 @@ from typing import Dict, Any, Optional, List
 from uuid import UUID
 from datetime import datetime, timedelta
 from decimal import Decimal
-import asyncio
 import structlog
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
@@ -20,6 +19,7 @@ from app.database.models import (
 from app.database.connection import get_session
 from app.websocket.manager import websocket_manager
 from app.websocket.events import WebSocketEvent, EventType
+from app.services.approval_notifier import approval_notifier
 from app.services.llm_monitoring import LLMUsageTracker
 from app.services.response_safety_analyzer import ResponseSafetyAnalyzer
 from app.config import settings
@@ -128,36 +128,47 @@ class HITLSafetyService:
         approval_id: UUID,
         timeout_minutes: int = 30
     ) -> ApprovalResult:
-        """Wait for human approval with timeout."""
+        """
+        Wait for human approval with timeout.
+
+        The approval is re-checked whenever a decision or emergency stop is
+        announced through the approval notifier, and otherwise only every
+        HITL_APPROVAL_RECHECK_SECONDS as a fallback for missed announcements.
+        """
 
         start_time = datetime.utcnow()
         timeout_time = start_time + timedelta(minutes=timeout_minutes)
 
         db = next(get_session())
         try:
-            while datetime.utcnow() < timeout_time:
-                # Check for emergency stops
-                if await self._is_emergency_stopped():
-                    raise EmergencyStopActivated("Emergency stop is active")
-
-                # Check approval status
-                approval = db.query(HitlAgentApprovalDB).filter(
-                    HitlAgentApprovalDB.id == approval_id
-                ).first()
-
-                if not approval:
-                    raise ValueError(f"Approval request {approval_id} not found")
-
-                if approval.status in ['APPROVED', 'REJECTED']:
-                    return ApprovalResult(
-                        approved=(approval.status == 'APPROVED'),
-                        response=approval.user_response,
-                        comment=approval.user_comment
+            async with approval_notifier.subscribe(approval_id) as subscription:
+                while datetime.utcnow() < timeout_time:
+                    # Check for emergency stops
+                    if await self._is_emergency_stopped():
+                        raise EmergencyStopActivated("Emergency stop is active")
+
+                    # Check approval status, discarding state loaded by earlier checks
+                    db.expire_all()
+                    approval = db.query(HitlAgentApprovalDB).filter(
+                        HitlAgentApprovalDB.id == approval_id
+                    ).first()
+
+                    if not approval:
+                        raise ValueError(f"Approval request {approval_id} not found")
+
+                    if approval.status in ['APPROVED', 'REJECTED']:
+                        return ApprovalResult(
+                            approved=(approval.status == 'APPROVED'),
+                            response=approval.user_response,
+                            comment=approval.user_comment
+                        )
+
+                    # Sleep until notified, the fallback re-check, or the timeout
+                    remaining = (timeout_time - datetime.utcnow()).total_seconds()
+                    await subscription.wait(
+                        timeout=max(0, min(remaining, settings.hitl_approval_recheck_seconds))
                     )
 
-                # Wait before checking again
-                await asyncio.sleep(5)
-
             # Timeout - automatically reject
             approval.status = 'EXPIRED'
             db.commit()
@@ -274,8 +285,9 @@ class HITLSafetyService:
             db.commit()
             db.refresh(stop)
 
-            # Add to active stops
+            # Add to active stops and wake agents waiting on approval
             self.emergency_stops.add(str(stop.id))
+            await approval_notifier.notify_emergency_stop()
 
             # Handle budget-based emergency stop
             if budget_based:
@@ -796,6 +808,10 @@ class HITLSafetyService:
 
             db.commit()
 
+            if main_approval:
+                # Wake the agent waiting on this approval
+                await approval_notifier.notify_decision(main_approval.id)
+
             logger.info("Response manually approved/rejected",
                        response_approval_id=str(response_approval_id),
                        approved=approved,
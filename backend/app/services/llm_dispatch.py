@@ -0,0 +1,91 @@
+"""Dispatch of agent LLM calls through the shared reliability stack.
+
+BaseAgent and AutoGenService both send an agent's messages the same way:
+each attempt waits for a scheduler slot, runs under the model's circuit
+breaker, is hedged with a duplicate request once it outlives the model's p95
+latency, and fails over to `LLM_FAILOVER_MODEL` while the circuit is open.
+This module holds that wiring once so the two call sites cannot drift apart.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from app.config import settings
+from app.services.llm_retry import FailoverTarget, LLMRetryHandler, RetryResult, mark_provider_start, mark_queued
+from app.services.llm_scheduler import llm_scheduler
+from app.services.llm_streaming import ResponseStreamBatcher, stream_agent_response
+
+DEFAULT_PROVIDER = "openai"
+
+
+async def dispatch_agent_call(
+    retry_handler: LLMRetryHandler,
+    agent: Any,
+    alternate_agent: Callable[[str, str], Any],
+    messages: List[Any],
+    model: str,
+    prompt_tokens: int = 0,
+    project_id: Optional[UUID] = None,
+    context: Optional[Dict[str, Any]] = None,
+    stream_batcher: Optional[ResponseStreamBatcher] = None,
+    provider: str = DEFAULT_PROVIDER
+) -> RetryResult:
+    """
+    Send messages to an agent with scheduling, retries, hedging and failover.
+
+    Args:
+        retry_handler: Handler running the attempts
+        agent: AutoGen agent for the primary model
+        alternate_agent: Returns the agent for a (model, role) pair, role being
+            "hedge" or "failover", so duplicates never share the primary's
+            conversation state
+        messages: Messages sent on every attempt
+        model: Primary model; keys the circuit breaker and scheduler limits
+        prompt_tokens: Estimated prompt tokens charged against the token bucket
+        project_id: Project the request is made for, used for fair queuing
+        context: Logging context
+        stream_batcher: Forwards completion chunks when streaming; streamed
+            calls are not hedged, as hedges would interleave their chunks
+
+    Returns:
+        The retry result, with the time spent waiting for scheduler slots
+    """
+    queued_time_ms = 0.0
+
+    def scheduled_call(get_agent: Callable[[], Any], call_model: str) -> Callable:
+        async def llm_call():
+            nonlocal queued_time_ms
+            # The hedge delay and latency samples exclude the wait for a slot, so a
+            # saturated scheduler is not sent a duplicate of every queued request
+            mark_queued()
+            async with llm_scheduler.acquire(provider, call_model, tokens=prompt_tokens,
+                                             project_id=project_id) as ticket:
+                queued_time_ms += ticket.queued_ms
+                mark_provider_start()
+                if stream_batcher:
+                    return await stream_agent_response(get_agent(), messages, stream_batcher)
+                return await get_agent().on_messages(messages, cancellation_token=None)
+        return llm_call
+
+    hedge_call = None
+    if settings.llm_hedging_enabled and not stream_batcher:
+        hedge_call = scheduled_call(lambda: alternate_agent(model, "hedge"), model)
+
+    failover = None
+    failover_model = settings.llm_failover_model
+    if failover_model and failover_model != model:
+        failover = FailoverTarget(
+            provider=provider,
+            model=failover_model,
+            call=scheduled_call(lambda: alternate_agent(failover_model, "failover"), failover_model)
+        )
+
+    retry_result = await retry_handler.execute_with_retry(
+        scheduled_call(lambda: agent, model),
+        context=context,
+        circuit=(provider, model),
+        hedge_call=hedge_call,
+        failover=failover
+    )
+    retry_result.queued_time_ms = queued_time_ms
+    return retry_result
@@ -7,12 +7,17 @@ and performance metrics for operational oversight and optimization.
 import time
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 from uuid import UUID
 import structlog
 import json
 import re
+import numpy as np
+
+from app.services.llm_usage_store import LLMUsageStore, UsageRollup, llm_usage_store
+from app.services.usage_columns import UsageColumns
+from app.services.tokenizer import token_counter
 
 logger = structlog.get_logger(__name__)
 
@@ -41,6 +46,8 @@ class UsageMetrics:
     success: bool = True
     error_type: Optional[str] = None
     retry_count: int = 0
+    cache_hit: bool = False
+    queued_time_ms: float = 0.0
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for logging/storage."""
@@ -65,6 +72,7 @@ class CostBreakdown:
     success_rate: float
     average_response_time: float
     time_period: Dict[str, str]  # start/end timestamps
+    average_queued_time: float = 0.0
 
 
 @dataclass
@@ -78,6 +86,7 @@ class UsageReport:
     hourly_distribution: Dict[str, Dict[str, Any]]
     error_analysis: Dict[str, Any]
     recommendations: List[str]
+    response_time_percentiles: Dict[str, Any] = field(default_factory=dict)
 
 
 class LLMUsageTracker:
@@ -113,21 +122,28 @@ class LLMUsageTracker:
         "gemini-pro-vision": {"input": 0.00025, "output": 0.0005}
     }
     
-    def __init__(self, enable_tracking: bool = True):
+    def __init__(self, enable_tracking: bool = True, store: Optional[LLMUsageStore] = None):
         """Initialize usage tracker.
         
         Args:
             enable_tracking: Whether to track usage (for testing/debugging)
+            store: Usage store to record into (defaults to the shared process store)
         """
         self.enable_tracking = enable_tracking
-        self.usage_history: List[UsageMetrics] = []
+        self.store = store or llm_usage_store
         self.session_stats = {
             'requests_tracked': 0,
             'total_tokens': 0,
             'total_cost': 0.0,
-            'errors_tracked': 0
+            'errors_tracked': 0,
+            'cache_hits': 0
         }
     
+    @property
+    def usage_history(self) -> List[UsageMetrics]:
+        """Recent requests held in the usage store's ring buffer."""
+        return list(self.store.recent)
+    
     async def track_request(
         self,
         agent_type: str,
@@ -142,7 +158,9 @@ class LLMUsageTracker:
         input_tokens: Optional[int] = None,
         output_tokens: Optional[int] = None,
         error_type: Optional[str] = None,
-        retry_count: int = 0
+        retry_count: int = 0,
+        cache_hit: bool = False,
+        queued_time_ms: float = 0.0
     ):
         """Track individual LLM request metrics.
         
@@ -160,6 +178,8 @@ class LLMUsageTracker:
             output_tokens: Output tokens (if available)
             error_type: Type of error if failed
             retry_count: Number of retries attempted
+            cache_hit: Whether the response was served from the response cache
+            queued_time_ms: Time spent waiting in the request scheduler
         """
         if not self.enable_tracking:
             return
@@ -184,10 +204,12 @@ class LLMUsageTracker:
             estimated_cost=cost,
             success=success,
             error_type=error_type,
-            retry_count=retry_count
+            retry_count=retry_count,
+            cache_hit=cache_hit,
+            queued_time_ms=queued_time_ms
         )
         
-        self.usage_history.append(metrics)
+        self.store.record(metrics)
         
         # Update session stats
         self.session_stats['requests_tracked'] += 1
@@ -195,6 +217,8 @@ class LLMUsageTracker:
         self.session_stats['total_cost'] += cost
         if not success:
             self.session_stats['errors_tracked'] += 1
+        if cache_hit:
+            self.session_stats['cache_hits'] += 1
         
         # Log the metrics
         logger.info("LLM request tracked",
@@ -277,14 +301,10 @@ class LLMUsageTracker:
         if start_date is None:
             start_date = end_date - timedelta(days=30)  # Last 30 days
         
-        # Filter usage history
-        filtered_usage = [
-            metric for metric in self.usage_history
-            if (project_id is None or metric.project_id == project_id) and
-               start_date <= metric.timestamp <= end_date
-        ]
+        # Aggregated usage across all processes for the range
+        rollups = await self.store.get_rollups(project_id, start_date, end_date)
         
-        if not filtered_usage:
+        if not rollups:
             logger.warning("No usage data found for report",
                          project_id=project_id,
                          start_date=start_date,
@@ -293,27 +313,30 @@ class LLMUsageTracker:
             return self._generate_empty_report(project_id, start_date, end_date)
         
         # Generate cost breakdown
-        cost_breakdown = self._analyze_costs(filtered_usage, start_date, end_date)
+        cost_breakdown = self._analyze_costs(rollups, start_date, end_date)
         
         # Analyze agent usage patterns
         top_agents_by_usage = self._top_agents_by_metric(
-            filtered_usage, lambda m: m.tokens_used, "tokens"
+            rollups, lambda r: r.tokens_used, "tokens"
         )
         top_agents_by_cost = self._top_agents_by_metric(
-            filtered_usage, lambda m: m.estimated_cost, "cost"
+            rollups, lambda r: r.total_cost, "cost"
         )
         
         # Hourly distribution analysis
-        hourly_dist = self._analyze_hourly_distribution(filtered_usage)
+        hourly_dist = self._analyze_hourly_distribution(rollups)
         
         # Error analysis
-        error_analysis = self._analyze_errors(filtered_usage)
+        error_analysis = self._analyze_errors(rollups)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(
-            filtered_usage, cost_breakdown, error_analysis
+            rollups, cost_breakdown, error_analysis
         )
         
+        # Latency percentiles over the requests still held in memory
+        response_time_percentiles = self._analyze_response_times(project_id, start_date, end_date)
+        
         report = UsageReport(
             project_id=project_id,
             date_range={"start": start_date, "end": end_date},
@@ -322,13 +345,14 @@ class LLMUsageTracker:
             top_agents_by_cost=top_agents_by_cost,
             hourly_distribution=hourly_dist,
             error_analysis=error_analysis,
-            recommendations=recommendations
+            recommendations=recommendations,
+            response_time_percentiles=response_time_percentiles
         )
         
         logger.info("Usage report generated",
                    project_id=project_id,
                    date_range_days=(end_date - start_date).days,
-                   total_requests=len(filtered_usage),
+                   total_requests=cost_breakdown.request_count,
                    total_cost=cost_breakdown.total_cost)
         
         return report
@@ -346,33 +370,31 @@ class LLMUsageTracker:
             List of detected anomalies
         """
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=lookback_hours)
-        recent_usage = [
-            m for m in self.usage_history
-            if m.timestamp >= cutoff_time
-        ]
+        columns = self.store.recent
+        rows = columns.select(start=cutoff_time)
         
         anomalies = []
         
-        if not recent_usage:
+        if not len(rows):
             return anomalies
         
         # Check for cost spikes
-        avg_cost = sum(m.estimated_cost for m in recent_usage) / len(recent_usage)
-        cost_threshold = avg_cost * 5  # 5x average
-        
-        for metric in recent_usage:
-            if metric.estimated_cost > cost_threshold:
-                anomalies.append({
-                    "type": "cost_spike",
-                    "timestamp": metric.timestamp.isoformat(),
-                    "agent_type": metric.agent_type,
-                    "cost": metric.estimated_cost,
-                    "threshold": cost_threshold,
-                    "severity": "high" if metric.estimated_cost > cost_threshold * 2 else "medium"
-                })
+        costs = columns.estimated_cost[rows]
+        cost_threshold = float(costs.mean()) * 5  # 5x average
+        
+        for index in rows[costs > cost_threshold].tolist():
+            cost = float(columns.estimated_cost[index])
+            anomalies.append({
+                "type": "cost_spike",
+                "timestamp": self._row_timestamp(columns, index),
+                "agent_type": columns.name(int(columns.agent[index])),
+                "cost": cost,
+                "threshold": cost_threshold,
+                "severity": "high" if cost > cost_threshold * 2 else "medium"
+            })
         
         # Check for high error rates
-        error_rate = sum(1 for m in recent_usage if not m.success) / len(recent_usage)
+        error_rate = int(np.count_nonzero(~columns.success[rows])) / len(rows)
         if error_rate > 0.2:  # >20% error rate
             anomalies.append({
                 "type": "high_error_rate",
@@ -380,23 +402,22 @@ class LLMUsageTracker:
                 "error_rate": error_rate,
                 "threshold": 0.2,
                 "severity": "high" if error_rate > 0.5 else "medium",
-                "total_requests": len(recent_usage)
+                "total_requests": len(rows)
             })
         
         # Check for unusual token usage
-        avg_tokens = sum(m.tokens_used for m in recent_usage) / len(recent_usage)
-        token_threshold = avg_tokens * 10  # 10x average
-        
-        for metric in recent_usage:
-            if metric.tokens_used > token_threshold:
-                anomalies.append({
-                    "type": "token_usage_spike",
-                    "timestamp": metric.timestamp.isoformat(),
-                    "agent_type": metric.agent_type,
-                    "tokens_used": metric.tokens_used,
-                    "threshold": token_threshold,
-                    "severity": "medium"
-                })
+        tokens = columns.tokens_used[rows]
+        token_threshold = float(tokens.mean()) * 10  # 10x average
+        
+        for index in rows[tokens > token_threshold].tolist():
+            anomalies.append({
+                "type": "token_usage_spike",
+                "timestamp": self._row_timestamp(columns, index),
+                "agent_type": columns.name(int(columns.agent[index])),
+                "tokens_used": int(columns.tokens_used[index]),
+                "threshold": token_threshold,
+                "severity": "medium"
+            })
         
         if anomalies:
             logger.warning("Usage anomalies detected",
@@ -405,32 +426,36 @@ class LLMUsageTracker:
         
         return anomalies
     
-    def estimate_tokens(self, text: str, is_input: bool = True) -> int:
-        """Estimate token count from text.
+    def estimate_tokens(self, text: str, is_input: bool = True, model: Optional[str] = None) -> int:
+        """Count tokens in text with the model's tokenizer.
         
-        Simple approximation: ~4 characters per token for English text.
-        This is less accurate than tiktoken but much faster.
+        Counts are memoized by text hash, so repeated prompts and context
+        artifacts are only tokenized once.
         
         Args:
-            text: Text to estimate tokens for
-            is_input: Whether this is input text (affects estimation)
+            text: Text to count tokens for
+            is_input: Whether this is input text
+            model: Model whose tokenizer should be used (defaults to gpt-4o-mini)
             
         Returns:
-            Estimated token count
+            Token count
         """
         if not text:
             return 0
         
-        # Basic approximation: 4 characters per token
-        char_count = len(text)
-        token_estimate = max(1, char_count // 4)
-        
-        # Adjust for code vs natural language
-        if self._appears_to_be_code(text):
-            # Code tends to have more tokens per character
-            token_estimate = int(token_estimate * 1.3)
+        return token_counter.count(text, model)
+    
+    def estimate_tokens_batch(self, texts: List[str], model: Optional[str] = None) -> int:
+        """Count the total tokens of several texts, such as the parts of a context message.
         
-        return token_estimate
+        Args:
+            texts: Texts to count
+            model: Model whose tokenizer should be used
+            
+        Returns:
+            Total token count
+        """
+        return token_counter.count_total(texts, model)
     
     def get_session_stats(self) -> Dict[str, Any]:
         """Get current session statistics."""
@@ -454,9 +479,14 @@ class LLMUsageTracker:
             'requests_tracked': 0,
             'total_tokens': 0,
             'total_cost': 0.0,
-            'errors_tracked': 0
+            'errors_tracked': 0,
+            'cache_hits': 0
         }
     
+    @staticmethod
+    def _row_timestamp(columns: UsageColumns, index: int) -> str:
+        return datetime.fromtimestamp(float(columns.timestamp[index]), tz=timezone.utc).isoformat()
+    
     def _get_pricing_table(self, provider: str) -> Dict[str, Dict[str, float]]:
         """Get pricing table for provider."""
         if provider.lower() == "openai":
@@ -486,67 +516,58 @@ class LLMUsageTracker:
         
         return input_tokens, output_tokens
     
-    def _appears_to_be_code(self, text: str) -> bool:
-        """Simple heuristic to detect if text contains code."""
-        code_indicators = [
-            '{', '}', ';', 'function', 'class', 'def ', 'import ',
-            'const ', 'var ', 'let ', '===', '!==', '->', '=>'
-        ]
-        
-        return any(indicator in text for indicator in code_indicators)
-    
     def _analyze_costs(
         self,
-        usage_data: List[UsageMetrics],
+        rollups: List[UsageRollup],
         start_date: datetime,
         end_date: datetime
     ) -> CostBreakdown:
-        """Analyze cost breakdown from usage data."""
-        total_cost = sum(m.estimated_cost for m in usage_data)
+        """Analyze cost breakdown from usage rollups."""
+        total_cost = sum(r.total_cost for r in rollups)
+        request_count = sum(r.request_count for r in rollups)
         
-        # Cost by agent
+        # Cost by agent and by model
         cost_by_agent = {}
-        for metric in usage_data:
-            agent = metric.agent_type
-            cost_by_agent[agent] = cost_by_agent.get(agent, 0.0) + metric.estimated_cost
-        
-        # Cost by model
         cost_by_model = {}
-        for metric in usage_data:
-            model = metric.model
-            cost_by_model[model] = cost_by_model.get(model, 0.0) + metric.estimated_cost
+        for rollup in rollups:
+            cost_by_agent[rollup.agent_type] = cost_by_agent.get(rollup.agent_type, 0.0) + rollup.total_cost
+            cost_by_model[rollup.model] = cost_by_model.get(rollup.model, 0.0) + rollup.total_cost
         
         # Token usage
         token_usage = {
-            "total": sum(m.tokens_used for m in usage_data),
-            "input": sum(m.input_tokens for m in usage_data),
-            "output": sum(m.output_tokens for m in usage_data)
+            "total": sum(r.tokens_used for r in rollups),
+            "input": sum(r.input_tokens for r in rollups),
+            "output": sum(r.output_tokens for r in rollups)
         }
         
         # Success rate
-        successful_requests = sum(1 for m in usage_data if m.success)
-        success_rate = successful_requests / len(usage_data) if usage_data else 0.0
+        failed_requests = sum(r.error_count for r in rollups)
+        success_rate = (request_count - failed_requests) / request_count if request_count else 0.0
         
         # Average response time
-        avg_response_time = sum(m.response_time_ms for m in usage_data) / len(usage_data) if usage_data else 0.0
+        total_response_time = sum(r.total_response_time_ms for r in rollups)
+        avg_response_time = total_response_time / request_count if request_count else 0.0
+        total_queued_time = sum(r.total_queued_time_ms for r in rollups)
+        avg_queued_time = total_queued_time / request_count if request_count else 0.0
         
         return CostBreakdown(
             total_cost=total_cost,
             cost_by_agent=cost_by_agent,
             cost_by_model=cost_by_model,
             token_usage=token_usage,
-            request_count=len(usage_data),
+            request_count=request_count,
             success_rate=success_rate,
             average_response_time=avg_response_time,
             time_period={
                 "start": start_date.isoformat(),
                 "end": end_date.isoformat()
-            }
+            },
+            average_queued_time=avg_queued_time
         )
     
     def _top_agents_by_metric(
         self,
-        usage_data: List[UsageMetrics],
+        rollups: List[UsageRollup],
         metric_func,
         metric_name: str,
         limit: int = 5
@@ -554,8 +575,8 @@ class LLMUsageTracker:
         """Get top agents by specified metric."""
         agent_metrics = {}
         
-        for metric in usage_data:
-            agent = metric.agent_type
+        for rollup in rollups:
+            agent = rollup.agent_type
             if agent not in agent_metrics:
                 agent_metrics[agent] = {
                     "agent_type": agent,
@@ -563,8 +584,8 @@ class LLMUsageTracker:
                     "request_count": 0
                 }
             
-            agent_metrics[agent]["total_value"] += metric_func(metric)
-            agent_metrics[agent]["request_count"] += 1
+            agent_metrics[agent]["total_value"] += metric_func(rollup)
+            agent_metrics[agent]["request_count"] += rollup.request_count
         
         # Calculate averages and sort
         for agent_data in agent_metrics.values():
@@ -580,13 +601,12 @@ class LLMUsageTracker:
         
         return sorted_agents[:limit]
     
-    def _analyze_hourly_distribution(self, usage_data: List[UsageMetrics]) -> Dict[str, Dict[str, Any]]:
+    def _analyze_hourly_distribution(self, rollups: List[UsageRollup]) -> Dict[str, Dict[str, Any]]:
         """Analyze usage distribution by hour of day."""
         hourly_stats = {}
         
-        for metric in usage_data:
-            hour = metric.timestamp.hour
-            hour_key = f"{hour:02d}:00"
+        for rollup in rollups:
+            hour_key = f"{rollup.hour:02d}:00"
             
             if hour_key not in hourly_stats:
                 hourly_stats[hour_key] = {
@@ -596,21 +616,25 @@ class LLMUsageTracker:
                     "error_count": 0
                 }
             
-            hourly_stats[hour_key]["request_count"] += 1
-            hourly_stats[hour_key]["total_cost"] += metric.estimated_cost
-            hourly_stats[hour_key]["total_tokens"] += metric.tokens_used
-            if not metric.success:
-                hourly_stats[hour_key]["error_count"] += 1
+            hourly_stats[hour_key]["request_count"] += rollup.request_count
+            hourly_stats[hour_key]["total_cost"] += rollup.total_cost
+            hourly_stats[hour_key]["total_tokens"] += rollup.tokens_used
+            hourly_stats[hour_key]["error_count"] += rollup.error_count
         
-        return hourly_stats
+        return dict(sorted(hourly_stats.items()))
     
-    def _analyze_errors(self, usage_data: List[UsageMetrics]) -> Dict[str, Any]:
+    def _analyze_errors(self, rollups: List[UsageRollup]) -> Dict[str, Any]:
         """Analyze error patterns."""
         error_types = {}
-        failed_requests = [m for m in usage_data if not m.success]
+        total_requests = sum(r.request_count for r in rollups)
+        total_errors = 0
         
-        for metric in failed_requests:
-            error_type = metric.error_type or "unknown"
+        for rollup in rollups:
+            if not rollup.error_count:
+                continue
+            
+            total_errors += rollup.error_count
+            error_type = rollup.error_type or "unknown"
             if error_type not in error_types:
                 error_types[error_type] = {
                     "count": 0,
@@ -618,25 +642,42 @@ class LLMUsageTracker:
                     "avg_retry_count": 0
                 }
             
-            error_types[error_type]["count"] += 1
-            error_types[error_type]["agents_affected"].add(metric.agent_type)
-            error_types[error_type]["avg_retry_count"] += metric.retry_count
+            error_types[error_type]["count"] += rollup.error_count
+            error_types[error_type]["agents_affected"].add(rollup.agent_type)
+            error_types[error_type]["avg_retry_count"] += rollup.retry_count
         
         # Convert sets to lists for JSON serialization
         for error_data in error_types.values():
-            error_data["agents_affected"] = list(error_data["agents_affected"])
+            error_data["agents_affected"] = sorted(error_data["agents_affected"])
             if error_data["count"] > 0:
                 error_data["avg_retry_count"] /= error_data["count"]
         
         return {
-            "total_errors": len(failed_requests),
-            "error_rate": len(failed_requests) / len(usage_data) if usage_data else 0.0,
+            "total_errors": total_errors,
+            "error_rate": total_errors / total_requests if total_requests else 0.0,
             "error_types": error_types
         }
     
+    def _analyze_response_times(
+        self,
+        project_id: Optional[UUID],
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, Any]:
+        """Compute p50/p95/p99 response times overall and per agent, and scheduler queue times."""
+        columns = self.store.recent
+        rows = columns.select(start_date, end_date, project_id)
+        
+        return {
+            "sample_size": len(rows),
+            "overall": columns.percentiles(rows),
+            "by_agent": columns.percentiles_by_agent(rows),
+            "queued": columns.percentiles(rows, column="queued_time_ms")
+        }
+    
     def _generate_recommendations(
         self,
-        usage_data: List[UsageMetrics],
+        rollups: List[UsageRollup],
         cost_breakdown: CostBreakdown,
         error_analysis: Dict[str, Any]
     ) -> List[str]:
@@ -664,6 +705,13 @@ class LLMUsageTracker:
                 f"Consider prompt optimization or model selection review."
             )
         
+        # Scheduler queueing
+        if cost_breakdown.average_queued_time > 5000:  # > 5 seconds
+            recommendations.append(
+                f"Requests waited {cost_breakdown.average_queued_time/1000:.1f}s on average for the request scheduler. "
+                f"Review provider rate limits or reduce parallel agent work."
+            )
+        
         # Token usage efficiency
         avg_tokens_per_request = cost_breakdown.token_usage["total"] / cost_breakdown.request_count
         if avg_tokens_per_request > 2000:
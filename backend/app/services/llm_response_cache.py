@@ -0,0 +1,197 @@
+"""LLM response cache keyed by prompt fingerprint.
+
+Re-runs after a HITL rejection and recovery retries send agents exactly the
+same prompt again. When a call is deterministic (temperature 0), or caching
+is forced, the validated response is stored under a hash of the model,
+temperature and messages and replayed instead of calling the model.
+
+The cache is opt-in (LLM_RESPONSE_CACHE_ENABLED) and stores entries either
+in Redis or in a local directory, both with a TTL and a size bound.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import structlog
+import redis
+
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+def prompt_fingerprint(
+    model: str,
+    temperature: float,
+    messages: Sequence[Tuple[str, str]],
+    agent_type: str = ""
+) -> str:
+    """
+    Hash the inputs that determine a model response.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        messages: (role, content) pairs in the order they are sent
+        agent_type: Agent the prompt is sent to
+
+    Returns:
+        Hex digest identifying the prompt
+    """
+    payload = json.dumps(
+        {
+            "agent_type": agent_type,
+            "model": model,
+            "temperature": float(temperature),
+            "messages": [list(m) for m in messages]
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Opt-in store of LLM responses with Redis and disk backends.
+
+    Lookups are bypassed when the temperature is above zero unless `force` is
+    set. Backend errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        backend: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        force: Optional[bool] = None,
+        cache_dir: Optional[str] = None,
+        redis_url: Optional[str] = None,
+        key_prefix: str = "botarmy:llm_response:"
+    ):
+        self.enabled = enabled if enabled is not None else settings.llm_response_cache_enabled
+        self.backend = backend or settings.llm_response_cache_backend
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.llm_response_cache_ttl_seconds
+        self.max_bytes = max_bytes if max_bytes is not None else settings.llm_response_cache_max_bytes
+        self.force = force if force is not None else settings.llm_response_cache_force
+        self.cache_dir = Path(cache_dir or settings.llm_response_cache_dir)
+        self.redis_url = redis_url or settings.redis_url
+        self.key_prefix = key_prefix
+
+        self._client: Optional[redis.Redis] = None
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        if self.backend not in ("redis", "disk"):
+            raise ValueError(f"Unknown LLM response cache backend: {self.backend}")
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Whether calls at this temperature should use the cache."""
+        return self.enabled and (temperature <= 0 or self.force)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss."""
+        try:
+            response = self._redis_get(key) if self.backend == "redis" else self._disk_get(key)
+        except (redis.RedisError, OSError, ValueError) as e:
+            logger.warning("LLM response cache read failed", backend=self.backend, error=str(e))
+            response = None
+
+        self.stats["hits" if response is not None else "misses"] += 1
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response under a prompt fingerprint."""
+        if len(response.encode("utf-8")) > self.max_bytes:
+            return
+
+        try:
+            if self.backend == "redis":
+                self._get_client().set(self._redis_key(key), response, ex=self.ttl_seconds)
+            else:
+                self._disk_set(key, response)
+            self.stats["stores"] += 1
+        except (redis.RedisError, OSError) as e:
+            logger.warning("LLM response cache write failed", backend=self.backend, error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "backend": self.backend,
+            "enabled": self.enabled,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+        }
+
+    def _get_client(self) -> redis.Redis:
+        """Get the Redis client, connecting lazily on first use."""
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url)
+        return self._client
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _redis_get(self, key: str) -> Optional[str]:
+        value = self._get_client().get(self._redis_key(key))
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+        if entry["expires_at"] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+
+        # Refresh the access time used for least-recently-used eviction
+        os.utime(path)
+        return entry["response"]
+
+    def _disk_set(self, key: str, response: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        path = self._disk_path(key)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(
+            json.dumps({"expires_at": time.time() + self.ttl_seconds, "response": response}),
+            encoding="utf-8"
+        )
+        temp_path.replace(path)
+
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Delete expired entries, then the least recently used, until under max_bytes."""
+        entries: List[Tuple[float, int, Path]] = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        expired_before = time.time() - self.ttl_seconds
+        for mtime, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes and mtime > expired_before:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats["evictions"] += 1
+
+
+# Global LLM response cache instance
+llm_response_cache = LLMResponseCache()
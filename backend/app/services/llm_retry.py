@@ -2,18 +2,73 @@
 
 This module provides robust retry mechanisms for LLM API calls with intelligent
 backoff strategies and comprehensive error classification.
+
+Calls can also be guarded by a circuit breaker per provider and model, shared by
+every handler in the process, hedged with a second request once they run past
+the model's p95 latency, and failed over to an alternate model while the
+primary model's circuit is open. Calls that queue before reaching the provider
+(e.g. for a scheduler slot) call `mark_queued` and then `mark_provider_start`
+once they are granted a slot. The latencies behind p95 then measure the provider
+alone, and the hedge delay only runs while the call is with the provider. This
+way a saturated scheduler is not sent a hedge for every queued request.
 """
 
 import asyncio
+import math
 import time
-from typing import Callable, Any, List, Type, Optional, Dict
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Any, Deque, List, Type, Optional, Dict, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import structlog
 from functools import wraps
 
+from app.config import settings
+
 logger = structlog.get_logger(__name__)
 
+# Successful call latencies kept per circuit for the hedging delay
+LATENCY_SAMPLES = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+class CallTimer:
+    """Latency clock of one call, stopped while it queues and restarted when it reaches the provider."""
+    
+    def __init__(self):
+        self.started: Optional[float] = time.time()
+        # Set whenever the clock is stopped or restarted, to wake a pending hedge deadline
+        self.changed = asyncio.Event()
+    
+    def elapsed(self) -> float:
+        return time.time() - self.started if self.started is not None else 0.0
+    
+    def stop(self) -> None:
+        self.started = None
+        self.changed.set()
+    
+    def restart(self) -> None:
+        self.started = time.time()
+        self.changed.set()
+
+
+_call_timer: ContextVar[Optional[CallTimer]] = ContextVar("llm_call_timer", default=None)
+
+
+def mark_queued() -> None:
+    """Stop the running call's clock while it waits before reaching the provider."""
+    timer = _call_timer.get()
+    if timer is not None:
+        timer.stop()
+
+
+def mark_provider_start() -> None:
+    """Start the running call's latency clock now, excluding time it spent queued."""
+    timer = _call_timer.get()
+    if timer is not None:
+        timer.restart()
+
 
 class RetryableErrorType(str, Enum):
     """Classification of retryable error types."""
@@ -58,6 +113,157 @@ class RetryConfig:
             ]
 
 
+class CircuitState(str, Enum):
+    """Circuit breaker state."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when every endpoint available for a call has an open circuit."""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one provider and model.
+    
+    Closed, the breaker counts outcomes in a sliding time window and opens
+    once enough calls have been seen and the failure rate reaches the
+    threshold. Open, it rejects calls until `open_seconds` have passed, then
+    lets a single probe through (half-open). The probe's outcome closes the
+    circuit or opens it again.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = (failure_threshold if failure_threshold is not None
+                                  else settings.llm_circuit_failure_threshold)
+        self.min_calls = min_calls if min_calls is not None else settings.llm_circuit_min_calls
+        self.window_seconds = (window_seconds if window_seconds is not None
+                               else settings.llm_circuit_window_seconds)
+        self.open_seconds = open_seconds if open_seconds is not None else settings.llm_circuit_open_seconds
+        self.clock = clock
+        
+        self.state = CircuitState.CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.times_opened = 0
+    
+    def allow_request(self) -> bool:
+        """Whether a call may be sent now; claims the probe slot when half-open."""
+        now = self.clock()
+        if self.state == CircuitState.OPEN:
+            if now - self._opened_at < self.open_seconds:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probe_started = None
+            logger.info("Circuit half-open, probing provider", circuit=self.name)
+        
+        if self.state == CircuitState.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) frees its slot after open_seconds
+            if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+                return False
+            self._probe_started = now
+        return True
+    
+    def record_success(self, latency: Optional[float] = None) -> None:
+        """Record a call the provider answered, with its latency in seconds."""
+        if latency is not None:
+            self._latencies.append(latency)
+        if self.state == CircuitState.HALF_OPEN:
+            self.state = CircuitState.CLOSED
+            self._outcomes.clear()
+            logger.info("Circuit closed after successful probe", circuit=self.name)
+            return
+        self._record(True)
+    
+    def record_failure(self) -> None:
+        """Record a provider-side failure."""
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+        self._record(False)
+        
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if (self.state == CircuitState.CLOSED and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_threshold):
+            self._open()
+    
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Latency percentile in seconds over recent successful calls."""
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and window counts."""
+        return {
+            "state": self.state.value,
+            "window_calls": len(self._outcomes),
+            "window_failures": sum(1 for _, ok in self._outcomes if not ok),
+            "times_opened": self.times_opened,
+            "p95_latency": self.latency_percentile(95)
+        }
+    
+    def _record(self, ok: bool) -> None:
+        now = self.clock()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+    
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+        self.times_opened += 1
+        logger.warning("Circuit opened, rejecting calls",
+                      circuit=self.name,
+                      open_seconds=self.open_seconds)
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers per provider and model, shared by every retry handler."""
+    
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+    
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get((provider, model))
+        if breaker is None:
+            breaker = self._breakers[(provider, model)] = CircuitBreaker(f"{provider}:{model}")
+        return breaker
+    
+    def reset(self) -> None:
+        """Forget every breaker's state."""
+        self._breakers.clear()
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {breaker.name: breaker.get_stats() for breaker in self._breakers.values()}
+
+
+# Global circuit breakers shared by every LLM retry handler in the process
+circuit_breakers = CircuitBreakerRegistry()
+
+
+@dataclass
+class FailoverTarget:
+    """Alternate model a call is sent to while the primary model's circuit is open."""
+    provider: str
+    model: str
+    call: Callable
+
+
 @dataclass 
 class RetryAttempt:
     """Information about a retry attempt."""
@@ -78,6 +284,10 @@ class RetryResult:
     total_time: float = 0.0
     attempts: List[RetryAttempt] = None
     final_error: Optional[Exception] = None
+    model: Optional[str] = None  # Model of the endpoint that produced the result
+    failed_over: bool = False
+    hedged: bool = False
+    queued_time_ms: float = 0.0  # Time attempts spent waiting for a scheduler slot
     
     def __post_init__(self):
         if self.attempts is None:
@@ -111,7 +321,11 @@ class LLMRetryHandler:
             'successful_calls': 0,
             'failed_calls': 0,
             'total_retries': 0,
-            'retry_success_rate': 0.0
+            'retry_success_rate': 0.0,
+            'circuit_rejections': 0,
+            'failovers': 0,
+            'hedged_calls': 0,
+            'hedge_wins': 0
         }
     
     async def execute_with_retry(
@@ -120,6 +334,9 @@ class LLMRetryHandler:
         *args,
         max_retries: Optional[int] = None,
         context: Optional[Dict[str, Any]] = None,
+        circuit: Optional[Tuple[str, str]] = None,
+        hedge_call: Optional[Callable] = None,
+        failover: Optional[FailoverTarget] = None,
         **kwargs
     ) -> RetryResult:
         """Execute LLM call with exponential backoff retry logic.
@@ -129,6 +346,10 @@ class LLMRetryHandler:
             *args: Positional arguments for the callable
             max_retries: Override default max retries
             context: Additional context for logging
+            circuit: (provider, model) whose shared circuit breaker guards the call
+            hedge_call: Independent duplicate of llm_call, sent once the call runs
+                past the model's p95 latency; the first response wins
+            failover: Alternate model used while the primary circuit is open
             **kwargs: Keyword arguments for the callable
             
         Returns:
@@ -138,6 +359,13 @@ class LLMRetryHandler:
         attempts = []
         effective_max_retries = max_retries or self.config.max_retries
         
+        # (breaker, model, call, hedge_call) in order of preference
+        endpoints = [(circuit_breakers.get(*circuit) if circuit else None,
+                      circuit[1] if circuit else None, llm_call, hedge_call)]
+        if failover is not None:
+            endpoints.append((circuit_breakers.get(failover.provider, failover.model),
+                              failover.model, failover.call, None))
+        
         self._retry_stats['total_calls'] += 1
         
         logger.info("Starting LLM call with retry",
@@ -145,12 +373,49 @@ class LLMRetryHandler:
                    context=context or {})
         
         for attempt in range(effective_max_retries + 1):  # +1 for initial attempt
+            endpoint = next((e for e in endpoints if e[0] is None or e[0].allow_request()), None)
+            if endpoint is None:
+                # Every endpoint is known to be failing; don't wait out the retry budget
+                self._retry_stats['failed_calls'] += 1
+                self._retry_stats['circuit_rejections'] += 1
+                if attempt > 0:
+                    self._retry_stats['total_retries'] += attempt
+                error = CircuitOpenError(
+                    "Circuit open for " + ", ".join(e[0].name for e in endpoints)
+                )
+                logger.error("LLM call rejected by open circuit",
+                           error=str(error),
+                           context=context or {})
+                return RetryResult(
+                    success=False,
+                    total_attempts=max(attempt, 1),
+                    total_time=time.time() - start_time,
+                    attempts=attempts,
+                    final_error=error,
+                    model=endpoints[0][1]
+                )
+            
+            breaker, model, call, hedge = endpoint
+            failed_over = endpoint is not endpoints[0]
+            if failed_over:
+                self._retry_stats['failovers'] += 1
+                logger.warning("Primary circuit open, failing over",
+                             failover_model=model,
+                             context=context or {})
+            
+            hedged = False
             try:
-                # Execute the callable
-                if asyncio.iscoroutinefunction(llm_call):
-                    result = await llm_call(*args, **kwargs)
+                # Execute the callable, hedged once it outlives the model's p95 latency
+                hedge_delay = self._hedge_delay(breaker) if hedge else None
+                if hedge_delay is not None:
+                    result, hedged, latency = await self._run_hedged(call, hedge, hedge_delay, args, kwargs)
                 else:
-                    result = llm_call(*args, **kwargs)
+                    timer = CallTimer()
+                    result = await self._invoke(call, args, kwargs, timer)
+                    latency = timer.elapsed()
+                
+                if breaker:
+                    breaker.record_success(latency)
                 
                 # Success!
                 total_time = time.time() - start_time
@@ -168,13 +433,23 @@ class LLMRetryHandler:
                     result=result,
                     total_attempts=attempt + 1,
                     total_time=total_time,
-                    attempts=attempts
+                    attempts=attempts,
+                    model=model,
+                    failed_over=failed_over,
+                    hedged=hedged
                 )
                 
             except Exception as e:
                 error_type = self._classify_error(e)
                 is_retryable = await self.should_retry(e, attempt, effective_max_retries)
                 
+                # Only provider-side failures count against the circuit
+                if breaker:
+                    if isinstance(error_type, RetryableErrorType):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                
                 attempt_info = RetryAttempt(
                     attempt_number=attempt + 1,
                     delay=0.0,  # Will be set below if retrying
@@ -212,7 +487,9 @@ class LLMRetryHandler:
                         total_attempts=attempt + 1,
                         total_time=total_time,
                         attempts=attempts,
-                        final_error=e
+                        final_error=e,
+                        model=model,
+                        failed_over=failed_over
                     )
                 
                 # Calculate delay and wait
@@ -236,6 +513,81 @@ class LLMRetryHandler:
             final_error=Exception("Max retries exceeded")
         )
     
+    @staticmethod
+    async def _invoke(call: Callable, args: tuple, kwargs: Dict[str, Any],
+                      timer: Optional[CallTimer] = None) -> Any:
+        token = _call_timer.set(timer)
+        try:
+            if asyncio.iscoroutinefunction(call):
+                return await call(*args, **kwargs)
+            return call(*args, **kwargs)
+        finally:
+            _call_timer.reset(token)
+    
+    @staticmethod
+    def _hedge_delay(breaker: Optional[CircuitBreaker]) -> Optional[float]:
+        """Seconds to wait before hedging: the model's p95 latency, floored at the minimum delay."""
+        p95 = breaker.latency_percentile(95) if breaker else None
+        if p95 is None:
+            return None
+        return max(p95, settings.llm_hedge_min_delay_ms / 1000)
+    
+    async def _run_hedged(
+        self,
+        call: Callable,
+        hedge_call: Callable,
+        delay: float,
+        args: tuple,
+        kwargs: Dict[str, Any]
+    ) -> Tuple[Any, bool, Optional[float]]:
+        """
+        Run a call, starting its hedge once it has been with the provider for `delay`.
+        
+        Time the call spends queued (between `mark_queued` and
+        `mark_provider_start`) does not count towards the delay.
+        
+        Returns:
+            (result, whether the hedge was sent, the primary's latency). The
+            latency is None when the hedge won, as the primary never finished.
+        """
+        timer = CallTimer()
+        primary = asyncio.ensure_future(self._invoke(call, args, kwargs, timer))
+        pending = {primary}
+        try:
+            while True:
+                timer.changed.clear()
+                remaining = None if timer.started is None else timer.started + delay - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                # Wake when the primary finishes, the deadline passes or its clock stops or restarts
+                changed = asyncio.ensure_future(timer.changed.wait())
+                try:
+                    await asyncio.wait({primary, changed}, timeout=remaining,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    changed.cancel()
+                if primary.done():
+                    return primary.result(), False, timer.elapsed()
+            
+            self._retry_stats['hedged_calls'] += 1
+            hedge = asyncio.ensure_future(self._invoke(hedge_call, args, kwargs))
+            pending.add(hedge)
+            
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._retry_stats['hedge_wins'] += 1
+                            return task.result(), True, None
+                        return task.result(), True, timer.elapsed()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+    
     def calculate_backoff_delay(self, attempt: int) -> float:
         """Calculate exponential backoff delay with jitter.
         
@@ -364,7 +716,11 @@ class LLMRetryHandler:
             'successful_calls': 0, 
             'failed_calls': 0,
             'total_retries': 0,
-            'retry_success_rate': 0.0
+            'retry_success_rate': 0.0,
+            'circuit_rejections': 0,
+            'failovers': 0,
+            'hedged_calls': 0,
+            'hedge_wins': 0
         }
 
 
@@ -0,0 +1,326 @@
+"""Shared scheduler for outbound LLM requests.
+
+Every agent call acquires a slot here before reaching the provider. The
+scheduler enforces:
+
+- token-bucket limits on requests and prompt tokens per minute, per provider
+  and model, so parallel agents stay under the provider quota instead of
+  discovering it through 429 responses;
+- a cap on requests in flight across the process;
+- priority lanes, so work a human is waiting on is dispatched before
+  ordinary workflow steps, and bulk work after them. Agent tasks take
+  their lane from their queue priority class;
+- round-robin between projects within a lane, so one busy project cannot
+  starve the others.
+
+A 429 that still gets through pauses the affected bucket for the provider's
+Retry-After interval. Limits apply per process; size them for the number of
+API and worker processes sharing a key.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Pause applied to a bucket after a rate-limit error without a Retry-After hint
+DEFAULT_THROTTLE_SECONDS = 1.0
+
+LimitKey = Tuple[str, str]
+
+
+class RequestPriority(IntEnum):
+    """Dispatch lane for an LLM request; lower values are served first."""
+    HITL_BLOCKING = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+_request_priority: ContextVar[RequestPriority] = ContextVar(
+    "llm_request_priority", default=RequestPriority.NORMAL
+)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Dispatch LLM requests made inside the block in the given lane."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute` units per minute up to one minute's worth."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available."""
+        if self.unlimited:
+            return 0.0
+        now = self._refill()
+        if now < self.paused_until:
+            return self.paused_until - now
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for `seconds`, then refill from empty."""
+        if not self.unlimited:
+            now = self._refill()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.level = min(self.level, 0.0)
+
+    def _refill(self) -> float:
+        now = self.clock()
+        if now > self.paused_until:
+            start = max(self.updated, self.paused_until)
+            self.level = min(self.capacity, self.level + (now - start) * self.rate)
+        self.updated = now
+        return now
+
+
+@dataclass
+class SchedulerTicket:
+    """A granted request slot."""
+    provider: str
+    model: str
+    tokens: int
+    priority: RequestPriority
+    queued_ms: float
+
+
+@dataclass
+class _Waiter:
+    key: LimitKey
+    tokens: int
+    future: asyncio.Future
+
+
+class LLMRequestScheduler:
+    """
+    Admission control for LLM requests.
+
+    Use `acquire` as an async context manager around each provider call. The
+    scheduler is driven by the event loop it is used from; waiters are
+    released as slots free up or as buckets refill.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        max_in_flight: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.enabled = enabled if enabled is not None else settings.llm_scheduler_enabled
+        self.max_in_flight = max_in_flight or settings.llm_scheduler_max_in_flight
+        self.requests_per_minute = (requests_per_minute if requests_per_minute is not None
+                                    else settings.llm_scheduler_requests_per_minute)
+        self.tokens_per_minute = (tokens_per_minute if tokens_per_minute is not None
+                                  else settings.llm_scheduler_tokens_per_minute)
+        self.clock = clock
+
+        self._limits: Dict[LimitKey, Tuple[int, int]] = {}
+        self._buckets: Dict[LimitKey, Tuple[TokenBucket, TokenBucket]] = {}
+        self._lanes: Dict[RequestPriority, "OrderedDict[Optional[UUID], Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._in_flight = 0
+        self._queued = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"granted": 0, "throttled": 0, "total_queued_ms": 0.0}
+
+    def configure(self, provider: str, model: str, requests_per_minute: int, tokens_per_minute: int) -> None:
+        """Set the limits for one provider and model; 0 disables a limit."""
+        self._limits[(provider, model)] = (requests_per_minute, tokens_per_minute)
+        self._buckets.pop((provider, model), None)
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        provider: str,
+        model: str,
+        tokens: int = 0,
+        project_id: Optional[UUID] = None,
+        priority: Optional[RequestPriority] = None
+    ) -> AsyncIterator[SchedulerTicket]:
+        """
+        Wait for a request slot.
+
+        Args:
+            provider: LLM provider name
+            model: Model name
+            tokens: Estimated prompt tokens charged against the token bucket
+            project_id: Project the request is made for, used for fair queuing
+            priority: Dispatch lane; defaults to the lane set by `request_priority`
+
+        Yields:
+            Ticket with the time spent queued
+        """
+        priority = priority if priority is not None else _request_priority.get()
+        start = self.clock()
+
+        if self.enabled:
+            waiter = _Waiter(key=(provider, model), tokens=tokens,
+                             future=asyncio.get_running_loop().create_future())
+            self._lanes[priority].setdefault(project_id, deque()).append(waiter)
+            self._queued += 1
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.cancelled():
+                    self._remove(priority, project_id, waiter)
+                else:
+                    self._release()
+                raise
+
+        queued_ms = (self.clock() - start) * 1000
+        self.stats["granted"] += 1
+        self.stats["total_queued_ms"] += queued_ms
+        ticket = SchedulerTicket(provider=provider, model=model, tokens=tokens,
+                                 priority=priority, queued_ms=queued_ms)
+        try:
+            yield ticket
+        except Exception as e:
+            if self.enabled and _is_rate_limit(e):
+                self.throttle(provider, model, _retry_after(e))
+            raise
+        finally:
+            if self.enabled:
+                self._release()
+
+    def throttle(self, provider: str, model: str, seconds: float) -> None:
+        """Pause a provider and model after it reported a rate limit."""
+        requests, tokens = self._bucket((provider, model))
+        requests.pause(seconds)
+        tokens.pause(seconds)
+        self.stats["throttled"] += 1
+        logger.warning("LLM provider rate limited, pausing requests",
+                      provider=provider,
+                      model=model,
+                      pause_seconds=seconds)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get scheduler counters and current occupancy."""
+        return {**self.stats, "in_flight": self._in_flight, "queued": self._queued}
+
+    def _bucket(self, key: LimitKey) -> Tuple[TokenBucket, TokenBucket]:
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            requests, tokens = self._limits.get(key, (self.requests_per_minute, self.tokens_per_minute))
+            buckets = self._buckets[key] = (TokenBucket(requests, self.clock), TokenBucket(tokens, self.clock))
+        return buckets
+
+    def _dispatch(self) -> None:
+        """Grant slots in priority order, one per project per round within a lane."""
+        blocked: Dict[LimitKey, float] = {}
+
+        while self._in_flight < self.max_in_flight and self._queued:
+            if not any(self._serve_round(lane, blocked) for lane in self._lanes.values()):
+                break
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if blocked and self._queued and self._in_flight < self.max_in_flight:
+            self._timer = asyncio.get_running_loop().call_later(min(blocked.values()), self._dispatch)
+
+    def _serve_round(self, lane: "OrderedDict[Optional[UUID], Deque[_Waiter]]",
+                     blocked: Dict[LimitKey, float]) -> bool:
+        """Grant at most one waiter per project in a lane; True if any was granted."""
+        served = []
+        for project_id, queue in lane.items():
+            if self._in_flight >= self.max_in_flight:
+                break
+            for waiter in queue:
+                # Cancelled waiters are removed by their own task
+                if waiter.future.done():
+                    continue
+                # A waiter blocked on its bucket holds back later waiters for the same model
+                if waiter.key in blocked:
+                    continue
+                requests, tokens = self._bucket(waiter.key)
+                delay = max(requests.wait_time(1), tokens.wait_time(waiter.tokens))
+                if delay > 0:
+                    blocked[waiter.key] = delay
+                    continue
+                requests.consume(1)
+                tokens.consume(waiter.tokens)
+                queue.remove(waiter)
+                self._queued -= 1
+                self._in_flight += 1
+                waiter.future.set_result(None)
+                served.append(project_id)
+                break
+
+        for project_id in served:
+            if lane[project_id]:
+                lane.move_to_end(project_id)
+            else:
+                del lane[project_id]
+        return bool(served)
+
+    def _remove(self, priority: RequestPriority, project_id: Optional[UUID], waiter: _Waiter) -> None:
+        queue = self._lanes[priority].get(project_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._lanes[priority][project_id]
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        if self._queued:
+            self._dispatch()
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return (getattr(error, "status_code", None) == 429
+            or type(error).__name__ == "RateLimitError"
+            or "rate limit" in str(error).lower())
+
+
+def _retry_after(error: Exception) -> float:
+    """Retry-After hint from a rate-limit error, in seconds."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return DEFAULT_THROTTLE_SECONDS
+
+
+# Global LLM request scheduler shared by every agent in the process
+llm_scheduler = LLMRequestScheduler()
@@ -0,0 +1,164 @@
+"""Incremental delivery of agent responses to WebSocket clients.
+
+With streaming enabled, agents are created with a streaming model client and
+their responses are read through `on_messages_stream`. Completion chunks are
+collected and sent as AGENT_RESPONSE_CHUNK events at most once per batch
+interval, so the UI sees output within the first second of a long generation
+instead of only after the full completion arrives.
+
+The streamed text is provisional. The assembled response is still validated
+by LLMResponseValidator, and the final event in a stream reports whether
+validation passed and the length of the response actually returned.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence
+from uuid import UUID
+import structlog
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent
+
+from app.config import settings
+from app.websocket.event_bus import event_publisher
+from app.websocket.events import WebSocketEvent, EventType
+from app.websocket.manager import websocket_manager
+
+logger = structlog.get_logger(__name__)
+
+EventSink = Callable[[WebSocketEvent], Awaitable[None]]
+
+
+async def publish_event(event: WebSocketEvent) -> None:
+    """Deliver an event through the event bus, or directly if the bus is disabled."""
+    if settings.event_bus_enabled:
+        await asyncio.to_thread(event_publisher.publish, event)
+    else:
+        await websocket_manager.broadcast_event(event)
+
+
+class ResponseStreamBatcher:
+    """
+    Batches streamed completion chunks into WebSocket events.
+
+    The first chunk is sent immediately; later chunks are held until the batch
+    interval has elapsed since the previous event. Every event carries a
+    sequence number so clients can detect gaps. If a call is retried, a
+    `restart` event tells clients to discard the text streamed so far.
+    """
+
+    def __init__(
+        self,
+        project_id: Optional[UUID],
+        task_id: Optional[UUID],
+        agent_type: str,
+        interval_ms: Optional[int] = None,
+        sink: Optional[EventSink] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.project_id = project_id
+        self.task_id = task_id
+        self.agent_type = agent_type
+        self.interval = (interval_ms if interval_ms is not None
+                         else settings.llm_stream_batch_interval_ms) / 1000
+        self.sink = sink or publish_event
+        self.clock = clock
+
+        self.sequence = 0
+        self._buffer: List[str] = []
+        self._parts: List[str] = []
+        self._last_emit: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        """Text assembled from every chunk of the current attempt."""
+        return "".join(self._parts)
+
+    async def add(self, chunk: str) -> None:
+        """Add a completion chunk, sending the batch if the interval has elapsed."""
+        if not chunk:
+            return
+
+        self._buffer.append(chunk)
+        self._parts.append(chunk)
+
+        if self._last_emit is None or self.clock() - self._last_emit >= self.interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send any buffered chunks as a single event."""
+        if not self._buffer:
+            return
+
+        chunk = "".join(self._buffer)
+        self._buffer.clear()
+        await self._emit({"chunk": chunk})
+
+    async def restart(self) -> None:
+        """Discard the current attempt before a retry streams a new one."""
+        self._buffer.clear()
+        if self._parts:
+            self._parts.clear()
+            await self._emit({"restart": True})
+
+    async def finish(self, validated: bool, final_text: str = "") -> None:
+        """
+        Send the remaining chunks and mark the stream complete.
+
+        Args:
+            validated: Whether the assembled response passed validation
+            final_text: Response returned to the caller after validation; its
+                length is reported, since it may differ from the streamed text
+        """
+        await self.flush()
+        await self._emit({"done": True, "validated": validated, "length": len(final_text)})
+
+    async def _emit(self, data: dict) -> None:
+        self.sequence += 1
+        self._last_emit = self.clock()
+
+        event = WebSocketEvent(
+            event_type=EventType.AGENT_RESPONSE_CHUNK,
+            project_id=self.project_id,
+            task_id=self.task_id,
+            agent_type=self.agent_type,
+            data={"sequence": self.sequence, **data}
+        )
+
+        try:
+            await self.sink(event)
+        except Exception as e:
+            # Streaming is best effort; the final response is delivered regardless
+            logger.warning("Failed to send response chunk",
+                          task_id=str(self.task_id) if self.task_id else None,
+                          sequence=self.sequence,
+                          error=str(e))
+
+
+async def stream_agent_response(
+    agent,
+    messages: Sequence,
+    batcher: ResponseStreamBatcher
+) -> Optional[Response]:
+    """
+    Run an agent through its streaming interface.
+
+    Args:
+        agent: AutoGen agent created with a streaming model client
+        messages: Messages to send to the agent
+        batcher: Batcher that forwards chunks to WebSocket clients
+
+    Returns:
+        The agent's final Response, as `on_messages` would return it
+    """
+    await batcher.restart()
+
+    response = None
+    async for item in agent.on_messages_stream(messages, cancellation_token=None):
+        if isinstance(item, Response):
+            response = item
+        elif isinstance(item, ModelClientStreamingChunkEvent):
+            await batcher.add(item.content)
+
+    await batcher.flush()
+    return response
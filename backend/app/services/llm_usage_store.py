@@ -0,0 +1,295 @@
+"""Shared, bounded store for LLM usage metrics.
+
+Every LLMUsageTracker in a process records into the same store. Recent
+requests are kept in a fixed-size columnar ring buffer for percentiles and
+anomaly detection, and
+per-minute rollups by project, agent, provider, model and error type are
+accumulated in memory and inserted into `llm_usage_rollups` in batches.
+
+Reports are built from a grouped query over the rollup table, so they cover
+every API process and Celery worker. Their cost depends on the number of
+agents and models, not on the number of requests.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import extract, func, insert, select
+from sqlalchemy.orm import Session
+import structlog
+
+from app.config import settings
+from app.database.models import LLMUsageRollupDB
+from app.database.write_behind import WriteBehindBuffer
+from app.services.usage_columns import UsageColumns
+
+if TYPE_CHECKING:
+    from app.services.llm_monitoring import UsageMetrics
+
+logger = structlog.get_logger(__name__)
+
+# (bucket, project_id, agent_type, provider, model, error_type)
+RollupKey = Tuple[datetime, Optional[UUID], str, str, str, Optional[str]]
+
+_COUNTERS = (
+    "request_count", "error_count", "cache_hits", "tokens_used", "input_tokens",
+    "output_tokens", "retry_count", "total_cost", "total_response_time_ms", "total_queued_time_ms",
+)
+_FLOAT_COUNTERS = ("total_cost", "total_response_time_ms", "total_queued_time_ms")
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, as stored in the rollup table."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def minute_bucket(timestamp: datetime) -> datetime:
+    """Start of the UTC minute containing the timestamp."""
+    return to_utc_naive(timestamp).replace(second=0, microsecond=0)
+
+
+@dataclass
+class UsageRollup:
+    """Aggregated usage for one agent, model and error type in one hour of the day."""
+    agent_type: str
+    provider: str
+    model: str
+    error_type: Optional[str]
+    hour: int
+    request_count: int = 0
+    error_count: int = 0
+    cache_hits: int = 0
+    tokens_used: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retry_count: int = 0
+    total_cost: float = 0.0
+    total_response_time_ms: float = 0.0
+    total_queued_time_ms: float = 0.0
+
+    @property
+    def group_key(self) -> Tuple[str, str, str, Optional[str], int]:
+        return (self.agent_type, self.provider, self.model, self.error_type, self.hour)
+
+    def add(self, other: "UsageRollup") -> None:
+        for counter in _COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+
+
+def _metric_counters(metrics: "UsageMetrics") -> Dict[str, float]:
+    return {
+        "request_count": 1,
+        "error_count": 0 if metrics.success else 1,
+        "cache_hits": 1 if metrics.cache_hit else 0,
+        "tokens_used": metrics.tokens_used,
+        "input_tokens": metrics.input_tokens,
+        "output_tokens": metrics.output_tokens,
+        "retry_count": metrics.retry_count,
+        "total_cost": metrics.estimated_cost,
+        "total_response_time_ms": metrics.response_time_ms,
+        "total_queued_time_ms": metrics.queued_time_ms,
+    }
+
+
+def _metric_error_type(metrics: "UsageMetrics") -> Optional[str]:
+    if metrics.success:
+        return None
+    return metrics.error_type or "unknown"
+
+
+class LLMUsageStore(WriteBehindBuffer):
+    """
+    Ring buffer of recent requests plus write-behind per-minute rollups.
+
+    Rollups are flushed on a timer while an event loop is running; the
+    insert runs in a worker thread so agents never wait on it. When
+    persistence is disabled, or the rollup table cannot be read, reports fall
+    back to the requests still held in the ring buffer.
+    """
+
+    def __init__(
+        self,
+        ring_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        persist: Optional[bool] = None,
+        max_pending_rollups: int = 10000,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        super().__init__(
+            flush_interval if flush_interval is not None else settings.llm_usage_flush_interval_ms / 1000,
+            session_factory
+        )
+        self.ring_size = ring_size or settings.llm_usage_ring_size
+        self.persist = persist if persist is not None else settings.llm_usage_persist_enabled
+        self.max_pending_rollups = max_pending_rollups
+
+        self.recent = UsageColumns(self.ring_size)
+        self._pending: Dict[RollupKey, Dict[str, float]] = {}
+        self.stats = {"recorded": 0, "rows_written": 0, "flush_failures": 0, "dropped_rollups": 0}
+
+    def record(self, metrics: "UsageMetrics") -> None:
+        """Add a request to the ring buffer and its minute rollup."""
+        self.recent.append(metrics)
+        self.stats["recorded"] += 1
+
+        if not self.persist:
+            return
+
+        key = (
+            minute_bucket(metrics.timestamp), metrics.project_id, metrics.agent_type,
+            metrics.provider, metrics.model, _metric_error_type(metrics)
+        )
+        self._merge_pending(key, _metric_counters(metrics))
+        self._schedule_flush()
+
+    async def get_rollups(
+        self,
+        project_id: Optional[UUID],
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[UsageRollup]:
+        """
+        Usage in a date range, grouped by agent, provider, model, error type and hour.
+
+        Args:
+            project_id: Filter by project (None for all projects)
+            start_date: Start of date range
+            end_date: End of date range
+
+        Returns:
+            Rollups from every process, including this process's unflushed usage
+        """
+        start, end = to_utc_naive(start_date), to_utc_naive(end_date)
+
+        if self.persist:
+            try:
+                rollups = await asyncio.to_thread(self._query, project_id, start, end)
+                return self._combine(rollups + self._pending_rollups(project_id, start, end))
+            except Exception as e:
+                logger.warning("Failed to read usage rollups, using recent requests only",
+                              error=str(e))
+
+        return self.recent.rollups(self.recent.select(start, end, project_id))
+
+    def clear(self) -> None:
+        """Drop buffered requests and unflushed rollups."""
+        super().clear()
+        self.recent.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get store counters."""
+        return {
+            **self.stats,
+            "buffered_requests": len(self.recent),
+            "pending_rollups": len(self._pending),
+        }
+
+    def _merge_pending(self, key: RollupKey, counters: Dict[str, float]) -> None:
+        pending = self._pending.get(key)
+        if pending is None:
+            if len(self._pending) >= self.max_pending_rollups:
+                self.stats["dropped_rollups"] += 1
+                return
+            pending = self._pending[key] = dict.fromkeys(_COUNTERS, 0)
+        for counter, value in counters.items():
+            pending[counter] += value
+
+    def _restore(self, pending: Dict[RollupKey, Dict[str, float]], error: Exception) -> int:
+        """Put rollups from a failed flush back so the next flush retries them."""
+        self.stats["flush_failures"] += 1
+        logger.warning("Failed to persist LLM usage rollups",
+                      rollups=len(pending),
+                      error=str(error))
+        for key, counters in pending.items():
+            self._merge_pending(key, counters)
+        return 0
+
+    def _write(self, pending: Dict[RollupKey, Dict[str, float]]) -> int:
+        rows = [
+            {
+                "bucket": bucket,
+                "project_id": project_id,
+                "agent_type": agent_type,
+                "provider": provider,
+                "model": model,
+                "error_type": error_type,
+                **counters
+            }
+            for (bucket, project_id, agent_type, provider, model, error_type), counters in pending.items()
+        ]
+
+        db = self.session_factory()
+        try:
+            db.execute(insert(LLMUsageRollupDB), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.stats["rows_written"] += len(rows)
+        logger.debug("LLM usage rollups persisted", rows=len(rows))
+        return len(rows)
+
+    def _query(self, project_id: Optional[UUID], start: datetime, end: datetime) -> List[UsageRollup]:
+        hour = extract("hour", LLMUsageRollupDB.bucket).label("hour")
+        group_columns = (
+            LLMUsageRollupDB.agent_type, LLMUsageRollupDB.provider,
+            LLMUsageRollupDB.model, LLMUsageRollupDB.error_type, hour
+        )
+        query = (
+            select(*group_columns, *(func.sum(getattr(LLMUsageRollupDB, c)).label(c) for c in _COUNTERS))
+            .where(LLMUsageRollupDB.bucket >= minute_bucket(start), LLMUsageRollupDB.bucket <= end)
+            .group_by(*group_columns)
+        )
+        if project_id is not None:
+            query = query.where(LLMUsageRollupDB.project_id == project_id)
+
+        db = self.session_factory()
+        try:
+            rows = db.execute(query).all()
+        finally:
+            db.close()
+
+        return [
+            UsageRollup(
+                agent_type=row.agent_type,
+                provider=row.provider,
+                model=row.model,
+                error_type=row.error_type,
+                hour=int(row.hour),
+                **{c: float(getattr(row, c) or 0) if c in _FLOAT_COUNTERS
+                   else int(getattr(row, c) or 0) for c in _COUNTERS}
+            )
+            for row in rows
+        ]
+
+    def _pending_rollups(self, project_id: Optional[UUID], start: datetime, end: datetime) -> List[UsageRollup]:
+        return [
+            UsageRollup(agent_type=agent_type, provider=provider, model=model,
+                        error_type=error_type, hour=bucket.hour, **counters)
+            for (bucket, rollup_project, agent_type, provider, model, error_type), counters in self._pending.items()
+            if (project_id is None or rollup_project == project_id)
+            and minute_bucket(start) <= bucket <= end
+        ]
+
+    @staticmethod
+    def _combine(rollups: List[UsageRollup]) -> List[UsageRollup]:
+        """Merge rollups that share agent, provider, model, error type and hour."""
+        combined: Dict[Tuple, UsageRollup] = {}
+        for rollup in rollups:
+            existing = combined.get(rollup.group_key)
+            if existing is None:
+                combined[rollup.group_key] = rollup
+            else:
+                existing.add(rollup)
+        return list(combined.values())
+
+
+# Global LLM usage store shared by every tracker in the process
+llm_usage_store = LLMUsageStore()
@@ -0,0 +1,168 @@
+"""Per-process registry of LLM model clients.
+
+Building an `OpenAIChatCompletionClient` creates a fresh OpenAI SDK client and
+HTTP connection pool, so a worker that builds one per task pays a TLS
+handshake to the provider on every task. The pool keeps one client per
+model, API key and temperature for the life of the process, all sharing a
+single keep-alive HTTP connection pool.
+
+HTTP connections belong to the event loop that opened them. When the pool is
+used from a new event loop after the previous one has closed, every client is
+discarded and the pool's generation is bumped; agents built on the old
+clients compare generations and rebuild themselves.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+import httpx
+import structlog
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from app.config import settings
+
+logger = structlog.get_logger(__name__)
+
+ClientKey = Tuple[str, str, float]
+
+
+def _key_digest(api_key: str) -> str:
+    """Short digest identifying an API key without keeping it in pool keys or logs."""
+    return hashlib.blake2b(api_key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ModelClientPool:
+    """
+    Model clients shared by every agent in the process.
+
+    Use `get` wherever an agent needs a model client, and `generation` to tell
+    whether clients handed out earlier are still usable.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None
+    ):
+        self.enabled = enabled if enabled is not None else settings.model_client_pool_enabled
+        self.max_keepalive_connections = (max_keepalive_connections if max_keepalive_connections is not None
+                                          else settings.model_client_max_keepalive)
+        self.keepalive_expiry = (keepalive_expiry if keepalive_expiry is not None
+                                 else settings.model_client_keepalive_expiry)
+
+        self._clients: Dict[ClientKey, OpenAIChatCompletionClient] = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0}
+
+    def get(self, model: str, temperature: float = 0.7, api_key: Optional[str] = None) -> OpenAIChatCompletionClient:
+        """
+        Get the shared client for a model, creating it on first use.
+
+        Args:
+            model: Model name
+            temperature: Sampling temperature the client is configured with
+            api_key: Provider API key; defaults to OPENAI_API_KEY
+
+        Returns:
+            Model client
+        """
+        # Get API key from environment - in production, this should be properly configured
+        api_key = api_key or os.getenv("OPENAI_API_KEY", "demo-key")
+
+        if not self.enabled:
+            self.stats["created"] += 1
+            return OpenAIChatCompletionClient(model=model, api_key=api_key, temperature=temperature)
+
+        key = (model, _key_digest(api_key), float(temperature))
+        with self._lock:
+            self._check_loop()
+            client = self._clients.get(key)
+            if client is not None:
+                self.stats["reused"] += 1
+                return client
+
+            client = self._clients[key] = OpenAIChatCompletionClient(
+                model=model,
+                api_key=api_key,
+                temperature=temperature,
+                http_client=self._shared_http_client()
+            )
+            self.stats["created"] += 1
+
+        logger.debug("Model client created", model=model, temperature=temperature, api_key_digest=key[1])
+        return client
+
+    def generation(self) -> int:
+        """Current client generation; it changes whenever pooled clients are discarded."""
+        with self._lock:
+            self._check_loop()
+            return self._generation
+
+    def clear(self) -> None:
+        """Forget every pooled client without closing it, e.g. in a forked child."""
+        with self._lock:
+            self._discard()
+            self._loop = None
+
+    async def close(self) -> None:
+        """Close pooled clients and their connections; call from the loop that used them."""
+        with self._lock:
+            clients = list(self._clients.values())
+            http_client = self._http_client
+            self._discard()
+
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning("Failed to close model client", error=str(e))
+        if http_client is not None:
+            await http_client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool counters and current size."""
+        return {**self.stats, "clients": len(self._clients), "generation": self._generation}
+
+    def _check_loop(self) -> None:
+        """Discard clients bound to an event loop that has since closed."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._loop is not loop:
+            if self._loop is not None and self._loop.is_closed() and self._clients:
+                logger.debug("Event loop changed, discarding pooled model clients", clients=len(self._clients))
+                self._discard()
+            self._loop = loop
+
+    def _discard(self) -> None:
+        if self._clients or self._http_client is not None:
+            self.stats["discarded"] += len(self._clients)
+            self._clients.clear()
+            self._http_client = None
+            self._generation += 1
+
+    def _shared_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.llm_response_timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+        return self._http_client
+
+
+# Global model client pool shared by every agent in the process
+model_client_pool = ModelClientPool()
+
+# Connections opened by a parent process must not be shared with forked workers
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=model_client_pool.clear)
@@ -72,18 +72,17 @@ class OrchestratorService:
                        workflow_id=workflow_id,
                        total_steps=execution.total_steps)
 
-            # Execute workflow steps sequentially
-            while not execution.is_complete():
-                try:
-                    # Execute next step
-                    result = await self.workflow_engine.execute_workflow_step(execution.execution_id)
+            # Execute workflow steps by dependency graph so independent steps run concurrently
+            try:
+                dag_result = await self.workflow_engine.execute_workflow_dag(execution.execution_id)
 
-                    if result.get("status") == "no_pending_steps":
-                        break
+                for step_index, result in sorted(dag_result["step_results"].items()):
+                    if result.get("status") == "failed":
+                        raise ValueError(result.get("error", f"Step {step_index} failed"))
 
                     logger.info("Workflow step completed",
                                execution_id=execution.execution_id,
-                               step_index=result.get("step_index"),
+                               step_index=step_index,
                                agent=result.get("agent"))
 
                     # Check for HITL requirements in step results
@@ -97,17 +96,17 @@ class OrchestratorService:
                                          execution_id=execution.execution_id)
                             break
 
-                except Exception as e:
-                    logger.error("Workflow step execution failed",
-                               execution_id=execution.execution_id,
-                               error=str(e))
+            except Exception as e:
+                logger.error("Workflow step execution failed",
+                           execution_id=execution.execution_id,
+                           error=str(e))
 
-                    # Mark execution as failed
-                    await self.workflow_engine.cancel_workflow_execution(
-                        execution.execution_id,
-                        f"Step execution failed: {str(e)}"
-                    )
-                    raise
+                # Mark execution as failed
+                await self.workflow_engine.cancel_workflow_execution(
+                    execution.execution_id,
+                    f"Step execution failed: {str(e)}"
+                )
+                raise
 
             # Check final status
             final_status = self.workflow_engine.get_workflow_execution_status(execution.execution_id)
@@ -519,18 +518,26 @@ class OrchestratorService:
         
         return task
     
-    def submit_task(self, task: Task) -> str:
-        """Submit a task to the Celery queue."""
+    def submit_task(self, task: Task, priority: int = 1, interactive: bool = False) -> str:
+        """Submit a task to the Celery queue.
+        
+        Args:
+            task: Task to run
+            priority: Handoff priority (1=highest); maps to the broker priority
+            interactive: A person is waiting on the result, e.g. work resumed after HITL
+        """
         
         task_data = {
             "task_id": str(task.task_id),
             "project_id": str(task.project_id),
             "agent_type": task.agent_type,
             "instructions": task.instructions,
-            "context_ids": [str(cid) for cid in task.context_ids]
+            "context_ids": [str(cid) for cid in task.context_ids],
+            "priority": priority,
+            "interactive": interactive
         }
         
-        # Submit to Celery
+        # Submit to Celery; the router picks the agent-type and priority-class queue
         celery_task = process_agent_task.delay(task_data)
         
         # Update task status to working
@@ -884,10 +891,38 @@ class OrchestratorService:
                    task_id=hitl_request.task_id,
                    hitl_action=hitl_action)
 
+        # The task held for approval continues now; a person is waiting on it
+        celery_task_id = None
+        if next_action != "handle_rejection" and task.status == TaskStatus.PENDING:
+            celery_task_id = self._submit_resumed_task(task, hitl_request)
+
         return {
             "workflow_resumed": True,
             "next_action": next_action,
             "project_id": str(hitl_request.project_id),
             "task_id": str(hitl_request.task_id),
-            "hitl_action": hitl_action
+            "hitl_action": hitl_action,
+            "celery_task_id": celery_task_id
         }
+
+    def _submit_resumed_task(self, task_db: TaskDB, hitl_request: HitlRequestDB) -> Optional[str]:
+        """Submit a task that was waiting on a HITL response as interactive work."""
+
+        instructions = task_db.instructions
+        if hitl_request.amended_content:
+            instructions = f"{instructions}\n\nAmendments from human review:\n{hitl_request.amended_content}"
+
+        task = Task(
+            task_id=task_db.id,
+            project_id=task_db.project_id,
+            agent_type=task_db.agent_type,
+            instructions=instructions,
+            context_ids=task_db.context_ids or []
+        )
+        try:
+            return self.submit_task(task, interactive=True)
+        except Exception as e:
+            logger.error("Failed to submit task resumed after HITL",
+                        task_id=task_db.id,
+                        error=str(e))
+            return None
@@ -0,0 +1,233 @@
+"""Token counting for budgets and cost tracking.
+
+Counts come from the model's own BPE encoding through tiktoken when it is
+available. Without tiktoken, or when an encoding cannot be loaded (for
+example offline with no cached encoding files), an approximate offline
+tokenizer is used instead. It splits text with the same pre-tokenization
+rules GPT encodings use and estimates tokens per piece.
+
+Counts are memoized in a bounded LRU keyed by a hash of the text, so the
+system prompt and context artifacts that every request repeats are
+tokenized once.
+"""
+
+import hashlib
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import structlog
+
+from app.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the installed extras
+    tiktoken = None
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Encoding used by each model family; the longest matching prefix wins
+MODEL_ENCODINGS = {
+    "gpt-4o": "o200k_base",
+    "gpt-4": "cl100k_base",
+    "gpt-3.5-turbo": "cl100k_base",
+}
+
+
+class Tokenizer(ABC):
+    """Counts the tokens a model would see for a piece of text."""
+
+    name: str
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Count tokens in a single text."""
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        """Count tokens in several texts."""
+        return [self.count(text) for text in texts]
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts from a tiktoken BPE encoding."""
+
+    def __init__(self, encoding_name: str):
+        self.name = encoding_name
+        self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode_ordinary(text))
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        return [len(tokens) for tokens in self._encoding.encode_ordinary_batch(list(texts))]
+
+
+class ApproximateTokenizer(Tokenizer):
+    """
+    Offline estimate based on GPT-style pre-tokenization.
+
+    Text is split the way BPE encodings split it before merging: words with
+    their leading space, short digit groups, punctuation runs and whitespace.
+    Common short words are a single token; longer words, punctuation runs and
+    whitespace are charged by length.
+    """
+
+    name = "approximate"
+
+    PIECES = re.compile(
+        r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+",
+        re.UNICODE
+    )
+
+    def count(self, text: str) -> int:
+        total = 0
+        for piece in self.PIECES.findall(text):
+            stripped = piece.strip()
+            if not stripped:
+                # Runs of spaces and newlines merge into few tokens
+                total += 1 + len(piece) // 8
+            elif stripped[0].isalpha():
+                total += 1 + max(len(stripped) - 6, 0) // 4
+                if not stripped.isascii():
+                    total += len(stripped) // 2
+            elif stripped[0].isdigit() or stripped[0] == "'":
+                total += 1
+            else:
+                total += (len(stripped) + 1) // 2
+        return total
+
+
+class TokenCounter:
+    """
+    Model-aware token counting with an LRU memo.
+
+    Tokenizers are created lazily per encoding and can be overridden for a
+    model prefix with `register`.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, use_tiktoken: Optional[bool] = None):
+        self.max_entries = (max_entries if max_entries is not None
+                            else settings.llm_token_count_cache_size)
+        self.use_tiktoken = (use_tiktoken if use_tiktoken is not None
+                             else settings.llm_tokenizer_use_tiktoken) and tiktoken is not None
+
+        self._memo: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tokenizers: Dict[str, Tokenizer] = {}
+        self._overrides: Dict[str, Tokenizer] = {}
+        self._approximate = ApproximateTokenizer()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, model_prefix: str, tokenizer: Tokenizer) -> None:
+        """Use a specific tokenizer for models starting with a prefix."""
+        self._overrides[model_prefix] = tokenizer
+
+    def tokenizer_for(self, model: Optional[str] = None) -> Tokenizer:
+        """Get the tokenizer for a model."""
+        model = model or DEFAULT_MODEL
+
+        override = self._match_prefix(self._overrides, model)
+        if override is not None:
+            return override
+
+        encoding_name = self._match_prefix(MODEL_ENCODINGS, model)
+        if encoding_name is None or not self.use_tiktoken:
+            return self._approximate
+
+        tokenizer = self._tokenizers.get(encoding_name)
+        if tokenizer is None:
+            try:
+                tokenizer = TiktokenTokenizer(encoding_name)
+            except Exception as e:
+                logger.warning("Tokenizer encoding unavailable, using approximate counts",
+                              encoding=encoding_name,
+                              error=str(e))
+                tokenizer = self._approximate
+            self._tokenizers[encoding_name] = tokenizer
+        return tokenizer
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Count tokens in a text for a model."""
+        return self.count_many([text], model)[0]
+
+    def count_many(self, texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+        """
+        Count tokens in several texts, tokenizing only the ones not memoized.
+
+        Args:
+            texts: Texts to count, e.g. the parts of a context message
+            model: Model whose encoding should be used
+
+        Returns:
+            Token count per text, in order
+        """
+        tokenizer = self.tokenizer_for(model)
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[Tuple[str, bytes], List[int]] = {}
+
+        with self._lock:
+            for index, text in enumerate(texts):
+                if not text:
+                    counts[index] = 0
+                    continue
+                key = (tokenizer.name, self._digest(text))
+                cached = self._memo.get(key)
+                if cached is not None:
+                    self._memo.move_to_end(key)
+                    counts[index] = cached
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(index)
+                    self.misses += 1
+
+        if missing:
+            keys = list(missing)
+            fresh = tokenizer.count_many([texts[missing[key][0]] for key in keys])
+
+            with self._lock:
+                for key, count in zip(keys, fresh):
+                    for index in missing[key]:
+                        counts[index] = count
+                    self._memo[key] = count
+                while len(self._memo) > self.max_entries:
+                    self._memo.popitem(last=False)
+
+        return counts
+
+    def count_total(self, texts: Sequence[str], model: Optional[str] = None) -> int:
+        """Total tokens across several texts."""
+        return sum(self.count_many(texts, model))
+
+    def clear(self) -> None:
+        """Drop memoized counts."""
+        with self._lock:
+            self._memo.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get memo counters."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._memo)}
+
+    @staticmethod
+    def _digest(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    @staticmethod
+    def _match_prefix(table: Dict[str, object], model: str):
+        matches = [prefix for prefix in table if model.startswith(prefix)]
+        return table[max(matches, key=len)] if matches else None
+
+
+# Global token counter instance
+token_counter = TokenCounter()
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens in a text using the shared counter."""
+    return token_counter.count(text, model)
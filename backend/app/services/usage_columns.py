@@ -0,0 +1,286 @@
+"""Columnar ring buffer of LLM request metrics.
+
+Each UsageMetrics field is stored in a preallocated NumPy array. Agent,
+provider, model, error type and project are interned to integer codes.
+Window selection, group-by aggregation and percentiles therefore run as
+array operations instead of Python loops over metric objects. Each time the
+ring wraps, the intern tables are rebuilt from the codes still stored, so
+memory stays bounded by the buffer capacity in long-lived processes.
+"""
+
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.services.llm_monitoring import UsageMetrics
+    from app.services.llm_usage_store import UsageRollup
+
+NO_CODE = -1
+
+# Rollup counter -> column summed into it
+ROLLUP_COLUMNS = {
+    "tokens_used": "tokens_used",
+    "input_tokens": "input_tokens",
+    "output_tokens": "output_tokens",
+    "retry_count": "retry_count",
+    "total_cost": "estimated_cost",
+    "total_response_time_ms": "response_time_ms",
+    "total_queued_time_ms": "queued_time_ms",
+}
+
+
+def _epoch(timestamp: datetime) -> float:
+    """Seconds since the epoch, treating naive datetimes as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class UsageColumns:
+    """
+    Fixed-capacity, column-per-field store of recent requests.
+
+    Iterating yields UsageMetrics oldest first, so callers that need whole
+    records still get them; analytics should use `select` and the column
+    arrays directly.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+
+        self.timestamp = np.zeros(capacity, dtype=np.float64)
+        self.agent = np.zeros(capacity, dtype=np.int32)
+        self.provider = np.zeros(capacity, dtype=np.int32)
+        self.model = np.zeros(capacity, dtype=np.int32)
+        self.error = np.full(capacity, NO_CODE, dtype=np.int32)
+        self.project = np.full(capacity, NO_CODE, dtype=np.int32)
+        self.tokens_used = np.zeros(capacity, dtype=np.int64)
+        self.input_tokens = np.zeros(capacity, dtype=np.int64)
+        self.output_tokens = np.zeros(capacity, dtype=np.int64)
+        self.retry_count = np.zeros(capacity, dtype=np.int32)
+        self.response_time_ms = np.zeros(capacity, dtype=np.float64)
+        self.queued_time_ms = np.zeros(capacity, dtype=np.float64)
+        self.estimated_cost = np.zeros(capacity, dtype=np.float64)
+        self.success = np.zeros(capacity, dtype=np.bool_)
+        self.cache_hit = np.zeros(capacity, dtype=np.bool_)
+        self.task_ids: List[Optional[UUID]] = [None] * capacity
+
+        self._names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._projects: List[UUID] = []
+        self._project_codes: Dict[UUID, int] = {}
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator["UsageMetrics"]:
+        for index in self.order():
+            yield self.metrics_at(int(index))
+
+    def append(self, metrics: "UsageMetrics") -> None:
+        """Store a request, overwriting the oldest once the buffer is full."""
+        i = self._next
+
+        self.timestamp[i] = _epoch(metrics.timestamp)
+        self.agent[i] = self.code(metrics.agent_type)
+        self.provider[i] = self.code(metrics.provider)
+        self.model[i] = self.code(metrics.model)
+        self.error[i] = NO_CODE if metrics.success else self.code(metrics.error_type or "unknown")
+        self.project[i] = self.project_code(metrics.project_id)
+        self.tokens_used[i] = metrics.tokens_used
+        self.input_tokens[i] = metrics.input_tokens
+        self.output_tokens[i] = metrics.output_tokens
+        self.retry_count[i] = metrics.retry_count
+        self.response_time_ms[i] = metrics.response_time_ms
+        self.queued_time_ms[i] = metrics.queued_time_ms
+        self.estimated_cost[i] = metrics.estimated_cost
+        self.success[i] = metrics.success
+        self.cache_hit[i] = metrics.cache_hit
+        self.task_ids[i] = metrics.task_id
+
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        if self._next == 0:
+            self._compact()
+
+    def clear(self) -> None:
+        """Forget every stored request and interned name."""
+        self.__init__(self.capacity)
+
+    def code(self, name: str) -> int:
+        """Intern a name, returning its integer code."""
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    def project_code(self, project_id: Optional[UUID]) -> int:
+        """Intern a project ID, returning its integer code."""
+        if project_id is None:
+            return NO_CODE
+        code = self._project_codes.get(project_id)
+        if code is None:
+            code = self._project_codes[project_id] = len(self._projects)
+            self._projects.append(project_id)
+        return code
+
+    def _compact(self) -> None:
+        """Drop interned names and projects no stored row refers to, renumbering the rest."""
+        names = np.unique(np.concatenate((self.agent, self.provider, self.model, self.error)))
+        names = names[names != NO_CODE]
+        remap = np.full(len(self._names), NO_CODE, dtype=np.int32)
+        remap[names] = np.arange(len(names), dtype=np.int32)
+        for column in (self.agent, self.provider, self.model):
+            column[:] = remap[column]
+        errors = self.error != NO_CODE
+        self.error[errors] = remap[self.error[errors]]
+        self._names = [self._names[code] for code in names.tolist()]
+        self._codes = {name: code for code, name in enumerate(self._names)}
+
+        projects = np.unique(self.project)
+        projects = projects[projects != NO_CODE]
+        remap = np.full(len(self._projects), NO_CODE, dtype=np.int32)
+        remap[projects] = np.arange(len(projects), dtype=np.int32)
+        known = self.project != NO_CODE
+        self.project[known] = remap[self.project[known]]
+        self._projects = [self._projects[code] for code in projects.tolist()]
+        self._project_codes = {project_id: code for code, project_id in enumerate(self._projects)}
+
+    def name(self, code: int) -> Optional[str]:
+        """Name for an interned code."""
+        return None if code == NO_CODE else self._names[code]
+
+    def order(self) -> np.ndarray:
+        """Row indices from oldest to newest."""
+        if self._size < self.capacity:
+            return np.arange(self._size)
+        return np.roll(np.arange(self.capacity), -self._next)
+
+    def select(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        project_id: Optional[UUID] = None
+    ) -> np.ndarray:
+        """Row indices, oldest first, of requests matching a window and project."""
+        rows = self.order()
+        mask = np.ones(len(rows), dtype=np.bool_)
+
+        if start is not None:
+            mask &= self.timestamp[rows] >= _epoch(start)
+        if end is not None:
+            mask &= self.timestamp[rows] <= _epoch(end)
+        if project_id is not None:
+            code = self._project_codes.get(project_id)
+            if code is None:
+                return rows[:0]
+            mask &= self.project[rows] == code
+
+        return rows[mask]
+
+    def metrics_at(self, index: int) -> "UsageMetrics":
+        """Rebuild the UsageMetrics stored at a row."""
+        from app.services.llm_monitoring import UsageMetrics
+
+        project_code = int(self.project[index])
+        return UsageMetrics(
+            timestamp=datetime.fromtimestamp(float(self.timestamp[index]), tz=timezone.utc),
+            agent_type=self._names[self.agent[index]],
+            project_id=None if project_code == NO_CODE else self._projects[project_code],
+            task_id=self.task_ids[index],
+            provider=self._names[self.provider[index]],
+            model=self._names[self.model[index]],
+            tokens_used=int(self.tokens_used[index]),
+            input_tokens=int(self.input_tokens[index]),
+            output_tokens=int(self.output_tokens[index]),
+            response_time_ms=float(self.response_time_ms[index]),
+            queued_time_ms=float(self.queued_time_ms[index]),
+            estimated_cost=float(self.estimated_cost[index]),
+            success=bool(self.success[index]),
+            error_type=self.name(int(self.error[index])),
+            retry_count=int(self.retry_count[index]),
+            cache_hit=bool(self.cache_hit[index])
+        )
+
+    def rollups(self, rows: np.ndarray) -> List["UsageRollup"]:
+        """Group rows by agent, provider, model, error type and UTC hour of day."""
+        from app.services.llm_usage_store import UsageRollup
+
+        if not len(rows):
+            return []
+
+        hours = ((self.timestamp[rows] // 3600) % 24).astype(np.int32)
+        keys = np.column_stack((
+            self.agent[rows], self.provider[rows], self.model[rows], self.error[rows], hours
+        ))
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        size = len(groups)
+
+        request_count = np.bincount(inverse, minlength=size)
+        error_count = np.bincount(inverse, weights=(~self.success[rows]).astype(np.float64), minlength=size)
+        cache_hits = np.bincount(inverse, weights=self.cache_hit[rows].astype(np.float64), minlength=size)
+        sums = {
+            field: np.bincount(inverse, weights=getattr(self, column)[rows], minlength=size)
+            for field, column in ROLLUP_COLUMNS.items()
+        }
+
+        return [
+            UsageRollup(
+                agent_type=self._names[agent],
+                provider=self._names[provider],
+                model=self._names[model],
+                error_type=self.name(int(error)),
+                hour=int(hour),
+                request_count=int(request_count[g]),
+                error_count=int(error_count[g]),
+                cache_hits=int(cache_hits[g]),
+                tokens_used=int(sums["tokens_used"][g]),
+                input_tokens=int(sums["input_tokens"][g]),
+                output_tokens=int(sums["output_tokens"][g]),
+                retry_count=int(sums["retry_count"][g]),
+                total_cost=float(sums["total_cost"][g]),
+                total_response_time_ms=float(sums["total_response_time_ms"][g]),
+                total_queued_time_ms=float(sums["total_queued_time_ms"][g])
+            )
+            for g, (agent, provider, model, error, hour) in enumerate(groups.tolist())
+        ]
+
+    def percentiles(
+        self,
+        rows: np.ndarray,
+        column: str = "response_time_ms",
+        quantiles: Sequence[int] = (50, 95, 99)
+    ) -> Dict[str, float]:
+        """Percentiles of a column over the given rows, keyed "p50", "p95", ..."""
+        if not len(rows):
+            return {}
+        values = np.percentile(getattr(self, column)[rows], quantiles)
+        return {f"p{q}": float(value) for q, value in zip(quantiles, values)}
+
+    def percentiles_by_agent(
+        self,
+        rows: np.ndarray,
+        column: str = "response_time_ms",
+        quantiles: Sequence[int] = (50, 95, 99)
+    ) -> Dict[str, Dict[str, float]]:
+        """Percentiles of a column per agent over the given rows."""
+        if not len(rows):
+            return {}
+
+        agents = self.agent[rows]
+        values = getattr(self, column)[rows]
+        order = np.argsort(agents, kind="stable")
+        agent_codes, starts = np.unique(agents[order], return_index=True)
+
+        result = {}
+        for code, group in zip(agent_codes.tolist(), np.split(values[order], starts[1:])):
+            result[self._names[code]] = {
+                f"p{q}": float(value) for q, value in zip(quantiles, np.percentile(group, quantiles))
+            }
+        return result
@@ -6,7 +6,7 @@ execution, agent handoffs, state persistence, and recovery mechanisms.
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, List, Optional, Set, Union, Callable
 from datetime import datetime
 from uuid import UUID, uuid4
 import structlog
@@ -15,6 +15,7 @@ import json
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
+from app.config import settings
 from app.models.workflow import WorkflowDefinition, WorkflowStep, WorkflowExecutionState
 from app.models.workflow_state import (
     WorkflowExecutionStateModel,
@@ -33,6 +34,7 @@ from app.services.hitl_service import HitlService
 from app.services.workflow_execution_manager import WorkflowExecutionManager
 from app.services.workflow_step_processor import WorkflowStepProcessor
 from app.services.workflow_persistence_manager import WorkflowPersistenceManager
+from app.services.workflow_state_store import WorkflowStateStore
 from app.services.workflow_hitl_integrator import WorkflowHitlIntegrator
 # Lazy import to avoid circular dependency
 from app.websocket.manager import websocket_manager
@@ -41,6 +43,60 @@ from app.websocket.events import WebSocketEvent, EventType
 logger = structlog.get_logger(__name__)
 
 
+class WorkflowDependencyGraph:
+    """
+    Dependency graph of workflow steps built from their `requires`/`creates` fields.
+
+    A requirement is satisfied by the closest preceding step that creates it.
+    Steps that declare no resolvable requirements keep the sequential semantics
+    of the workflow definition and wait for every preceding step.
+    """
+
+    def __init__(self, dependencies: Dict[int, Set[int]]):
+        self.dependencies = dependencies
+
+    @classmethod
+    def from_workflow(cls, workflow: WorkflowDefinition) -> "WorkflowDependencyGraph":
+        """Build the dependency graph for a workflow definition."""
+        producers: Dict[str, int] = {}
+        dependencies: Dict[int, Set[int]] = {}
+
+        for index, step in enumerate(workflow.sequence):
+            required_items = step.requires if isinstance(step.requires, list) else [step.requires]
+            step_dependencies = {
+                producers[cls._normalize_artifact_name(item)]
+                for item in required_items
+                if isinstance(item, str) and cls._normalize_artifact_name(item) in producers
+            }
+
+            if not step_dependencies and index > 0:
+                # No resolvable requirements - behave as a barrier on prior steps
+                step_dependencies = set(range(index))
+
+            dependencies[index] = step_dependencies
+
+            if step.creates:
+                producers[cls._normalize_artifact_name(step.creates)] = index
+
+        return cls(dependencies)
+
+    @staticmethod
+    def _normalize_artifact_name(name: str) -> str:
+        """Strip annotations such as "(optional)" from artifact names."""
+        return name.split("(")[0].strip()
+
+    def get_dependencies(self, step_index: int) -> Set[int]:
+        """Get the step indices a step depends on."""
+        return self.dependencies.get(step_index, set())
+
+    def get_ready_steps(self, completed: Set[int], pending: Set[int]) -> List[int]:
+        """Get pending steps whose dependencies have all completed, in sequence order."""
+        return sorted(
+            index for index in pending
+            if self.get_dependencies(index) <= completed
+        )
+
+
 class WorkflowExecutionEngine:
     """
     Workflow execution engine with state machine pattern.
@@ -60,6 +116,7 @@ class WorkflowExecutionEngine:
         self.context_store = ContextStoreService(db)
         self.autogen_service = AutoGenService()
         self.hitl_service = HitlService(db)
+        self.state_store = WorkflowStateStore(db)
 
         # Execution state cache
         self._active_executions: Dict[str, WorkflowExecutionStateModel] = {}
@@ -274,8 +331,8 @@ class WorkflowExecutionEngine:
                     "hitl_request_id": str(hitl_request.request_id)
                 }
 
-            # Check if workflow is complete
-            if execution.get_next_pending_step() is None:
+            # Check if workflow is complete (steps may still be running concurrently)
+            if execution.get_next_pending_step() is None and not execution.get_running_steps():
                 execution.mark_completed()
                 self._persist_execution_state(execution)
 
@@ -350,14 +407,16 @@ class WorkflowExecutionEngine:
                    execution_id=execution_id,
                    step_indices=step_indices)
 
-        # Create tasks for parallel execution
-        tasks = []
-        for step_index in step_indices:
-            task = asyncio.create_task(self.execute_workflow_step(execution_id, step_index))
-            tasks.append(task)
+        # Coalesce state writes from the concurrent steps
+        with self.state_store.batch(execution_id):
+            # Create tasks for parallel execution
+            tasks = []
+            for step_index in step_indices:
+                task = asyncio.create_task(self.execute_workflow_step(execution_id, step_index))
+                tasks.append(task)
 
-        # Wait for all tasks to complete
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Wait for all tasks to complete
+            results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # Process results
         success_count = 0
@@ -385,6 +444,95 @@ class WorkflowExecutionEngine:
             "step_results": step_results
         }
 
+    async def execute_workflow_dag(
+        self,
+        execution_id: str,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute all pending workflow steps following their dependency graph.
+
+        Every step whose `requires` have been created by completed steps is
+        launched immediately, up to `max_concurrency` steps at a time. Scheduling
+        stops launching new steps once a step fails or pauses for HITL, and
+        waits for in-flight steps to finish.
+
+        Args:
+            execution_id: ID of the workflow execution
+            max_concurrency: Maximum steps running at once (defaults to settings)
+
+        Returns:
+            Dictionary with DAG execution results
+        """
+        execution = self._get_execution_state(execution_id)
+        if not execution:
+            raise ValueError(f"Execution {execution_id} not found")
+
+        workflow = self.workflow_service.load_workflow(execution.workflow_id)
+        graph = WorkflowDependencyGraph.from_workflow(workflow)
+        concurrency_limit = max(1, max_concurrency or settings.workflow_max_parallel_steps)
+
+        completed = {step.step_index for step in execution.get_completed_steps()}
+        pending = {step.step_index for step in execution.get_pending_steps()}
+        in_flight: Dict[asyncio.Task, int] = {}
+        step_results: Dict[int, Dict[str, Any]] = {}
+        halt_reason: Optional[str] = None
+
+        logger.info("Executing workflow dependency graph",
+                   execution_id=execution_id,
+                   pending_steps=len(pending),
+                   max_concurrency=concurrency_limit)
+
+        # Coalesce state writes from the concurrent steps
+        with self.state_store.batch(execution_id):
+            while True:
+                if halt_reason is None and not execution.is_complete():
+                    for step_index in graph.get_ready_steps(completed, pending):
+                        if len(in_flight) >= concurrency_limit:
+                            break
+                        pending.discard(step_index)
+                        task = asyncio.create_task(self.execute_workflow_step(execution_id, step_index))
+                        in_flight[task] = step_index
+
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(in_flight.keys(), return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    step_index = in_flight.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        step_results[step_index] = {"status": "failed", "error": str(e)}
+                        halt_reason = halt_reason or "failed"
+                        continue
+
+                    step_results[step_index] = result
+                    if result.get("status") == "paused_for_hitl":
+                        halt_reason = halt_reason or "paused_for_hitl"
+                    elif result.get("status") in ("completed", "skipped"):
+                        completed.add(step_index)
+
+        if halt_reason:
+            status = halt_reason
+        elif execution.is_complete():
+            status = execution.status.value
+        else:
+            status = "incomplete"
+
+        logger.info("Workflow dependency graph execution finished",
+                   execution_id=execution_id,
+                   status=status,
+                   executed_steps=len(step_results))
+
+        return {
+            "status": status,
+            "executed_steps": len(step_results),
+            "remaining_steps": len(pending),
+            "step_results": step_results
+        }
+
     async def pause_workflow_execution(self, execution_id: str, reason: str) -> bool:
         """
         Pause a workflow execution.
@@ -628,54 +776,8 @@ class WorkflowExecutionEngine:
         return self.recover_workflow_execution(execution_id)
 
     def _persist_execution_state(self, execution: WorkflowExecutionStateModel) -> None:
-        """Persist execution state to database."""
-        try:
-            # Convert to database format
-            steps_data = [step.model_dump() for step in execution.steps]
-
-            # Find existing record or create new
-            db_state = self.db.query(WorkflowStateDB).filter(
-                WorkflowStateDB.execution_id == execution.execution_id
-            ).first()
-
-            if db_state:
-                # Update existing
-                db_state.status = execution.status.value
-                db_state.current_step = execution.current_step
-                db_state.total_steps = execution.total_steps
-                db_state.steps_data = steps_data
-                db_state.context_data = execution.context_data
-                db_state.created_artifacts = execution.created_artifacts
-                db_state.error_message = execution.error_message
-                db_state.started_at = datetime.fromisoformat(execution.started_at) if execution.started_at else None
-                db_state.completed_at = datetime.fromisoformat(execution.completed_at) if execution.completed_at else None
-                db_state.updated_at = datetime.utcnow()
-            else:
-                # Create new
-                db_state = WorkflowStateDB(
-                    project_id=UUID(execution.project_id),
-                    workflow_id=execution.workflow_id,
-                    execution_id=execution.execution_id,
-                    status=execution.status.value,
-                    current_step=execution.current_step,
-                    total_steps=execution.total_steps,
-                    steps_data=steps_data,
-                    context_data=execution.context_data,
-                    created_artifacts=execution.created_artifacts,
-                    error_message=execution.error_message,
-                    started_at=datetime.fromisoformat(execution.started_at) if execution.started_at else None,
-                    completed_at=datetime.fromisoformat(execution.completed_at) if execution.completed_at else None
-                )
-                self.db.add(db_state)
-
-            self.db.commit()
-
-        except Exception as e:
-            logger.error("Failed to persist execution state",
-                        execution_id=execution.execution_id,
-                        error=str(e))
-            self.db.rollback()
-            raise
+        """Persist execution state, coalesced while steps run in a batch."""
+        self.state_store.save(execution)
 
     def _evaluate_condition(self, condition: str, context_data: Dict[str, Any]) -> bool:
         """Evaluate a conditional expression against context data."""
@@ -817,7 +919,7 @@ class WorkflowExecutionEngine:
                 }
             )
 
-            # Note: In a real implementation, this would emit to WebSocket clients
+            await websocket_manager.broadcast_event(event)
             logger.debug("Workflow event emitted",
                         event_type=event_type.value,
                         project_id=project_id,
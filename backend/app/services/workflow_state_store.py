@@ -0,0 +1,289 @@
+"""
+Workflow State Store
+
+Write-behind persistence of workflow execution state. A workflow step used to
+rewrite the whole `workflow_states` row, including the steps_data and
+context_data JSON blobs, four or five times. The store coalesces those
+transitions per execution and writes only the columns that changed since the
+last flush.
+"""
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import structlog
+
+from app.config import settings
+from app.models.workflow_state import WorkflowExecutionStateModel, WorkflowExecutionState as ExecutionStateEnum
+from app.database.models import WorkflowStateDB
+
+logger = structlog.get_logger(__name__)
+
+# Transitions that are written through immediately instead of being coalesced
+CRITICAL_STATUSES = {
+    ExecutionStateEnum.COMPLETED,
+    ExecutionStateEnum.FAILED,
+    ExecutionStateEnum.PAUSED,
+    ExecutionStateEnum.CANCELLED,
+}
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def _encode(value: Any) -> str:
+    """Stable JSON encoding used to detect changed values."""
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _to_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class WorkflowStateStore:
+    """
+    Coalescing, diff-based writer for workflow execution state.
+
+    Outside of a `batch()` every save is written immediately. Inside a batch,
+    saves only mark the execution dirty; it is flushed once the flush interval
+    has elapsed, on a critical transition (completed, failed, paused,
+    cancelled), and when the batch ends.
+
+    Each flush compares the execution with the snapshot from the previous
+    flush and updates only the changed columns. steps_data is rewritten only if
+    a step entry changed, and context_data only if the context changed. An
+    execution the store has not written yet is inserted with an UPSERT on
+    execution_id.
+    """
+
+    def __init__(self, db: Session, flush_interval: Optional[float] = None):
+        self.db = db
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else settings.workflow_state_flush_interval_ms / 1000
+        )
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Dict[str, WorkflowExecutionStateModel] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._batches: Dict[str, int] = {}
+
+    @contextmanager
+    def batch(self, execution_id: str) -> Iterator[None]:
+        """Coalesce saves for an execution until the block exits."""
+        self._batches[execution_id] = self._batches.get(execution_id, 0) + 1
+        try:
+            yield
+        finally:
+            self._batches[execution_id] -= 1
+            if not self._batches[execution_id]:
+                del self._batches[execution_id]
+                self.flush(execution_id)
+
+    def save(self, execution: WorkflowExecutionStateModel, immediate: bool = False) -> None:
+        """
+        Record the current state of an execution.
+
+        Args:
+            execution: Execution state to persist
+            immediate: Write now even inside a batch
+        """
+        execution_id = execution.execution_id
+        self._dirty[execution_id] = execution
+
+        if (immediate
+                or execution_id not in self._batches
+                or execution_id not in self._snapshots
+                or execution.status in CRITICAL_STATUSES
+                or time.monotonic() - self._last_flush.get(execution_id, 0.0) >= self.flush_interval):
+            self.flush(execution_id)
+        else:
+            self._schedule_flush(execution_id)
+
+    def flush(self, execution_id: str) -> bool:
+        """
+        Write an execution's pending state, if any.
+
+        Returns:
+            True if a write was issued
+        """
+        timer = self._timers.pop(execution_id, None)
+        if timer is not None:
+            timer.cancel()
+
+        execution = self._dirty.pop(execution_id, None)
+        if execution is None:
+            return False
+
+        snapshot = self._snapshot(execution)
+        previous = self._snapshots.get(execution_id)
+
+        try:
+            if previous is None:
+                self._upsert(execution, snapshot)
+                changed_steps = len(snapshot["steps"])
+            else:
+                values = self._changed_values(execution, snapshot, previous)
+                changed_steps = sum(
+                    1 for index, step in enumerate(snapshot["steps"])
+                    if index >= len(previous["steps"]) or previous["steps"][index] != step
+                )
+                if not values:
+                    self._last_flush[execution_id] = time.monotonic()
+                    return False
+                values["updated_at"] = datetime.utcnow()
+                self.db.execute(
+                    update(WorkflowStateDB)
+                    .where(WorkflowStateDB.execution_id == execution_id)
+                    .values(**values)
+                )
+            self.db.commit()
+
+        except Exception as e:
+            logger.error("Failed to persist execution state",
+                        execution_id=execution_id,
+                        error=str(e))
+            self.db.rollback()
+            self._dirty.setdefault(execution_id, execution)
+            raise
+
+        self._snapshots[execution_id] = snapshot
+        self._last_flush[execution_id] = time.monotonic()
+
+        if execution.is_complete():
+            self._forget(execution_id)
+
+        logger.debug("Workflow execution state flushed",
+                    execution_id=execution_id,
+                    status=execution.status.value,
+                    changed_steps=changed_steps)
+        return True
+
+    def flush_all(self) -> None:
+        """Write every execution with pending state."""
+        for execution_id in list(self._dirty):
+            self.flush(execution_id)
+
+    def _schedule_flush(self, execution_id: str) -> None:
+        """Flush after the interval even if no further saves arrive."""
+        if execution_id in self._timers:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        elapsed = time.monotonic() - self._last_flush.get(execution_id, 0.0)
+        delay = max(self.flush_interval - elapsed, 0.0)
+        self._timers[execution_id] = loop.call_later(delay, self._flush_due, execution_id)
+
+    def _flush_due(self, execution_id: str) -> None:
+        self._timers.pop(execution_id, None)
+        try:
+            self.flush(execution_id)
+        except Exception:
+            # Already logged; the state stays dirty for the next flush
+            pass
+
+    def _forget(self, execution_id: str) -> None:
+        """Drop tracking for an execution that reached a terminal state."""
+        self._snapshots.pop(execution_id, None)
+        self._last_flush.pop(execution_id, None)
+
+    @staticmethod
+    def _snapshot(execution: WorkflowExecutionStateModel) -> Dict[str, Any]:
+        """Capture the persisted columns of an execution in comparable form."""
+        return {
+            "status": execution.status.value,
+            "current_step": execution.current_step,
+            "total_steps": execution.total_steps,
+            "steps": [_encode(step.model_dump()) for step in execution.steps],
+            "context_data": _encode(execution.context_data),
+            "created_artifacts": list(execution.created_artifacts),
+            "error_message": execution.error_message,
+            "started_at": execution.started_at,
+            "completed_at": execution.completed_at,
+        }
+
+    @staticmethod
+    def _changed_values(
+        execution: WorkflowExecutionStateModel,
+        snapshot: Dict[str, Any],
+        previous: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Column values that differ from the previously flushed snapshot."""
+        values: Dict[str, Any] = {}
+
+        for column in ("status", "current_step", "total_steps", "created_artifacts", "error_message"):
+            if snapshot[column] != previous[column]:
+                values[column] = snapshot[column]
+
+        for column in ("started_at", "completed_at"):
+            if snapshot[column] != previous[column]:
+                values[column] = _to_datetime(snapshot[column])
+
+        if snapshot["steps"] != previous["steps"]:
+            values["steps_data"] = [step.model_dump() for step in execution.steps]
+
+        if snapshot["context_data"] != previous["context_data"]:
+            values["context_data"] = execution.context_data
+
+        return values
+
+    def _upsert(self, execution: WorkflowExecutionStateModel, snapshot: Dict[str, Any]) -> None:
+        """Insert or fully overwrite the execution's row in one statement."""
+        values = {
+            "status": snapshot["status"],
+            "current_step": execution.current_step,
+            "total_steps": execution.total_steps,
+            "steps_data": [step.model_dump() for step in execution.steps],
+            "context_data": execution.context_data,
+            "created_artifacts": execution.created_artifacts,
+            "error_message": execution.error_message,
+            "started_at": _to_datetime(execution.started_at),
+            "completed_at": _to_datetime(execution.completed_at),
+            "updated_at": datetime.utcnow(),
+        }
+
+        insert = _UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if insert is None:
+            self._merge(execution, values)
+            return
+
+        statement = insert(WorkflowStateDB).values(
+            project_id=UUID(execution.project_id),
+            workflow_id=execution.workflow_id,
+            execution_id=execution.execution_id,
+            **values
+        )
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[WorkflowStateDB.execution_id],
+            set_=values
+        ))
+
+    def _merge(self, execution: WorkflowExecutionStateModel, values: Dict[str, Any]) -> None:
+        """Select-then-write fallback for dialects without ON CONFLICT."""
+        db_state = self.db.query(WorkflowStateDB).filter(
+            WorkflowStateDB.execution_id == execution.execution_id
+        ).first()
+
+        if db_state is None:
+            db_state = WorkflowStateDB(
+                project_id=UUID(execution.project_id),
+                workflow_id=execution.workflow_id,
+                execution_id=execution.execution_id
+            )
+            self.db.add(db_state)
+
+        for column, value in values.items():
+            setattr(db_state, column, value)
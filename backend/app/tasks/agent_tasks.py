@@ -1,26 +1,92 @@
 """Agent task processing with Celery."""
 
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Awaitable, Iterator, List, Optional, TypeVar
 from celery import current_task
+import hashlib
 import structlog
-import asyncio
-from uuid import UUID
+import threading
+from uuid import NAMESPACE_URL, UUID, uuid5
 
 from .celery_app import celery_app
+from .async_runner import async_runner
+from .routing import PriorityClass, priority_class
 from app.models.task import Task, TaskStatus
 from app.models.handoff import HandoffSchema
 from app.models.agent import AgentType
 from app.models.context import ContextArtifact
-from app.websocket.manager import websocket_manager
+from app.websocket.event_bus import event_publisher
 from app.websocket.events import WebSocketEvent, EventType
 from app.services.autogen_service import AutoGenService
 from app.services.context_store import ContextStoreService
+from app.services.llm_scheduler import RequestPriority, request_priority
 from app.database.connection import get_session
 from app.database.models import TaskDB
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
+# Idle AutoGen services kept warm between tasks; tasks running concurrently on
+# the worker loop each lease their own, so agents never share a conversation
+_idle_autogen_services: List[AutoGenService] = []
+_autogen_services_lock = threading.Lock()
+
+
+@contextmanager
+def lease_autogen_service() -> Iterator[AutoGenService]:
+    """Borrow a warm AutoGen service for one task, creating one if none is idle.
+
+    Yields:
+        AutoGenService instance reserved for the caller until the block exits
+    """
+    with _autogen_services_lock:
+        service = _idle_autogen_services.pop() if _idle_autogen_services else None
+    if service is None:
+        service = AutoGenService()
+    try:
+        yield service
+    finally:
+        with _autogen_services_lock:
+            _idle_autogen_services.append(service)
+
+
+# LLM scheduler lane for the requests a task makes, per queue priority class
+SCHEDULER_LANES = {
+    PriorityClass.INTERACTIVE: RequestPriority.HITL_BLOCKING,
+    PriorityClass.NORMAL: RequestPriority.NORMAL,
+    PriorityClass.BULK: RequestPriority.BACKGROUND,
+}
+
+
+async def run_in_lane(awaitable: Awaitable[T], lane: RequestPriority) -> T:
+    """Await on the worker loop with LLM requests dispatched in the given scheduler lane."""
+    with request_priority(lane):
+        return await awaitable
+
+
+def execution_key(task_id: UUID, scope: Optional[str]) -> str:
+    """
+    Idempotency key for one submission of a task.
+
+    Celery keeps the task ID across `self.retry` and late-ack redelivery, so it
+    scopes the key; submitting the task again starts a fresh execution.
+
+    Args:
+        task_id: Database task ID
+        scope: Celery task ID of the submission
+
+    Returns:
+        Hex digest identifying the execution
+    """
+    return hashlib.blake2b(f"{task_id}:{scope or ''}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def output_artifact_id(key: str) -> UUID:
+    """Deterministic ID of the output artifact written for an execution key."""
+    return uuid5(NAMESPACE_URL, f"botarmy:agent_output:{key}")
+
 
 def validate_task_data(task_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -70,7 +136,8 @@ def validate_task_data(task_data: Dict[str, Any]) -> Dict[str, Any]:
         "context_ids": context_uuids,
         "from_agent": task_data.get("from_agent", "orchestrator"),
         "expected_outputs": task_data.get("expected_outputs", ["task_result"]),
-        "priority": task_data.get("priority", 1)
+        "priority": task_data.get("priority", 1),
+        "interactive": bool(task_data.get("interactive", False))
     }
 
 
@@ -93,6 +160,7 @@ def process_agent_task(self, task_data: Dict[str, Any]):
         from_agent = validated_data["from_agent"]
         expected_outputs = validated_data["expected_outputs"]
         priority = validated_data["priority"]
+        interactive = validated_data["interactive"]
     except ValueError as e:
         logger.error("Task data validation failed", error=str(e))
         raise
@@ -104,12 +172,26 @@ def process_agent_task(self, task_data: Dict[str, Any]):
 
     # Get database session using context manager for proper cleanup
     db = None
+    task_db = None
     try:
         db = next(get_session())
 
-        # Update task status to WORKING in database
+        # Retries and redeliveries of this submission share an execution key
+        key = execution_key(task_uuid, self.request.id)
         task_db = db.query(TaskDB).filter(TaskDB.id == task_uuid).first()
+        if task_db and task_db.execution_key == key and task_db.status == TaskStatus.COMPLETED:
+            logger.info("Task already completed for this submission, returning stored result",
+                        task_id=str(task_uuid))
+            return task_db.output
+
+        # Update task status to WORKING in database
+        checkpoint = None
         if task_db:
+            if task_db.execution_key == key:
+                checkpoint = task_db.checkpoint
+            else:
+                task_db.execution_key = key
+                task_db.checkpoint = None
             task_db.status = TaskStatus.WORKING
             task_db.started_at = datetime.now(timezone.utc)
             db.commit()
@@ -128,8 +210,8 @@ def process_agent_task(self, task_data: Dict[str, Any]):
             }
         )
 
-        # Send WebSocket event asynchronously
-        asyncio.run(websocket_manager.broadcast_event(event))
+        # Publish to the event bus; the API process relays it to WebSocket clients
+        event_publisher.publish(event)
         logger.info("Task started event broadcast", task_id=str(task_uuid))
 
         # Create Task object for agent processing
@@ -156,7 +238,6 @@ def process_agent_task(self, task_data: Dict[str, Any]):
         )
 
         # Initialize services
-        autogen_service = AutoGenService()
         context_store = ContextStoreService(db)
 
         # Get context artifacts
@@ -164,27 +245,50 @@ def process_agent_task(self, task_data: Dict[str, Any]):
         if task.context_ids:
             context_artifacts = context_store.get_artifacts_by_ids(task.context_ids)
 
-        # Execute task with real agent processing
-        logger.info("Executing task with AutoGen service", task_id=str(task_uuid))
-        result = asyncio.run(autogen_service.execute_task(task, handoff, context_artifacts))
+        if checkpoint:
+            # An earlier attempt already paid for the model call
+            logger.info("Resuming task from checkpointed agent result", task_id=str(task_uuid))
+            result = checkpoint
+        else:
+            # Execute task with real agent processing on the worker's event loop
+            logger.info("Executing task with AutoGen service", task_id=str(task_uuid))
+            lane = SCHEDULER_LANES[priority_class(priority, interactive)]
+            with lease_autogen_service() as autogen_service:
+                # Enforce the soft time limit here; the threads pool cannot interrupt a task
+                result = async_runner.run(
+                    run_in_lane(autogen_service.execute_task(task, handoff, context_artifacts), lane),
+                    timeout=celery_app.conf.task_soft_time_limit
+                )
+
+            # Checkpoint the result before post-processing so a retry resumes from here
+            if task_db and result.get("success", False):
+                task_db.checkpoint = result
+                db.commit()
 
         # Update task status based on result
         if result.get("success", False):
+            # Create output artifact; its ID is derived from the execution key so a retry
+            # finds the artifact an earlier attempt wrote instead of adding a duplicate.
+            # Look it up even without a checkpoint: tasks with no row are never checkpointed
+            artifact_id = output_artifact_id(key)
+            output_artifact = context_store.get_artifact(artifact_id)
+            if output_artifact is None:
+                output_artifact = context_store.create_artifact(
+                    project_id=project_uuid,
+                    source_agent=agent_type,
+                    artifact_type="agent_output",
+                    content=result,
+                    context_id=artifact_id
+                )
+
             # Update database task status to COMPLETED
             if task_db:
                 task_db.status = TaskStatus.COMPLETED
                 task_db.output = result
+                task_db.checkpoint = None
                 task_db.completed_at = datetime.now(timezone.utc)
                 db.commit()
 
-            # Create output artifact
-            output_artifact = context_store.create_artifact(
-                project_id=project_uuid,
-                source_agent=agent_type,
-                artifact_type="agent_output",
-                content=result
-            )
-
             # Emit task completed event
             event = WebSocketEvent(
                 event_type=EventType.TASK_COMPLETED,
@@ -199,7 +303,7 @@ def process_agent_task(self, task_data: Dict[str, Any]):
                 }
             )
 
-            asyncio.run(websocket_manager.broadcast_event(event))
+            event_publisher.publish(event)
             logger.info("Task completed successfully", task_id=str(task_uuid))
 
         else:
@@ -226,7 +330,7 @@ def process_agent_task(self, task_data: Dict[str, Any]):
                 }
             )
 
-            asyncio.run(websocket_manager.broadcast_event(event))
+            event_publisher.publish(event)
             logger.error("Task failed", task_id=str(task_uuid), error=error_message)
 
             # Re-raise exception to trigger Celery retry
@@ -240,8 +344,8 @@ def process_agent_task(self, task_data: Dict[str, Any]):
                     error=str(exc),
                     exc_info=True)
 
-        # Update database task status to FAILED
-        if db and task_db:
+        # Update database task status to FAILED, unless the failure came after completion
+        if db and task_db and task_db.status != TaskStatus.COMPLETED:
             task_db.status = TaskStatus.FAILED
             task_db.error_message = str(exc)
             task_db.completed_at = datetime.now(timezone.utc)
@@ -260,7 +364,7 @@ def process_agent_task(self, task_data: Dict[str, Any]):
             }
         )
 
-        asyncio.run(websocket_manager.broadcast_event(event))
+        event_publisher.publish(event)
 
         # Re-raise the exception to mark the task as failed in Celery
         raise self.retry(exc=exc, countdown=60, max_retries=3)
@@ -0,0 +1,178 @@
+"""Persistent event loop for running agent coroutines from Celery tasks.
+
+Celery tasks are synchronous. Calling `asyncio.run` in each task builds and
+tears down an event loop per task, which throws away every loop-bound
+resource: pooled model clients, keep-alive connections and the usage
+store's flush timer. The runner keeps one event loop per worker process on a
+background thread and runs task coroutines on it.
+
+With the threads pool (the default worker pool), several task threads hand
+coroutines to the same loop, so I/O-bound agent tasks overlap inside one
+process instead of each needing its own prefork child.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+import structlog
+from celery.signals import worker_process_shutdown, worker_shutdown
+
+from app.config import settings
+from app.services.audit_writer import audit_writer
+from app.services.llm_usage_store import llm_usage_store
+from app.services.model_client_pool import model_client_pool
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncTaskRunner:
+    """
+    Runs coroutines on a long-lived event loop owned by the worker process.
+
+    The loop thread starts on first use. `run` blocks the calling task thread
+    until its coroutine finishes; coroutines from different threads run
+    concurrently on the shared loop.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, shutdown_timeout: float = 10.0):
+        self.enabled = enabled if enabled is not None else settings.celery_async_runner_enabled
+        self.shutdown_timeout = shutdown_timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._active = 0
+        self.stats = {"completed": 0, "failed": 0, "cancelled": 0, "max_concurrent": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine to completion on the worker loop.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait before cancelling it; None waits indefinitely
+
+        Returns:
+            The coroutine's result
+
+        Raises:
+            Whatever the coroutine raises; TimeoutError if it overran `timeout`
+        """
+        if not self.enabled:
+            try:
+                return asyncio.run(coro)
+            finally:
+                # The event loop that would have flushed usage rollups and audit events has exited
+                llm_usage_store.flush_sync()
+                audit_writer.flush_sync()
+
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncTaskRunner.run cannot be called from the worker loop itself")
+
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        with self._lock:
+            self._active += 1
+            self.stats["max_concurrent"] = max(self.stats["max_concurrent"], self._active)
+        try:
+            result = future.result(timeout)
+            self.stats["completed"] += 1
+            return result
+        except FutureTimeoutError:
+            future.cancel()
+            self.stats["cancelled"] += 1
+            raise TimeoutError(f"Task coroutine did not finish within {timeout} seconds")
+        except BaseException:
+            # Celery time limits and worker shutdown interrupt the waiting thread, not the coroutine
+            if future.done():
+                self.stats["failed"] += 1
+            else:
+                future.cancel()
+                self.stats["cancelled"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def shutdown(self) -> None:
+        """Flush usage rollups and audit events, close pooled clients and stop the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None or not thread.is_alive():
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close_services(), loop).result(self.shutdown_timeout)
+        except Exception as e:
+            logger.warning("Failed to close worker services cleanly", error=str(e))
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(self.shutdown_timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.info("Worker event loop stopped", **self.stats)
+
+    def reset(self) -> None:
+        """Forget the loop without stopping it; the loop thread does not survive a fork."""
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get runner counters and current occupancy."""
+        return {**self.stats, "running": self.running, "active": self._active}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or not self.running:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+                thread = threading.Thread(
+                    target=self._run_loop, args=(loop, started), name="agent-task-loop", daemon=True
+                )
+                thread.start()
+                started.wait()
+                self._loop, self._thread = loop, thread
+                logger.info("Worker event loop started", pid=os.getpid())
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, started: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_forever()
+
+
+async def _close_services() -> None:
+    await llm_usage_store.flush()
+    await audit_writer.flush()
+    await model_client_pool.close()
+
+
+# Event loop shared by every agent task in this worker process
+async_runner = AsyncTaskRunner()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=async_runner.reset)
+
+
+@worker_process_shutdown.connect
+def _stop_process_loop(**kwargs) -> None:
+    async_runner.shutdown()
+
+
+@worker_shutdown.connect
+def _stop_worker_loop(**kwargs) -> None:
+    async_runner.shutdown()
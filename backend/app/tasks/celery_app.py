@@ -2,6 +2,9 @@
 
 from celery import Celery
 from app.config import settings
+from app.tasks.routing import (
+    BROKER_PRIORITY_STEPS, DEFAULT_AGENT_QUEUE, PRIORITY_KEY_SEPARATOR, agent_task_queues, route_agent_task
+)
 
 # Create Celery instance
 celery_app = Celery(
@@ -24,9 +27,17 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     task_acks_late=True,
     worker_disable_rate_limits=True,
+    # Agent tasks are I/O-bound; threads share the process's persistent event loop
+    worker_pool=settings.celery_worker_pool,
+    worker_concurrency=settings.celery_worker_concurrency,
 )
 
-# Task routing
-celery_app.conf.task_routes = {
-    "app.tasks.agent_tasks.*": {"queue": "agent_tasks"},
+# Task routing: one queue per agent type and priority class, consumed interactive first
+celery_app.conf.task_queues = agent_task_queues()
+celery_app.conf.task_default_queue = DEFAULT_AGENT_QUEUE
+celery_app.conf.task_routes = (route_agent_task,)
+celery_app.conf.broker_transport_options = {
+    "priority_steps": BROKER_PRIORITY_STEPS,
+    "sep": PRIORITY_KEY_SEPARATOR,
+    "queue_order_strategy": "priority",
 }
@@ -0,0 +1,173 @@
+"""Priority-aware routing for agent tasks.
+
+Every agent task used to share one FIFO queue, so a long deployer task or a
+backlog of bulk work held up a quick analyst step queued behind it. Tasks are
+now routed to a queue per agent type and priority class:
+
+    agent_tasks.<agent_type>.<priority_class>
+
+Priority classes are `interactive` (a person is waiting, e.g. work resumed
+from a HITL response), `normal` and `bulk`. Workers consume the interactive
+queues first, then normal, then bulk. Within a queue, messages carry a broker
+priority derived from `HandoffSchema.priority` (1 = highest); with the Redis
+transport broker priority 0 is served first.
+"""
+
+import math
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from kombu import Queue
+
+from app.config import settings
+from app.models.agent import AgentType
+
+AGENT_TASK_PREFIX = "app.tasks.agent_tasks."
+DEFAULT_AGENT_QUEUE = "agent_tasks"
+
+# Broker priority levels; Redis keeps one list per level and serves 0 first
+BROKER_PRIORITY_STEPS = list(range(10))
+PRIORITY_KEY_SEPARATOR = ":"
+
+
+class PriorityClass(str, Enum):
+    """Queue class for an agent task, in the order workers consume them."""
+    INTERACTIVE = "interactive"
+    NORMAL = "normal"
+    BULK = "bulk"
+
+
+def priority_class(priority: int, interactive: bool = False) -> PriorityClass:
+    """Queue class for a handoff priority (1 = highest)."""
+    if interactive:
+        return PriorityClass.INTERACTIVE
+    if priority <= settings.celery_normal_priority_max:
+        return PriorityClass.NORMAL
+    return PriorityClass.BULK
+
+
+def broker_priority(priority: int, interactive: bool = False) -> int:
+    """
+    Broker priority for a handoff priority.
+
+    Interactive tasks get 0; other tasks map handoff priority 1..9 onto
+    broker priority 1..9, so nothing queued normally outranks interactive work.
+    """
+    if interactive:
+        return 0
+    return min(max(int(priority), 1), BROKER_PRIORITY_STEPS[-1])
+
+
+def agent_queue_name(agent_type: str, klass: PriorityClass) -> str:
+    return f"{DEFAULT_AGENT_QUEUE}.{agent_type}.{klass.value}"
+
+
+def agent_task_queues() -> List[Queue]:
+    """Queues workers consume, interactive queues first."""
+    queues = [
+        Queue(agent_queue_name(agent_type.value, klass), routing_key=agent_queue_name(agent_type.value, klass))
+        for klass in PriorityClass
+        for agent_type in AgentType
+    ]
+    # Tasks submitted before per-type routing, or for unknown agent types
+    queues.append(Queue(DEFAULT_AGENT_QUEUE, routing_key=DEFAULT_AGENT_QUEUE))
+    return queues
+
+
+def route_agent_task(name: str, args: Any, kwargs: Any, options: Dict[str, Any],
+                     task: Any = None, **kw) -> Optional[Dict[str, Any]]:
+    """
+    Celery router placing agent tasks on their agent-type and priority-class queue.
+
+    Reads `agent_type`, `priority` and `interactive` from the task data
+    passed as the first positional argument.
+    """
+    if not name.startswith(AGENT_TASK_PREFIX):
+        return None
+
+    task_data = (args[0] if args else None) or (kwargs or {}).get("task_data") or {}
+    if not isinstance(task_data, dict):
+        return {"queue": DEFAULT_AGENT_QUEUE}
+
+    try:
+        priority = int(task_data.get("priority", 1))
+    except (TypeError, ValueError):
+        priority = 1
+    interactive = bool(task_data.get("interactive", False))
+
+    agent_type = task_data.get("agent_type")
+    if agent_type not in {member.value for member in AgentType}:
+        queue = DEFAULT_AGENT_QUEUE
+    else:
+        queue = agent_queue_name(agent_type, priority_class(priority, interactive))
+
+    return {"queue": queue, "routing_key": queue, "priority": broker_priority(priority, interactive)}
+
+
+def queue_depths(client, queues: Optional[List[Queue]] = None) -> Dict[str, int]:
+    """
+    Messages waiting in each agent queue, summed over broker priority levels.
+
+    Args:
+        client: Redis client connected to the Celery broker
+        queues: Queues to measure; defaults to every agent queue
+
+    Returns:
+        Queue name -> waiting messages
+    """
+    names = [queue.name for queue in (queues or agent_task_queues())]
+    pipe = client.pipeline(transaction=False)
+    for name in names:
+        pipe.llen(name)
+        for step in BROKER_PRIORITY_STEPS[1:]:
+            pipe.llen(f"{name}{PRIORITY_KEY_SEPARATOR}{step}")
+    counts = pipe.execute()
+
+    per_queue = len(BROKER_PRIORITY_STEPS)
+    return {name: sum(counts[i * per_queue:(i + 1) * per_queue]) for i, name in enumerate(names)}
+
+
+def autoscaling_hints(depths: Dict[str, int], concurrency: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Suggest worker capacity from queue depths.
+
+    Aims for `celery_autoscale_target_depth` waiting tasks per worker slot.
+
+    Args:
+        depths: Queue name -> waiting messages, from `queue_depths`
+        concurrency: Worker slots currently running; defaults to the configured concurrency
+
+    Returns:
+        Depths per priority class and agent type, desired slots and a scaling action
+    """
+    concurrency = concurrency or settings.celery_worker_concurrency
+    by_class = {klass.value: 0 for klass in PriorityClass}
+    by_agent: Dict[str, int] = {}
+    for name, depth in depths.items():
+        parts = name.split(".")
+        if len(parts) == 3:
+            by_agent[parts[1]] = by_agent.get(parts[1], 0) + depth
+            by_class[parts[2]] = by_class.get(parts[2], 0) + depth
+
+    total = sum(depths.values())
+    desired = max(1, math.ceil(total / max(settings.celery_autoscale_target_depth, 1)))
+
+    # Interactive work queued behind busy slots needs capacity now
+    if by_class[PriorityClass.INTERACTIVE.value] and total >= concurrency:
+        desired = max(desired, concurrency + 1)
+
+    if desired > concurrency:
+        action = "scale_up"
+    elif desired < concurrency // 2:
+        action = "scale_down"
+    else:
+        action = "steady"
+
+    return {
+        "total_depth": total,
+        "by_priority_class": by_class,
+        "by_agent_type": by_agent,
+        "queues": depths,
+        "current_concurrency": concurrency,
+        "desired_concurrency": desired,
+        "action": action,
+    }
@@ -0,0 +1,209 @@
+"""Coalescing and delta encoding for high-frequency WebSocket events.
+
+Busy projects emit bursts of small events: an agent moves through several
+statuses in a few milliseconds, and a workflow execution reports each step.
+Two mechanisms reduce what goes over the wire:
+
+- Coalescing: superseding events (agent status changes) are held for a
+  short window per (project, entity). A newer event for the same entity
+  replaces the pending one, so a burst goes out as its final state.
+- Delta encoding: events about the same entity are versioned. Clients that
+  connect with ``deltas=true`` receive a JSON patch (RFC 6902, on the
+  top-level ``data`` keys) against the previous version they received,
+  instead of the full payload.
+
+Clients may also ask for msgpack frames with ``encoding=msgpack``, sent as
+binary messages. Text frames are always JSON. permessage-deflate
+compression is negotiated by the server itself (see
+``WS_PER_MESSAGE_DEFLATE``).
+"""
+
+import asyncio
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import orjson
+import structlog
+
+from .events import EventType, WebSocketEvent
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the installed extras
+    msgpack = None
+
+logger = structlog.get_logger(__name__)
+
+# Events whose newer instance fully replaces an older one for the same entity
+SUPERSEDING_EVENTS = {EventType.AGENT_STATUS_CHANGE.value}
+
+# (project ID or None for global broadcasts, entity key)
+PendingKey = Tuple[Optional[str], str]
+
+
+class FrameEncoding(str, Enum):
+    """Wire format negotiated by a client."""
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+def negotiate_encoding(requested: Optional[str]) -> FrameEncoding:
+    """Wire format for a client request, falling back to JSON when unavailable."""
+    if requested == FrameEncoding.MSGPACK.value:
+        if msgpack is not None:
+            return FrameEncoding.MSGPACK
+        logger.warning("msgpack framing requested but msgpack is not installed; using JSON")
+    return FrameEncoding.JSON
+
+
+def entity_key(event: WebSocketEvent) -> Optional[str]:
+    """The entity an event describes, if later events about it can be coalesced or diffed."""
+    event_type = getattr(event.event_type, "value", event.event_type)
+    if event_type == EventType.AGENT_STATUS_CHANGE.value and event.agent_type:
+        return f"agent:{event.agent_type}"
+    if event_type == EventType.WORKFLOW_EVENT.value and event.data.get("execution_id"):
+        return f"workflow:{event.data['execution_id']}"
+    return None
+
+
+def _pointer(key: str) -> str:
+    return "/" + key.replace("~", "~0").replace("/", "~1")
+
+
+def diff_data(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """JSON patch operations turning `old` into `new`, at the top level of the dicts."""
+    ops: List[Dict[str, Any]] = [{"op": "remove", "path": _pointer(key)} for key in old if key not in new]
+    for key, value in new.items():
+        if key not in old:
+            ops.append({"op": "add", "path": _pointer(key), "value": value})
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": _pointer(key), "value": value})
+    return ops
+
+
+class EventFrame:
+    """
+    A broadcast event, serialized lazily and at most once per wire format and variant.
+
+    Every connection receiving the broadcast shares the same frame; the
+    writer for each connection picks the full or delta variant.
+    """
+
+    __slots__ = ("payload", "entity", "version", "base", "patch", "_encoded")
+
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        entity: Optional[str] = None,
+        version: int = 0,
+        base: Optional[int] = None,
+        patch: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.payload = payload
+        self.entity = entity
+        self.version = version
+        self.base = base
+        self.patch = patch
+        self._encoded: Dict[Tuple[FrameEncoding, bool], Union[str, bytes]] = {}
+
+    def encode(self, encoding: FrameEncoding, delta: bool = False) -> Union[str, bytes]:
+        """Text (JSON) or bytes (msgpack) for the full event or its delta."""
+        delta = delta and self.patch is not None
+        cache_key = (encoding, delta)
+        if cache_key not in self._encoded:
+            self._encoded[cache_key] = self._serialize(encoding, self._delta_payload() if delta else self.payload)
+        return self._encoded[cache_key]
+
+    def _delta_payload(self) -> Dict[str, Any]:
+        envelope = {key: value for key, value in self.payload.items() if key != "data"}
+        envelope["delta"] = {"base": self.base, "patch": self.patch}
+        return envelope
+
+    @staticmethod
+    def _serialize(encoding: FrameEncoding, body: Dict[str, Any]) -> Union[str, bytes]:
+        if encoding == FrameEncoding.MSGPACK:
+            return msgpack.packb(body, use_bin_type=True)
+        return orjson.dumps(body).decode("utf-8")
+
+
+class EventFramer:
+    """Builds frames, versioning events per entity and diffing them against the last version."""
+
+    def __init__(self, max_entities: int = 10000):
+        self.max_entities = max_entities
+        # Full entity key -> (version, data) of the last frame built for it
+        self._last: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+
+    def frame(self, event: WebSocketEvent, target: Optional[str] = None) -> EventFrame:
+        payload = event.model_dump(mode="json")
+        key = entity_key(event)
+        if key is None:
+            return EventFrame(payload)
+
+        entity = f"{target or event.project_id or '*'}:{key}"
+        previous = self._last.pop(entity, None)
+        version = previous[0] + 1 if previous else 1
+        self._last[entity] = (version, payload["data"])
+        while len(self._last) > self.max_entities:
+            self._last.popitem(last=False)
+
+        payload["entity"] = entity
+        payload["version"] = version
+        if previous is None:
+            return EventFrame(payload, entity, version)
+        return EventFrame(payload, entity, version, base=previous[0], patch=diff_data(previous[1], payload["data"]))
+
+
+class EventCoalescer:
+    """
+    Holds superseding events for a short window so a burst is sent as its final state.
+
+    Events that do not supersede earlier ones pass straight through, after
+    any pending events for the same target so per-project order is kept.
+    """
+
+    def __init__(self, sink: Callable[[WebSocketEvent, Optional[str]], None], window: float):
+        self.sink = sink
+        self.window = window
+        self._pending: "OrderedDict[PendingKey, WebSocketEvent]" = OrderedDict()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"submitted": 0, "coalesced": 0, "flushed": 0}
+
+    def submit(self, event: WebSocketEvent, target: Optional[str] = None) -> None:
+        """Send an event to `target` (a project ID, or None for everyone), coalescing it if possible."""
+        self.stats["submitted"] += 1
+        event_type = getattr(event.event_type, "value", event.event_type)
+        key = entity_key(event)
+        if self.window <= 0 or key is None or event_type not in SUPERSEDING_EVENTS:
+            self.flush(target)
+            self.sink(event, target)
+            return
+
+        pending_key = (target, key)
+        if pending_key in self._pending:
+            self.stats["coalesced"] += 1
+        # Assigning an existing key keeps its place, so the entity keeps its position in line
+        self._pending[pending_key] = event
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush_all)
+
+    def flush(self, target: Optional[str] = None) -> None:
+        """Send pending events for one target now."""
+        for pending_key in [k for k in self._pending if k[0] == target]:
+            self._send(pending_key)
+
+    def _flush_all(self) -> None:
+        self._timer = None
+        for pending_key in list(self._pending):
+            self._send(pending_key)
+
+    def _send(self, pending_key: PendingKey) -> None:
+        event = self._pending.pop(pending_key)
+        self.stats["flushed"] += 1
+        try:
+            self.sink(event, pending_key[0])
+        except Exception as e:
+            logger.error("Failed to send coalesced event", target=pending_key[0], error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self._pending)}
@@ -0,0 +1,216 @@
+"""Redis-backed event bus for delivering WebSocket events across processes.
+
+Celery workers hold no WebSocket connections, so events they emit are published
+to a Redis channel. Every API process runs a subscriber that relays those events
+to its own connected clients through the WebSocketManager.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+import structlog
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+from .events import WebSocketEvent
+from .manager import WebSocketManager, websocket_manager
+
+logger = structlog.get_logger(__name__)
+
+
+class EventBusPublisher:
+    """Publishes WebSocket events to the Redis event bus from any process."""
+
+    def __init__(self, redis_url: Optional[str] = None, channel: Optional[str] = None):
+        self.redis_url = redis_url or settings.redis_url
+        self.channel = channel or settings.event_bus_channel
+        self._client: Optional[redis.Redis] = None
+
+    def _get_client(self) -> redis.Redis:
+        """Get the Redis client, connecting lazily on first use."""
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url)
+        return self._client
+
+    def publish(self, event: WebSocketEvent) -> bool:
+        """
+        Publish a single event to the event bus.
+
+        Returns:
+            True if the event was handed to Redis, False otherwise
+        """
+        return self.publish_many([event]) == 1
+
+    def publish_many(self, events: List[WebSocketEvent]) -> int:
+        """
+        Publish several events in a single Redis round trip.
+
+        Returns:
+            Number of events published
+        """
+        if not events:
+            return 0
+
+        try:
+            pipeline = self._get_client().pipeline(transaction=False)
+            for event in events:
+                pipeline.publish(self.channel, event.model_dump_json())
+            pipeline.execute()
+            return len(events)
+
+        except redis.RedisError as e:
+            logger.warning("Failed to publish events to event bus",
+                          channel=self.channel,
+                          event_count=len(events),
+                          error=str(e))
+            return 0
+
+
+class EventBusSubscriber:
+    """
+    Relays events from the Redis event bus to local WebSocket clients.
+
+    Messages arriving within a short window are collected into a batch and
+    grouped by project. Projects are delivered concurrently while events for
+    the same project keep their publish order.
+    """
+
+    def __init__(
+        self,
+        manager: WebSocketManager,
+        redis_url: Optional[str] = None,
+        channel: Optional[str] = None,
+        batch_window_ms: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        reconnect_delay: float = 1.0
+    ):
+        self.manager = manager
+        self.redis_url = redis_url or settings.redis_url
+        self.channel = channel or settings.event_bus_channel
+        self.batch_window = (batch_window_ms if batch_window_ms is not None
+                             else settings.event_bus_batch_window_ms) / 1000
+        self.max_batch_size = max_batch_size or settings.event_bus_max_batch_size
+        self.reconnect_delay = reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    @property
+    def is_running(self) -> bool:
+        """Check whether the subscriber loop is active."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start relaying events in a background task."""
+        if self.is_running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("Event bus subscriber started", channel=self.channel)
+
+    async def stop(self) -> None:
+        """Stop relaying events and wait for the background task to exit."""
+        self._running = False
+
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        logger.info("Event bus subscriber stopped", channel=self.channel)
+
+    async def _run(self) -> None:
+        """Subscribe to the channel and relay batches, reconnecting on failure."""
+        while self._running:
+            client = aioredis.from_url(self.redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+
+                while self._running:
+                    batch = await self._read_batch(pubsub)
+                    if batch:
+                        await self.dispatch_batch(batch)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logger.error("Event bus subscriber connection failed",
+                            channel=self.channel,
+                            error=str(e))
+                await asyncio.sleep(self.reconnect_delay)
+
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+    async def _read_batch(self, pubsub) -> List[bytes]:
+        """Wait for a message, then collect any others arriving within the batch window."""
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        if message is None:
+            return []
+
+        batch = [message["data"]]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message is not None:
+                batch.append(message["data"])
+
+        return batch
+
+    async def dispatch_batch(self, payloads: List[bytes]) -> int:
+        """
+        Deliver a batch of serialized events to local WebSocket clients.
+
+        Returns:
+            Number of events delivered
+        """
+        by_project: Dict[Optional[str], List[WebSocketEvent]] = {}
+
+        for payload in payloads:
+            try:
+                event = WebSocketEvent.model_validate_json(payload)
+            except ValueError as e:
+                logger.warning("Discarding malformed event bus message", error=str(e))
+                continue
+
+            project_key = str(event.project_id) if event.project_id else None
+            by_project.setdefault(project_key, []).append(event)
+
+        results = await asyncio.gather(
+            *(self._deliver_project_events(events) for events in by_project.values()),
+            return_exceptions=True
+        )
+
+        delivered = 0
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Failed to relay event bus batch", error=str(result))
+            else:
+                delivered += result
+
+        return delivered
+
+    async def _deliver_project_events(self, events: List[WebSocketEvent]) -> int:
+        """Deliver one project's events in publish order."""
+        for event in events:
+            await self.manager.broadcast_event(event)
+        return len(events)
+
+
+# Global event bus instances
+event_publisher = EventBusPublisher()
+event_bus_subscriber = EventBusSubscriber(websocket_manager)
@@ -19,6 +19,8 @@ class EventType(str, Enum):
     WORKFLOW_RESUMED = "workflow_resumed"
     ARTIFACT_CREATED = "artifact_created"
     WORKFLOW_EVENT = "workflow_event"
+    AGENT_RESPONSE_CHUNK = "agent_response_chunk"
+    STREAM_RESET = "stream_reset"
     ERROR = "error"
 
 
@@ -7,8 +7,14 @@ from fastapi import WebSocket, WebSocketDisconnect
 from datetime import datetime, timedelta
 import structlog
 from enum import Enum
+from uuid import uuid4
 
 from .events import WebSocketEvent, EventType
+from .coalescing import EventCoalescer, EventFrame, EventFramer, negotiate_encoding
+from .outbound import ClientConnection, SlowConsumerPolicy, encode_event, supersede_key
+from .notification_store import DELIVERED, EXPIRED, FAILED, notification_store
+from .replay import ReplayBuffer
+from app.config import settings
 from app.database.models import WebSocketNotificationDB
 from app.database.connection import get_session
 
@@ -45,11 +51,29 @@ class PriorityNotification:
 class WebSocketManager:
     """Manages WebSocket connections and broadcasting with priority notifications."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        slow_consumer_policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+        coalesce_window: Optional[float] = None
+    ):
         # Store active connections by project ID
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # Store all connections for global broadcasts
         self.all_connections: Set[WebSocket] = set()
+        # Outbound queue and writer task per connection
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        self.max_queue = max_queue or settings.ws_send_queue_size
+        self.slow_consumer_policy = SlowConsumerPolicy(slow_consumer_policy or settings.ws_slow_consumer_policy)
+        self.send_timeout = send_timeout or settings.ws_send_timeout_seconds
+        # Superseded events are merged per entity before fan-out, then framed once per broadcast
+        if coalesce_window is None:
+            coalesce_window = settings.ws_coalesce_window_ms / 1000
+        self.coalescer = EventCoalescer(self._deliver, coalesce_window)
+        self.framer = EventFramer(settings.ws_entity_cache_size)
+        # Sequenced recent events per project, for clients resuming with last_seq
+        self.replay = ReplayBuffer(settings.ws_replay_buffer_size)
         # Priority notification queues
         self.priority_queues: Dict[str, List[PriorityNotification]] = {
             "CRITICAL": [],
@@ -60,8 +84,25 @@ class WebSocketManager:
         # Notification delivery tracking
         self.pending_notifications: Dict[str, PriorityNotification] = {}
     
-    async def connect(self, websocket: WebSocket, project_id: str = None):
-        """Accept a WebSocket connection."""
+    async def connect(
+        self,
+        websocket: WebSocket,
+        project_id: str = None,
+        encoding: Optional[str] = None,
+        deltas: bool = False,
+        last_seq: Optional[int] = None
+    ):
+        """
+        Accept a WebSocket connection.
+
+        Args:
+            websocket: Connection to accept
+            project_id: Project whose events the client receives, besides global ones
+            encoding: Requested wire format, "json" (default) or "msgpack"
+            deltas: Send JSON patches for events about an entity the client already has
+            last_seq: Last sequence number the client received on the project stream;
+                it is sent the events after it, or a stream_reset event if they are gone
+        """
         await websocket.accept()
         
         if project_id:
@@ -70,20 +111,49 @@ class WebSocketManager:
             self.active_connections[project_id].add(websocket)
         
         self.all_connections.add(websocket)
-        logger.info("WebSocket connected", project_id=project_id)
+        
+        connection = ClientConnection(
+            websocket,
+            project_id,
+            max_queue=self.max_queue,
+            policy=self.slow_consumer_policy,
+            send_timeout=self.send_timeout,
+            on_close=lambda closed: self.disconnect(closed.websocket, closed.project_id),
+            encoding=negotiate_encoding(encoding),
+            deltas=deltas
+        )
+        self.connections[websocket] = connection
+        connection.start()
+        if project_id and last_seq is not None:
+            # Queued before any live event, which can only arrive once this coroutine yields
+            self._resume(connection, project_id, last_seq)
+        logger.info("WebSocket connected",
+                   project_id=project_id,
+                   encoding=connection.encoding.value,
+                   deltas=deltas)
     
     def disconnect(self, websocket: WebSocket, project_id: str = None):
         """Remove a WebSocket connection."""
+        connection = self.connections.pop(websocket, None)
+        if connection is not None:
+            project_id = project_id or connection.project_id
+            connection.close()
+        
         if project_id and project_id in self.active_connections:
             self.active_connections[project_id].discard(websocket)
             if not self.active_connections[project_id]:
                 del self.active_connections[project_id]
         
-        self.all_connections.discard(websocket)
-        logger.info("WebSocket disconnected", project_id=project_id)
+        if websocket in self.all_connections:
+            self.all_connections.discard(websocket)
+            logger.info("WebSocket disconnected", project_id=project_id)
     
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """Send a message to a specific WebSocket connection."""
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.enqueue(message)
+            return
         try:
             await websocket.send_text(message)
         except WebSocketDisconnect:
@@ -91,52 +161,67 @@ class WebSocketManager:
     
     async def send_event(self, event: WebSocketEvent, websocket: WebSocket):
         """Send a WebSocket event to a specific connection."""
-        try:
-            await websocket.send_text(event.model_dump_json())
-        except WebSocketDisconnect:
-            self.disconnect(websocket)
+        await self.send_personal_message(encode_event(event), websocket)
     
     async def broadcast_to_project(self, event: WebSocketEvent, project_id: str):
         """Broadcast an event to all connections for a specific project."""
-        if project_id not in self.active_connections:
-            return
-        
-        message = event.model_dump_json()
-        disconnected = set()
-        
-        for websocket in self.active_connections[project_id]:
-            try:
-                await websocket.send_text(message)
-            except WebSocketDisconnect:
-                disconnected.add(websocket)
-        
-        # Clean up disconnected connections
-        for websocket in disconnected:
-            self.disconnect(websocket, project_id)
-        
-        logger.info("Event broadcasted to project", 
-                   project_id=project_id, 
-                   event_type=event.event_type,
-                   connections=len(self.active_connections[project_id]))
+        # Sequenced even with no one connected, so a reconnecting client can catch up
+        self.coalescer.submit(event, project_id)
     
     async def broadcast_global(self, event: WebSocketEvent):
         """Broadcast an event to all active connections."""
-        message = event.model_dump_json()
-        disconnected = set()
-
-        for websocket in self.all_connections:
-            try:
-                await websocket.send_text(message)
-            except WebSocketDisconnect:
-                disconnected.add(websocket)
+        self.coalescer.submit(event)
+
+    def _deliver(self, event: WebSocketEvent, project_id: Optional[str] = None) -> None:
+        """Fan an event out to a project's connections, or to every connection."""
+        if project_id is None:
+            queued = self._fan_out(event, self.all_connections)
+            logger.debug("Event broadcasted globally",
+                        event_type=event.event_type,
+                        connections=queued)
+            return
 
-        # Clean up disconnected connections
-        for websocket in disconnected:
-            self.disconnect(websocket)
+        frame = self.framer.frame(event, project_id)
+        self.replay.append(project_id, frame)
+        queued = self._fan_out(event, self.active_connections.get(project_id, set()), frame)
+        logger.debug("Event broadcasted to project",
+                    project_id=project_id,
+                    event_type=event.event_type,
+                    connections=queued)
+
+    def _fan_out(self, event: WebSocketEvent, websockets: Set[WebSocket], frame: Optional[EventFrame] = None) -> int:
+        """Frame an event once and queue it on every connection; returns connections reached."""
+        if not websockets:
+            return 0
+        message = frame or self.framer.frame(event)
+        key = supersede_key(event)
+        queued = 0
+        
+        # Copy: a slow consumer may be disconnected while queuing
+        for websocket in list(websockets):
+            connection = self.connections.get(websocket)
+            if connection is not None and connection.enqueue(message, key):
+                queued += 1
+        return queued
+
+    def _resume(self, connection: ClientConnection, project_id: str, last_seq: int) -> None:
+        """Queue the events a reconnecting client missed, or tell it to refetch."""
+        missed = self.replay.since(project_id, last_seq)
+        if missed is not None and len(missed) <= connection.max_queue:
+            for frame in missed:
+                connection.enqueue(frame)
+            logger.info("WebSocket stream resumed",
+                       project_id=project_id,
+                       last_seq=last_seq,
+                       replayed=len(missed))
+            return
 
-        logger.info("Event broadcasted globally",
-                   event_type=event.event_type,
-                   connections=len(self.all_connections))
+        reset = WebSocketEvent(
+            event_type=EventType.STREAM_RESET,
+            data={"project_id": project_id, "last_seq": last_seq, "seq": self.replay.last_seq(project_id)}
+        )
+        connection.enqueue(EventFrame(reset.model_dump(mode="json")))
+        logger.info("WebSocket stream reset", project_id=project_id, last_seq=last_seq)
 
     async def broadcast_event(self, event: WebSocketEvent):
         """Broadcast an event to appropriate connections based on project_id."""
@@ -147,6 +232,20 @@ class WebSocketManager:
             # Broadcast globally if no project_id
             await self.broadcast_global(event)
     
+    def get_broadcast_stats(self) -> Dict[str, Any]:
+        """Get per-connection queue depth, drops and delivery lag."""
+        connections = [connection.get_stats() for connection in self.connections.values()]
+        return {
+            "connections": len(connections),
+            "queued": sum(stats["queued"] for stats in connections),
+            "dropped": sum(stats["dropped"] for stats in connections),
+            "coalesced": sum(stats["coalesced"] for stats in connections),
+            "max_lag_ms": max((stats["max_lag_ms"] for stats in connections), default=0.0),
+            "coalescer": self.coalescer.get_stats(),
+            "replay": self.replay.get_stats(),
+            "per_connection": connections,
+        }
+    
     def get_connection_count(self, project_id: str = None) -> int:
         """Get the number of active connections."""
         if project_id:
@@ -170,7 +269,8 @@ class WebSocketManager:
             max_retries=max_retries
         )
 
-        notification_id = f"{priority.value}_{event.event_type}_{datetime.utcnow().timestamp()}"
+        # Suffix keeps IDs unique when notifications of one type are sent in the same instant
+        notification_id = f"{priority.value}_{event.event_type}_{datetime.utcnow().timestamp()}_{uuid4().hex[:8]}"
 
         # Add to appropriate priority queue
         self.priority_queues[priority.value].append(notification)
@@ -237,7 +337,7 @@ class WebSocketManager:
             success = await self._deliver_priority_notification(notification, project_id)
             if success:
                 notification.delivered_at = datetime.utcnow()
-                await self._mark_notification_delivered(notification_id)
+                await self._mark_notification_delivered(notification_id, notification.retry_count + 2)
                 logger.info("Priority notification delivered on retry",
                            notification_id=notification_id,
                            retry_count=notification.retry_count,
@@ -263,33 +363,24 @@ class WebSocketManager:
     ):
         """Persist notification to database for guaranteed delivery."""
 
-        db = next(get_session())
-        try:
-            db_notification = WebSocketNotificationDB(
-                project_id=project_id,
-                event_type=notification.event.event_type.value,
-                priority=notification.priority.value,
-                title=self._extract_notification_title(notification.event),
-                message=self._extract_notification_message(notification.event),
-                event_data=notification.event.data,
-                expires_at=notification.expires_at,
-                delivery_attempts=0
-            )
-
-            db.add(db_notification)
-            db.commit()
-            db.refresh(db_notification)
-
-            logger.debug("Notification persisted to database",
-                        notification_id=notification_id,
-                        db_id=str(db_notification.id))
-
-        finally:
-            db.close()
+        notification_store.insert({
+            "notification_id": notification_id,
+            "project_id": project_id,
+            "event_type": EventType(notification.event.event_type).value,
+            "priority": notification.priority.value,
+            "title": self._extract_notification_title(notification.event),
+            "message": self._extract_notification_message(notification.event),
+            "event_data": notification.event.data,
+            "expires_at": notification.expires_at,
+            "delivery_attempts": 0
+        })
+
+        logger.debug("Notification persisted to database",
+                    notification_id=notification_id)
 
     def _extract_notification_title(self, event: WebSocketEvent) -> str:
         """Extract a human-readable title from the event."""
-        event_type = event.event_type
+        event_type = EventType(event.event_type)
 
         if event_type == EventType.HITL_REQUEST_CREATED:
             return "HITL Approval Required"
@@ -308,67 +399,19 @@ class WebSocketManager:
             elif "recovery_event" in event.data:
                 return f"Recovery session {event.data.get('event_type', 'Unknown')} for {event.data.get('agent_type', 'Unknown agent')}"
 
-        return f"System event: {event.event_type.value}"
+        return f"System event: {EventType(event.event_type).value}"
 
-    async def _mark_notification_delivered(self, notification_id: str):
+    async def _mark_notification_delivered(self, notification_id: str, attempts: int = 1):
         """Mark notification as delivered in database."""
-
-        db = next(get_session())
-        try:
-            # Find notification by event data (since we don't store the ID)
-            # This is a simplified approach - in production, you'd store the notification ID
-            notifications = db.query(WebSocketNotificationDB).filter(
-                WebSocketNotificationDB.delivered == False
-            ).order_by(WebSocketNotificationDB.created_at.desc()).limit(10).all()
-
-            for notification in notifications:
-                if notification.event_data and "notification_id" in notification.event_data:
-                    if notification.event_data["notification_id"] == notification_id:
-                        notification.delivered = True
-                        notification.delivered_at = datetime.utcnow()
-                        db.commit()
-                        break
-
-        finally:
-            db.close()
+        notification_store.mark(notification_id, DELIVERED, attempts)
 
     async def _mark_notification_expired(self, notification_id: str):
         """Mark notification as expired."""
-
-        db = next(get_session())
-        try:
-            notifications = db.query(WebSocketNotificationDB).filter(
-                WebSocketNotificationDB.expired == False
-            ).order_by(WebSocketNotificationDB.created_at.desc()).limit(10).all()
-
-            for notification in notifications:
-                if notification.event_data and "notification_id" in notification.event_data:
-                    if notification.event_data["notification_id"] == notification_id:
-                        notification.expired = True
-                        db.commit()
-                        break
-
-        finally:
-            db.close()
+        notification_store.mark(notification_id, EXPIRED)
 
     async def _mark_notification_failed(self, notification_id: str):
         """Mark notification as failed after max retries."""
-
-        db = next(get_session())
-        try:
-            notifications = db.query(WebSocketNotificationDB).filter(
-                WebSocketNotificationDB.delivered == False
-            ).order_by(WebSocketNotificationDB.created_at.desc()).limit(10).all()
-
-            for notification in notifications:
-                if notification.event_data and "notification_id" in notification.event_data:
-                    if notification.event_data["notification_id"] == notification_id:
-                        notification.delivery_attempts = 999  # Mark as failed
-                        db.commit()
-                        break
-
-        finally:
-            db.close()
+        notification_store.mark(notification_id, FAILED)
 
     async def get_pending_notifications(self, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get pending notifications for a project."""
@@ -407,21 +450,10 @@ class WebSocketManager:
 
     async def cleanup_expired_notifications(self):
         """Clean up expired notifications from database."""
+        expired_count = await asyncio.to_thread(notification_store.expire_overdue)
 
-        db = next(get_session())
-        try:
-            now = datetime.utcnow()
-
-            expired_count = db.query(WebSocketNotificationDB).filter(
-                WebSocketNotificationDB.expires_at < now,
-                WebSocketNotificationDB.expired == False
-            ).update({"expired": True})
-
-            logger.info("Cleaned up expired notifications",
-                       expired_count=expired_count)
-
-        finally:
-            db.close()
+        logger.info("Cleaned up expired notifications",
+                   expired_count=expired_count)
 
     async def broadcast_advanced_event(
         self,
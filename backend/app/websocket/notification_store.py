@@ -0,0 +1,214 @@
+"""Persistence for priority WebSocket notifications.
+
+Notifications are stored by their notification ID so delivery status can
+be written with keyed UPDATEs. Status changes are buffered and written on a
+short timer: one batch of UPDATEs per flush instead of a session and commit
+per notification. A compaction loop marks overdue notifications expired and
+deletes settled ones past the retention period, so the table stays bounded.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, or_, update
+from sqlalchemy.orm import Session
+import structlog
+
+from app.config import settings
+from app.database.models import WebSocketNotificationDB
+from app.database.write_behind import WriteBehindBuffer
+
+logger = structlog.get_logger(__name__)
+
+# Delivery attempts recorded for a notification that exhausted its retries
+FAILED_DELIVERY_ATTEMPTS = 999
+
+DELIVERED = "delivered"
+EXPIRED = "expired"
+FAILED = "failed"
+
+
+class NotificationStore(WriteBehindBuffer):
+    """
+    Inserts notifications and writes their delivery status behind.
+
+    Status changes for the same notification overwrite each other until the
+    next flush, which writes each pending status with one executemany UPDATE
+    keyed on notification_id.
+    """
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        max_pending: int = 500,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        super().__init__(
+            flush_interval if flush_interval is not None else settings.ws_notification_flush_interval_ms / 1000,
+            session_factory
+        )
+        self.max_pending = max_pending
+
+        # notification_id -> (status, time of the change, delivery attempts)
+        self._pending: Dict[str, Tuple[str, datetime, int]] = {}
+        self._compaction_task: Optional[asyncio.Task] = None
+        self.stats = {"inserted": 0, "rows_updated": 0, "flushes": 0, "flush_failures": 0,
+                      "expired": 0, "deleted": 0}
+
+    def insert(self, row: Dict[str, Any]) -> None:
+        """Store a notification before its first delivery attempt."""
+        db = self.session_factory()
+        try:
+            db.add(WebSocketNotificationDB(**row))
+            db.commit()
+            self.stats["inserted"] += 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def mark(self, notification_id: str, status: str, attempts: int = 0) -> None:
+        """Queue a status change; it is written on the next flush."""
+        self._pending[notification_id] = (status, datetime.utcnow(), attempts)
+        if len(self._pending) >= self.max_pending:
+            self._flush_soon()
+        else:
+            self._schedule_flush()
+
+    def expire_overdue(self) -> int:
+        """Mark notifications past their expiry as expired."""
+        db = self.session_factory()
+        try:
+            expired = db.execute(
+                update(WebSocketNotificationDB)
+                .where(WebSocketNotificationDB.expires_at < datetime.utcnow(),
+                       WebSocketNotificationDB.expired == False)
+                .values(expired=True)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.stats["expired"] += expired
+        return expired
+
+    def compact(self, retention_hours: Optional[int] = None) -> Dict[str, int]:
+        """
+        Expire overdue notifications and delete settled ones older than the retention period.
+
+        Settled means delivered, expired or failed; pending notifications are
+        kept however old they are.
+
+        Returns:
+            Counts of notifications expired and deleted
+        """
+        retention_hours = retention_hours if retention_hours is not None else settings.ws_notification_retention_hours
+        expired = self.expire_overdue()
+        cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+
+        db = self.session_factory()
+        try:
+            deleted = db.execute(
+                delete(WebSocketNotificationDB)
+                .where(WebSocketNotificationDB.created_at < cutoff,
+                       or_(WebSocketNotificationDB.delivered == True,
+                           WebSocketNotificationDB.expired == True,
+                           WebSocketNotificationDB.delivery_attempts >= FAILED_DELIVERY_ATTEMPTS))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.stats["deleted"] += deleted
+        logger.info("Compacted WebSocket notifications", expired=expired, deleted=deleted)
+        return {"expired": expired, "deleted": deleted}
+
+    def start_compaction(self, interval: Optional[float] = None) -> None:
+        """Run `compact` periodically on the current event loop."""
+        if self._compaction_task is not None and not self._compaction_task.done():
+            return
+        interval = interval or settings.ws_notification_compaction_interval_minutes * 60
+        self._compaction_task = asyncio.create_task(self._compact_periodically(interval))
+
+    async def stop(self) -> None:
+        """Stop compaction and write pending status changes."""
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            try:
+                await self._compaction_task
+            except asyncio.CancelledError:
+                pass
+            self._compaction_task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "pending_updates": len(self._pending)}
+
+    async def _compact_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                logger.warning("Failed to compact WebSocket notifications", error=str(e))
+
+    def _write(self, pending: Dict[str, Tuple[str, datetime, int]]) -> int:
+        by_status: Dict[str, List[Dict[str, Any]]] = {DELIVERED: [], EXPIRED: [], FAILED: []}
+        for notification_id, (status, at, attempts) in pending.items():
+            # Only the statement's own bind parameters; other keys would be read as columns
+            row = {"b_id": notification_id, "b_at": at}
+            if status == DELIVERED:
+                row["b_attempts"] = attempts
+            by_status[status].append(row)
+
+        table = WebSocketNotificationDB.__table__
+        by_id = table.c.notification_id == bindparam("b_id")
+        statements = {
+            DELIVERED: update(table).where(by_id).values(
+                delivered=True, delivered_at=bindparam("b_at"), delivery_attempts=bindparam("b_attempts")
+            ),
+            EXPIRED: update(table).where(by_id).values(expired=True, updated_at=bindparam("b_at")),
+            FAILED: update(table).where(by_id).values(
+                delivery_attempts=FAILED_DELIVERY_ATTEMPTS, updated_at=bindparam("b_at")
+            ),
+        }
+
+        db = self.session_factory()
+        try:
+            for status, rows in by_status.items():
+                if rows:
+                    db.execute(statements[status], rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.stats["flushes"] += 1
+        self.stats["rows_updated"] += len(pending)
+        logger.debug("Notification status changes persisted", rows=len(pending))
+        return len(pending)
+
+    def _restore(self, pending: Dict[str, Tuple[str, datetime, int]], error: Exception) -> int:
+        """Put status changes from a failed flush back, unless a newer change arrived meanwhile."""
+        self.stats["flush_failures"] += 1
+        logger.warning("Failed to persist notification status changes",
+                      rows=len(pending),
+                      error=str(error))
+        for notification_id, change in pending.items():
+            self._pending.setdefault(notification_id, change)
+        return 0
+
+
+# Notification persistence shared by the WebSocket manager
+notification_store = NotificationStore()
@@ -0,0 +1,180 @@
+"""Per-connection outbound queues for WebSocket clients.
+
+Broadcasting used to await `send_text` on each socket in turn, so one slow or
+stalled client delayed every client after it. Each connection now owns a
+bounded queue drained by its own writer task; a broadcast builds one frame
+for the event and enqueues it on every connection without waiting. Each
+frame is serialized at most once per wire format.
+
+When a client falls behind and its queue is full, the slow-consumer policy
+decides what happens:
+
+- ``drop_oldest``: discard the oldest queued message;
+- ``coalesce``: replace a queued message superseded by the new one (for
+  example an older status of the same agent), else drop the oldest;
+- ``disconnect``: close the connection so the client reconnects and resyncs.
+"""
+
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Union
+from fastapi import WebSocket
+import orjson
+import structlog
+
+from .coalescing import SUPERSEDING_EVENTS, EventFrame, FrameEncoding
+from .events import WebSocketEvent
+
+logger = structlog.get_logger(__name__)
+
+# Close code sent to clients disconnected for falling behind ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a client's outbound queue is full."""
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+def encode_event(event: WebSocketEvent) -> str:
+    """Serialize an event once for every connection it is sent to."""
+    return orjson.dumps(event.model_dump(mode="json")).decode("utf-8")
+
+
+def supersede_key(event: WebSocketEvent) -> Optional[str]:
+    """Key under which a newer event replaces an older queued one, if it does."""
+    event_type = getattr(event.event_type, "value", event.event_type)
+    if event_type not in SUPERSEDING_EVENTS:
+        return None
+    return f"{event_type}:{event.project_id}:{event.agent_type}"
+
+
+class ClientConnection:
+    """A WebSocket with a bounded outbound queue and a dedicated writer task."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        project_id: Optional[str],
+        max_queue: int,
+        policy: SlowConsumerPolicy,
+        send_timeout: float,
+        on_close: Callable[["ClientConnection"], None],
+        encoding: FrameEncoding = FrameEncoding.JSON,
+        deltas: bool = False
+    ):
+        self.websocket = websocket
+        self.project_id = project_id
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        self.encoding = encoding
+        self.deltas = deltas
+
+        # Entries are [supersede key, message, enqueued at]; lists so coalescing can update in place
+        self.queue: Deque[list] = deque()
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        # Entity -> last version sent, the base a delta must be built on
+        self._versions: Dict[str, int] = {}
+        self.stats = {"sent": 0, "dropped": 0, "coalesced": 0, "last_lag_ms": 0.0, "max_lag_ms": 0.0}
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, message: Union[str, EventFrame], key: Optional[str] = None) -> bool:
+        """
+        Queue a message without waiting for the client.
+
+        Returns:
+            False if the connection is closed or was closed for falling behind
+        """
+        if self.closed:
+            return False
+
+        if len(self.queue) >= self.max_queue:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                logger.warning("Disconnecting slow WebSocket consumer",
+                              project_id=self.project_id,
+                              queued=len(self.queue))
+                self.close(SLOW_CONSUMER_CLOSE_CODE)
+                return False
+            if self.policy == SlowConsumerPolicy.COALESCE and key is not None and self._replace(key, message):
+                return True
+            self.queue.popleft()
+            self.stats["dropped"] += 1
+
+        self.queue.append([key, message, time.monotonic()])
+        self._ready.set()
+        return True
+
+    def close(self, code: Optional[int] = None) -> None:
+        """Stop the writer and detach from the manager; sends a close frame if `code` is given."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is not None:
+            asyncio.create_task(self._send_close(code))
+        self.on_close(self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lag = (time.monotonic() - self.queue[0][2]) * 1000 if self.queue else 0.0
+        return {**self.stats, "queued": len(self.queue), "oldest_queued_ms": lag, "project_id": self.project_id}
+
+    def _replace(self, key: str, message: Union[str, EventFrame]) -> bool:
+        """Overwrite the newest queued message with the same key, keeping its place in line."""
+        for entry in reversed(self.queue):
+            if entry[0] == key:
+                entry[1] = message
+                self.stats["coalesced"] += 1
+                return True
+        return False
+
+    async def _write_loop(self) -> None:
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self.queue and not self.closed:
+                    _, message, enqueued_at = self.queue.popleft()
+                    data = message if isinstance(message, str) else self._render(message)
+                    if isinstance(data, bytes):
+                        send = self.websocket.send_bytes(data)
+                    else:
+                        send = self.websocket.send_text(data)
+                    await asyncio.wait_for(send, timeout=self.send_timeout)
+                    lag_ms = (time.monotonic() - enqueued_at) * 1000
+                    self.stats["sent"] += 1
+                    self.stats["last_lag_ms"] = lag_ms
+                    self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag_ms)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Disconnects, send timeouts and transport errors all end the connection
+            logger.info("WebSocket writer stopped",
+                        project_id=self.project_id,
+                        error_type=type(e).__name__)
+            self.close()
+
+    def _render(self, frame: EventFrame) -> Union[str, bytes]:
+        """Encode a frame for this client, as a delta if it holds the version the delta is based on."""
+        delta = (self.deltas and frame.base is not None
+                 and self._versions.get(frame.entity) == frame.base)
+        if frame.entity is not None:
+            self._versions[frame.entity] = frame.version
+        return frame.encode(self.encoding, delta)
+
+    async def _send_close(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
@@ -0,0 +1,84 @@
+"""Sequence numbers and a replay ring for project event streams.
+
+Every event broadcast to a project carries a ``seq`` that increases by one
+per event on that project's stream. The last events of each stream are kept
+in a bounded ring. A client reconnecting to ``/ws`` with ``last_seq`` is
+sent only the events it missed, instead of refetching project state.
+
+If the gap is no longer in the ring, the client is sent a
+``stream_reset`` event and should refetch. Numbers a client holds from
+before a restart, or from before an idle stream was evicted, must never
+fall inside a new ring, or they would be answered with a wrong replay.
+So a new stream starts after the highest number the buffer has issued, and
+a buffer starts from its boot time in milliseconds shifted above a
+``SEQUENCE_COUNTER_BITS`` counter. Numbers from a previous process are then
+always older, unless it averaged more than 2**SEQUENCE_COUNTER_BITS events
+per millisecond of uptime. Sequence numbers stay below 2**53, so JavaScript
+clients read them exactly.
+
+Global broadcasts (events without a project) are not sequenced.
+"""
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .coalescing import EventFrame
+
+# Boot times are counted from 2024-01-01 UTC to leave room for the counter below 2**53
+SEQUENCE_EPOCH = 1_704_067_200
+SEQUENCE_COUNTER_BITS = 13
+
+
+class ReplayBuffer:
+    """Per-project sequence counters and rings of recent frames, bounded in projects and events."""
+
+    def __init__(self, size: int, max_streams: int = 1000, clock: Callable[[], float] = time.time):
+        self.size = size
+        self.max_streams = max_streams
+        boot_ms = int((clock() - SEQUENCE_EPOCH) * 1000)
+        # Highest sequence number issued on any stream; new streams start above it
+        self._issued = boot_ms << SEQUENCE_COUNTER_BITS
+        # Project ID -> (last sequence number, ring of (seq, frame)); least recently used first
+        self._streams: "OrderedDict[str, Tuple[int, Deque[Tuple[int, EventFrame]]]]" = OrderedDict()
+        self.stats = {"replayed": 0, "resets": 0}
+
+    def append(self, project_id: str, frame: EventFrame) -> int:
+        """Assign the next sequence number to a frame and keep it for replay."""
+        last, ring = self._streams.pop(project_id, (None, None))
+        if ring is None:
+            last, ring = self._issued, deque(maxlen=self.size)
+        seq = last + 1
+        self._issued = max(self._issued, seq)
+        frame.payload["seq"] = seq
+        ring.append((seq, frame))
+        self._streams[project_id] = (seq, ring)
+        while len(self._streams) > self.max_streams:
+            self._streams.popitem(last=False)
+        return seq
+
+    def last_seq(self, project_id: str) -> Optional[int]:
+        return self._streams.get(project_id, (None, None))[0]
+
+    def since(self, project_id: str, last_seq: int) -> Optional[List[EventFrame]]:
+        """
+        Frames after `last_seq`, oldest first.
+
+        Returns:
+            The missed frames (possibly none), or None if the gap is no longer
+            available and the client must refetch
+        """
+        current, ring = self._streams.get(project_id, (None, None))
+        if current is not None and last_seq == current:
+            return []
+        if not ring or last_seq > current or last_seq < ring[0][0] - 1:
+            self.stats["resets"] += 1
+            return None
+
+        missed = [frame for seq, frame in ring if seq > last_seq]
+        self.stats["replayed"] += len(missed)
+        return missed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "streams": len(self._streams),
+                "buffered": sum(len(ring) for _, ring in self._streams.values())}
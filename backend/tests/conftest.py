@@ -16,13 +16,15 @@ from typing import AsyncGenerator, Generator
 from unittest.mock import Mock, AsyncMock
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import redis
 from uuid import uuid4, UUID
 
 from app.main import app
-from app.database.connection import Base, get_session
+from app.config import settings
+from app.database.connection import Base, get_async_session, get_session
 from app.database.models import ProjectDB, TaskDB, ContextArtifactDB, HitlRequestDB, AgentStatusDB
 from app.models.task import TaskStatus
 from app.models.agent import AgentType, AgentStatus
@@ -30,6 +32,13 @@ from app.models.context import ArtifactType
 from app.models.hitl import HitlStatus
 from app.services.orchestrator import OrchestratorService
 from app.services.context_store import ContextStoreService
+from app.services.artifact_cache import artifact_cache
+from app.services.llm_usage_store import llm_usage_store
+from app.services.audit_writer import audit_writer
+from app.websocket.notification_store import notification_store
+from app.services.llm_scheduler import llm_scheduler
+from app.services.llm_retry import circuit_breakers
+from app.services.model_client_pool import model_client_pool
 from app.services.autogen_service import AutoGenService
 
 
@@ -76,6 +85,57 @@ def db_session() -> Generator[Session, None, None]:
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_artifact_cache():
+    """Keep cached context artifacts from leaking between tests."""
+    yield
+    artifact_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_usage_store(monkeypatch):
+    """Keep usage recorded by one test out of another's reports and the database."""
+    monkeypatch.setattr(llm_usage_store, "persist", False)
+    yield
+    llm_usage_store.clear()
+
+
+@pytest.fixture(autouse=True)
+def strict_audit_writes(monkeypatch):
+    """Commit audit events on the test's session unless a test opts into buffering."""
+    monkeypatch.setattr(settings, "audit_durability", "strict")
+    yield
+    audit_writer.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_notification_store():
+    """Keep notification status changes from one test out of the next test's database."""
+    yield
+    notification_store.clear()
+
+
+@pytest.fixture(autouse=True)
+def unscheduled_llm_requests(monkeypatch):
+    """Keep rate-limit pauses from one test out of another's LLM calls."""
+    monkeypatch.setattr(llm_scheduler, "enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Keep provider failures injected by one test from opening circuits for the next."""
+    yield
+    circuit_breakers.reset()
+
+
+@pytest.fixture(autouse=True)
+def fresh_worker_services(monkeypatch):
+    """Give each test its own worker AutoGen service and model clients."""
+    monkeypatch.setattr("app.tasks.agent_tasks._idle_autogen_services", [])
+    yield
+    model_client_pool.clear()
+
+
 @pytest.fixture
 def client(db_session: Session) -> TestClient:
     """
@@ -84,7 +144,12 @@ def client(db_session: Session) -> TestClient:
     def get_test_db():
         return db_session
     
+    async def get_test_async_db():
+        # Run async endpoints inside the same rolled-back test transaction
+        yield AsyncSession(sync_session_class=lambda **kw: db_session)
+    
     app.dependency_overrides[get_session] = get_test_db
+    app.dependency_overrides[get_async_session] = get_test_async_db
     
     with TestClient(app) as test_client:
         yield test_client
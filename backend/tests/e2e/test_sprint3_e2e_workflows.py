@@ -417,7 +417,7 @@ class TestHITLWebSocketIntegrationE2E:
             
             # Step 4: Verify workflow resumed
             mock_orchestrator.resume_workflow_after_hitl.assert_called_once_with(
-                sample_project_id, sample_task_id
+                sample_request_id, HitlAction.APPROVE.value
             )
             
             # Step 5: Verify HITL request status updated
@@ -25,6 +25,14 @@ from app.models.agent import AgentType
 from tests.conftest import assert_performance_threshold
 
 
+@pytest.fixture(autouse=True)
+def celery_queue(mock_celery_task):
+    """Keep tasks resumed after a HITL response out of the real Celery broker."""
+    with patch("app.services.orchestrator.process_agent_task") as process_agent_task:
+        process_agent_task.delay.return_value = mock_celery_task
+        yield process_agent_task
+
+
 class TestHitlRequestCreationAndPersistence:
     """Test scenario 2.3-INT-001: HITL request creation and persistence (P0)"""
     
@@ -1024,3 +1032,37 @@ class TestHitlRequestHistoryTracking:
         final_entry = complete_data["history"][0]  # Newest first
         assert final_entry["action"] == "approve"
         assert "All issues addressed" in final_entry["comment"]
+
+
+class TestPendingHitlRequests:
+    """Test listing pending HITL requests through the async session."""
+    
+    @pytest.mark.integration
+    @pytest.mark.p1
+    @pytest.mark.hitl
+    def test_pending_requests_exclude_resolved_and_expired(
+        self, client: TestClient, db_session: Session,
+        project_factory, task_factory, hitl_request_factory
+    ):
+        """Test that only pending, unexpired requests for the project are listed."""
+        project = project_factory.create(db_session)
+        task = task_factory.create(db_session, project_id=project.id)
+        
+        pending = hitl_request_factory.create(
+            db_session, project.id, task.id,
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        )
+        hitl_request_factory.create(
+            db_session, project.id, task.id, status=HitlStatus.APPROVED
+        )
+        hitl_request_factory.create(
+            db_session, project.id, task.id,
+            expires_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        
+        response = client.get(f"/api/v1/hitl/pending?project_id={project.id}")
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [item["request_id"] for item in data] == [str(pending.id)]
+        assert data[0]["status"] == HitlStatus.PENDING.value
@@ -521,7 +521,7 @@ class TestCompleteSDLCWorkflow:
 
         # Mock all the services and dependencies
         with patch.object(orchestrator_service.workflow_engine, 'start_workflow_execution') as mock_start, \
-             patch.object(orchestrator_service.workflow_engine, 'execute_workflow_step') as mock_execute, \
+             patch.object(orchestrator_service.workflow_engine, 'execute_workflow_dag') as mock_execute_dag, \
              patch.object(orchestrator_service.workflow_engine, 'get_workflow_execution_status') as mock_status, \
              patch.object(orchestrator_service.context_store, 'create_artifact') as mock_create_artifact:
 
@@ -532,15 +532,19 @@ class TestCompleteSDLCWorkflow:
             mock_execution.status = ExecutionStateEnum.RUNNING
             mock_start.return_value = mock_execution
 
-            # Mock step execution results
-            mock_execute.side_effect = [
-                {"status": "completed", "agent": "analyst", "step_index": 0},
-                {"status": "completed", "agent": "architect", "step_index": 1},
-                {"status": "completed", "agent": "coder", "step_index": 2},
-                {"status": "completed", "agent": "tester", "step_index": 3},
-                {"status": "completed", "agent": "deployer", "step_index": 4},
-                {"status": "no_pending_steps"}
-            ]
+            # Mock dependency graph execution results
+            mock_execute_dag.return_value = {
+                "status": "completed",
+                "executed_steps": 5,
+                "remaining_steps": 0,
+                "step_results": {
+                    0: {"status": "completed", "agent": "analyst", "step_index": 0},
+                    1: {"status": "completed", "agent": "architect", "step_index": 1},
+                    2: {"status": "completed", "agent": "coder", "step_index": 2},
+                    3: {"status": "completed", "agent": "tester", "step_index": 3},
+                    4: {"status": "completed", "agent": "deployer", "step_index": 4}
+                }
+            }
 
             # Mock final status
             mock_status.return_value = {
@@ -569,8 +573,8 @@ class TestCompleteSDLCWorkflow:
             assert start_call[1]["project_id"] == str(project_id)
             assert "user_idea" in start_call[1]["context_data"]
 
-            # Verify all steps were executed
-            assert mock_execute.call_count == 6  # 5 steps + 1 no_pending_steps
+            # Verify all steps were scheduled through the dependency graph
+            mock_execute_dag.assert_called_once_with("test-execution-id")
 
             # Verify final status was checked
             mock_status.assert_called()
@@ -5,10 +5,11 @@ import asyncio
 from unittest.mock import Mock, patch, AsyncMock
 from uuid import uuid4
 
-from app.tasks.agent_tasks import process_agent_task, validate_task_data
+from app.tasks.agent_tasks import execution_key, output_artifact_id, process_agent_task, validate_task_data
 from app.models.task import TaskStatus
 from app.models.agent import AgentType
 from app.database.models import TaskDB
+from app.services.llm_scheduler import RequestPriority, _request_priority
 from uuid import UUID
 
 
@@ -87,16 +88,16 @@ class TestAgentTaskProcessing:
         assert result["priority"] == 5
 
     @patch('app.database.connection.get_session')
-    @patch('app.tasks.agent_tasks.websocket_manager')
+    @patch('app.tasks.agent_tasks.event_publisher')
     @patch('app.tasks.agent_tasks.AutoGenService')
     @patch('app.tasks.agent_tasks.ContextStoreService')
     def test_process_agent_task_failure(self, mock_context_store, mock_autogen_service,
-                                       mock_websocket_manager, mock_get_db, mock_db_session, task_data):
+                                       mock_event_publisher, mock_get_db, mock_db_session, task_data):
         """Test agent task processing failure handling."""
 
         # Setup mocks
         mock_get_db.return_value = iter([mock_db_session])
-        mock_websocket_manager.broadcast_event = AsyncMock()
+        mock_event_publisher.publish = Mock(return_value=True)
 
         # Mock AutoGen service to return failure
         mock_autogen_instance = Mock()
@@ -122,15 +123,15 @@ class TestAgentTaskProcessing:
         assert "Task execution failed" in str(exc_info.value)
         assert "LLM service unavailable" in str(exc_info.value)
 
-        # Verify WebSocket events were sent (started + failed)
-        assert mock_websocket_manager.broadcast_event.call_count == 2
+        # Verify WebSocket events were published (started + failed)
+        assert mock_event_publisher.publish.call_count == 2
 
     @patch('app.database.connection.get_session')
-    @patch('app.tasks.agent_tasks.websocket_manager')
+    @patch('app.tasks.agent_tasks.event_publisher')
     @patch('app.tasks.agent_tasks.AutoGenService')
     @patch('app.tasks.agent_tasks.ContextStoreService')
     def test_process_agent_task_with_context(self, mock_context_store, mock_autogen_service,
-                                           mock_websocket_manager, mock_get_db, mock_db_session, task_data):
+                                           mock_event_publisher, mock_get_db, mock_db_session, task_data):
         """Test agent task processing with context artifacts."""
 
         # Add context IDs to task data
@@ -139,7 +140,7 @@ class TestAgentTaskProcessing:
 
         # Setup mocks
         mock_get_db.return_value = iter([mock_db_session])
-        mock_websocket_manager.broadcast_event = AsyncMock()
+        mock_event_publisher.publish = Mock(return_value=True)
 
         # Mock AutoGen service
         mock_autogen_instance = Mock()
@@ -178,11 +179,11 @@ class TestAgentTaskProcessing:
         assert context_id in result.get("context_used", [])
 
     @patch('app.database.connection.get_session')
-    @patch('app.tasks.agent_tasks.websocket_manager')
+    @patch('app.tasks.agent_tasks.event_publisher')
     @patch('app.tasks.agent_tasks.AutoGenService')
     @patch('app.tasks.agent_tasks.ContextStoreService')
     def test_process_agent_task_database_error(self, mock_context_store, mock_autogen_service,
-                                             mock_websocket_manager, mock_get_db, task_data):
+                                             mock_event_publisher, mock_get_db, task_data):
         """Test handling of database errors during task processing."""
 
         # Setup mock to raise database error
@@ -190,7 +191,7 @@ class TestAgentTaskProcessing:
         mock_db_session.query.side_effect = Exception("Database connection failed")
         mock_get_db.return_value = iter([mock_db_session])
 
-        mock_websocket_manager.broadcast_event = AsyncMock()
+        mock_event_publisher.publish = Mock(return_value=True)
 
         # Mock services to prevent additional errors
         mock_autogen_instance = Mock()
@@ -216,7 +217,7 @@ class TestAgentTaskProcessing:
         assert result.get("success") == True
 
         # Verify WebSocket events were still sent
-        mock_websocket_manager.broadcast_event.assert_called()
+        mock_event_publisher.publish.assert_called()
 
     def test_validate_task_data_success(self, task_data):
         """Test successful task data validation."""
@@ -302,16 +303,16 @@ class TestAgentTaskProcessing:
         assert result["priority"] == 5
 
     @patch('app.database.connection.get_session')
-    @patch('app.tasks.agent_tasks.websocket_manager')
+    @patch('app.tasks.agent_tasks.event_publisher')
     @patch('app.tasks.agent_tasks.AutoGenService')
     @patch('app.tasks.agent_tasks.ContextStoreService')
     def test_process_agent_task_artifact_creation(self, mock_context_store, mock_autogen_service,
-                                                mock_websocket_manager, mock_get_db, mock_db_session, task_data):
+                                                mock_event_publisher, mock_get_db, mock_db_session, task_data):
         """Test that artifacts are properly created on task completion."""
 
         # Setup mocks
         mock_get_db.return_value = iter([mock_db_session])
-        mock_websocket_manager.broadcast_event = AsyncMock()
+        mock_event_publisher.publish = Mock(return_value=True)
 
         # Mock AutoGen service
         mock_autogen_instance = Mock()
@@ -328,6 +329,7 @@ class TestAgentTaskProcessing:
         # Mock Context Store service
         mock_context_store_instance = Mock()
         mock_context_store_instance.get_artifacts_by_ids.return_value = []
+        mock_context_store_instance.get_artifact.return_value = None
         mock_artifact = Mock()
         mock_artifact.context_id = uuid4()
         mock_context_store_instance.create_artifact.return_value = mock_artifact
@@ -346,4 +348,145 @@ class TestAgentTaskProcessing:
         assert call_args[1]["content"] == result
 
         # Verify the result includes artifact information
-        assert "artifact_id" in result or "artifact_id" in mock_websocket_manager.broadcast_event.call_args[0][0].data
+        assert "artifact_id" in result or "artifact_id" in mock_event_publisher.publish.call_args[0][0].data
+
+
+class TestIdempotentAgentTasks:
+    """Test that retries and redeliveries resume instead of repeating work."""
+
+    CELERY_TASK_ID = "celery-submission-1"
+
+    @pytest.fixture
+    def task_data(self):
+        return {
+            "task_id": str(uuid4()),
+            "project_id": str(uuid4()),
+            "agent_type": "analyst",
+            "instructions": "Analyze requirements",
+        }
+
+    @pytest.fixture
+    def agent_result(self, task_data):
+        return {"success": True, "agent_type": "analyst", "task_id": task_data["task_id"],
+                "output": "requirements analyzed", "context_used": []}
+
+    @pytest.fixture
+    def task_db(self):
+        task_db = Mock(spec=TaskDB)
+        task_db.status = TaskStatus.PENDING
+        task_db.execution_key = None
+        task_db.checkpoint = None
+        task_db.output = None
+        return task_db
+
+    @pytest.fixture
+    def services(self, task_db, agent_result):
+        """Patch the session, event bus, AutoGen service and context store."""
+        session = Mock()
+        session.query.return_value.filter.return_value.first.return_value = task_db
+        context_store = Mock()
+        context_store.get_artifacts_by_ids.return_value = []
+        context_store.get_artifact.return_value = None
+        context_store.create_artifact.return_value = Mock(context_id=uuid4())
+        autogen = Mock()
+        autogen.execute_task = AsyncMock(return_value=agent_result)
+
+        with patch('app.tasks.agent_tasks.get_session', side_effect=lambda: iter([session])), \
+             patch('app.tasks.agent_tasks.event_publisher'), \
+             patch('app.tasks.agent_tasks._idle_autogen_services', []), \
+             patch('app.tasks.agent_tasks.AutoGenService', return_value=autogen), \
+             patch('app.tasks.agent_tasks.ContextStoreService', return_value=context_store):
+            yield autogen, context_store
+
+    def run(self, task_data):
+        return process_agent_task.apply(args=[task_data], task_id=self.CELERY_TASK_ID).get()
+
+    def test_result_is_checkpointed_and_artifact_id_is_deterministic(self, services, task_data,
+                                                                      task_db, agent_result):
+        """Test a first run records its key and writes the artifact under a derived ID."""
+        autogen, context_store = services
+        key = execution_key(UUID(task_data["task_id"]), self.CELERY_TASK_ID)
+
+        assert self.run(task_data) == agent_result
+
+        autogen.execute_task.assert_awaited_once()
+        assert task_db.execution_key == key
+        assert task_db.status == TaskStatus.COMPLETED
+        assert task_db.checkpoint is None
+        assert context_store.create_artifact.call_args[1]["context_id"] == output_artifact_id(key)
+
+    def test_retry_resumes_from_checkpoint(self, services, task_data, task_db, agent_result):
+        """Test that a retry after post-processing failed skips the model call."""
+        autogen, context_store = services
+        key = execution_key(UUID(task_data["task_id"]), self.CELERY_TASK_ID)
+        task_db.execution_key = key
+        task_db.checkpoint = agent_result
+        task_db.status = TaskStatus.FAILED
+
+        assert self.run(task_data) == agent_result
+
+        autogen.execute_task.assert_not_awaited()
+        context_store.get_artifact.assert_called_once_with(output_artifact_id(key))
+        context_store.create_artifact.assert_called_once()
+        assert task_db.status == TaskStatus.COMPLETED
+
+    def test_retry_reuses_artifact_written_by_earlier_attempt(self, services, task_data, task_db,
+                                                              agent_result):
+        """Test that an artifact written before a crash is not written again."""
+        _, context_store = services
+        task_db.execution_key = execution_key(UUID(task_data["task_id"]), self.CELERY_TASK_ID)
+        task_db.checkpoint = agent_result
+        context_store.get_artifact.return_value = Mock(context_id=uuid4())
+
+        self.run(task_data)
+
+        context_store.create_artifact.assert_not_called()
+
+    @pytest.mark.parametrize("task_db", [None])
+    def test_retry_without_task_row_reuses_artifact(self, services, task_data, task_db):
+        """Test that an untracked task's retry finds its artifact instead of recreating the ID."""
+        _, context_store = services
+        key = execution_key(UUID(task_data["task_id"]), self.CELERY_TASK_ID)
+        context_store.get_artifact.return_value = Mock(context_id=output_artifact_id(key))
+
+        self.run(task_data)
+
+        context_store.get_artifact.assert_called_once_with(output_artifact_id(key))
+        context_store.create_artifact.assert_not_called()
+
+    def test_completed_submission_is_not_executed_again(self, services, task_data, task_db):
+        """Test that a redelivered, already completed task returns the stored result."""
+        autogen, context_store = services
+        task_db.execution_key = execution_key(UUID(task_data["task_id"]), self.CELERY_TASK_ID)
+        task_db.status = TaskStatus.COMPLETED
+        task_db.output = {"success": True, "output": "stored"}
+
+        assert self.run(task_data) == {"success": True, "output": "stored"}
+
+        autogen.execute_task.assert_not_awaited()
+        context_store.create_artifact.assert_not_called()
+
+    @pytest.mark.parametrize("priority, interactive, lane", [
+        (1, False, RequestPriority.NORMAL),
+        (9, False, RequestPriority.BACKGROUND),
+        (9, True, RequestPriority.HITL_BLOCKING),
+    ])
+    def test_llm_calls_use_the_task_priority_lane(self, services, task_data, agent_result,
+                                                  priority, interactive, lane):
+        """Test that the agent's LLM requests are scheduled in the lane of the task's priority class."""
+        autogen, _ = services
+        lanes = []
+
+        async def execute_task(*args):
+            lanes.append(_request_priority.get())
+            return agent_result
+
+        autogen.execute_task.side_effect = execute_task
+        task_data["priority"] = priority
+        task_data["interactive"] = interactive
+
+        with patch('app.tasks.routing.settings') as mock_settings:
+            mock_settings.celery_normal_priority_max = 3
+            self.run(task_data)
+
+        assert lanes == [lane]
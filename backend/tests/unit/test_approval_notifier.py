@@ -0,0 +1,140 @@
+"""Unit tests for event-driven HITL approval waits."""
+
+import pytest
+import asyncio
+import threading
+from uuid import uuid4
+from unittest.mock import Mock, patch
+
+import redis
+
+from app.services.approval_notifier import ApprovalNotifier
+from app.services.hitl_safety_service import HITLSafetyService
+
+
+@pytest.fixture
+def notifier():
+    """Notifier with Redis replaced by mocks."""
+    notifier = ApprovalNotifier(redis_url="redis://localhost:6379/0", channel="test:approvals")
+    notifier._client = Mock()
+    notifier._ensure_listener = Mock()
+    return notifier
+
+
+class TestApprovalNotifier:
+    """Test waking approval waiters."""
+
+    @pytest.mark.asyncio
+    async def test_decision_wakes_matching_waiter(self, notifier):
+        """Test that a decision wakes only waiters for that approval."""
+        approval_id, other_id = uuid4(), uuid4()
+
+        async with notifier.subscribe(approval_id) as subscription, \
+                notifier.subscribe(other_id) as other:
+            await notifier.notify_decision(approval_id)
+
+            assert await subscription.wait(timeout=1) is True
+            assert await other.wait(timeout=0.01) is False
+
+        notifier._client.publish.assert_called_once()
+        assert notifier.waiter_count == 0
+
+    @pytest.mark.asyncio
+    async def test_notification_before_wait_is_not_lost(self, notifier):
+        """Test that a decision arriving between subscribe and wait still wakes."""
+        approval_id = uuid4()
+
+        async with notifier.subscribe(approval_id) as subscription:
+            await notifier.notify_decision(approval_id)
+            await asyncio.sleep(0)
+
+            assert await subscription.wait(timeout=1) is True
+            assert await subscription.wait(timeout=0.01) is False
+
+    @pytest.mark.asyncio
+    async def test_emergency_stop_wakes_all_waiters(self, notifier):
+        """Test that an emergency stop wakes every registered waiter."""
+        async with notifier.subscribe(uuid4()) as first, notifier.subscribe(uuid4()) as second:
+            await notifier.notify_emergency_stop()
+
+            assert await first.wait(timeout=1) is True
+            assert await second.wait(timeout=1) is True
+
+    @pytest.mark.asyncio
+    async def test_wake_from_another_thread(self, notifier):
+        """Test that announcements from other threads are delivered safely."""
+        approval_id = uuid4()
+
+        async with notifier.subscribe(approval_id) as subscription:
+            thread = threading.Thread(target=notifier._wake, args=(str(approval_id),))
+            thread.start()
+
+            assert await subscription.wait(timeout=1) is True
+            thread.join()
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_still_wakes_local_waiters(self, notifier):
+        """Test that Redis errors do not prevent local delivery."""
+        approval_id = uuid4()
+        notifier._client.publish.side_effect = redis.ConnectionError("down")
+
+        async with notifier.subscribe(approval_id) as subscription:
+            await notifier.notify_decision(approval_id)
+
+            assert await subscription.wait(timeout=1) is True
+
+
+class TestWaitForApproval:
+    """Test that wait_for_approval resumes on notification instead of polling."""
+
+    @pytest.mark.asyncio
+    async def test_wait_resumes_on_decision(self, notifier):
+        """Test that an announced decision is picked up without a re-check delay."""
+        service = HITLSafetyService()
+        approval_id = uuid4()
+
+        approval = Mock(status="PENDING", user_response="approved", user_comment="Go")
+        db = Mock()
+        db.query.return_value.filter.return_value.first.return_value = approval
+        db.query.return_value.filter.return_value.count.return_value = 0
+
+        def session_generator():
+            yield db
+
+        async def approve_later():
+            await asyncio.sleep(0.05)
+            approval.status = "APPROVED"
+            await notifier.notify_decision(approval_id)
+
+        with patch('app.services.hitl_safety_service.get_session', side_effect=session_generator), \
+             patch('app.services.hitl_safety_service.approval_notifier', notifier), \
+             patch('app.services.hitl_safety_service.settings') as mock_settings:
+            mock_settings.hitl_approval_recheck_seconds = 60
+
+            approver = asyncio.create_task(approve_later())
+            result = await asyncio.wait_for(service.wait_for_approval(approval_id), timeout=2)
+            await approver
+
+        assert result.approved is True
+        assert db.query.return_value.filter.return_value.first.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_manual_response_approval_wakes_waiter(self, notifier):
+        """Test that approving an analyzed response announces the main approval's decision."""
+        service = HITLSafetyService()
+        approval_id = uuid4()
+        response_approval = Mock(approval_request_id=approval_id)
+        main_approval = Mock(id=approval_id)
+        db = Mock()
+        db.query.return_value.filter.return_value.first.side_effect = [response_approval, main_approval]
+
+        def session_generator():
+            yield db
+
+        with patch('app.services.hitl_safety_service.get_session', side_effect=session_generator), \
+             patch('app.services.hitl_safety_service.approval_notifier', notifier):
+            async with notifier.subscribe(approval_id) as subscription:
+                assert await service.approve_response_manually(uuid4(), True, "reviewer") is True
+
+                assert await subscription.wait(timeout=1) is True
+        assert main_approval.status == "APPROVED"
@@ -0,0 +1,200 @@
+"""Unit tests for the context artifact read-through cache."""
+
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+from unittest.mock import Mock, patch
+
+import redis
+
+from app.models.agent import AgentType
+from app.models.context import ArtifactType, ContextArtifact
+from app.services.artifact_cache import ArtifactCache
+from app.services.context_store import ContextStoreService
+
+
+def make_artifact(body: str = "x", updated_at: datetime = None) -> ContextArtifact:
+    """Build an artifact whose encoded size grows with the body."""
+    timestamp = updated_at or datetime(2024, 1, 1, 12, 0, 0)
+    return ContextArtifact(
+        project_id=uuid4(),
+        source_agent=AgentType.ANALYST,
+        artifact_type=ArtifactType.PROJECT_PLAN,
+        content={"body": body},
+        created_at=timestamp,
+        updated_at=timestamp
+    )
+
+
+@pytest.fixture
+def cache():
+    """Local-only cache with small limits."""
+    return ArtifactCache(max_entries=3, max_bytes=10_000, ttl_seconds=60, redis_enabled=False)
+
+
+class TestArtifactCache:
+    """Test the in-process and Redis cache tiers."""
+
+    def test_hit_and_miss_counters(self, cache):
+        """Test that lookups are counted as hits or misses."""
+        artifact = make_artifact()
+        cache.put(artifact)
+
+        assert cache.get(artifact.context_id) is artifact
+        assert cache.get(uuid4()) is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_least_recently_used_entry_is_evicted(self, cache):
+        """Test that the entry limit evicts the least recently read artifact."""
+        first, second, third, fourth = (make_artifact() for _ in range(4))
+        cache.put_many([first, second, third])
+        cache.get(first.context_id)
+
+        cache.put(fourth)
+
+        assert cache.get(second.context_id) is None
+        assert cache.get(first.context_id) is first
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_size_limit_evicts_and_skips_oversized_artifacts(self):
+        """Test that the byte budget bounds the local tier."""
+        first, second = make_artifact("a" * 100), make_artifact("b" * 100)
+        budget = len(first.model_dump_json()) + len(second.model_dump_json())
+        cache = ArtifactCache(max_entries=100, max_bytes=budget, ttl_seconds=60, redis_enabled=False)
+
+        cache.put_many([first, second])
+        cache.put(make_artifact("c" * 1000))
+        assert cache.get_stats()["entries"] == 2
+
+        cache.put(make_artifact("d" * 100))
+        assert cache.get(first.context_id) is None
+        assert cache.get(second.context_id) is second
+        assert cache.size_bytes <= budget
+
+    def test_updated_at_mismatch_is_a_miss(self, cache):
+        """Test that a copy older than the caller's updated_at is not returned."""
+        artifact = make_artifact()
+        cache.put(artifact)
+
+        assert cache.get(artifact.context_id, artifact.updated_at) is artifact
+        assert cache.get(artifact.context_id, artifact.updated_at + timedelta(seconds=1)) is None
+
+    def test_expired_entries_are_dropped(self):
+        """Test that entries past their TTL are not served."""
+        cache = ArtifactCache(max_entries=10, max_bytes=10_000, ttl_seconds=0, redis_enabled=False)
+        artifact = make_artifact()
+        cache.put(artifact)
+
+        assert cache.get(artifact.context_id) is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_redis_tier_fills_local_tier(self):
+        """Test that an artifact found in Redis is served and cached locally."""
+        cache = ArtifactCache(max_entries=10, max_bytes=10_000, ttl_seconds=60, redis_enabled=True)
+        artifact = make_artifact()
+        cache._client = Mock()
+        cache._client.mget.return_value = [artifact.model_dump_json()]
+
+        cached = cache.get(artifact.context_id)
+
+        assert cached.context_id == artifact.context_id
+        assert cached.content == artifact.content
+        assert cache.get_stats()["redis_hits"] == 1
+
+        cache.get(artifact.context_id)
+        cache._client.mget.assert_called_once()
+
+    def test_redis_failure_backs_off(self):
+        """Test that a Redis error disables the Redis tier until the retry delay passes."""
+        cache = ArtifactCache(max_entries=10, max_bytes=10_000, ttl_seconds=60,
+                              redis_enabled=True, redis_retry_delay=60)
+        cache._client = Mock()
+        cache._client.mget.side_effect = redis.ConnectionError("down")
+
+        assert cache.get(uuid4()) is None
+        assert cache.get(uuid4()) is None
+
+        cache._client.mget.assert_called_once()
+
+
+class TestContextStoreCaching:
+    """Test ContextStoreService reads through the artifact cache."""
+
+    @pytest.fixture
+    def service(self, db_session):
+        cache = ArtifactCache(max_entries=100, max_bytes=1_000_000, ttl_seconds=60, redis_enabled=False)
+        return ContextStoreService(db_session, cache=cache)
+
+    @pytest.fixture
+    def project(self, db_session, project_factory):
+        return project_factory.create(db_session)
+
+    def test_repeated_reads_skip_loading_content(self, service, project):
+        """Test that artifacts read by ID are served from the cache after a version check."""
+        artifact = service.create_artifact(project.id, "analyst", ArtifactType.PROJECT_PLAN, {"plan": "v1"})
+
+        with patch.object(service, "_load_by_ids", wraps=service._load_by_ids) as load:
+            assert service.get_artifact(artifact.context_id).content == {"plan": "v1"}
+            assert service.get_artifacts_by_ids([str(artifact.context_id)])[0].content == {"plan": "v1"}
+
+        load.assert_not_called()
+        assert service.cache.get_stats()["hits"] == 2
+
+    def test_update_invalidates_cached_artifact(self, service, project):
+        """Test that reads after an update see the new content."""
+        artifact = service.create_artifact(project.id, "analyst", ArtifactType.PROJECT_PLAN, {"plan": "v1"})
+        service.get_artifact(artifact.context_id)
+
+        service.update_artifact(context_id=artifact.context_id, content={"plan": "v2"})
+
+        assert service.get_artifact(artifact.context_id).content == {"plan": "v2"}
+
+    def test_delete_invalidates_cached_artifact(self, service, project):
+        """Test that a deleted artifact is no longer served."""
+        artifact = service.create_artifact(project.id, "analyst", ArtifactType.PROJECT_PLAN, {"plan": "v1"})
+
+        service.delete_artifact(artifact.context_id)
+
+        assert service.get_artifact(artifact.context_id) is None
+
+    def test_project_listing_uses_cached_content(self, service, project):
+        """Test that listings load only metadata for artifacts already cached."""
+        created = [
+            service.create_artifact(project.id, "analyst", ArtifactType.PROJECT_PLAN, {"index": index})
+            for index in range(3)
+        ]
+
+        listed = service.get_artifacts_by_project(project.id)
+
+        assert [a.content["index"] for a in listed] == [0, 1, 2]
+        assert service.cache.get_stats()["hits"] == len(created)
+
+    def test_update_in_another_process_is_not_served_stale(self, service, db_session, project):
+        """Test that a local tier the update's invalidation never reached is bypassed."""
+        artifact = service.create_artifact(project.id, "analyst", ArtifactType.PROJECT_PLAN, {"plan": "v1"})
+        service.get_artifact(artifact.context_id)
+        other_cache = ArtifactCache(max_entries=100, max_bytes=1_000_000, ttl_seconds=60, redis_enabled=False)
+        other_process = ContextStoreService(db_session, cache=other_cache)
+
+        other_process.update_artifact(context_id=artifact.context_id, content={"plan": "v2"})
+
+        assert service.get_artifact(artifact.context_id).content == {"plan": "v2"}
+        assert service.get_artifact(artifact.context_id).content == {"plan": "v2"}
+        # Hit before the remote update, miss on the stale copy, hit on the reloaded one
+        stats = service.cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_artifact_deleted_elsewhere_is_not_served(self, service, db_session, project):
+        """Test that a cached copy of an artifact deleted by another process is not returned."""
+        artifact = service.create_artifact(project.id, "analyst", ArtifactType.PROJECT_PLAN, {"plan": "v1"})
+        service.get_artifact(artifact.context_id)
+        other_cache = ArtifactCache(max_entries=100, max_bytes=1_000_000, ttl_seconds=60, redis_enabled=False)
+
+        ContextStoreService(db_session, cache=other_cache).delete_artifact(artifact.context_id)
+
+        assert service.get_artifact(artifact.context_id) is None
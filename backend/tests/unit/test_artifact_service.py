@@ -92,9 +92,6 @@ class TestArtifactGeneration:
         
         # Configure database mocks
         mock_db.query.return_value.filter.return_value.first.return_value = mock_project
-        mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
-            mock_code_artifact, mock_doc_artifact, mock_req_artifact
-        ]
         
         return mock_db, mock_project, [mock_code_artifact, mock_doc_artifact, mock_req_artifact]
     
@@ -104,7 +101,11 @@ class TestArtifactGeneration:
         mock_db, mock_project, mock_artifacts = mock_db_session
         project_id = mock_project.id
         
-        artifacts = await service.generate_project_artifacts(project_id, mock_db)
+        with patch('app.services.artifact_service.ContextStoreService') as mock_store_class:
+            mock_store_class.return_value.get_artifacts_by_project.return_value = mock_artifacts
+            artifacts = await service.generate_project_artifacts(project_id, mock_db)
+        
+        mock_store_class.return_value.get_artifacts_by_project.assert_called_once_with(project_id)
         
         # Should generate multiple artifacts
         assert len(artifacts) >= 4  # code, docs, requirements.txt, README.md, summary
@@ -142,9 +143,10 @@ class TestArtifactGeneration:
         mock_project.updated_at = datetime.now()
         
         mock_db.query.return_value.filter.return_value.first.return_value = mock_project
-        mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
         
-        artifacts = await service.generate_project_artifacts(mock_project.id, mock_db)
+        with patch('app.services.artifact_service.ContextStoreService') as mock_store_class:
+            mock_store_class.return_value.get_artifacts_by_project.return_value = []
+            artifacts = await service.generate_project_artifacts(mock_project.id, mock_db)
         
         # Should still generate basic artifacts
         assert len(artifacts) >= 2  # README.md and project_summary.md
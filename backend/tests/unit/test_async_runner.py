@@ -0,0 +1,99 @@
+"""Unit tests for the persistent worker event loop."""
+
+import asyncio
+import threading
+import pytest
+
+from app.tasks import agent_tasks
+from app.tasks.async_runner import AsyncTaskRunner
+
+
+@pytest.fixture
+def runner():
+    runner = AsyncTaskRunner(enabled=True, shutdown_timeout=2.0)
+    yield runner
+    runner.shutdown()
+
+
+async def current_loop():
+    return asyncio.get_running_loop()
+
+
+class TestAsyncTaskRunner:
+    """Test loop persistence, concurrency and error handling."""
+
+    def test_tasks_share_one_event_loop(self, runner):
+        """Test that successive coroutines run on the same long-lived loop."""
+        first = runner.run(current_loop())
+        second = runner.run(current_loop())
+
+        assert first is second
+        assert not first.is_closed()
+        assert runner.get_stats()["completed"] == 2
+
+    def test_coroutines_from_task_threads_run_concurrently(self, runner):
+        """Test that blocking task threads overlap on the shared loop."""
+        started = []
+        both_started = asyncio.Event()
+        loop = runner.run(current_loop())
+
+        async def task(label):
+            started.append(label)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=2)
+            return label
+
+        results = {}
+        threads = [threading.Thread(target=lambda n=n: results.update({n: runner.run(task(n))}))
+                   for n in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == {"a": "a", "b": "b"}
+        assert runner.get_stats()["max_concurrent"] == 2
+        assert runner.run(current_loop()) is loop
+
+    def test_errors_and_timeouts_reach_the_caller(self, runner):
+        """Test that exceptions propagate and an overrunning coroutine is cancelled."""
+        cancelled = threading.Event()
+
+        async def failing():
+            raise ValueError("agent failed")
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(ValueError, match="agent failed"):
+            runner.run(failing())
+        with pytest.raises(TimeoutError):
+            runner.run(slow(), timeout=0.05)
+
+        assert cancelled.wait(2)
+        assert runner.get_stats()["cancelled"] == 1
+
+    def test_disabled_runner_uses_a_loop_per_call(self):
+        """Test the fallback that runs each coroutine under asyncio.run."""
+        runner = AsyncTaskRunner(enabled=False)
+
+        first = runner.run(current_loop())
+
+        assert first.is_closed()
+        assert not runner.running
+
+
+def test_concurrent_tasks_lease_separate_autogen_services(monkeypatch):
+    """Test that services are reused between tasks but never shared by two at once."""
+    monkeypatch.setattr(agent_tasks, "AutoGenService", object)
+
+    with agent_tasks.lease_autogen_service() as first:
+        with agent_tasks.lease_autogen_service() as second:
+            assert second is not first
+    with agent_tasks.lease_autogen_service() as reused:
+        assert reused in (first, second)
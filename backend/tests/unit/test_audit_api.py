@@ -65,7 +65,7 @@ class TestAuditAPIEndpoints:
     
     def test_get_audit_events_success(self, client, mock_audit_events):
         """Test successful retrieval of audit events."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -102,7 +102,7 @@ class TestAuditAPIEndpoints:
     
     def test_get_audit_events_with_filters(self, client, mock_audit_events):
         """Test audit events retrieval with query filters."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -149,7 +149,7 @@ class TestAuditAPIEndpoints:
     
     def test_get_audit_event_by_id_success(self, client, mock_audit_events):
         """Test successful retrieval of specific audit event by ID."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -177,7 +177,7 @@ class TestAuditAPIEndpoints:
     
     def test_get_audit_event_by_id_not_found(self, client):
         """Test retrieval of non-existent audit event."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -206,7 +206,7 @@ class TestAuditAPIEndpoints:
     
     def test_get_project_audit_events_success(self, client, mock_audit_events):
         """Test successful retrieval of project-specific audit events."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -239,7 +239,7 @@ class TestAuditAPIEndpoints:
     
     def test_get_task_audit_events_success(self, client, mock_audit_events):
         """Test successful retrieval of task-specific audit events."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -272,7 +272,7 @@ class TestAuditAPIEndpoints:
     
     def test_audit_endpoints_database_error(self, client):
         """Test audit endpoints handle database errors gracefully."""
-        with patch('app.api.audit.get_session') as mock_get_session:
+        with patch('app.api.audit.get_async_session') as mock_get_session:
             
             # Setup failing database
             mock_db = Mock()
@@ -292,7 +292,7 @@ class TestAuditAPIEndpoints:
     
     def test_audit_pagination_parameters(self, client, mock_audit_events):
         """Test audit events pagination parameters."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -319,7 +319,7 @@ class TestAuditAPIEndpoints:
     
     def test_audit_date_range_filtering(self, client, mock_audit_events):
         """Test audit events date range filtering."""
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
@@ -358,7 +358,7 @@ class TestAuditAPIPerformance:
         """Test audit queries meet NFR-01 sub-200ms requirement."""
         import time
         
-        with patch('app.api.audit.get_session') as mock_get_session, \
+        with patch('app.api.audit.get_async_session') as mock_get_session, \
              patch('app.services.audit_service.AuditService') as mock_audit_service:
             
             # Setup mocks
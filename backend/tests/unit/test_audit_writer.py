@@ -0,0 +1,154 @@
+"""Unit tests for buffered audit event writes."""
+
+import pytest
+from unittest.mock import Mock, patch
+from uuid import uuid4
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.database.models import EventLogDB
+from app.models.event_log import EventLogFilter, EventSource, EventType
+from app.services.audit_service import AuditService
+from app.services.audit_writer import AuditDurability, AuditWriter
+
+
+@pytest.fixture
+def writer(db_session):
+    """Writer inserting through the test session, flushed explicitly."""
+    writer = AuditWriter(flush_interval=60, batch_size=3, max_queue=5, session_factory=lambda: db_session)
+    with patch("app.services.audit_service.audit_writer", writer):
+        yield writer
+    writer.clear()
+
+
+def stored(db_session):
+    return db_session.query(EventLogDB).count()
+
+
+async def log(service, index=0, project_id=None):
+    return await service.log_event(
+        event_type=EventType.TASK_CREATED,
+        event_source=EventSource.SYSTEM,
+        event_data={"index": index},
+        project_id=project_id
+    )
+
+
+def rejecting_session(missing_project_id, inserted, error=None):
+    """Session whose INSERT fails with a foreign key violation for batches naming the project."""
+    def execute(statement, rows):
+        if error is not None and len(inserted) >= 2:
+            raise error
+        if any(row["project_id"] == missing_project_id for row in rows):
+            raise IntegrityError("INSERT INTO event_log", rows, Exception("FOREIGN KEY constraint failed"))
+        inserted.extend(row["event_data"]["index"] for row in rows)
+
+    session = Mock()
+    session.execute.side_effect = execute
+    return session
+
+
+class TestBufferedAuditWrites:
+    """Test queueing, batching and durability modes."""
+
+    @pytest.mark.asyncio
+    async def test_buffered_event_returns_before_insert(self, writer, db_session):
+        """Test that a buffered event has its ID and timestamp but is written on flush."""
+        caller_session = Mock()
+        service = AuditService(caller_session, durability=AuditDurability.BUFFERED)
+
+        response = await log(service)
+
+        assert response.id is not None
+        assert response.created_at is not None
+        caller_session.commit.assert_not_called()
+        assert stored(db_session) == 0
+
+        assert await writer.flush() == 1
+        assert db_session.get(EventLogDB, response.id).event_data == {"index": 0}
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_written_in_one_flush(self, writer, db_session):
+        """Test that reaching the batch size writes every queued event together."""
+        service = AuditService(Mock(), durability="buffered")
+
+        for index in range(3):
+            await log(service, index)
+        await writer.flush()
+
+        assert stored(db_session) == 3
+        assert writer.get_stats()["flushes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reads_include_queued_events(self, writer, db_session):
+        """Test that querying the audit trail flushes this process's queued events first."""
+        service = AuditService(db_session, durability=AuditDurability.BUFFERED)
+        await log(service)
+
+        events = await service.get_events(EventLogFilter())
+
+        assert [event.event_data for event in events] == [{"index": 0}]
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_events_queued(self, writer):
+        """Test that a database error requeues rows instead of losing them."""
+        service = AuditService(Mock(), durability=AuditDurability.BUFFERED)
+        await log(service)
+        failing_session = Mock()
+        failing_session.execute.side_effect = Exception("database unavailable")
+        writer.session_factory = lambda: failing_session
+
+        assert await writer.flush() == 0
+
+        assert writer.get_stats()["pending"] == 1
+        assert writer.get_stats()["flush_failures"] == 1
+        failing_session.rollback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_rejected_row_is_dropped_without_blocking_the_batch(self, writer):
+        """Test that one row violating a foreign key is isolated and the rest are written."""
+        service = AuditService(Mock(), durability=AuditDurability.BUFFERED)
+        missing_project_id = uuid4()
+        inserted = []
+        writer.session_factory = lambda: rejecting_session(missing_project_id, inserted)
+        writer.batch_size = 10
+        for index in range(5):
+            await log(service, index, project_id=missing_project_id if index == 3 else None)
+
+        assert await writer.flush() == 4
+
+        assert sorted(inserted) == [0, 1, 2, 4]
+        stats = writer.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["pending"] == 0
+        assert stats["flush_failures"] == 0
+
+    @pytest.mark.asyncio
+    async def test_connection_error_while_splitting_requeues_unwritten_rows(self, writer):
+        """Test that a transient error requeues only the rows not yet written."""
+        service = AuditService(Mock(), durability=AuditDurability.BUFFERED)
+        missing_project_id = uuid4()
+        inserted = []
+        lost = OperationalError("INSERT INTO event_log", {}, Exception("server closed the connection"))
+        writer.session_factory = lambda: rejecting_session(missing_project_id, inserted, error=lost)
+        writer.batch_size = 10
+        for index in range(5):
+            await log(service, index, project_id=missing_project_id if index == 3 else None)
+
+        assert await writer.flush() == 2
+
+        assert inserted == [0, 1]
+        stats = writer.get_stats()
+        assert stats["pending"] == 3
+        assert stats["flush_failures"] == 1
+        assert stats["rejected"] == 0
+
+    @pytest.mark.asyncio
+    async def test_strict_mode_commits_per_event(self, writer, db_session):
+        """Test that strict callers get the event committed before log_event returns."""
+        service = AuditService(db_session, durability=AuditDurability.STRICT)
+
+        await log(service)
+
+        assert stored(db_session) == 1
+        assert writer.get_stats()["queued"] == 0
@@ -0,0 +1,128 @@
+"""Unit tests for token-budgeted context message assembly."""
+
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.models.agent import AgentType
+from app.models.context import ArtifactType, ContextArtifact
+from app.models.handoff import HandoffSchema
+from app.services.context_compactor import ContextCompactor
+from app.services.tokenizer import TokenCounter, Tokenizer
+
+
+class WordTokenizer(Tokenizer):
+    """One token per whitespace-separated word."""
+
+    name = "words"
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def make_artifact(content, source_agent=AgentType.ANALYST, artifact_type=ArtifactType.AGENT_OUTPUT,
+                  minutes_ago=0):
+    """Artifact last updated some minutes ago."""
+    timestamp = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    return ContextArtifact(project_id=uuid4(), source_agent=source_agent, artifact_type=artifact_type,
+                           content=content, created_at=timestamp, updated_at=timestamp)
+
+
+def make_handoff(instructions, to_agent="tester", expected_outputs=None):
+    """Handoff to an agent with instructions."""
+    return HandoffSchema(handoff_id=uuid4(), from_agent="coder", to_agent=to_agent, project_id=uuid4(),
+                         phase="testing", context_ids=[], instructions=instructions,
+                         expected_outputs=expected_outputs or ["test_results"])
+
+
+@pytest.fixture
+def compactor():
+    """Compactor with word-count budgets."""
+    counter = TokenCounter(use_tiktoken=False)
+    counter.register("words", WordTokenizer())
+    return ContextCompactor(budgets={"tester": 40}, default_budget=1000, max_section_tokens=20,
+                            max_entries=10, counter=counter)
+
+
+def build(compactor, artifacts, handoff):
+    return compactor.build_message(artifacts, handoff, model="words")
+
+
+class TestContextCompactor:
+    """Test deduplication, ranking, truncation and caching."""
+
+    def test_small_context_is_kept_whole(self, compactor):
+        """Test that the header and every section survive when under budget."""
+        artifact = make_artifact({"summary": "login service", "risks": "none"})
+
+        message = build(compactor, [artifact], make_handoff("Test login", to_agent="coder"))
+
+        assert message.startswith("Task: Test login\nPhase: testing\nExpected outputs: test_results")
+        assert "Artifact from analyst (agent_output):" in message
+        assert "summary: login service" in message
+        assert "risks: none" in message
+
+    def test_repeated_sections_are_sent_once(self, compactor):
+        """Test that a section restated by a newer artifact is only sent from the newer one."""
+        requirements = "users sign in with email and password"
+        prd = make_artifact({"requirements": requirements}, minutes_ago=10)
+        architecture = make_artifact({"requirements": requirements, "design": "stateless api"},
+                                     source_agent=AgentType.ARCHITECT)
+
+        message = build(compactor, [prd, architecture], make_handoff("Write tests", to_agent="coder"))
+
+        assert message.count(requirements) == 1
+        assert "Artifact from analyst" not in message
+        assert "Artifact from architect" in message
+
+    def test_equal_values_under_different_keys_are_kept(self, compactor):
+        """Test that only sections repeating both key and content count as duplicates."""
+        prd = make_artifact({"status": "pending", "blockers": []}, minutes_ago=10)
+        architecture = make_artifact({"review": "pending", "open_questions": []},
+                                     source_agent=AgentType.ARCHITECT)
+
+        message = build(compactor, [prd, architecture], make_handoff("Write tests", to_agent="coder"))
+
+        assert "status: pending" in message
+        assert "review: pending" in message
+        assert "blockers: []" in message
+        assert "open_questions: []" in message
+
+    def test_relevant_sections_win_the_budget(self, compactor):
+        """Test that sections matching the instructions are kept over unrelated ones."""
+        artifact = make_artifact({
+            "history": " ".join(["meeting notes about branding"] * 4),
+            "authentication": "password hashing uses bcrypt with per user salt",
+            "marketing": " ".join(["launch campaign ideas"] * 4),
+        })
+
+        message = build(compactor, [artifact], make_handoff("Test authentication and password hashing"))
+
+        assert "authentication: password hashing" in message
+        assert "marketing:" not in message
+        assert "sections omitted to fit the context budget" in message
+
+    def test_oversized_sections_are_truncated(self, compactor):
+        """Test that a section over the cap keeps its head and tail."""
+        text = " ".join(f"word{i}" for i in range(100))
+
+        message = build(compactor, [make_artifact({"log": text})], make_handoff("Check log", to_agent="coder"))
+
+        assert "log: word0" in message
+        assert "word99" in message
+        assert "tokens omitted" in message
+        assert "word50 " not in message
+
+    def test_sections_are_cached_per_artifact_version(self, compactor):
+        """Test that an unchanged artifact is rendered once and an update re-renders it."""
+        artifact = make_artifact({"summary": "first version"})
+        handoff = make_handoff("Summarize", to_agent="coder")
+
+        build(compactor, [artifact], handoff)
+        build(compactor, [artifact], handoff)
+        assert compactor.get_stats()["hits"] == 1
+
+        updated = artifact.model_copy(update={"content": {"summary": "second version"},
+                                              "updated_at": artifact.updated_at + timedelta(seconds=1)})
+        assert "second version" in build(compactor, [updated], handoff)
+        assert compactor.get_stats()["misses"] == 2
@@ -0,0 +1,94 @@
+"""Unit tests for projected and keyset-paginated context store reads."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.database.models import ContextArtifactDB
+from app.models.context import ArtifactType, ContextArtifact, ContextArtifactSummary
+from app.services.context_store import to_artifacts
+
+
+@pytest.fixture
+def project_artifacts(db_session, project_factory):
+    """Create a project with five artifacts one minute apart."""
+    project = project_factory.create(db_session)
+    base_time = datetime(2024, 1, 1, 12, 0, 0)
+
+    for index in range(5):
+        db_session.add(ContextArtifactDB(
+            project_id=project.id,
+            source_agent="analyst",
+            artifact_type=ArtifactType.PROJECT_PLAN if index % 2 == 0 else ArtifactType.SOURCE_CODE,
+            content={"index": index, "body": "x" * 100},
+            artifact_metadata={"index": index},
+            created_at=base_time + timedelta(minutes=index)
+        ))
+    db_session.commit()
+
+    return project
+
+
+class TestContextStoreQueries:
+    """Test batched context store read APIs."""
+
+    def test_keyset_pages_cover_all_artifacts_once(self, context_store_service, project_artifacts):
+        """Test that following cursors walks every artifact exactly once in order."""
+        seen = []
+        cursor = None
+
+        while True:
+            page = context_store_service.list_artifacts(project_artifacts.id, limit=2, after=cursor)
+            if not page:
+                break
+            seen.extend(artifact.content["index"] for artifact in page)
+            cursor = (page[-1].created_at, page[-1].context_id)
+
+        assert seen == [0, 1, 2, 3, 4]
+
+    def test_metadata_only_listing_skips_content(self, context_store_service, project_artifacts):
+        """Test that include_content=False returns summaries without content."""
+        summaries = context_store_service.list_artifacts(
+            project_artifacts.id,
+            artifact_type=ArtifactType.PROJECT_PLAN,
+            include_content=False
+        )
+
+        assert len(summaries) == 3
+        assert all(isinstance(summary, ContextArtifactSummary) for summary in summaries)
+        assert [summary.artifact_metadata["index"] for summary in summaries] == [0, 2, 4]
+
+    def test_recent_artifacts_are_newest_in_chronological_order(self, context_store_service, project_artifacts):
+        """Test that only the latest artifacts are loaded, oldest first."""
+        recent = context_store_service.get_recent_artifacts(project_artifacts.id, limit=3)
+
+        assert [artifact.content["index"] for artifact in recent] == [2, 3, 4]
+
+    def test_newest_first_pagination(self, context_store_service, project_artifacts):
+        """Test that descending pages continue from the cursor."""
+        first_page = context_store_service.list_artifacts(project_artifacts.id, limit=2, newest_first=True)
+        cursor = (first_page[-1].created_at, first_page[-1].context_id)
+        second_page = context_store_service.list_artifacts(
+            project_artifacts.id, limit=2, after=cursor, newest_first=True
+        )
+
+        assert [a.content["index"] for a in first_page + second_page] == [4, 3, 2, 1]
+
+    def test_get_artifacts_by_ids_batches_lookups(self, context_store_service, project_artifacts):
+        """Test that large ID lists are split across several IN queries."""
+        ids = [a.context_id for a in context_store_service.get_artifacts_by_project(project_artifacts.id)]
+
+        with patch("app.services.context_store.ID_BATCH_SIZE", 2):
+            artifacts = context_store_service.get_artifacts_by_ids([str(i) for i in ids])
+
+        assert sorted(a.context_id for a in artifacts) == sorted(ids)
+
+    def test_to_artifacts_converts_orm_instances(self, db_session, project_artifacts):
+        """Test that the shared converter accepts ORM rows."""
+        db_artifact = db_session.query(ContextArtifactDB).first()
+
+        artifact = to_artifacts([db_artifact])[0]
+
+        assert isinstance(artifact, ContextArtifact)
+        assert artifact.context_id == db_artifact.id
+        assert artifact.content == db_artifact.content
@@ -0,0 +1,162 @@
+"""Unit tests for the Redis-backed WebSocket event bus."""
+
+import pytest
+import asyncio
+from uuid import uuid4
+from unittest.mock import Mock, AsyncMock
+
+import redis
+
+from app.websocket.event_bus import EventBusPublisher, EventBusSubscriber
+from app.websocket.events import WebSocketEvent, EventType
+
+
+def make_event(project_id=None, **data):
+    """Create a task event for the given project."""
+    return WebSocketEvent(
+        event_type=EventType.TASK_STARTED,
+        project_id=project_id,
+        data=data
+    )
+
+
+class TestEventBusPublisher:
+    """Test publishing events from worker processes."""
+
+    @pytest.fixture
+    def publisher(self):
+        publisher = EventBusPublisher(redis_url="redis://localhost:6379/0", channel="test:events")
+        publisher._client = Mock()
+        return publisher
+
+    def test_publish_sends_serialized_event(self, publisher):
+        """Test that publish writes the JSON event to the channel."""
+        event = make_event(uuid4(), status="working")
+
+        assert publisher.publish(event) is True
+
+        pipeline = publisher._client.pipeline.return_value
+        pipeline.publish.assert_called_once_with("test:events", event.model_dump_json())
+        pipeline.execute.assert_called_once()
+
+    def test_publish_many_uses_single_round_trip(self, publisher):
+        """Test that several events share one pipeline execution."""
+        events = [make_event(uuid4(), index=i) for i in range(3)]
+
+        assert publisher.publish_many(events) == 3
+
+        pipeline = publisher._client.pipeline.return_value
+        assert pipeline.publish.call_count == 3
+        pipeline.execute.assert_called_once()
+
+    def test_publish_failure_is_not_raised(self, publisher):
+        """Test that Redis errors are logged rather than failing the task."""
+        publisher._client.pipeline.return_value.execute.side_effect = redis.ConnectionError("down")
+
+        assert publisher.publish(make_event(uuid4())) is False
+
+
+class TestEventBusSubscriber:
+    """Test relaying event bus batches to WebSocket clients."""
+
+    @pytest.fixture
+    def manager(self):
+        manager = Mock()
+        manager.broadcast_event = AsyncMock()
+        return manager
+
+    @pytest.fixture
+    def subscriber(self, manager):
+        return EventBusSubscriber(manager, redis_url="redis://localhost:6379/0", channel="test:events")
+
+    @pytest.mark.asyncio
+    async def test_dispatch_batch_preserves_per_project_order(self, subscriber, manager):
+        """Test that events for one project are delivered in publish order."""
+        project_a, project_b = uuid4(), uuid4()
+        events = [
+            make_event(project_a, index=0),
+            make_event(project_b, index=0),
+            make_event(project_a, index=1),
+            make_event(None, index=0),
+            make_event(project_a, index=2),
+        ]
+
+        delivered = await subscriber.dispatch_batch([e.model_dump_json().encode() for e in events])
+
+        assert delivered == 5
+        delivered_events = [call.args[0] for call in manager.broadcast_event.call_args_list]
+        project_a_indices = [e.data["index"] for e in delivered_events if e.project_id == project_a]
+        assert project_a_indices == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_dispatch_batch_discards_malformed_messages(self, subscriber, manager):
+        """Test that malformed payloads do not block the rest of the batch."""
+        event = make_event(uuid4())
+
+        delivered = await subscriber.dispatch_batch([b"not json", event.model_dump_json().encode()])
+
+        assert delivered == 1
+        manager.broadcast_event.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failing_project_does_not_block_others(self, subscriber, manager):
+        """Test that a delivery failure for one project leaves others unaffected."""
+        failing_project, healthy_project = uuid4(), uuid4()
+
+        async def broadcast(event):
+            if event.project_id == failing_project:
+                raise RuntimeError("socket error")
+
+        manager.broadcast_event.side_effect = broadcast
+
+        delivered = await subscriber.dispatch_batch([
+            make_event(failing_project).model_dump_json(),
+            make_event(healthy_project).model_dump_json(),
+        ])
+
+        assert delivered == 1
+
+    @pytest.mark.asyncio
+    async def test_read_batch_collects_messages_within_window(self, subscriber):
+        """Test that messages arriving inside the batch window are grouped."""
+        subscriber.batch_window = 0.05
+        messages = [{"data": b"first"}, {"data": b"second"}, None, {"data": b"third"}]
+
+        async def get_message(ignore_subscribe_messages, timeout):
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(timeout)
+            return None
+
+        pubsub = Mock()
+        pubsub.get_message = get_message
+
+        batch = await subscriber._read_batch(pubsub)
+
+        assert batch == [b"first", b"second", b"third"]
+
+    @pytest.mark.asyncio
+    async def test_read_batch_respects_max_batch_size(self, subscriber):
+        """Test that a batch is flushed once it reaches the size limit."""
+        subscriber.batch_window = 1.0
+        subscriber.max_batch_size = 2
+        pubsub = Mock()
+        pubsub.get_message = AsyncMock(return_value={"data": b"event"})
+
+        batch = await subscriber._read_batch(pubsub)
+
+        assert len(batch) == 2
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, subscriber):
+        """Test that the subscriber loop can be started and stopped cleanly."""
+        async def run_forever():
+            await asyncio.sleep(10)
+
+        subscriber._run = run_forever
+
+        await subscriber.start()
+        assert subscriber.is_running
+
+        await subscriber.stop()
+        assert not subscriber.is_running
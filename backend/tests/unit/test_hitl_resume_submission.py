@@ -0,0 +1,69 @@
+"""Unit tests for resubmitting work once a HITL request is answered."""
+
+import pytest
+from unittest.mock import patch
+
+from app.models.hitl import HitlAction
+from app.models.task import TaskStatus
+
+
+@pytest.fixture
+def submitted(mock_celery_task):
+    """Capture task data sent to Celery instead of queueing it."""
+    with patch("app.services.orchestrator.process_agent_task") as process_agent_task:
+        process_agent_task.delay.return_value = mock_celery_task
+        yield process_agent_task.delay
+
+
+class TestResumeSubmission:
+    """Test that resumed tasks are queued as interactive work."""
+
+    @pytest.mark.asyncio
+    async def test_approved_task_is_submitted_as_interactive(self, orchestrator_service, project_with_hitl,
+                                                             submitted, mock_celery_task):
+        """Test that approval queues the waiting task with interactive set."""
+        hitl_request = project_with_hitl["hitl_request"]
+
+        result = await orchestrator_service.resume_workflow_after_hitl(hitl_request.id, HitlAction.APPROVE.value)
+
+        task_data = submitted.call_args.args[0]
+        assert task_data["task_id"] == str(project_with_hitl["task"].id)
+        assert task_data["interactive"] is True
+        assert result["celery_task_id"] == mock_celery_task.id
+
+    @pytest.mark.asyncio
+    async def test_amended_content_is_appended_to_instructions(self, orchestrator_service, db_session,
+                                                               project_with_hitl, submitted):
+        """Test that amendments reach the agent with the original instructions."""
+        hitl_request = project_with_hitl["hitl_request"]
+        hitl_request.amended_content = {"scope": "backend only"}
+        db_session.commit()
+
+        await orchestrator_service.resume_workflow_after_hitl(hitl_request.id, HitlAction.AMEND.value)
+
+        instructions = submitted.call_args.args[0]["instructions"]
+        assert instructions.startswith("Test task instructions")
+        assert "backend only" in instructions
+
+    @pytest.mark.asyncio
+    async def test_rejected_task_is_not_submitted(self, orchestrator_service, project_with_hitl, submitted):
+        """Test that rejection leaves the task for rework instead of running it."""
+        hitl_request = project_with_hitl["hitl_request"]
+
+        result = await orchestrator_service.resume_workflow_after_hitl(hitl_request.id, HitlAction.REJECT.value)
+
+        submitted.assert_not_called()
+        assert result["celery_task_id"] is None
+
+    @pytest.mark.asyncio
+    async def test_task_no_longer_pending_is_not_submitted(self, orchestrator_service, db_session,
+                                                           project_with_hitl, submitted):
+        """Test that a task already picked up again is not queued twice."""
+        task = project_with_hitl["task"]
+        task.status = TaskStatus.WORKING
+        db_session.commit()
+
+        await orchestrator_service.resume_workflow_after_hitl(project_with_hitl["hitl_request"].id,
+                                                              HitlAction.APPROVE.value)
+
+        submitted.assert_not_called()
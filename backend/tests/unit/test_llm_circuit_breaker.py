@@ -0,0 +1,265 @@
+"""Unit tests for circuit breaking, hedging and failover in LLM retries."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+from app.models.task import Task
+from app.services import autogen_service, llm_retry
+from app.services.autogen_service import AutoGenService
+from app.services.llm_retry import (
+    CircuitBreaker, CircuitOpenError, CircuitState, FailoverTarget, LLMRetryHandler,
+    RetryConfig, RetryResult, circuit_breakers, mark_provider_start, mark_queued
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("openai:gpt-4o-mini", failure_threshold=0.5, min_calls=4,
+                          window_seconds=60, open_seconds=30, clock=clock)
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """Fast retries; circuits open after three provider failures."""
+    monkeypatch.setattr(llm_retry.settings, "llm_circuit_min_calls", 3)
+    monkeypatch.setattr(llm_retry.settings, "llm_circuit_failure_threshold", 0.5)
+    monkeypatch.setattr(llm_retry.settings, "llm_circuit_open_seconds", 30)
+    return LLMRetryHandler(RetryConfig(max_retries=5, base_delay=0.001, jitter=False))
+
+
+class TestCircuitBreaker:
+    """Test state transitions and the sliding window."""
+
+    def test_opens_when_failure_rate_reaches_threshold(self, breaker):
+        """Test that the circuit opens only once enough calls have been seen."""
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+
+    def test_old_failures_leave_the_window(self, breaker, clock):
+        """Test that failures older than the window no longer count."""
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 120
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_stats()["window_calls"] == 1
+
+    def test_half_open_probe_closes_or_reopens(self, breaker, clock):
+        """Test that one probe is allowed after the open period and decides the state."""
+        for _ in range(4):
+            breaker.record_failure()
+
+        clock.now = 30
+        assert breaker.allow_request()
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert not breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+
+        clock.now = 60
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.times_opened == 2
+
+
+@pytest.mark.asyncio
+class TestRetryHandlerCircuits:
+    """Test the retry handler with shared circuits, failover and hedging."""
+
+    async def test_open_circuit_stops_retries(self, handler):
+        """Test that a dead endpoint is not retried once its circuit opens."""
+        calls = []
+
+        async def failing_call():
+            calls.append(1)
+            raise ConnectionError("connection reset")
+
+        result = await handler.execute_with_retry(failing_call, circuit=("openai", "gpt-4o-mini"))
+
+        assert not result.success
+        assert isinstance(result.final_error, CircuitOpenError)
+        assert len(calls) == 3
+        assert handler.get_retry_stats()["circuit_rejections"] == 1
+
+    async def test_circuits_are_shared_across_handlers(self, handler):
+        """Test that another handler fails fast on a circuit opened elsewhere."""
+        for _ in range(3):
+            circuit_breakers.get("openai", "gpt-4o").record_failure()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            return "ok"
+
+        other = LLMRetryHandler(RetryConfig(max_retries=2, base_delay=0.001, jitter=False))
+        result = await other.execute_with_retry(call, circuit=("openai", "gpt-4o"))
+
+        assert isinstance(result.final_error, CircuitOpenError)
+        assert calls == []
+
+    async def test_fails_over_while_primary_circuit_is_open(self, handler):
+        """Test that calls move to the alternate model and report it."""
+        async def primary():
+            raise TimeoutError("request timed out")
+
+        async def alternate():
+            return "from failover"
+
+        result = await handler.execute_with_retry(
+            primary,
+            circuit=("openai", "gpt-4o-mini"),
+            failover=FailoverTarget(provider="openai", model="gpt-4o", call=alternate)
+        )
+
+        assert result.success
+        assert result.result == "from failover"
+        assert result.model == "gpt-4o"
+        assert result.failed_over
+        assert result.total_attempts == 4
+
+    async def test_request_errors_do_not_trip_the_circuit(self, handler):
+        """Test that errors caused by the request itself leave the circuit closed."""
+        async def bad_request():
+            raise ValueError("invalid request payload")
+
+        for _ in range(3):
+            await handler.execute_with_retry(bad_request, circuit=("openai", "gpt-4o-mini"))
+
+        assert circuit_breakers.get("openai", "gpt-4o-mini").state == CircuitState.CLOSED
+
+    async def test_slow_call_is_hedged(self, handler, monkeypatch):
+        """Test that a call past the p95 latency is duplicated and the first answer wins."""
+        monkeypatch.setattr(llm_retry.settings, "llm_hedge_min_delay_ms", 0)
+        breaker = circuit_breakers.get("openai", "gpt-4o-mini")
+        for _ in range(20):
+            breaker.record_success(0.01)
+        primary_cancelled = asyncio.Event()
+
+        async def slow_call():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+            return "slow"
+
+        async def hedge_call():
+            return "hedge"
+
+        result = await handler.execute_with_retry(slow_call, circuit=("openai", "gpt-4o-mini"),
+                                                  hedge_call=hedge_call)
+        await asyncio.sleep(0)
+
+        assert result.result == "hedge"
+        assert result.hedged
+        assert primary_cancelled.is_set()
+        assert handler.get_retry_stats()["hedge_wins"] == 1
+        # The cancelled primary's latency is unknown, so no sample is recorded
+        assert len(breaker._latencies) == 20
+
+    async def test_call_queued_past_the_delay_is_not_hedged(self, handler, monkeypatch):
+        """Test that the hedge delay only runs once the call has reached the provider."""
+        monkeypatch.setattr(llm_retry.settings, "llm_hedge_min_delay_ms", 0)
+        breaker = circuit_breakers.get("openai", "gpt-4o-mini")
+        for _ in range(20):
+            breaker.record_success(0.05)
+        hedge_call = AsyncMock(return_value="hedge")
+
+        async def queued_call():
+            mark_queued()
+            await asyncio.sleep(0.2)
+            mark_provider_start()
+            await asyncio.sleep(0.01)
+            return "primary"
+
+        result = await handler.execute_with_retry(queued_call, circuit=("openai", "gpt-4o-mini"),
+                                                  hedge_call=hedge_call)
+
+        assert result.result == "primary"
+        assert not result.hedged
+        hedge_call.assert_not_awaited()
+        assert handler.get_retry_stats()["hedged_calls"] == 0
+
+    async def test_latency_excludes_time_queued_before_the_provider(self, handler):
+        """Test that the p95 samples only measure time after the call reaches the provider."""
+        async def queued_call():
+            await asyncio.sleep(0.2)
+            mark_provider_start()
+            return "ok"
+
+        await handler.execute_with_retry(queued_call, circuit=("openai", "gpt-4o-mini"))
+
+        assert list(circuit_breakers.get("openai", "gpt-4o-mini")._latencies)[0] < 0.1
+
+
+class TestAgentDispatch:
+    """Test that agent calls are guarded under the model the agent was created with."""
+
+    @pytest.mark.asyncio
+    async def test_autogen_calls_use_the_configured_model(self, monkeypatch):
+        """Test that the circuit and failover comparison use the agent's model, not a default."""
+        monkeypatch.setattr(llm_retry.settings, "llm_streaming_enabled", False)
+        monkeypatch.setattr(llm_retry.settings, "llm_failover_model", "gpt-4o")
+        service = AutoGenService()
+        agent = Mock()
+        agent.name = "architect_agent"
+        agent.on_messages = AsyncMock(return_value=Mock(messages=[Mock(content="{\"plan\": \"ok\"}")]))
+        service.agent_configs[agent.name] = {"model": "gpt-4o", "temperature": 0.7, "system_message": "Design"}
+
+        task = Task(project_id=uuid4(), agent_type="architect", instructions="Design it")
+        await service.run_single_agent_conversation(agent, "Design it", task)
+
+        agent.on_messages.assert_awaited_once()
+        assert circuit_breakers.get("openai", "gpt-4o").get_stats()["window_calls"] == 1
+        assert circuit_breakers.get("openai", "gpt-4o-mini").get_stats()["window_calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failover_response_is_not_cached_for_the_requested_model(self, monkeypatch):
+        """Test that an answer from the failover model is not replayed for the primary model."""
+        monkeypatch.setattr(llm_retry.settings, "llm_streaming_enabled", False)
+        cache = Mock()
+        cache.is_cacheable.return_value = True
+        cache.get.return_value = None
+        monkeypatch.setattr(autogen_service, "llm_response_cache", cache)
+        response = Mock(messages=[Mock(content="{\"plan\": \"ok\"}")])
+        monkeypatch.setattr(autogen_service, "dispatch_agent_call", AsyncMock(
+            return_value=RetryResult(success=True, result=response, total_attempts=1,
+                                     model="gpt-4o", failed_over=True)
+        ))
+        service = AutoGenService()
+        agent = Mock()
+        agent.name = "architect_agent"
+        service.agent_configs[agent.name] = {"model": "gpt-4o-mini", "temperature": 0.0, "system_message": "Design"}
+
+        task = Task(project_id=uuid4(), agent_type="architect", instructions="Design it")
+        await service.run_single_agent_conversation(agent, "Design it", task)
+
+        cache.get.assert_called_once()
+        cache.set.assert_not_called()
@@ -366,16 +366,17 @@ class TestLLMUsageTracker:
     
     def test_estimate_tokens_code(self, usage_tracker):
         """Test token estimation for code content."""
+        from app.services.tokenizer import token_counter
+        
         code = """
         def hello_world():
             return {"message": "Hello, world!"}
         """
         tokens = usage_tracker.estimate_tokens(code, is_input=True)
         
-        # Code should have higher token density (1.3x multiplier)
-        base_estimate = max(1, len(code) // 4)
-        expected_tokens = int(base_estimate * 1.3)
-        assert abs(tokens - expected_tokens) <= 3
+        # Code is counted by the model's tokenizer rather than a flat multiplier
+        assert tokens == token_counter.count(code, "gpt-4o-mini")
+        assert 10 <= tokens <= len(code) // 3
     
     @pytest.mark.asyncio
     async def test_generate_usage_report_empty_data(self, usage_tracker):
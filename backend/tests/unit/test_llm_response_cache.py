@@ -0,0 +1,119 @@
+"""Unit tests for the LLM response cache."""
+
+import pytest
+import os
+import time
+from unittest.mock import Mock
+
+import redis
+
+from app.services.llm_monitoring import LLMUsageTracker
+from app.services.llm_response_cache import LLMResponseCache, prompt_fingerprint
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    """Enabled disk-backed cache in a temporary directory."""
+    return LLMResponseCache(enabled=True, backend="disk", ttl_seconds=60,
+                            max_bytes=10_000, cache_dir=str(tmp_path))
+
+
+class TestPromptFingerprint:
+    """Test prompt fingerprinting."""
+
+    def test_identical_prompts_share_a_key(self):
+        """Test that the same inputs always hash to the same key."""
+        messages = [("system", "You are an analyst."), ("user", "Analyze this")]
+
+        assert prompt_fingerprint("gpt-4o-mini", 0, messages) == prompt_fingerprint("gpt-4o-mini", 0.0, messages)
+
+    @pytest.mark.parametrize("model, temperature, user_message, agent_type", [
+        ("gpt-4o", 0, "Analyze this", "analyst"),
+        ("gpt-4o-mini", 0.2, "Analyze this", "analyst"),
+        ("gpt-4o-mini", 0, "Analyze that", "analyst"),
+        ("gpt-4o-mini", 0, "Analyze this", "architect"),
+    ])
+    def test_any_input_change_changes_the_key(self, model, temperature, user_message, agent_type):
+        """Test that model, temperature, messages and agent all affect the key."""
+        base = prompt_fingerprint("gpt-4o-mini", 0, [("user", "Analyze this")], agent_type="analyst")
+
+        assert prompt_fingerprint(model, temperature, [("user", user_message)], agent_type=agent_type) != base
+
+
+class TestLLMResponseCache:
+    """Test response cache backends and bypass rules."""
+
+    def test_disabled_by_default_and_bypassed_above_zero_temperature(self):
+        """Test that caching is opt-in and limited to deterministic calls unless forced."""
+        assert LLMResponseCache(enabled=False, backend="disk").is_cacheable(0) is False
+        assert LLMResponseCache(enabled=True, backend="disk").is_cacheable(0) is True
+        assert LLMResponseCache(enabled=True, backend="disk", force=False).is_cacheable(0.7) is False
+        assert LLMResponseCache(enabled=True, backend="disk", force=True).is_cacheable(0.7) is True
+
+    def test_disk_round_trip_counts_hits_and_misses(self, disk_cache):
+        """Test that a stored response is returned for the same key."""
+        assert disk_cache.get("abc") is None
+
+        disk_cache.set("abc", '{"plan": "ok"}')
+
+        assert disk_cache.get("abc") == '{"plan": "ok"}'
+        stats = disk_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_disk_entries_expire(self, tmp_path):
+        """Test that entries past their TTL are treated as misses."""
+        cache = LLMResponseCache(enabled=True, backend="disk", ttl_seconds=0, cache_dir=str(tmp_path))
+        cache.set("abc", "response")
+
+        assert cache.get("abc") is None
+        assert not (tmp_path / "abc.json").exists()
+
+    def test_disk_size_limit_evicts_least_recently_used(self, disk_cache, tmp_path):
+        """Test that the oldest entries are removed once max_bytes is exceeded."""
+        disk_cache.max_bytes = 2_500
+        disk_cache.set("old", "x" * 1000)
+        past = time.time() - 30
+        os.utime(tmp_path / "old.json", (past, past))
+
+        disk_cache.set("new", "y" * 1000)
+        disk_cache.set("newest", "z" * 1000)
+
+        assert disk_cache.get("old") is None
+        assert disk_cache.get("newest") == "z" * 1000
+        assert disk_cache.get_stats()["evictions"] >= 1
+
+    def test_redis_backend_stores_with_ttl(self):
+        """Test that the Redis backend sets an expiry on stored responses."""
+        cache = LLMResponseCache(enabled=True, backend="redis", ttl_seconds=120)
+        cache._client = Mock()
+        cache._client.get.return_value = b"cached"
+
+        cache.set("abc", "response")
+
+        cache._client.set.assert_called_once_with("botarmy:llm_response:abc", "response", ex=120)
+        assert cache.get("abc") == "cached"
+
+    def test_redis_errors_are_misses(self):
+        """Test that an unavailable Redis does not break agent calls."""
+        cache = LLMResponseCache(enabled=True, backend="redis")
+        cache._client = Mock()
+        cache._client.get.side_effect = redis.ConnectionError("down")
+        cache._client.set.side_effect = redis.ConnectionError("down")
+
+        cache.set("abc", "response")
+
+        assert cache.get("abc") is None
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_are_tracked_as_zero_cost(self):
+        """Test that the usage tracker counts cache hits separately."""
+        tracker = LLMUsageTracker(enable_tracking=True)
+
+        await tracker.track_request(agent_type="analyst", tokens_used=0, response_time=1.0,
+                                    cost=0.0, input_tokens=0, output_tokens=0, cache_hit=True)
+
+        stats = tracker.get_session_stats()
+        assert stats["cache_hits"] == 1
+        assert stats["total_cost"] == 0.0
+        assert tracker.usage_history[0].cache_hit is True
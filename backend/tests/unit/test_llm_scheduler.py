@@ -0,0 +1,193 @@
+"""Unit tests for the shared LLM request scheduler."""
+
+import asyncio
+import pytest
+from uuid import uuid4
+
+from app.services.llm_monitoring import LLMUsageTracker
+from app.services.llm_scheduler import LLMRequestScheduler, RequestPriority, TokenBucket, request_priority
+from app.services.llm_usage_store import LLMUsageStore
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RateLimitError(Exception):
+    """Provider 429 carrying a Retry-After hint."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+def make_scheduler(**kwargs):
+    kwargs.setdefault("max_in_flight", 1)
+    kwargs.setdefault("requests_per_minute", 0)
+    kwargs.setdefault("tokens_per_minute", 0)
+    return LLMRequestScheduler(enabled=True, **kwargs)
+
+
+async def request(scheduler, order, label, **kwargs):
+    """Acquire a slot, note the grant order and release it on the next loop turn."""
+    async with scheduler.acquire("openai", "gpt-4o-mini", **kwargs) as ticket:
+        order.append(label)
+        await asyncio.sleep(0)
+        return ticket
+
+
+async def run_behind_holder(scheduler, requests):
+    """Start requests while another request holds the only slot, then release it."""
+    order = []
+    release = asyncio.Event()
+
+    async def holder():
+        async with scheduler.acquire("openai", "gpt-4o-mini"):
+            await release.wait()
+
+    holding = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    tasks = []
+    for label, kwargs in requests:
+        tasks.append(asyncio.create_task(request(scheduler, order, label, **kwargs)))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holding, *tasks)
+    return order
+
+
+class TestTokenBucket:
+    """Test refill and rate-limit pauses."""
+
+    def test_refills_at_the_per_minute_rate(self):
+        """Test that an empty bucket reports the time until enough units return."""
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=60, clock=clock)
+        bucket.consume(60)
+
+        assert bucket.wait_time(2) == pytest.approx(2.0)
+        clock.now = 1.0
+        assert bucket.wait_time(2) == pytest.approx(1.0)
+        assert bucket.wait_time(1000) == pytest.approx(59.0)
+
+    def test_pause_holds_back_requests(self):
+        """Test that a paused bucket grants nothing until the pause ends."""
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=600, clock=clock)
+
+        bucket.pause(5)
+
+        assert bucket.wait_time(1) == pytest.approx(5.0)
+        clock.now = 5.1
+        assert bucket.wait_time(1) == pytest.approx(0.0)
+        assert TokenBucket(per_minute=0, clock=clock).wait_time(10 ** 9) == 0.0
+
+
+@pytest.mark.asyncio
+class TestLLMRequestScheduler:
+    """Test admission order, rate limits and queue-time accounting."""
+
+    async def test_hitl_blocking_requests_are_served_first(self):
+        """Test that the HITL lane jumps ahead of earlier ordinary requests."""
+        scheduler = make_scheduler()
+
+        order = await run_behind_holder(scheduler, [
+            ("normal", {}),
+            ("background", {"priority": RequestPriority.BACKGROUND}),
+            ("hitl", {"priority": RequestPriority.HITL_BLOCKING}),
+        ])
+
+        assert order == ["hitl", "normal", "background"]
+
+    async def test_priority_follows_the_request_context(self):
+        """Test that requests inherit the lane set by request_priority."""
+        scheduler = make_scheduler()
+        order = []
+
+        with request_priority(RequestPriority.HITL_BLOCKING):
+            ticket = await request(scheduler, order, "hitl")
+
+        assert ticket.priority == RequestPriority.HITL_BLOCKING
+
+    async def test_projects_take_turns_within_a_lane(self):
+        """Test round-robin between projects so a busy project cannot starve others."""
+        scheduler = make_scheduler()
+        busy, quiet = uuid4(), uuid4()
+
+        order = await run_behind_holder(scheduler, [
+            ("busy-1", {"project_id": busy}),
+            ("busy-2", {"project_id": busy}),
+            ("busy-3", {"project_id": busy}),
+            ("quiet-1", {"project_id": quiet}),
+        ])
+
+        assert order == ["busy-1", "quiet-1", "busy-2", "busy-3"]
+
+    async def test_token_budget_delays_requests(self):
+        """Test that a drained token bucket queues the next request until it refills."""
+        scheduler = make_scheduler(max_in_flight=4, tokens_per_minute=6000)
+        order = []
+
+        await request(scheduler, order, "large", tokens=6000)
+        ticket = await request(scheduler, order, "small", tokens=10)
+
+        assert ticket.queued_ms >= 80
+        assert scheduler.get_stats()["in_flight"] == 0
+
+    async def test_rate_limit_error_pauses_the_model(self):
+        """Test that a 429 pauses the bucket for the Retry-After interval."""
+        scheduler = make_scheduler(max_in_flight=4, requests_per_minute=6000)
+        order = []
+
+        with pytest.raises(RateLimitError):
+            async with scheduler.acquire("openai", "gpt-4o-mini"):
+                raise RateLimitError(retry_after=0.1)
+        ticket = await request(scheduler, order, "after-429")
+
+        assert ticket.queued_ms >= 80
+        assert scheduler.get_stats()["throttled"] == 1
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        """Test that a cancelled request does not hold a slot or a queue position."""
+        scheduler = make_scheduler()
+        order = []
+        release = asyncio.Event()
+
+        async def holder():
+            async with scheduler.acquire("openai", "gpt-4o-mini"):
+                await release.wait()
+
+        holding = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(request(scheduler, order, "cancelled"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        release.set()
+        await holding
+        await request(scheduler, order, "next")
+
+        assert order == ["next"]
+        assert scheduler.get_stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_time_is_reported():
+    """Test that scheduler wait time reaches usage reports."""
+    tracker = LLMUsageTracker(store=LLMUsageStore(ring_size=10, persist=False))
+    await tracker.track_request(agent_type="tester", tokens_used=100, response_time=1500.0, cost=0.001,
+                                input_tokens=80, output_tokens=20, queued_time_ms=500.0)
+    await tracker.track_request(agent_type="tester", tokens_used=100, response_time=1000.0, cost=0.001,
+                                input_tokens=80, output_tokens=20)
+
+    report = await tracker.generate_usage_report()
+
+    assert report.cost_breakdown.average_queued_time == pytest.approx(250.0)
+    assert report.response_time_percentiles["queued"]["p50"] == pytest.approx(250.0)
@@ -0,0 +1,162 @@
+"""Unit tests for streaming agent responses to WebSocket clients."""
+
+import pytest
+from uuid import uuid4
+from unittest.mock import AsyncMock, Mock, patch
+
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent, TextMessage
+
+from app.models.task import Task
+from app.services.autogen_service import AutoGenService
+from app.services.llm_streaming import ResponseStreamBatcher, stream_agent_response
+from app.websocket.events import EventType
+
+
+class FakeClock:
+    """Monotonic clock advanced only by the test."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_batcher(interval_ms: int = 100, clock=None):
+    """Batcher that records sent events instead of publishing them."""
+    sent = []
+
+    async def sink(event):
+        sent.append(event)
+
+    batcher = ResponseStreamBatcher(uuid4(), uuid4(), "architect", interval_ms=interval_ms, sink=sink,
+                                    clock=clock or FakeClock())
+    return batcher, sent
+
+
+def make_streaming_agent(chunks, final_text):
+    """Agent whose stream yields the given chunks followed by a Response."""
+    async def on_messages_stream(messages, cancellation_token=None):
+        for chunk in chunks:
+            yield ModelClientStreamingChunkEvent(content=chunk, source="architect_agent")
+        response = Response(chat_message=TextMessage(content=final_text, source="architect_agent"))
+        response.messages = [response.chat_message]
+        yield response
+
+    agent = Mock()
+    agent.on_messages_stream = on_messages_stream
+    return agent
+
+
+class TestResponseStreamBatcher:
+    """Test chunk batching and stream events."""
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_is_sent_immediately_and_rest_batched(self):
+        """Test that chunks within the interval are combined into one event."""
+        batcher, sent = make_batcher(interval_ms=100)
+
+        for chunk in ["{", "\"design\"", ": ", "\"ok\"", "}"]:
+            await batcher.add(chunk)
+
+        assert [event.data["chunk"] for event in sent] == ["{"]
+
+        await batcher.finish(validated=True, final_text="{\"design\": \"ok\"}")
+
+        assert [event.data.get("chunk") for event in sent] == ["{", "\"design\": \"ok\"}", None]
+        assert sent[-1].data == {"sequence": 3, "done": True, "validated": True, "length": 16}
+        assert all(event.event_type == EventType.AGENT_RESPONSE_CHUNK for event in sent)
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_sent_once_the_interval_elapses(self):
+        """Test that a held chunk goes out with the first chunk after the interval."""
+        clock = FakeClock()
+        batcher, sent = make_batcher(interval_ms=100, clock=clock)
+
+        await batcher.add("a")
+        clock.now += 0.05
+        await batcher.add("b")
+        clock.now += 0.05
+        await batcher.add("c")
+
+        assert [event.data["chunk"] for event in sent] == ["a", "bc"]
+
+    @pytest.mark.asyncio
+    async def test_finish_reports_length_of_returned_response(self):
+        """Test that the final event describes the sanitized response, not the raw stream."""
+        batcher, sent = make_batcher(interval_ms=0)
+        await batcher.add("  {\"plan\": \"ok\"}  ")
+
+        await batcher.finish(validated=True, final_text="{\"plan\": \"ok\"}")
+
+        assert sent[-1].data["length"] == 14
+
+    @pytest.mark.asyncio
+    async def test_zero_interval_sends_every_chunk(self):
+        """Test that each chunk is its own event when batching is disabled."""
+        batcher, sent = make_batcher(interval_ms=0)
+
+        for chunk in ["a", "b", "c"]:
+            await batcher.add(chunk)
+
+        assert [event.data["sequence"] for event in sent] == [1, 2, 3]
+        assert batcher.text == "abc"
+
+    @pytest.mark.asyncio
+    async def test_restart_discards_previous_attempt(self):
+        """Test that a retried call tells clients to drop the streamed text."""
+        batcher, sent = make_batcher(interval_ms=0)
+        await batcher.add("partial")
+
+        await batcher.restart()
+
+        assert sent[-1].data == {"sequence": 2, "restart": True}
+        assert batcher.text == ""
+
+    @pytest.mark.asyncio
+    async def test_sink_errors_do_not_interrupt_the_stream(self):
+        """Test that delivery failures are logged and ignored."""
+        batcher = ResponseStreamBatcher(uuid4(), uuid4(), "architect", interval_ms=0,
+                                        sink=AsyncMock(side_effect=ConnectionError("down")))
+
+        await batcher.add("chunk")
+        await batcher.finish(validated=True)
+
+        assert batcher.text == "chunk"
+
+
+class TestStreamAgentResponse:
+    """Test running agents through the streaming interface."""
+
+    @pytest.mark.asyncio
+    async def test_returns_final_response_after_streaming_chunks(self):
+        """Test that chunks are forwarded and the final Response is returned."""
+        batcher, sent = make_batcher(interval_ms=0)
+        agent = make_streaming_agent(["{\"plan\": ", "\"ok\"}"], "{\"plan\": \"ok\"}")
+
+        response = await stream_agent_response(agent, [], batcher)
+
+        assert response.chat_message.content == "{\"plan\": \"ok\"}"
+        assert batcher.text == "{\"plan\": \"ok\"}"
+        assert [event.data["chunk"] for event in sent] == ["{\"plan\": ", "\"ok\"}"]
+
+    @pytest.mark.asyncio
+    async def test_service_validates_assembled_stream(self):
+        """Test that streamed responses still go through response validation."""
+        service = AutoGenService()
+        agent = make_streaming_agent(["{\"plan\": ", "\"ok\"}"], "{\"plan\": \"ok\"}")
+        task = Task(project_id=uuid4(), agent_type="architect", instructions="Design it")
+        sent = []
+
+        with patch("app.services.autogen_service.settings.llm_streaming_enabled", True), \
+                patch("app.services.llm_streaming.publish_event", AsyncMock(side_effect=sent.append)), \
+                patch.object(service.response_validator, "validate_response",
+                             wraps=service.response_validator.validate_response) as validate:
+            result = await service.run_single_agent_conversation(agent, "Design it", task)
+
+        validate.assert_called_once_with("{\"plan\": \"ok\"}", expected_format="auto")
+        assert "plan" in result
+        assert sent[-1].data["done"] is True
+        assert sent[-1].data["validated"] is True
+        assert sent[-1].data["length"] == len(result)
@@ -0,0 +1,131 @@
+"""Unit tests for the shared, bounded LLM usage store."""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from unittest.mock import Mock
+
+from app.database.models import LLMUsageRollupDB
+from app.services.llm_monitoring import LLMUsageTracker, UsageMetrics
+from app.services.llm_usage_store import LLMUsageStore
+
+
+def make_metrics(agent_type="analyst", timestamp=None, project_id=None, success=True, **kwargs):
+    """Usage metrics for a single request."""
+    return UsageMetrics(
+        timestamp=timestamp or datetime.now(timezone.utc),
+        agent_type=agent_type,
+        project_id=project_id,
+        task_id=None,
+        tokens_used=kwargs.pop("tokens_used", 100),
+        input_tokens=kwargs.pop("input_tokens", 70),
+        output_tokens=kwargs.pop("output_tokens", 30),
+        response_time_ms=kwargs.pop("response_time_ms", 1000.0),
+        estimated_cost=kwargs.pop("estimated_cost", 0.001),
+        success=success,
+        **kwargs
+    )
+
+
+@pytest.fixture
+def store(db_session):
+    """Persisting store that writes through the test session."""
+    return LLMUsageStore(ring_size=5, flush_interval=60, persist=True,
+                         session_factory=lambda: db_session)
+
+
+class TestLLMUsageStore:
+    """Test the ring buffer and per-minute rollups."""
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that memory stays flat no matter how many requests are recorded."""
+        store = LLMUsageStore(ring_size=3, persist=False)
+
+        for index in range(10):
+            store.record(make_metrics(tokens_used=index))
+
+        assert [m.tokens_used for m in store.recent] == [7, 8, 9]
+        assert store.get_stats()["recorded"] == 10
+
+    def test_requests_in_the_same_minute_share_a_rollup(self, store):
+        """Test that rollups are keyed by minute, project, agent, model and error type."""
+        minute = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+        store.record(make_metrics(timestamp=minute + timedelta(seconds=5)))
+        store.record(make_metrics(timestamp=minute + timedelta(seconds=50)))
+        store.record(make_metrics(timestamp=minute + timedelta(minutes=1)))
+        store.record(make_metrics(timestamp=minute, success=False, error_type="TimeoutError"))
+
+        assert store.get_stats()["pending_rollups"] == 3
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_rollups_in_one_batch(self, store, db_session):
+        """Test that pending rollups become rows and are summed by reports."""
+        project_id = uuid4()
+        for _ in range(4):
+            store.record(make_metrics(project_id=project_id, estimated_cost=0.25))
+
+        assert await store.flush() == 1
+
+        row = db_session.query(LLMUsageRollupDB).one()
+        assert row.request_count == 4
+        assert row.total_cost == pytest.approx(1.0)
+        assert store.get_stats()["pending_rollups"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rollups_include_flushed_and_pending_usage(self, store):
+        """Test that reports combine stored rows with unflushed usage."""
+        project_id = uuid4()
+        store.record(make_metrics(project_id=project_id, tokens_used=100))
+        await store.flush()
+        store.record(make_metrics(project_id=project_id, tokens_used=50))
+        store.record(make_metrics(project_id=uuid4(), tokens_used=1000))
+
+        now = datetime.now(timezone.utc)
+        rollups = await store.get_rollups(project_id, now - timedelta(hours=1), now)
+
+        assert len(rollups) == 1
+        assert rollups[0].request_count == 2
+        assert rollups[0].tokens_used == 150
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_rollups_for_retry(self):
+        """Test that rollups survive a database outage."""
+        session = Mock()
+        session.execute.side_effect = ConnectionError("database unavailable")
+        store = LLMUsageStore(ring_size=5, flush_interval=60, persist=True, session_factory=lambda: session)
+        store.record(make_metrics())
+
+        assert await store.flush() == 0
+
+        session.rollback.assert_called_once()
+        assert store.get_stats()["pending_rollups"] == 1
+        assert store.get_stats()["flush_failures"] == 1
+
+
+class TestTrackerReports:
+    """Test that tracker reports are built from the shared store."""
+
+    @pytest.mark.asyncio
+    async def test_trackers_share_usage(self):
+        """Test that usage recorded by one tracker appears in another's report."""
+        store = LLMUsageStore(ring_size=100, persist=False)
+        agent_tracker = LLMUsageTracker(store=store)
+        hitl_tracker = LLMUsageTracker(store=store)
+
+        await agent_tracker.track_request(agent_type="architect", tokens_used=400, response_time=2000.0,
+                                          cost=0.02, input_tokens=300, output_tokens=100)
+        await agent_tracker.track_request(agent_type="coder", tokens_used=100, response_time=1000.0,
+                                          cost=0.0, success=False, error_type="RateLimitError",
+                                          retry_count=2, input_tokens=100, output_tokens=0)
+
+        report = await hitl_tracker.generate_usage_report()
+
+        assert report.cost_breakdown.request_count == 2
+        assert report.cost_breakdown.success_rate == 0.5
+        assert report.cost_breakdown.average_response_time == 1500.0
+        assert report.top_agents_by_cost[0]["agent_type"] == "architect"
+        assert report.error_analysis["error_types"]["RateLimitError"] == {
+            "count": 1, "agents_affected": ["coder"], "avg_retry_count": 2.0
+        }
+        assert sum(h["request_count"] for h in report.hourly_distribution.values()) == 2
@@ -0,0 +1,53 @@
+"""Unit tests for the per-process model client pool."""
+
+import asyncio
+import pytest
+
+from app.services.model_client_pool import ModelClientPool
+
+
+@pytest.fixture
+def pool():
+    return ModelClientPool(enabled=True, max_keepalive_connections=4, keepalive_expiry=5.0)
+
+
+class TestModelClientPool:
+    """Test client sharing, keying and event-loop affinity."""
+
+    def test_clients_are_shared_per_model_key_and_temperature(self, pool):
+        """Test that identical settings share a client and any difference gets its own."""
+        async def get_clients():
+            return [
+                pool.get("gpt-4o-mini", 0.7, api_key="key-a"),
+                pool.get("gpt-4o-mini", 0.7, api_key="key-a"),
+                pool.get("gpt-4o-mini", 0.2, api_key="key-a"),
+                pool.get("gpt-4o-mini", 0.7, api_key="key-b"),
+                pool.get("gpt-4o", 0.7, api_key="key-a"),
+            ]
+
+        first, same, cooler, other_key, other_model = asyncio.run(get_clients())
+
+        assert same is first
+        assert len({id(first), id(cooler), id(other_key), id(other_model)}) == 4
+        assert pool.get_stats()["reused"] == 1
+        assert pool.get_stats()["clients"] == 4
+
+    def test_clients_from_a_closed_loop_are_discarded(self, pool):
+        """Test that a new event loop gets new clients and a new generation."""
+        async def get_client():
+            return pool.get("gpt-4o-mini", api_key="key-a"), pool.generation()
+
+        first, first_generation = asyncio.run(get_client())
+        second, second_generation = asyncio.run(get_client())
+
+        assert second is not first
+        assert second_generation == first_generation + 1
+        assert pool.get_stats()["discarded"] == 1
+
+    def test_disabled_pool_creates_a_client_per_call(self):
+        """Test that a disabled pool behaves like constructing clients directly."""
+        pool = ModelClientPool(enabled=False)
+
+        assert pool.get("gpt-4o-mini", api_key="key-a") is not pool.get("gpt-4o-mini", api_key="key-a")
+        assert pool.get_stats()["clients"] == 0
+
@@ -0,0 +1,99 @@
+"""Unit tests for priority notification persistence."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.database.models import WebSocketNotificationDB
+from app.websocket.events import WebSocketEvent, EventType
+from app.websocket.manager import NotificationPriority, WebSocketManager
+from app.websocket.notification_store import (
+    DELIVERED, EXPIRED, FAILED, FAILED_DELIVERY_ATTEMPTS, NotificationStore
+)
+
+
+@pytest.fixture
+def store(db_session):
+    """Store writing through the test session, flushed explicitly."""
+    return NotificationStore(flush_interval=60, session_factory=lambda: db_session)
+
+
+def insert(store, notification_id, **row):
+    store.insert({
+        "notification_id": notification_id,
+        "event_type": "error",
+        "title": "System Error",
+        "message": "System event: error",
+        **row
+    })
+
+
+def get(db_session, notification_id):
+    return db_session.query(WebSocketNotificationDB).filter_by(notification_id=notification_id).one()
+
+
+class TestNotificationStore:
+    """Test keyed, batched status updates and compaction."""
+
+    def test_status_changes_are_written_per_flush(self, store, db_session):
+        """Test that queued status changes land on the matching rows in one flush."""
+        for notification_id in ["n-delivered", "n-expired", "n-failed", "n-pending"]:
+            insert(store, notification_id)
+
+        store.mark("n-delivered", DELIVERED, attempts=2)
+        store.mark("n-expired", EXPIRED)
+        store.mark("n-failed", FAILED)
+        assert get(db_session, "n-delivered").delivered is False
+
+        assert store.flush_sync() == 3
+
+        delivered = get(db_session, "n-delivered")
+        assert delivered.delivered is True
+        assert delivered.delivery_attempts == 2
+        assert get(db_session, "n-expired").expired is True
+        assert get(db_session, "n-failed").delivery_attempts == FAILED_DELIVERY_ATTEMPTS
+        assert get(db_session, "n-pending").delivered is False
+        assert store.get_stats()["flushes"] == 1
+
+    def test_latest_status_wins_within_a_flush(self, store, db_session):
+        """Test that a notification changed twice before a flush is written once."""
+        insert(store, "n-1")
+
+        store.mark("n-1", EXPIRED)
+        store.mark("n-1", DELIVERED, attempts=1)
+        store.flush_sync()
+
+        row = get(db_session, "n-1")
+        assert row.delivered is True
+        assert row.expired is False
+
+    def test_compaction_deletes_only_settled_old_notifications(self, store, db_session):
+        """Test retention: old settled rows go, pending and recent rows stay."""
+        old = datetime.utcnow() - timedelta(days=10)
+        insert(store, "old-delivered", created_at=old, delivered=True)
+        insert(store, "old-failed", created_at=old, delivery_attempts=FAILED_DELIVERY_ATTEMPTS)
+        insert(store, "old-overdue", created_at=old, expires_at=old + timedelta(hours=1))
+        insert(store, "old-pending", created_at=old)
+        insert(store, "recent-delivered", delivered=True)
+
+        result = store.compact(retention_hours=24)
+
+        remaining = {row.notification_id for row in db_session.query(WebSocketNotificationDB).all()}
+        assert remaining == {"old-pending", "recent-delivered"}
+        assert result == {"expired": 1, "deleted": 3}
+
+
+@pytest.mark.asyncio
+async def test_priority_notification_status_reaches_its_row(store, db_session):
+    """Test that the manager stores the notification ID it later marks delivered."""
+    manager = WebSocketManager(coalesce_window=0)
+    event = WebSocketEvent(event_type=EventType.ERROR, data={"reason": "disk full"})
+
+    with patch("app.websocket.manager.notification_store", store):
+        notification_id = await manager.send_priority_notification(event, NotificationPriority.CRITICAL)
+    await store.flush()
+
+    row = get(db_session, notification_id)
+    assert row.delivered is True
+    assert row.delivery_attempts == 1
+    assert row.priority == "CRITICAL"
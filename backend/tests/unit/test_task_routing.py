@@ -0,0 +1,95 @@
+"""Unit tests for priority-aware agent task routing."""
+
+from app.tasks.routing import (
+    DEFAULT_AGENT_QUEUE, agent_task_queues, autoscaling_hints, queue_depths, route_agent_task
+)
+
+TASK_NAME = "app.tasks.agent_tasks.process_agent_task"
+
+
+def route(**task_data):
+    return route_agent_task(TASK_NAME, [task_data], {}, {})
+
+
+class FakePipeline:
+    """Redis pipeline answering LLEN from a dict of list lengths."""
+
+    def __init__(self, lengths):
+        self.lengths = lengths
+        self.keys = []
+
+    def llen(self, key):
+        self.keys.append(key)
+
+    def execute(self):
+        return [self.lengths.get(key, 0) for key in self.keys]
+
+
+class FakeRedis:
+    def __init__(self, lengths):
+        self.lengths = lengths
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.lengths)
+
+
+class TestRouteAgentTask:
+    """Test queue and broker priority selection."""
+
+    def test_routes_by_agent_type_and_priority_class(self):
+        """Test that ordinary and low-priority work land on separate per-agent queues."""
+        assert route(agent_type="analyst") == {
+            "queue": "agent_tasks.analyst.normal",
+            "routing_key": "agent_tasks.analyst.normal",
+            "priority": 1,
+        }
+        assert route(agent_type="deployer", priority=7)["queue"] == "agent_tasks.deployer.bulk"
+        assert route(agent_type="deployer", priority=7)["priority"] == 7
+
+    def test_interactive_tasks_outrank_everything(self):
+        """Test that interactive tasks get their own queue and the top broker priority."""
+        routed = route(agent_type="coder", priority=5, interactive=True)
+
+        assert routed["queue"] == "agent_tasks.coder.interactive"
+        assert routed["priority"] == 0
+
+    def test_unknown_or_foreign_tasks(self):
+        """Test the fallback queue for unknown agents and that other tasks are left alone."""
+        assert route(agent_type="reviewer", priority="high")["queue"] == DEFAULT_AGENT_QUEUE
+        assert route_agent_task("app.tasks.other.cleanup", [], {}, {}) is None
+
+    def test_interactive_queues_are_consumed_first(self):
+        """Test the declaration order the priority queue strategy consumes in."""
+        names = [queue.name for queue in agent_task_queues()]
+
+        last_interactive = max(i for i, name in enumerate(names) if name.endswith(".interactive"))
+        first_bulk = min(i for i, name in enumerate(names) if name.endswith(".bulk"))
+        assert last_interactive < first_bulk
+        assert names[-1] == DEFAULT_AGENT_QUEUE
+
+
+def test_queue_depths_sum_priority_levels():
+    """Test that depth counts messages at every broker priority level."""
+    client = FakeRedis({"agent_tasks.analyst.normal": 2, "agent_tasks.analyst.normal:3": 4,
+                        "agent_tasks.tester.bulk:9": 1})
+
+    depths = queue_depths(client)
+
+    assert depths["agent_tasks.analyst.normal"] == 6
+    assert depths["agent_tasks.tester.bulk"] == 1
+    assert depths[DEFAULT_AGENT_QUEUE] == 0
+
+
+def test_autoscaling_hints():
+    """Test scaling advice from queue depth and waiting interactive work."""
+    quiet = autoscaling_hints({"agent_tasks.analyst.normal": 1}, concurrency=8)
+    busy = autoscaling_hints({"agent_tasks.analyst.normal": 40, "agent_tasks.deployer.bulk": 8}, concurrency=8)
+    waiting = autoscaling_hints({"agent_tasks.coder.interactive": 1, "agent_tasks.coder.normal": 7},
+                                concurrency=8)
+
+    assert quiet["action"] == "scale_down"
+    assert busy["action"] == "scale_up"
+    assert busy["desired_concurrency"] == 12
+    assert busy["by_agent_type"] == {"analyst": 40, "deployer": 8}
+    assert waiting["action"] == "scale_up"
+    assert waiting["by_priority_class"]["interactive"] == 1
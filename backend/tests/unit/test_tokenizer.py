@@ -0,0 +1,87 @@
+"""Unit tests for model-aware, memoized token counting."""
+
+import pytest
+from typing import List, Sequence
+
+from app.services.tokenizer import ApproximateTokenizer, TokenCounter, Tokenizer
+
+
+class RecordingTokenizer(Tokenizer):
+    """Counts words and records every batch it is asked to tokenize."""
+
+    name = "recording"
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        self.batches.append(list(texts))
+        return [self.count(text) for text in texts]
+
+
+@pytest.fixture
+def counter():
+    """Offline counter with a recording tokenizer for the test model."""
+    counter = TokenCounter(max_entries=3, use_tiktoken=False)
+    counter.register("test-model", RecordingTokenizer())
+    return counter
+
+
+class TestApproximateTokenizer:
+    """Test the offline approximation."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Hello world, this is a test message.", 9),
+        ("", 0),
+        ("1234567", 3),
+    ])
+    def test_counts_pre_tokenized_pieces(self, text, expected):
+        """Test counts for common short text."""
+        assert ApproximateTokenizer().count(text) == expected
+
+    def test_long_words_cost_more_than_short_words(self):
+        """Test that long words are charged as several tokens."""
+        tokenizer = ApproximateTokenizer()
+
+        assert tokenizer.count(" internationalization") > tokenizer.count(" word")
+
+
+class TestTokenCounter:
+    """Test tokenizer selection, memoization and batching."""
+
+    def test_selects_tokenizer_by_model_prefix(self, counter):
+        """Test that registered tokenizers win and unknown models fall back."""
+        assert counter.tokenizer_for("test-model-large").name == "recording"
+        assert counter.tokenizer_for("claude-3-haiku").name == "approximate"
+        assert counter.tokenizer_for("gpt-4o-mini").name == "approximate"
+
+    def test_repeated_text_is_tokenized_once(self, counter):
+        """Test that memoized counts skip the tokenizer."""
+        tokenizer = counter.tokenizer_for("test-model")
+
+        assert counter.count("one two three", "test-model") == 3
+        assert counter.count("one two three", "test-model") == 3
+
+        assert tokenizer.batches == [["one two three"]]
+        assert counter.get_stats()["hits"] == 1
+
+    def test_batch_tokenizes_only_missing_texts_in_one_call(self, counter):
+        """Test that a context message is counted with a single tokenizer call."""
+        tokenizer = counter.tokenizer_for("test-model")
+        counter.count("system prompt", "test-model")
+
+        counts = counter.count_many(["system prompt", "artifact one", "artifact one", ""], "test-model")
+
+        assert counts == [2, 2, 2, 0]
+        assert tokenizer.batches[-1] == ["artifact one"]
+        assert counter.count_total(["a b", "c"], "test-model") == 3
+
+    def test_memo_is_bounded(self, counter):
+        """Test that the least recently used counts are evicted."""
+        for text in ["a", "b", "c", "d"]:
+            counter.count(text, "test-model")
+
+        assert counter.get_stats()["entries"] == 3
@@ -0,0 +1,140 @@
+"""Unit tests for columnar usage analytics."""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.services.llm_monitoring import LLMUsageTracker, UsageMetrics
+from app.services.llm_usage_store import LLMUsageStore
+from app.services.usage_columns import UsageColumns
+
+
+def make_metrics(index, agent_type="analyst", project_id=None, success=True, minutes_ago=0):
+    """Request whose tokens, cost and latency grow with the index."""
+    return UsageMetrics(
+        timestamp=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        agent_type=agent_type,
+        project_id=project_id,
+        task_id=uuid4(),
+        tokens_used=index,
+        input_tokens=index,
+        output_tokens=0,
+        response_time_ms=float(index * 10),
+        estimated_cost=index / 1000,
+        success=success,
+        error_type=None if success else "TimeoutError",
+        retry_count=0 if success else 1
+    )
+
+
+class TestUsageColumns:
+    """Test the columnar ring buffer."""
+
+    def test_iterates_oldest_first_after_wrapping(self):
+        """Test that overwritten rows drop out and order is preserved."""
+        columns = UsageColumns(capacity=3)
+        for index in range(5):
+            columns.append(make_metrics(index))
+
+        assert len(columns) == 3
+        assert [m.tokens_used for m in columns] == [2, 3, 4]
+
+    def test_wrapping_forgets_overwritten_projects_and_names(self):
+        """Test that intern tables only keep what the stored rows still refer to."""
+        columns = UsageColumns(capacity=3)
+        kept = uuid4()
+        for index in range(6):
+            columns.append(make_metrics(index, agent_type=f"agent-{index}", project_id=uuid4()))
+        for index in range(3):
+            columns.append(make_metrics(index, project_id=kept, success=False))
+
+        assert columns._projects == [kept]
+        assert sorted(columns._names) == ["TimeoutError", "analyst", "gpt-4o-mini", "openai"]
+        assert [m.project_id for m in columns] == [kept] * 3
+        assert columns.tokens_used[columns.select(project_id=kept)].tolist() == [0, 1, 2]
+
+    def test_round_trips_metrics(self):
+        """Test that stored rows rebuild the original metrics."""
+        columns = UsageColumns(capacity=2)
+        metrics = make_metrics(7, project_id=uuid4(), success=False)
+        metrics.timestamp = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+        columns.append(metrics)
+
+        assert list(columns)[0] == metrics
+
+    def test_select_filters_by_window_and_project(self):
+        """Test that window and project filters are applied to the columns."""
+        columns = UsageColumns(capacity=10)
+        project_id = uuid4()
+        columns.append(make_metrics(1, project_id=project_id, minutes_ago=120))
+        columns.append(make_metrics(2, project_id=project_id))
+        columns.append(make_metrics(3, project_id=uuid4()))
+
+        rows = columns.select(start=datetime.now(timezone.utc) - timedelta(hours=1), project_id=project_id)
+
+        assert columns.tokens_used[rows].tolist() == [2]
+        assert len(columns.select(project_id=uuid4())) == 0
+
+    def test_rollups_group_by_agent_and_error_type(self):
+        """Test that group-by sums match the per-request values."""
+        columns = UsageColumns(capacity=10)
+        for index in range(1, 5):
+            columns.append(make_metrics(index, agent_type="coder"))
+        columns.append(make_metrics(10, agent_type="coder", success=False))
+        columns.append(make_metrics(20, agent_type="tester"))
+
+        rollups = {(r.agent_type, r.error_type): r for r in columns.rollups(columns.select())}
+
+        assert rollups[("coder", None)].request_count == 4
+        assert rollups[("coder", None)].tokens_used == 10
+        assert rollups[("coder", "TimeoutError")].error_count == 1
+        assert rollups[("coder", "TimeoutError")].retry_count == 1
+        assert rollups[("tester", None)].total_cost == pytest.approx(0.02)
+
+    def test_percentiles(self):
+        """Test p50/p95/p99 over all rows and per agent."""
+        columns = UsageColumns(capacity=200)
+        for index in range(1, 101):
+            columns.append(make_metrics(index, agent_type="architect" if index > 50 else "analyst"))
+        rows = columns.select()
+
+        overall = columns.percentiles(rows)
+        by_agent = columns.percentiles_by_agent(rows)
+
+        assert overall["p50"] == pytest.approx(505.0)
+        assert overall["p99"] == pytest.approx(990.1)
+        assert by_agent["analyst"]["p95"] < by_agent["architect"]["p50"]
+        assert columns.percentiles(rows[:0]) == {}
+
+
+class TestVectorizedReports:
+    """Test tracker reports computed from the columns."""
+
+    @pytest.mark.asyncio
+    async def test_report_includes_response_time_percentiles(self):
+        """Test that reports carry latency percentiles for the range."""
+        tracker = LLMUsageTracker(store=LLMUsageStore(ring_size=100, persist=False))
+        for index in range(1, 11):
+            await tracker.track_request(agent_type="analyst", tokens_used=100,
+                                        response_time=float(index * 100), cost=0.001,
+                                        input_tokens=80, output_tokens=20)
+
+        report = await tracker.generate_usage_report()
+
+        assert report.response_time_percentiles["sample_size"] == 10
+        assert report.response_time_percentiles["overall"]["p50"] == pytest.approx(550.0)
+        assert "analyst" in report.response_time_percentiles["by_agent"]
+
+    @pytest.mark.asyncio
+    async def test_anomalies_ignore_requests_outside_lookback(self):
+        """Test that only requests in the lookback window are analyzed."""
+        store = LLMUsageStore(ring_size=100, persist=False)
+        tracker = LLMUsageTracker(store=store)
+        store.record(make_metrics(100_000, agent_type="architect", minutes_ago=180))
+        for index in range(5):
+            store.record(make_metrics(10, agent_type="tester"))
+
+        anomalies = await tracker.detect_usage_anomalies(lookback_hours=1)
+
+        assert anomalies == []
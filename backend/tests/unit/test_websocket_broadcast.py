@@ -0,0 +1,157 @@
+"""Unit tests for per-connection WebSocket outbound queues."""
+
+import pytest
+import asyncio
+import json
+from uuid import uuid4
+from unittest.mock import patch
+
+from app.websocket.manager import WebSocketManager
+from app.websocket.events import WebSocketEvent, EventType
+from app.websocket.coalescing import EventFrame
+from app.websocket.outbound import SLOW_CONSUMER_CLOSE_CODE
+
+
+class FakeWebSocket:
+    """WebSocket recording sent text; `gate` holds sends until it is set."""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def make_event(project_id, event_type=EventType.TASK_STARTED, agent_type=None, **data):
+    return WebSocketEvent(event_type=event_type, project_id=project_id, agent_type=agent_type, data=data)
+
+
+async def wait_until(condition, timeout=1.0):
+    """Let writer tasks run until `condition()` holds, failing after `timeout` seconds."""
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0)
+    await asyncio.wait_for(poll(), timeout)
+
+
+class TestOutboundQueues:
+    """Test broadcasting through per-connection writer tasks."""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_others(self):
+        """Test that a stalled socket leaves delivery to other sockets unaffected."""
+        manager = WebSocketManager(max_queue=10, slow_consumer_policy="drop_oldest", send_timeout=5.0,
+                                   coalesce_window=0)
+        project_id = uuid4()
+        stalled, healthy = FakeWebSocket(gate=asyncio.Event()), FakeWebSocket()
+        await manager.connect(stalled, str(project_id))
+        await manager.connect(healthy, str(project_id))
+
+        await asyncio.wait_for(manager.broadcast_event(make_event(project_id, index=0)), timeout=1)
+        await wait_until(lambda: healthy.sent)
+
+        assert [json.loads(m)["data"]["index"] for m in healthy.sent] == [0]
+        assert stalled.sent == []
+
+        stalled.gate.set()
+        await wait_until(lambda: stalled.sent)
+        assert stalled.sent == healthy.sent
+
+    @pytest.mark.asyncio
+    async def test_event_is_serialized_once_per_broadcast(self):
+        """Test that one encoded payload is shared by every connection."""
+        manager = WebSocketManager(max_queue=10, slow_consumer_policy="drop_oldest", send_timeout=5.0,
+                                   coalesce_window=0)
+        sockets = [FakeWebSocket() for _ in range(3)]
+        for websocket in sockets:
+            await manager.connect(websocket)
+
+        with patch.object(EventFrame, "_serialize", wraps=EventFrame._serialize) as serialize:
+            await manager.broadcast_global(make_event(None))
+            await wait_until(lambda: all(websocket.sent for websocket in sockets))
+
+        assert serialize.call_count == 1
+        assert all(len(websocket.sent) == 1 for websocket in sockets)
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_policy(self):
+        """Test that a full queue discards its oldest message."""
+        manager = WebSocketManager(max_queue=2, slow_consumer_policy="drop_oldest", send_timeout=5.0,
+                                   coalesce_window=0)
+        websocket = FakeWebSocket(gate=asyncio.Event())
+        await manager.connect(websocket)
+        connection = manager.connections[websocket]
+
+        await manager.broadcast_global(make_event(None, index=0))
+        await wait_until(lambda: not connection.queue)
+        for index in range(1, 4):
+            await manager.broadcast_global(make_event(None, index=index))
+        websocket.gate.set()
+        await wait_until(lambda: len(websocket.sent) == 3)
+
+        # The writer holds the first message while the rest queue up behind it
+        assert [json.loads(m)["data"]["index"] for m in websocket.sent] == [0, 2, 3]
+        assert manager.get_broadcast_stats()["dropped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesce_policy_replaces_superseded_status(self):
+        """Test that a newer agent status replaces the queued one for the same agent."""
+        manager = WebSocketManager(max_queue=2, slow_consumer_policy="coalesce", send_timeout=5.0,
+                                   coalesce_window=0)
+        project_id = uuid4()
+        websocket = FakeWebSocket(gate=asyncio.Event())
+        await manager.connect(websocket, str(project_id))
+        connection = manager.connections[websocket]
+
+        await manager.broadcast_event(make_event(project_id, index=0))
+        await wait_until(lambda: not connection.queue)
+        for status in ["thinking", "working", "idle"]:
+            await manager.broadcast_event(
+                make_event(project_id, EventType.AGENT_STATUS_CHANGE, agent_type="coder", status=status)
+            )
+        websocket.gate.set()
+        await wait_until(lambda: len(websocket.sent) == 3)
+
+        statuses = [json.loads(m)["data"].get("status") for m in websocket.sent]
+        assert statuses == [None, "thinking", "idle"]
+        assert manager.get_broadcast_stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_closes_slow_consumer(self):
+        """Test that an overflowing client is closed and removed from the manager."""
+        manager = WebSocketManager(max_queue=1, slow_consumer_policy="disconnect", send_timeout=5.0,
+                                   coalesce_window=0)
+        project_id = str(uuid4())
+        websocket = FakeWebSocket(gate=asyncio.Event())
+        await manager.connect(websocket, project_id)
+
+        for index in range(3):
+            await manager.broadcast_global(make_event(None, index=index))
+        await wait_until(lambda: websocket.closed_with is not None)
+
+        assert websocket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+        assert manager.get_connection_count() == 0
+        assert manager.get_connection_count(project_id) == 0
+
+    @pytest.mark.asyncio
+    async def test_send_timeout_disconnects(self):
+        """Test that a send exceeding the timeout ends the connection."""
+        manager = WebSocketManager(max_queue=10, slow_consumer_policy="drop_oldest", send_timeout=0.01,
+                                   coalesce_window=0)
+        websocket = FakeWebSocket(gate=asyncio.Event())
+        await manager.connect(websocket)
+
+        await manager.broadcast_global(make_event(None))
+        await asyncio.sleep(0.05)
+
+        assert manager.get_connection_count() == 0
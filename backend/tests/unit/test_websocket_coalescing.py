@@ -0,0 +1,136 @@
+"""Unit tests for WebSocket event coalescing and delta encoding."""
+
+import pytest
+import asyncio
+import json
+from uuid import uuid4
+
+from app.websocket.coalescing import EventCoalescer, EventFramer, FrameEncoding, diff_data
+from app.websocket.events import WebSocketEvent, EventType
+from app.websocket.manager import WebSocketManager
+
+
+def status_event(project_id, status, agent_type="coder", **data):
+    return WebSocketEvent(
+        event_type=EventType.AGENT_STATUS_CHANGE,
+        project_id=project_id,
+        agent_type=agent_type,
+        data={"agent_type": agent_type, "status": status, **data}
+    )
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.sent.append(message)
+
+    async def send_bytes(self, message):
+        self.sent.append(message)
+
+
+class TestEventCoalescer:
+    """Test merging superseded events within the coalescing window."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_sent_as_final_state(self):
+        """Test that repeated status changes for one agent collapse to the last one."""
+        sent = []
+        coalescer = EventCoalescer(lambda event, target: sent.append((event, target)), window=0.01)
+        project_id = uuid4()
+
+        for status in ["thinking", "working", "idle"]:
+            coalescer.submit(status_event(project_id, status), str(project_id))
+        coalescer.submit(status_event(project_id, "working", agent_type="tester"), str(project_id))
+        assert sent == []
+
+        await asyncio.sleep(0.03)
+
+        assert [(e.agent_type, e.data["status"]) for e, _ in sent] == [("coder", "idle"), ("tester", "working")]
+        assert coalescer.get_stats()["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_other_events_flush_pending_first(self):
+        """Test that a non-coalesced event keeps its order after pending events for the same target."""
+        sent = []
+        coalescer = EventCoalescer(lambda event, target: sent.append(event.event_type), window=10)
+        project_id = uuid4()
+
+        coalescer.submit(status_event(project_id, "working"), str(project_id))
+        coalescer.submit(WebSocketEvent(event_type=EventType.TASK_COMPLETED, project_id=project_id),
+                         str(project_id))
+
+        assert sent == [EventType.AGENT_STATUS_CHANGE.value, EventType.TASK_COMPLETED.value]
+
+
+class TestDeltaEncoding:
+    """Test versioned frames and JSON patch deltas."""
+
+    def test_diff_data(self):
+        """Test add, replace and remove operations with escaped keys."""
+        patch = diff_data({"status": "idle", "error": "x", "a/b": 1}, {"status": "working", "a/b": 1, "task": "t"})
+
+        assert patch == [
+            {"op": "remove", "path": "/error"},
+            {"op": "replace", "path": "/status", "value": "working"},
+            {"op": "add", "path": "/task", "value": "t"},
+        ]
+
+    def test_frames_are_versioned_per_entity(self):
+        """Test that a repeated entity gets a delta against its previous version."""
+        framer = EventFramer()
+        project_id = str(uuid4())
+
+        first = framer.frame(status_event(project_id, "idle"), project_id)
+        second = framer.frame(status_event(project_id, "working"), project_id)
+        unrelated = framer.frame(WebSocketEvent(event_type=EventType.TASK_STARTED), project_id)
+
+        assert (first.version, first.patch) == (1, None)
+        assert second.base == 1 and second.version == 2
+        delta = json.loads(second.encode(FrameEncoding.JSON, delta=True))
+        assert "data" not in delta
+        assert delta["delta"]["patch"] == [{"op": "replace", "path": "/status", "value": "working"}]
+        assert unrelated.entity is None
+
+    @pytest.mark.asyncio
+    async def test_clients_receive_deltas_only_when_negotiated_and_based(self):
+        """Test that delta clients get patches after a full event and others always get full events."""
+        manager = WebSocketManager(coalesce_window=0)
+        project_id = uuid4()
+        plain, delta_client = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(plain, str(project_id))
+        await manager.connect(delta_client, str(project_id), deltas=True)
+
+        for status in ["idle", "working"]:
+            await manager.broadcast_event(status_event(project_id, status))
+            await drain()
+        late_client = FakeWebSocket()
+        await manager.connect(late_client, str(project_id), deltas=True)
+        await manager.broadcast_event(status_event(project_id, "idle"))
+        await drain()
+
+        assert all("data" in json.loads(m) for m in plain.sent)
+        assert ["data" in json.loads(m) for m in delta_client.sent] == [True, False, False]
+        assert ["data" in json.loads(m) for m in late_client.sent] == [True]
+
+    @pytest.mark.asyncio
+    async def test_msgpack_falls_back_to_json_when_unavailable(self, monkeypatch):
+        """Test that an unavailable binary encoding degrades to JSON text frames."""
+        monkeypatch.setattr("app.websocket.coalescing.msgpack", None)
+        manager = WebSocketManager(coalesce_window=0)
+        websocket = FakeWebSocket()
+
+        await manager.connect(websocket, encoding="msgpack")
+        await manager.broadcast_global(WebSocketEvent(event_type=EventType.TASK_STARTED))
+        await drain()
+
+        assert isinstance(websocket.sent[0], str)
@@ -0,0 +1,133 @@
+"""Unit tests for resumable project event streams."""
+
+import pytest
+import asyncio
+import json
+from uuid import uuid4
+
+from app.websocket.coalescing import EventFrame
+from app.websocket.events import WebSocketEvent, EventType
+from app.websocket.manager import WebSocketManager
+from app.websocket.replay import ReplayBuffer
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        self.sent.append(json.loads(message))
+
+
+async def wait_until(condition, timeout=1.0):
+    """Let writer tasks run until `condition()` holds, failing after `timeout` seconds."""
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def task_event(project_id, index):
+    return WebSocketEvent(event_type=EventType.TASK_STARTED, project_id=project_id, data={"index": index})
+
+
+class TestReplayBuffer:
+    """Test sequence assignment and gap lookup."""
+
+    def test_sequence_numbers_increase_per_project(self):
+        """Test that each project stream counts independently and stamps frames."""
+        buffer = ReplayBuffer(size=10)
+        frames = [EventFrame({"data": {}}) for _ in range(3)]
+
+        first = buffer.append("a", frames[0])
+        second = buffer.append("a", frames[1])
+        other = buffer.append("b", frames[2])
+
+        assert second == first + 1
+        assert frames[1].payload["seq"] == second
+        assert buffer.last_seq("b") == other
+
+    def test_since_returns_only_the_gap(self):
+        """Test that a caught-up or recent client gets exactly what it missed."""
+        buffer = ReplayBuffer(size=10)
+        seqs = [buffer.append("a", EventFrame({"data": {"index": i}})) for i in range(5)]
+
+        assert [f.payload["data"]["index"] for f in buffer.since("a", seqs[2])] == [3, 4]
+        assert buffer.since("a", seqs[-1]) == []
+        assert len(buffer.since("a", seqs[0] - 1)) == 5
+
+    def test_gap_outside_the_ring_needs_reset(self):
+        """Test that evicted, future or unknown positions are not replayed."""
+        buffer = ReplayBuffer(size=2)
+        seqs = [buffer.append("a", EventFrame({"data": {}})) for _ in range(5)]
+
+        assert buffer.since("a", seqs[1]) is None
+        assert buffer.since("a", seqs[-1] + 10) is None
+        assert buffer.since("unknown", seqs[-1]) is None
+
+    def test_numbers_from_before_a_restart_are_older(self):
+        """Test that a new buffer never reuses sequence numbers a client may hold."""
+        old = ReplayBuffer(size=10, clock=lambda: 1_750_000_000.0)
+        held = [old.append("a", EventFrame({"data": {}})) for _ in range(1000)][-1]
+
+        restarted = ReplayBuffer(size=10, clock=lambda: 1_750_000_000.5)
+        first = restarted.append("a", EventFrame({"data": {}}))
+
+        assert first > held
+        assert restarted.since("a", held) is None
+
+    def test_evicted_stream_restarts_above_numbers_already_issued(self):
+        """Test that a stream recreated after eviction does not replay for old positions."""
+        buffer = ReplayBuffer(size=10, max_streams=1, clock=lambda: 1_750_000_000.0)
+        held = [buffer.append("a", EventFrame({"data": {}})) for _ in range(3)][-1]
+        buffer.append("b", EventFrame({"data": {}}))
+
+        recreated = buffer.append("a", EventFrame({"data": {}}))
+
+        assert recreated > held
+        assert buffer.since("a", held) is None
+
+
+class TestResume:
+    """Test reconnecting clients through the manager."""
+
+    @pytest.mark.asyncio
+    async def test_reconnect_receives_missed_events_then_live_ones(self):
+        """Test that events broadcast while a client was away are replayed in order."""
+        manager = WebSocketManager(coalesce_window=0)
+        project_id = uuid4()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, str(project_id))
+        await manager.broadcast_event(task_event(project_id, 0))
+        await wait_until(lambda: websocket.sent)
+        last_seq = websocket.sent[-1]["seq"]
+        manager.disconnect(websocket, str(project_id))
+
+        for index in range(1, 3):
+            await manager.broadcast_event(task_event(project_id, index))
+        reconnected = FakeWebSocket()
+        await manager.connect(reconnected, str(project_id), last_seq=last_seq)
+        await manager.broadcast_event(task_event(project_id, 3))
+        await wait_until(lambda: len(reconnected.sent) == 3)
+
+        assert [m["data"]["index"] for m in reconnected.sent] == [1, 2, 3]
+        assert [m["seq"] for m in reconnected.sent] == [last_seq + 1, last_seq + 2, last_seq + 3]
+
+    @pytest.mark.asyncio
+    async def test_reconnect_after_gap_is_lost_gets_reset(self):
+        """Test that a client too far behind is told to refetch."""
+        manager = WebSocketManager(coalesce_window=0)
+        manager.replay = ReplayBuffer(size=2)
+        project_id = uuid4()
+
+        for index in range(5):
+            await manager.broadcast_event(task_event(project_id, index))
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, str(project_id), last_seq=1)
+        await wait_until(lambda: websocket.sent)
+
+        assert websocket.sent[0]["event_type"] == EventType.STREAM_RESET.value
+        assert websocket.sent[0]["data"]["seq"] == manager.replay.last_seq(str(project_id))
@@ -0,0 +1,207 @@
+"""Unit tests for dependency-graph scheduling of workflow steps."""
+
+import pytest
+import asyncio
+from uuid import uuid4
+from unittest.mock import Mock, patch
+
+from app.services.workflow_engine import WorkflowExecutionEngine, WorkflowDependencyGraph
+from app.models.workflow import WorkflowDefinition, WorkflowStep
+from app.models.workflow_state import (
+    WorkflowExecutionStateModel,
+    WorkflowStepExecutionState,
+    WorkflowExecutionState as ExecutionStateEnum
+)
+
+
+def build_workflow(steps):
+    """Build a workflow definition from step keyword arguments."""
+    return WorkflowDefinition(
+        id="dag-workflow",
+        name="DAG Workflow",
+        sequence=[WorkflowStep(**step) for step in steps]
+    )
+
+
+def build_execution(workflow):
+    """Build a pending execution for the given workflow."""
+    return WorkflowExecutionStateModel(
+        project_id=str(uuid4()),
+        workflow_id=workflow.id,
+        total_steps=len(workflow.sequence),
+        status=ExecutionStateEnum.RUNNING,
+        steps=[
+            WorkflowStepExecutionState(step_index=i, agent=step.agent)
+            for i, step in enumerate(workflow.sequence)
+        ]
+    )
+
+
+FAN_OUT_STEPS = [
+    {"agent": "analyst", "creates": "project-brief.md"},
+    {"agent": "pm", "creates": "prd.md", "requires": "project-brief.md"},
+    {"agent": "ux-expert", "creates": "front-end-spec.md", "requires": "prd.md"},
+    {"agent": "architect", "creates": "architecture.md", "requires": "prd.md"},
+    {"agent": "po", "requires": ["front-end-spec.md", "architecture.md"]},
+]
+
+
+class TestWorkflowDependencyGraph:
+    """Test dependency graph construction from requires/creates."""
+
+    def test_dependencies_resolve_to_producing_steps(self):
+        """Test that requirements map to the steps creating them."""
+        graph = WorkflowDependencyGraph.from_workflow(build_workflow(FAN_OUT_STEPS))
+
+        assert graph.get_dependencies(0) == set()
+        assert graph.get_dependencies(1) == {0}
+        assert graph.get_dependencies(2) == {1}
+        assert graph.get_dependencies(3) == {1}
+        assert graph.get_dependencies(4) == {2, 3}
+
+    def test_steps_without_requirements_wait_for_preceding_steps(self):
+        """Test that steps with no resolvable requirements act as barriers."""
+        graph = WorkflowDependencyGraph.from_workflow(build_workflow([
+            {"agent": "analyst", "creates": "brief"},
+            {"agent": "ux-expert", "creates": "spec", "requires": "brief"},
+            {"agent": "po"},
+            {"agent": "sm", "requires": "all_artifacts_in_project"},
+        ]))
+
+        assert graph.get_dependencies(2) == {0, 1}
+        assert graph.get_dependencies(3) == {0, 1, 2}
+
+    def test_optional_annotation_is_ignored(self):
+        """Test that "(optional)" annotations do not break matching."""
+        graph = WorkflowDependencyGraph.from_workflow(build_workflow([
+            {"agent": "analyst", "creates": "brief"},
+            {"agent": "ux-expert", "creates": "v0_prompt (optional)", "requires": "brief"},
+            {"agent": "architect", "requires": "v0_prompt"},
+        ]))
+
+        assert graph.get_dependencies(2) == {1}
+
+    def test_ready_steps(self):
+        """Test ready step selection from completed and pending sets."""
+        graph = WorkflowDependencyGraph.from_workflow(build_workflow(FAN_OUT_STEPS))
+
+        assert graph.get_ready_steps(completed=set(), pending={0, 1, 2, 3, 4}) == [0]
+        assert graph.get_ready_steps(completed={0, 1}, pending={2, 3, 4}) == [2, 3]
+        assert graph.get_ready_steps(completed={0, 1, 2}, pending={3, 4}) == [3]
+
+
+class TestWorkflowDagExecution:
+    """Test concurrent execution of ready workflow steps."""
+
+    @pytest.fixture
+    def workflow(self):
+        return build_workflow(FAN_OUT_STEPS)
+
+    @pytest.fixture
+    def engine(self, workflow):
+        engine = WorkflowExecutionEngine(Mock())
+        engine.workflow_service = Mock()
+        engine.workflow_service.load_workflow.return_value = workflow
+        return engine
+
+    def _install_step_runner(self, engine, execution, delays=None, results=None):
+        """Replace step execution with a recorder tracking concurrency."""
+        state = {"running": 0, "max_running": 0, "order": []}
+
+        async def fake_execute(execution_id, step_index):
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+            state["order"].append(step_index)
+            await asyncio.sleep((delays or {}).get(step_index, 0.01))
+            state["running"] -= 1
+            result = (results or {}).get(step_index, {"status": "completed"})
+            if isinstance(result, Exception):
+                raise result
+            if result.get("status") == "completed":
+                execution.steps[step_index].status = ExecutionStateEnum.COMPLETED
+            return {"step_index": step_index, **result}
+
+        engine.execute_workflow_step = fake_execute
+        return state
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self, engine, workflow):
+        """Test that steps sharing the same dependency are launched together."""
+        execution = build_execution(workflow)
+        engine._active_executions[execution.execution_id] = execution
+        state = self._install_step_runner(engine, execution)
+
+        result = await engine.execute_workflow_dag(execution.execution_id, max_concurrency=4)
+
+        assert result["executed_steps"] == 5
+        assert state["max_running"] == 2
+        assert state["order"][:2] == [0, 1]
+        assert set(state["order"][2:4]) == {2, 3}
+        assert state["order"][4] == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_is_respected(self, engine, workflow):
+        """Test that no more than max_concurrency steps run at once."""
+        execution = build_execution(workflow)
+        engine._active_executions[execution.execution_id] = execution
+        state = self._install_step_runner(engine, execution)
+
+        await engine.execute_workflow_dag(execution.execution_id, max_concurrency=1)
+
+        assert state["max_running"] == 1
+        assert state["order"] == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_default_concurrency_comes_from_settings(self, engine, workflow):
+        """Test that the concurrency cap defaults to the configured value."""
+        execution = build_execution(workflow)
+        engine._active_executions[execution.execution_id] = execution
+        state = self._install_step_runner(engine, execution)
+
+        with patch("app.services.workflow_engine.settings") as mock_settings:
+            mock_settings.workflow_max_parallel_steps = 1
+            await engine.execute_workflow_dag(execution.execution_id)
+
+        assert state["max_running"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_stops_scheduling_dependents(self, engine, workflow):
+        """Test that a failed step halts launching of new steps."""
+        execution = build_execution(workflow)
+        engine._active_executions[execution.execution_id] = execution
+        state = self._install_step_runner(
+            engine, execution, results={1: ValueError("Step execution failed")}
+        )
+
+        result = await engine.execute_workflow_dag(execution.execution_id)
+
+        assert result["status"] == "failed"
+        assert result["step_results"][1]["status"] == "failed"
+        assert state["order"] == [0, 1]
+        assert result["remaining_steps"] == 3
+
+    @pytest.mark.asyncio
+    async def test_hitl_pause_waits_for_in_flight_steps(self, engine, workflow):
+        """Test that a HITL pause lets running siblings finish but launches nothing new."""
+        execution = build_execution(workflow)
+        engine._active_executions[execution.execution_id] = execution
+        state = self._install_step_runner(
+            engine,
+            execution,
+            delays={3: 0.05},
+            results={2: {"status": "paused_for_hitl"}}
+        )
+
+        result = await engine.execute_workflow_dag(execution.execution_id)
+
+        assert result["status"] == "paused_for_hitl"
+        assert result["step_results"][3]["status"] == "completed"
+        assert 4 not in state["order"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_execution_raises(self, engine):
+        """Test that scheduling an unknown execution raises ValueError."""
+        engine.recover_workflow_execution = Mock(return_value=None)
+
+        with pytest.raises(ValueError):
+            await engine.execute_workflow_dag("missing-execution")
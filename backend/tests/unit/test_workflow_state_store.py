@@ -0,0 +1,118 @@
+"""Unit tests for coalesced, diff-based workflow state persistence."""
+
+import pytest
+import asyncio
+from unittest.mock import patch
+
+from app.database.models import WorkflowStateDB
+from app.models.workflow_state import (
+    WorkflowExecutionStateModel,
+    WorkflowExecutionState as ExecutionStateEnum,
+    WorkflowStepExecutionState
+)
+from app.services.workflow_state_store import WorkflowStateStore
+
+
+@pytest.fixture
+def execution(db_session, project_factory):
+    """Running execution with three pending steps."""
+    project = project_factory.create(db_session)
+    execution = WorkflowExecutionStateModel(
+        project_id=str(project.id),
+        workflow_id="test-workflow",
+        total_steps=3,
+        context_data={"brief": "x" * 1000},
+        steps=[WorkflowStepExecutionState(step_index=i, agent="analyst") for i in range(3)]
+    )
+    execution.mark_started()
+    return execution
+
+
+def load_state(db_session, execution_id):
+    db_session.expire_all()
+    return db_session.query(WorkflowStateDB).filter(
+        WorkflowStateDB.execution_id == execution_id
+    ).one()
+
+
+class TestWorkflowStateStore:
+    """Test write-behind workflow state persistence."""
+
+    def test_first_save_inserts_row(self, db_session, execution):
+        """Test that a new execution is inserted with all columns."""
+        store = WorkflowStateStore(db_session, flush_interval=60)
+
+        store.save(execution)
+
+        db_state = load_state(db_session, execution.execution_id)
+        assert db_state.status == "running"
+        assert len(db_state.steps_data) == 3
+        assert db_state.context_data == execution.context_data
+
+    def test_saves_in_batch_are_coalesced(self, db_session, execution):
+        """Test that non-critical transitions in a batch produce a single write."""
+        store = WorkflowStateStore(db_session, flush_interval=60)
+        store.save(execution)
+
+        with patch.object(db_session, "commit", wraps=db_session.commit) as commit:
+            with store.batch(execution.execution_id):
+                for step in execution.steps:
+                    step.status = ExecutionStateEnum.RUNNING
+                    store.save(execution)
+                    step.status = ExecutionStateEnum.COMPLETED
+                    store.save(execution)
+
+                assert commit.call_count == 0
+
+        assert commit.call_count == 1
+        db_state = load_state(db_session, execution.execution_id)
+        assert [step["status"] for step in db_state.steps_data] == ["completed"] * 3
+
+    def test_critical_transition_is_written_immediately(self, db_session, execution):
+        """Test that pausing flushes even inside a batch."""
+        store = WorkflowStateStore(db_session, flush_interval=60)
+        store.save(execution)
+
+        with store.batch(execution.execution_id):
+            execution.pause("HITL approval required")
+            store.save(execution)
+
+            assert load_state(db_session, execution.execution_id).status == "paused"
+
+    def test_unchanged_columns_are_not_rewritten(self, db_session, execution):
+        """Test that a step change does not rewrite the context blob."""
+        store = WorkflowStateStore(db_session, flush_interval=60)
+        store.save(execution)
+
+        execution.steps[0].status = ExecutionStateEnum.RUNNING
+        with patch.object(db_session, "execute", wraps=db_session.execute) as execute:
+            store.save(execution)
+
+        statement = execute.call_args[0][0]
+        assert "steps_data" in statement.compile().params
+        assert "context_data" not in statement.compile().params
+
+    def test_save_without_changes_skips_write(self, db_session, execution):
+        """Test that saving an unchanged execution issues no statement."""
+        store = WorkflowStateStore(db_session, flush_interval=60)
+        store.save(execution)
+
+        with patch.object(db_session, "execute", wraps=db_session.execute) as execute:
+            store.save(execution)
+
+        execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dirty_state_flushes_after_interval(self, db_session, execution):
+        """Test that a coalesced save is written once the interval elapses."""
+        store = WorkflowStateStore(db_session, flush_interval=0.05)
+        store.save(execution)
+
+        with store.batch(execution.execution_id):
+            execution.steps[0].status = ExecutionStateEnum.RUNNING
+            store.save(execution)
+            assert load_state(db_session, execution.execution_id).steps_data[0]["status"] == "pending"
+
+            await asyncio.sleep(0.1)
+
+            assert load_state(db_session, execution.execution_id).steps_data[0]["status"] == "running"
@@ -0,0 +1,81 @@
+"""Unit tests for the batching shared by write-behind stores."""
+
+import pytest
+import asyncio
+
+from app.database.write_behind import WriteBehindBuffer
+
+
+class RecordingBuffer(WriteBehindBuffer):
+    """Buffer that records written batches and can be made to fail."""
+
+    def __init__(self, flush_interval=60):
+        super().__init__(flush_interval, session_factory=lambda: None)
+        self.batches = []
+        self.restored = []
+        self.error = None
+
+    def add(self, row):
+        self._pending.append(row)
+        self._schedule_flush()
+
+    def _write(self, pending):
+        if self.error is not None:
+            raise self.error
+        self.batches.append(pending)
+        return len(pending)
+
+    def _restore(self, pending, error):
+        self.restored.append((pending, error))
+        self._pending[:0] = pending
+        return 0
+
+
+class TestWriteBehindBuffer:
+    """Test timer scheduling, flush tracking and failed batches."""
+
+    @pytest.mark.asyncio
+    async def test_rows_are_written_together_when_the_timer_fires(self):
+        """Test that rows queued within the interval are written in one batch."""
+        buffer = RecordingBuffer(flush_interval=0.01)
+
+        for row in range(3):
+            buffer.add(row)
+        await asyncio.sleep(0.05)
+
+        assert buffer.batches == [[0, 1, 2]]
+        assert not buffer._flush_tasks
+
+    @pytest.mark.asyncio
+    async def test_flush_waits_for_background_flushes(self):
+        """Test that flush returns only after a flush already started has finished."""
+        buffer = RecordingBuffer()
+        buffer.add("row")
+
+        buffer._flush_soon()
+        assert buffer._flush_tasks
+        await buffer.flush()
+
+        assert buffer.batches == [["row"]]
+
+    def test_flush_soon_without_event_loop_writes_synchronously(self):
+        """Test that code outside an event loop is flushed inline."""
+        buffer = RecordingBuffer()
+        buffer.add("row")
+
+        buffer._flush_soon()
+
+        assert buffer.batches == [["row"]]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_handed_back_to_the_store(self):
+        """Test that a failed batch is passed to _restore and kept pending."""
+        buffer = RecordingBuffer()
+        buffer.add("row")
+        buffer.error = ConnectionError("database unavailable")
+
+        assert await buffer.flush() == 0
+
+        assert buffer.restored == [(["row"], buffer.error)]
+        assert buffer._pending == ["row"]
+        buffer.clear()